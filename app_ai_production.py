@@ -5,21 +5,43 @@ Solo OpenRouter - Sin debugging extenso
 """
 
 import os
+import time
 import logging
 from slack_bolt import App
 from dotenv import load_dotenv
 
 # Importar handlers de producción
-from llm_handler_production import get_llm_response_sync
+from llm_handler_production import get_llm_response_sync, prompt_cache_stats
 from llm_config_production import llm_config
+from llm_tools import tool_router
 
 # Importar memory manager y canvas
 from memory_manager import memory_manager
 from canvas_manager import canvas_manager
 
+# Fast path sin LLM para mensajes triviales
+from fast_path import fast_path_responder
+from llm_admission import llm_admission, SHED_MESSAGE
+
+# Scheduler por urgencia entre la recepción de eventos y el trabajo LLM/MCP
+from request_scheduler import request_scheduler, classify_priority, PRIORITY_LEVELS
+# Pipeline de eventos: ack inmediato y procesamiento por etapas
+from event_pipeline import event_pipeline
+# Orden estricto dentro de cada conversación, paralelismo entre conversaciones
+from keyed_executor import conversation_executor, conversation_key
+# Conexiones Socket Mode concurrentes (métricas para /health)
+from socket_mode_pool import socket_mode_pool
+# Salud agregada de los procesos worker (modo supervisor)
+from worker_supervisor import worker_index, read_worker_health
+
 # Importar integración MCP
 from mcp_integration import mcp_integration
-from mcp_health_monitor import initialize_health_monitor, health_monitor
+from mcp_cache import mcp_cache
+from mcp_bridge import mcp_bridge
+from mcp_cache_warmer import cache_warmer
+import mcp_health_monitor
+from circuit_breaker import circuit_breakers
+from event_dedup import event_deduplicator
 
 # Cargar variables de entorno
 load_dotenv()
@@ -36,6 +58,125 @@ logger = logging.getLogger(__name__)
 # Inicializar la app
 app = App(token=os.environ.get("SLACK_BOT_TOKEN"))
 
+# Reintentos de Slack: los eventos ya vistos se confirman sin llegar a los handlers
+app.middleware(event_deduplicator.middleware)
+
+# ============================================================================
+# PIPELINE DE EVENTOS: los listeners encolan, las etapas procesan
+# ============================================================================
+def pipeline_fetch_context(job: dict):
+    """Etapa 1: registrar usuario y mensaje (los reintentos ya guardados terminan aquí)"""
+    memory_manager.add_user(job["user"])
+    stored = memory_manager.log_conversation(
+        user_id=job["user"],
+        channel_id=job["channel"],
+        role="user",
+        content=job["text"],
+        thread_ts=job["thread_ts"],
+        message_ts=job["message_ts"]
+    )
+    if stored is False:
+        # Mensaje ya procesado (reintento de Slack que pasó el dedup de entrada)
+        logger.info(f"♻️ Mensaje {job['message_ts']} ya procesado, no se responde de nuevo")
+        return None
+    return job
+
+def pipeline_generate(job: dict):
+    """Etapa 2: respuesta del LLM (la cola de la etapa ordena por urgencia)"""
+    if job.get("fast_path"):
+        # Respuesta del fast path encolada detrás de otra pendiente: ya está lista
+        return job
+    # MEMORIA: el historial lo carga el handler (en paralelo con la búsqueda en
+    # consultas científicas)
+    load_context = lambda: memory_manager.get_context_for_llm(job["user"], job["channel"], max_messages=10)
+    job["response"] = request_scheduler.run(
+        job["urgency"],
+        get_llm_response_sync, job["text"], context_loader=load_context, priority=job["kind"]
+    )
+    return job
+
+def pipeline_post(job: dict):
+    """Etapa 3: guardar la respuesta y publicarla en Slack"""
+    memory_manager.log_conversation(
+        user_id=job["user"],
+        channel_id=job["channel"],
+        role="assistant",
+        content=job["response"],
+        thread_ts=job["thread_ts"],
+        metadata={"provider": "fast_path" if job.get("fast_path") else llm_config.active_provider}
+    )
+    
+    # QUICK WIN: Responder en hilo si es parte de uno
+    if job.get("blocks"):
+        job["say"]({"text": job["response"], "blocks": job["blocks"]})
+    elif job["reply_thread_ts"]:
+        job["say"](job["response"], thread_ts=job["reply_thread_ts"])
+    else:
+        job["say"](job["response"])
+    
+    if job["kind"] == "mention":
+        add_context_reaction(job["client"], job["channel"], job["message_ts"], job["text"])
+    
+    logger.info(f"✅ Respuesta enviada ({job['kind']})")
+    return job
+
+def add_context_reaction(client, channel: str, message_ts: str, text: str):
+    """QUICK WIN: Reacción automática según contexto"""
+    reactions = (
+        (['gracias', 'thank'], "heart"),
+        (['problema', 'error', 'bug'], "wrench"),
+        (['bueno', 'excelente', 'genial'], "thumbsup")
+    )
+    try:
+        for words, name in reactions:
+            if any(word in text.lower() for word in words):
+                client.reactions_add(channel=channel, timestamp=message_ts, name=name)
+                break
+    except Exception as reaction_error:
+        logger.warning(f"⚠️ Error agregando reacción: {reaction_error}")
+
+def notify_pipeline_error(job: dict, error: Exception):
+    """Una etapa falló: en menciones se avisa en el canal"""
+    if job["kind"] == "mention":
+        job["say"]("😅 Disculpa, tuve un problema. ¿Podrías intentarlo de nuevo?")
+
+def conversation_busy(key: str) -> bool:
+    """La conversación tiene una respuesta pendiente en este proceso"""
+    return event_pipeline.enabled and event_pipeline.ordering is not None and event_pipeline.ordering.is_busy(key)
+
+def queue_fast_reply(job: dict, fast_reply: dict):
+    """
+    Fast path con una respuesta pendiente en la misma conversación: va por su
+    lane para no publicarse antes que la respuesta anterior
+    """
+    job["response"] = fast_reply["text"]
+    job["fast_path"] = fast_reply["kind"]
+    if fast_reply["show_help"]:
+        job["blocks"] = create_help_blocks()
+    dispatch_event(job)
+    logger.info(f"⚡ Fast path {fast_reply['kind']} encolado detrás de la respuesta pendiente")
+
+def dispatch_event(job: dict):
+    """Encola el evento (o lo procesa en línea si el pipeline está desactivado)"""
+    if not event_pipeline.enabled:
+        event_pipeline.run_inline(job)
+        return
+    if not event_pipeline.submit(job):
+        job["say"](SHED_MESSAGE)
+
+event_pipeline.on_error = notify_pipeline_error
+if os.getenv("KEYED_ORDERING_ENABLED", "true").lower() == "true":
+    event_pipeline.set_ordering(conversation_executor)
+event_pipeline.add_stage("context", pipeline_fetch_context, workers=int(os.getenv("PIPELINE_CONTEXT_WORKERS", "2")))
+# Los workers de la etapa esperan al scheduler: la urgencia se aplica en la cola de la etapa,
+# con el mismo envejecimiento que el scheduler
+event_pipeline.add_stage(
+    "llm", pipeline_generate, workers=int(os.getenv("PIPELINE_LLM_WORKERS", "4")),
+    priority=lambda job: PRIORITY_LEVELS.get(job["urgency"], PRIORITY_LEVELS["medium"]),
+    aging_seconds=request_scheduler.aging_seconds
+)
+event_pipeline.add_stage("post", pipeline_post, workers=int(os.getenv("PIPELINE_POST_WORKERS", "2")))
+
 # ============================================================================
 # MANEJO DE MENCIONES (@bot) CON IA
 # ============================================================================
@@ -64,65 +205,53 @@ def handle_mention(body, say, client, logger):
             })
             return
         
-        # MEMORIA: Registrar usuario y mensaje
         thread_ts = body["event"].get("thread_ts") or body["event"]["ts"]
-        memory_manager.add_user(user)
-        memory_manager.log_conversation(
-            user_id=user,
-            channel_id=channel,
-            role="user",
-            content=clean_text,
-            thread_ts=thread_ts,
-            message_ts=body["event"]["ts"]
-        )
-        
-        # MEMORIA: Obtener contexto previo
-        context = memory_manager.get_context_for_llm(user, channel, max_messages=10)
-        logger.info(f"🧠 Contexto: {len(context)} mensajes")
-        
-        # Obtener respuesta del LLM con contexto
-        response = get_llm_response_sync(clean_text, context=context)
-        
-        # MEMORIA: Guardar respuesta
-        memory_manager.log_conversation(
-            user_id=user,
-            channel_id=channel,
-            role="assistant",
-            content=response,
-            thread_ts=thread_ts,
-            metadata={"provider": llm_config.active_provider}
-        )
-        
-        # QUICK WIN: Responder en hilo si es parte de uno
-        if body["event"].get("thread_ts"):
-            say(response, thread_ts=body["event"]["thread_ts"])
-        else:
-            say(response)
+        job = {
+            "kind": "mention",
+            "user": user,
+            "channel": channel,
+            "text": clean_text,
+            "thread_ts": thread_ts,
+            "reply_thread_ts": body["event"].get("thread_ts"),
+            "message_ts": body["event"]["ts"],
+            "key": conversation_key(user, channel, body["event"].get("thread_ts")),
+            "urgency": classify_priority(clean_text),
+            "say": say,
+            "client": client
+        }
         
-        # QUICK WIN: Reacción automática según contexto
-        try:
-            if any(word in clean_text.lower() for word in ['gracias', 'thank']):
-                client.reactions_add(
-                    channel=channel,
-                    timestamp=body["event"]["ts"],
-                    name="heart"
-                )
-            elif any(word in clean_text.lower() for word in ['problema', 'error', 'bug']):
-                client.reactions_add(
-                    channel=channel,
-                    timestamp=body["event"]["ts"],
-                    name="wrench"
-                )
-            elif any(word in clean_text.lower() for word in ['bueno', 'excelente', 'genial']):
-                client.reactions_add(
-                    channel=channel,
-                    timestamp=body["event"]["ts"],
-                    name="thumbsup"
-                )
-        except Exception as reaction_error:
-            logger.warning(f"⚠️ Error agregando reacción: {reaction_error}")
+        # FAST PATH: saludos, agradecimientos y ayuda sin pasar por el LLM
+        fast_reply = fast_path_responder.respond(clean_text, body.get("team_id"))
+        if fast_reply and conversation_busy(job["key"]):
+            queue_fast_reply(job, fast_reply)
+            return
+        if fast_reply:
+            if fast_reply["show_help"]:
+                # Respuesta con botones interactivos
+                say({
+                    "text": fast_reply["text"],
+                    "blocks": create_help_blocks()
+                })
+            elif body["event"].get("thread_ts"):
+                say(fast_reply["text"], thread_ts=body["event"]["thread_ts"])
+            else:
+                say(fast_reply["text"])
+            
+            fast_path_responder.log_async(
+                log_fast_path_turn, user, channel, clean_text, fast_reply["text"],
+                thread_ts=thread_ts, message_ts=body["event"]["ts"]
+            )
+            if fast_reply["kind"] == "acknowledgment":
+                try:
+                    client.reactions_add(channel=channel, timestamp=body["event"]["ts"], name="heart")
+                except Exception as reaction_error:
+                    logger.warning(f"⚠️ Error agregando reacción: {reaction_error}")
+            
+            logger.info(f"⚡ Fast path: {fast_reply['kind']}")
+            return
         
-        logger.info("✅ Respuesta enviada")
+        # PIPELINE: encolar y liberar el hilo de Bolt (contexto → LLM → publicación)
+        dispatch_event(job)
         
     except Exception as e:
         logger.error(f"❌ Error en mención: {e}")
@@ -131,6 +260,27 @@ def handle_mention(body, say, client, logger):
         except:
             pass
 
+def log_fast_path_turn(user: str, channel: str, text: str, reply: str,
+                       thread_ts: str = None, message_ts: str = None):
+    """Registra en memoria un turno respondido por el fast path (se ejecuta en segundo plano)"""
+    memory_manager.add_user(user)
+    memory_manager.log_conversation(
+        user_id=user,
+        channel_id=channel,
+        role="user",
+        content=text,
+        thread_ts=thread_ts,
+        message_ts=message_ts
+    )
+    memory_manager.log_conversation(
+        user_id=user,
+        channel_id=channel,
+        role="assistant",
+        content=reply,
+        thread_ts=thread_ts,
+        metadata={"provider": "fast_path"}
+    )
+
 # ============================================================================
 # QUICK WINS: BOTONES INTERACTIVOS
 # ============================================================================
@@ -285,8 +435,10 @@ def handle_create_summary_button(ack, body, client, logger):
             user_id, channel_id, "crear resumen"
         ).get("analysis", {})
         
-        # Crear Canvas de resumen
-        canvas_result = canvas_manager.create_conversation_summary(
+        # Crear Canvas de resumen (trabajo masivo: cede el paso a solicitudes urgentes)
+        canvas_result = request_scheduler.run(
+            "bulk",
+            canvas_manager.create_conversation_summary,
             client=client,
             channel_id=channel_id,
             conversation_history=history,
@@ -356,7 +508,10 @@ def handle_hello_command(ack, respond, command, logger):
             return
         
         # Obtener respuesta del LLM
-        response = get_llm_response_sync(text)
+        response = request_scheduler.run(
+            classify_priority(text, is_direct=True),
+            get_llm_response_sync, text, priority="command"
+        )
         respond(response)
         
         logger.info("✅ Comando procesado")
@@ -420,7 +575,9 @@ def handle_canvas_command(ack, body, client, logger, respond):
                 user_id, channel_id, "crear resumen canvas"
             ).get("analysis", {})
             
-            canvas_result = canvas_manager.create_conversation_summary(
+            canvas_result = request_scheduler.run(
+                "bulk",
+                canvas_manager.create_conversation_summary,
                 client=client,
                 channel_id=channel_id,
                 conversation_history=history,
@@ -551,35 +708,39 @@ def handle_message_events(body, logger, say, client):
                 )
                 return
             
-            # MEMORIA: Registrar mensaje
-            memory_manager.add_user(user)
-            memory_manager.log_conversation(
-                user_id=user,
-                channel_id=event.get("channel"),
-                role="user",
-                content=text,
-                message_ts=event.get("ts")
-            )
-            
-            # MEMORIA: Obtener contexto
-            context = memory_manager.get_context_for_llm(user, event.get("channel"), max_messages=10)
-            logger.info(f"🧠 Contexto DM: {len(context)} mensajes")
-            
-            # Respuesta con IA y contexto
-            response = get_llm_response_sync(text, context=context)
-            
-            # MEMORIA: Guardar respuesta
-            memory_manager.log_conversation(
-                user_id=user,
-                channel_id=event.get("channel"),
-                role="assistant",
-                content=response,
-                metadata={"provider": llm_config.active_provider}
-            )
+            job = {
+                "kind": "dm",
+                "user": user,
+                "channel": event.get("channel"),
+                "text": text,
+                "thread_ts": None,
+                "reply_thread_ts": None,
+                "message_ts": event.get("ts"),
+                "key": conversation_key(user, event.get("channel")),
+                "urgency": classify_priority(text, is_direct=True),
+                "say": say,
+                "client": client
+            }
             
-            say(response)
+            # FAST PATH: saludos, agradecimientos y ayuda sin pasar por el LLM
+            fast_reply = fast_path_responder.respond(text, body.get("team_id"))
+            if fast_reply and conversation_busy(job["key"]):
+                queue_fast_reply(job, fast_reply)
+                return
+            if fast_reply:
+                if fast_reply["show_help"]:
+                    say({"text": fast_reply["text"], "blocks": create_help_blocks()})
+                else:
+                    say(fast_reply["text"])
+                fast_path_responder.log_async(
+                    log_fast_path_turn, user, event.get("channel"), text, fast_reply["text"],
+                    message_ts=event.get("ts")
+                )
+                logger.info(f"⚡ Fast path DM: {fast_reply['kind']}")
+                return
             
-            logger.info("✅ DM respondido")
+            # PIPELINE: encolar y liberar el hilo de Bolt
+            dispatch_event(job)
         
     except Exception as e:
         logger.error(f"❌ Error en mensaje: {e}")
@@ -609,12 +770,17 @@ def handle_papers_command(text: str, user_id: str, say):
         logger.info(f"🔍 Búsqueda de papers: {query} por {user_id}")
         
         # Buscar papers usando MCP
-        if not mcp_integration.initialized:
-            if not mcp_integration.initialize():
-                say("❌ Error: Sistema MCP no disponible")
-                return
+        if not mcp_integration.ensure_arxiv_ready():
+            say("❌ Error: Sistema MCP no disponible")
+            return
         
-        result = mcp_integration.search_papers(query, max_results=5)
+        cache_hit = mcp_integration.search_is_cached(query, max_results=5)
+        started = time.perf_counter()
+        result = request_scheduler.run(
+            classify_priority(query, is_direct=True),
+            mcp_integration.search_papers, query, max_results=5
+        )
+        cache_warmer.observe_papers(time.perf_counter() - started, cache_hit)
         
         if result.get("success"):
             papers = result.get("papers", [])
@@ -646,10 +812,9 @@ def handle_categories_command(user_id: str, say):
         logger.info(f"📂 Solicitud de categorías por {user_id}")
         
         # Obtener categorías usando MCP
-        if not mcp_integration.initialized:
-            if not mcp_integration.initialize():
-                say("❌ Error: Sistema MCP no disponible")
-                return
+        if not mcp_integration.ensure_arxiv_ready():
+            say("❌ Error: Sistema MCP no disponible")
+            return
         
         result = mcp_integration.get_arxiv_categories()
         
@@ -710,15 +875,20 @@ def handle_papers_slash_command(ack, body, client, respond):
         logger.info(f"🔍 Slash command papers: {text} por {user_id}")
         
         # Buscar papers usando MCP
-        if not mcp_integration.initialized:
-            if not mcp_integration.initialize():
-                respond({
-                    "response_type": "ephemeral",
-                    "text": "❌ Error: Sistema MCP no disponible temporalmente"
-                })
-                return
+        if not mcp_integration.ensure_arxiv_ready():
+            respond({
+                "response_type": "ephemeral",
+                "text": "❌ Error: Sistema MCP no disponible temporalmente"
+            })
+            return
         
-        result = mcp_integration.search_papers(text, max_results=5)
+        cache_hit = mcp_integration.search_is_cached(text, max_results=5)
+        started = time.perf_counter()
+        result = request_scheduler.run(
+            classify_priority(text, is_direct=True),
+            mcp_integration.search_papers, text, max_results=5
+        )
+        cache_warmer.observe_papers(time.perf_counter() - started, cache_hit)
         
         if result.get("success"):
             papers = result.get("papers", [])
@@ -773,48 +943,46 @@ def handle_mcp_status_command(ack, body, respond):
         
         logger.info(f"📊 MCP status solicitado por {body['user_id']}")
         
-        # Inicializar MCP si es necesario
-        if not mcp_integration.initialized:
-            if not mcp_integration.initialize():
-                respond({
-                    "response_type": "ephemeral",
-                    "text": "❌ Sistema MCP no disponible"
-                })
-                return
-        
-        # Obtener estado del sistema
-        result = mcp_integration.get_system_status()
-        
-        if result.get("success"):
-            status = result.get("status", {})
-            health = result.get("health", {})
-            
-            formatted = "🔧 **Estado del Sistema MCP**\n\n"
-            formatted += f"✅ **Estado**: {'Saludable' if health.get('healthy') else 'Con problemas'}\n"
-            formatted += f"⏱️ **Uptime**: {status.get('uptime', 'N/A')}\n"
-            formatted += f"📦 **Módulos**: {status.get('mcpCount', 0)}\n"
-            formatted += f"🧠 **Cache**: {status.get('arxivCache', {}).get('size', 0)} elementos\n"
-            
-            if health.get('modules'):
-                modules = health['modules']
-                formatted += "\n📋 **Módulos disponibles**:\n"
-                for module, mod_health in modules.items():
-                    status_icon = "✅" if mod_health.get('healthy') else "❌"
-                    formatted += f"• {status_icon} {module.upper()}\n"
-            
-            formatted += "\n💡 **Comandos disponibles**:\n"
-            formatted += "• `/papers [query]` - Buscar papers científicos\n"
-            formatted += "• `/categories` - Ver categorías ArXiv\n"
-            
-            respond({
-                "response_type": "ephemeral",
-                "text": formatted
-            })
-        else:
+        # Snapshot del monitor de salud (sin tocar el worker en el camino de la request)
+        monitor = mcp_health_monitor.health_monitor
+        snapshot = monitor.get_snapshot() if monitor else None
+        if not snapshot or not snapshot.get("checked_at"):
+            if monitor:
+                monitor.request_check()
             respond({
                 "response_type": "ephemeral",
-                "text": f"❌ Error obteniendo estado MCP: {result.get('error')}"
+                "text": "⏳ Aún no hay un chequeo de salud MCP, intenta de nuevo en unos segundos"
             })
+            return
+        
+        worker = snapshot.get("worker") or {}
+        status = worker.get("status") or {}
+        
+        formatted = "🔧 **Estado del Sistema MCP**\n\n"
+        formatted += f"{'✅' if snapshot['healthy'] else '❌'} **Estado**: "
+        formatted += f"{'Saludable' if snapshot['healthy'] else 'Con problemas'}\n"
+        if snapshot.get("error"):
+            formatted += f"⚠️ **Último error**: {snapshot['error'][:150]}\n"
+        formatted += f"⏱️ **Uptime**: {status.get('uptime', 'N/A')}\n"
+        formatted += f"📦 **Módulos**: {status.get('mcpCount', 0)}\n"
+        formatted += f"🧠 **Cache**: {status.get('arxivCache', {}).get('size', 0)} elementos\n"
+        if snapshot.get("latency_ms") is not None:
+            formatted += f"📡 **Ping**: {snapshot['latency_ms']} ms (hace {snapshot['age_seconds']}s)\n"
+        
+        if status.get('availableMCPs'):
+            formatted += "\n📋 **Módulos disponibles**:\n"
+            for module in status['availableMCPs']:
+                status_icon = "✅" if snapshot['healthy'] else "❌"
+                formatted += f"• {status_icon} {module.upper()}\n"
+        
+        formatted += "\n💡 **Comandos disponibles**:\n"
+        formatted += "• `/papers [query]` - Buscar papers científicos\n"
+        formatted += "• `/categories` - Ver categorías ArXiv\n"
+        
+        respond({
+            "response_type": "ephemeral",
+            "text": formatted
+        })
         
     except Exception as e:
         logger.error(f"Error en comando MCP status: {e}")
@@ -831,10 +999,26 @@ def handle_debug_command(ack, body, respond):
         
         logger.info(f"🔍 Debug solicitado por {body['user_id']}")
         
-        # Ejecutar diagnóstico
+        # Diagnóstico cacheado; los subprocesos corren fuera del handler
+        monitor = mcp_health_monitor.health_monitor
+        if not monitor:
+            respond({
+                "response_type": "ephemeral",
+                "text": "❌ Monitor de salud no disponible"
+            })
+            return
+        
+        snapshot = monitor.get_debug_snapshot()
+        if not snapshot:
+            respond({
+                "response_type": "ephemeral",
+                "text": "⏳ Recolectando diagnóstico del entorno, intenta de nuevo en unos segundos"
+            })
+            return
+        
         import debug_render_mcp
-        debug_info = debug_render_mcp.debug_environment()
-        formatted_output = debug_render_mcp.format_debug_output(debug_info)
+        formatted_output = debug_render_mcp.format_debug_output(snapshot["info"])
+        formatted_output += f"\n_Diagnóstico de hace {snapshot['age_seconds']}s_"
         
         respond({
             "response_type": "ephemeral",
@@ -856,7 +1040,8 @@ def handle_health_command(ack, body, respond):
         
         logger.info(f"🩺 Health check solicitado por {body['user_id']}")
         
-        # Obtener estado del monitor MCP
+        # Obtener estado del monitor MCP (reporte cacheado)
+        health_monitor = mcp_health_monitor.health_monitor
         if health_monitor:
             health_report = health_monitor.get_health_report()
             
@@ -869,6 +1054,10 @@ def handle_health_command(ack, body, respond):
             response += f"**Uptime**: {health_report['uptime_formatted']}\n"
             response += f"**Checks realizados**: {health_report['total_checks']}\n"
             response += f"**Fallos consecutivos**: {health_report['consecutive_failures']}\n"
+            if health_report["latency_ms"] is not None:
+                response += f"**Ping worker**: {health_report['latency_ms']} ms\n"
+            if health_report["next_check_in"] is not None:
+                response += f"**Próximo check**: en {health_report['next_check_in']}s\n"
             
             if health_report["node_path"]:
                 response += f"**Node.js**: {health_report['node_path']}\n"
@@ -880,6 +1069,97 @@ def handle_health_command(ack, body, respond):
         else:
             response = "❌ **Monitor de salud no disponible**\n\nEl sistema no pudo inicializar el monitor de salud MCP."
         
+        # Control de admisión del LLM
+        admission = llm_admission.get_metrics()
+        response += f"\n🚦 **Cola LLM**: {admission['queue_depth']} en espera, "
+        response += f"{admission['in_flight']}/{admission['max_concurrent']} en curso\n"
+        response += f"**Espera p95**: {admission['wait_seconds']['p95']}s\n"
+        response += f"**Descartadas**: {admission['shed_queue_full'] + admission['shed_timeout']}\n"
+        
+        # Reintentos de Slack descartados en la entrada
+        dedup_stats = event_deduplicator.get_stats()
+        response += f"♻️ **Eventos duplicados**: {dedup_stats['duplicates']}/{dedup_stats['checked']} descartados "
+        response += f"({'LRU + Redis' if dedup_stats['redis'] else 'solo LRU'})\n"
+        
+        # Cache de prompts del proveedor
+        cache_stats = prompt_cache_stats.snapshot()
+        response += f"🗄️ **Prompt cache**: {cache_stats['cached_tokens']}/{cache_stats['prompt_tokens']} tokens "
+        response += f"({int(cache_stats['cache_hit_ratio'] * 100)}%)\n"
+        
+        # Function calling (solo si está activo)
+        if llm_config.tool_calling["enabled"]:
+            tool_stats = tool_router.stats
+            response += f"🧰 **Tools LLM**: {tool_stats['calls']} ejecutadas, {tool_stats['cache_hits']} desde cache, "
+            response += f"{tool_stats['errors']} con error, {tool_stats['over_budget']} fuera de presupuesto\n"
+        
+        # Cache persistente de resultados MCP
+        mcp_cache_stats = mcp_cache.get_stats()
+        response += f"📦 **MCP cache**: {mcp_cache_stats['entries']} entradas, "
+        response += f"hit ratio {int(mcp_cache_stats['hit_ratio'] * 100)}%, "
+        response += f"{mcp_cache_stats['stale_served']} stale servidos\n"
+        
+        # Latencia de /papers esperando a arXiv vs desde el cache que mantiene el warmer
+        warmer_report = cache_warmer.report()
+        miss = warmer_report["papers_latency"]["cache_miss"]
+        hit = warmer_report["papers_latency"]["cache_hit"]
+        response += f"🔥 **/papers p95**: {miss['p95']}s sin cache ({miss['count']}) → "
+        response += f"{hit['p95']}s desde cache ({hit['count']}), "
+        response += f"{int(warmer_report['papers_hit_ratio'] * 100)}% desde cache, "
+        response += f"{warmer_report['refreshed']} entradas precalentadas\n"
+        
+        # Pool de workers Node persistentes
+        bridge_stats = mcp_bridge.get_stats()
+        response += f"🧩 **Workers MCP**: {bridge_stats['running_workers']}/{bridge_stats['size']} activos, "
+        response += f"{bridge_stats['requests']} requests, {bridge_stats['pending']} en curso, "
+        response += f"{bridge_stats['restarts']} reinicios, {bridge_stats['recycled']} reciclados por memoria\n"
+        
+        # Circuitos MCP abiertos (las requests van directo al fallback)
+        breakers = circuit_breakers.snapshot()
+        open_circuits = [f"{name} ({b['state']}, reintento en {b['retry_in'] or 0}s)"
+                         for name, b in breakers.items() if b["state"] != "closed"]
+        response += f"🔌 **Circuitos MCP**: {', '.join(open_circuits) if open_circuits else 'todos cerrados'}, "
+        response += f"{sum(b['rejected'] for b in breakers.values())} requests en fallo rápido\n"
+        
+        # Conexiones Socket Mode
+        socket_metrics = socket_mode_pool.get_metrics()
+        if socket_metrics["running"]:
+            response += f"\n📡 **Socket Mode**: {socket_metrics['connected']}/{socket_metrics['size']} conexiones, "
+            response += f"{socket_metrics['events_per_minute']} eventos/min, {socket_metrics['reconnects']} reconexiones\n"
+            for connection in socket_metrics["connections"]:
+                state = "conectada" if connection["connected"] else "reconectando"
+                response += f"• #{connection['index']}: {state}, {connection['events']} eventos "
+                response += f"({connection['events_per_minute']}/min), {connection['reconnects']} reconexiones\n"
+        
+        # Procesos worker: este worker responde con el agregado de todos
+        if worker_index() is not None:
+            workers_health = read_worker_health()
+            response += f"\n🧵 **Workers**: {workers_health['ready']}/{workers_health['size']} listos "
+            response += f"(este: #{worker_index()}), {workers_health['events_per_minute']} eventos/min, "
+            response += f"{workers_health['queue_depth']} en cola, {workers_health['completed']} completados, "
+            response += f"{workers_health['restarts']} reinicios\n"
+        
+        # Pipeline de eventos por etapa
+        pipeline_metrics = event_pipeline.get_metrics()
+        response += f"\n🛤️ **Pipeline de eventos**: {pipeline_metrics['queue_depth']} en cola, "
+        response += f"{pipeline_metrics['completed']} completados, {pipeline_metrics['shed']} descartados por carga, "
+        response += f"p95 total {pipeline_metrics['end_to_end_seconds']['p95']}s\n"
+        for stage_name, stage in pipeline_metrics["stages"].items():
+            response += f"• {stage_name}: {stage['queue_depth']}/{stage['max_queue']} en cola, "
+            response += f"{stage['busy']}/{stage['workers']} ocupados, espera p95 {stage['wait_seconds']['p95']}s, "
+            response += f"duración p95 {stage['duration_seconds']['p95']}s\n"
+        ordering = pipeline_metrics["ordering"]
+        if ordering:
+            response += f"• orden por conversación: {ordering['active_conversations']} activas, "
+            response += f"{ordering['waiting']} mensajes esperando su turno, "
+            response += f"espera p95 {ordering['lane_wait_seconds']['p95']}s\n"
+        
+        # Latencia por prioridad del scheduler
+        scheduler_metrics = request_scheduler.get_metrics()
+        response += "\n🗂️ **Latencia p95 por prioridad**:\n"
+        for level, histogram in scheduler_metrics["latency_seconds"].items():
+            if histogram["count"]:
+                response += f"• {level}: {histogram['p95']}s ({histogram['count']} solicitudes)\n"
+        
         respond({
             "response_type": "ephemeral",
             "text": response
@@ -909,8 +1189,7 @@ def health_check():
         
         # Verificar MCP si está disponible
         try:
-            if not mcp_integration.initialized:
-                mcp_integration.initialize()
+            mcp_integration.is_ready()
         except:
             logger.warning("MCP integration not available during health check")
             
@@ -0,0 +1,205 @@
+"""
+Cliente arXiv nativo y async
+Consulta export.arxiv.org con el pool aiohttp compartido y parsea el feed Atom
+de forma incremental, sin pasar por el puente Node.js
+"""
+
+import os
+import time
+import asyncio
+import logging
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterable, List, Optional
+
+import aiohttp
+
+from async_runtime import async_runtime
+
+logger = logging.getLogger(__name__)
+
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+ARXIV_NS = "{http://arxiv.org/schemas/atom}"
+
+# Mismas categorías que ArxivMCP.js, servidas en proceso
+ARXIV_CATEGORIES = {
+    'cs.AI': 'Artificial Intelligence',
+    'cs.LG': 'Machine Learning',
+    'cs.CL': 'Computation and Language',
+    'cs.CV': 'Computer Vision',
+    'cs.RO': 'Robotics',
+    'stat.ML': 'Machine Learning (Statistics)',
+    'math.OC': 'Optimization and Control',
+    'eess.AS': 'Audio and Speech Processing',
+    'eess.IV': 'Image and Video Processing'
+}
+
+
+def _text(entry: ET.Element, tag: str) -> Optional[str]:
+    element = entry.find(tag)
+    return element.text if element is not None else None
+
+
+def parse_entry(entry: ET.Element, detailed: bool = False) -> Dict:
+    """Convierte un <entry> Atom al mismo dict que produce ArxivMCP._parseArxivEntry"""
+    links = entry.findall(f"{ATOM_NS}link")
+    pdf_url = next((l.get("href") for l in links if l.get("type") == "application/pdf"), None)
+    arxiv_url = next((l.get("href") for l in links if l.get("rel") == "alternate"), None)
+
+    paper = {
+        "id": (_text(entry, f"{ATOM_NS}id") or "").split("/")[-1],
+        "title": (_text(entry, f"{ATOM_NS}title") or "").strip(),
+        "authors": [
+            name.text for name in entry.findall(f"{ATOM_NS}author/{ATOM_NS}name") if name.text
+        ],
+        "summary": (_text(entry, f"{ATOM_NS}summary") or "").strip(),
+        "categories": [c.get("term") for c in entry.findall(f"{ATOM_NS}category")],
+        "published": _text(entry, f"{ATOM_NS}published"),
+        "updated": _text(entry, f"{ATOM_NS}updated"),
+        "pdfUrl": pdf_url,
+        "arxivUrl": arxiv_url
+    }
+
+    if detailed:
+        primary = entry.find(f"{ARXIV_NS}primary_category")
+        paper["comment"] = _text(entry, f"{ARXIV_NS}comment")
+        paper["journalRef"] = _text(entry, f"{ARXIV_NS}journal_ref")
+        paper["doi"] = _text(entry, f"{ARXIV_NS}doi")
+        paper["primaryCategory"] = primary.get("term") if primary is not None else None
+
+    return paper
+
+
+class AtomFeedParser:
+    """Parser incremental: recibe chunks de bytes y emite papers a medida que cierran los <entry>"""
+
+    def __init__(self, detailed: bool = False):
+        self.detailed = detailed
+        self._parser = ET.XMLPullParser(events=("end",))
+
+    def feed(self, chunk: bytes) -> List[Dict]:
+        self._parser.feed(chunk)
+        return self._drain()
+
+    def _drain(self) -> List[Dict]:
+        papers = []
+        for _, element in self._parser.read_events():
+            if element.tag == f"{ATOM_NS}entry":
+                papers.append(parse_entry(element, self.detailed))
+                # Liberar el subárbol ya procesado
+                element.clear()
+        return papers
+
+    def close(self) -> List[Dict]:
+        self._parser.close()
+        return self._drain()
+
+
+def parse_feed(chunks: Iterable[bytes], detailed: bool = False) -> List[Dict]:
+    """Parsea un feed completo (útil para fixtures y benchmarks)"""
+    parser = AtomFeedParser(detailed)
+    papers = []
+    for chunk in chunks:
+        papers.extend(parser.feed(chunk))
+    papers.extend(parser.close())
+    return papers
+
+
+class ArxivClient:
+    """Cliente async de la API de arXiv con espaciado de cortesía entre requests"""
+
+    def __init__(self):
+        self.base_url = os.getenv("ARXIV_API_URL", "http://export.arxiv.org/api/query")
+        self.timeout = float(os.getenv("ARXIV_TIMEOUT", "30"))
+        # arXiv pide como máximo una request cada tres segundos
+        self.min_interval = float(os.getenv("ARXIV_MIN_INTERVAL", "3"))
+        self._throttle_lock: Optional[asyncio.Lock] = None
+        self._last_request = 0.0
+        self.stats = {"requests": 0, "papers": 0, "errors": 0}
+
+    async def _throttle(self):
+        """Respeta el intervalo mínimo entre requests (el lock vive en el loop del runtime)"""
+        if self._throttle_lock is None:
+            self._throttle_lock = asyncio.Lock()
+        async with self._throttle_lock:
+            wait = self._last_request + self.min_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._last_request = time.monotonic()
+
+    async def _fetch_entries(self, params: Dict, detailed: bool = False) -> List[Dict]:
+        """Descarga y parsea el feed en streaming"""
+        await self._throttle()
+        session = await async_runtime.get_http_session()
+        parser = AtomFeedParser(detailed)
+        papers = []
+
+        try:
+            async with session.get(
+                self.base_url,
+                params=params,
+                headers={"User-Agent": "DonaBot-ArxivClient/1.0"},
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            ) as response:
+                if response.status != 200:
+                    raise RuntimeError(f"arXiv respondió HTTP {response.status}")
+                async for chunk in response.content.iter_chunked(16384):
+                    papers.extend(parser.feed(chunk))
+            papers.extend(parser.close())
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+
+        self.stats["requests"] += 1
+        self.stats["papers"] += len(papers)
+        return papers
+
+    async def search_papers(self, query: str, max_results: int = 10,
+                            category: Optional[str] = None) -> List[Dict]:
+        """Busca papers por relevancia (misma consulta que ArxivMCP.searchPapers)"""
+        search_query = f"all:{query}"
+        if category:
+            search_query = f"cat:{category} AND {search_query}"
+
+        start = time.perf_counter()
+        papers = await self._fetch_entries({
+            "search_query": search_query,
+            "start": 0,
+            "max_results": max_results,
+            "sortBy": "relevance",
+            "sortOrder": "descending"
+        })
+        logger.info(f"📚 arXiv nativo: {len(papers)} papers para '{query}' "
+                    f"en {(time.perf_counter() - start) * 1000:.0f}ms")
+        return papers
+
+    async def get_paper_details(self, arxiv_id: str) -> Dict:
+        """Detalles de un paper; lanza ValueError si no existe"""
+        papers = await self.get_papers_details([arxiv_id])
+        if not papers:
+            raise ValueError(f"Paper not found: {arxiv_id}")
+        return papers[0]
+
+    async def get_papers_details(self, arxiv_ids: List[str]) -> List[Dict]:
+        """Detalles de varios papers en una sola request (id_list separado por comas)"""
+        if not arxiv_ids:
+            return []
+        return await self._fetch_entries(
+            {"id_list": ",".join(arxiv_ids), "max_results": len(arxiv_ids)}, detailed=True
+        )
+
+    async def get_recent_papers(self, category: str, max_results: int = 10) -> List[Dict]:
+        """Papers más recientes de una categoría"""
+        return await self._fetch_entries({
+            "search_query": f"cat:{category}",
+            "start": 0,
+            "max_results": max_results,
+            "sortBy": "submittedDate",
+            "sortOrder": "descending"
+        })
+
+    def get_categories(self) -> Dict[str, str]:
+        """Categorías disponibles (constante en proceso, sin I/O)"""
+        return dict(ARXIV_CATEGORIES)
+
+# Instancia global
+arxiv_client = ArxivClient()
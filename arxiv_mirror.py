@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+Mirror local de metadatos de arXiv
+Carga metadatos de las categorías configuradas (OAI-PMH o snapshots JSON locales)
+en un índice SQLite FTS5, con actualizaciones incrementales diarias, para que
+search_papers no dependa de la latencia de arXiv
+
+Uso:
+    python arxiv_mirror.py harvest [--from YYYY-MM-DD]
+    python arxiv_mirror.py load arxiv-metadata-oai-snapshot.json
+    python arxiv_mirror.py search "graph neural networks" [--category cs.LG]
+    python arxiv_mirror.py stats
+"""
+
+import os
+import re
+import sys
+import gzip
+import json
+import time
+import logging
+import tempfile
+import threading
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+import requests
+
+from sqlite_utils import sqlite_connect
+
+logger = logging.getLogger(__name__)
+
+OAI_NS = "{http://www.openarchives.org/OAI/2.0/}"
+ARXIV_OAI_NS = "{http://arxiv.org/OAI/arXiv/}"
+
+# Categorías que más busca el equipo (las de handle_categories_command)
+DEFAULT_MIRROR_CATEGORIES = "cs.AI,cs.LG,cs.CL,cs.CV,stat.ML"
+
+
+class ArxivMirror:
+    """Índice FTS5 local con los metadatos de arXiv de las categorías configuradas"""
+
+    def __init__(self, db_path: str = None, categories: List[str] = None):
+        if db_path is None:
+            db_path = os.getenv(
+                "ARXIV_MIRROR_DB", os.path.join(tempfile.gettempdir(), "dona_arxiv_mirror.db")
+            )
+        self.db_path = db_path
+        self.enabled = os.getenv("ARXIV_MIRROR_ENABLED", "false").lower() == "true"
+        self.categories = categories or [
+            c.strip() for c in os.getenv("ARXIV_MIRROR_CATEGORIES", DEFAULT_MIRROR_CATEGORIES).split(",")
+            if c.strip()
+        ]
+        self.oai_url = os.getenv("ARXIV_OAI_URL", "http://export.arxiv.org/oai2")
+        self.min_interval = float(os.getenv("ARXIV_MIN_INTERVAL", "3"))
+        self.update_hours = float(os.getenv("ARXIV_MIRROR_UPDATE_HOURS", "24"))
+        # Tras una cosecha fallida: reintento con backoff exponencial acotado (segundos)
+        self.retry_base = float(os.getenv("ARXIV_MIRROR_RETRY_BASE", "300"))
+        self.retry_max = float(os.getenv("ARXIV_MIRROR_RETRY_MAX", "21600"))
+        self._update_thread: Optional[threading.Thread] = None
+        self._paper_count: Optional[int] = None
+        self.init_database()
+
+    def init_database(self):
+        """Crear tablas del mirror"""
+        try:
+            with sqlite_connect(self.db_path) as conn:
+                conn.execute("""
+                CREATE TABLE IF NOT EXISTS papers (
+                    id TEXT PRIMARY KEY,
+                    title TEXT,
+                    authors TEXT,  -- JSON array
+                    summary TEXT,
+                    categories TEXT,  -- separadas por espacio
+                    primary_category TEXT,
+                    published TEXT,
+                    updated TEXT,
+                    comment TEXT,
+                    journal_ref TEXT,
+                    doi TEXT
+                )
+                """)
+                conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(
+                    title, summary, authors, categories,
+                    tokenize = 'porter unicode61'
+                )
+                """)
+                # Estado de las cosechas incrementales
+                conn.execute("""
+                CREATE TABLE IF NOT EXISTS mirror_state (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                )
+                """)
+        except Exception as e:
+            logger.error(f"❌ Error inicializando mirror de arXiv: {e}")
+            self.enabled = False
+
+    # ------------------------------------------------------------------
+    # Carga de datos
+    # ------------------------------------------------------------------
+
+    def _wanted(self, categories: List[str]) -> bool:
+        return any(c in self.categories for c in categories)
+
+    def upsert_papers(self, papers: Iterable[Dict]) -> int:
+        """Inserta o actualiza papers (solo los de las categorías configuradas)"""
+        count = 0
+        with sqlite_connect(self.db_path) as conn:
+            for paper in papers:
+                if not self._wanted(paper["categories"]):
+                    continue
+                authors = json.dumps(paper["authors"], ensure_ascii=False)
+                categories = " ".join(paper["categories"])
+                # El índice FTS comparte rowid con papers: se reemplaza sin recorrerlo
+                existing = conn.execute("SELECT rowid FROM papers WHERE id = ?", (paper["id"],)).fetchone()
+                if existing:
+                    conn.execute("DELETE FROM papers_fts WHERE rowid = ?", existing)
+                cursor = conn.execute("""
+                INSERT OR REPLACE INTO papers (id, title, authors, summary, categories,
+                    primary_category, published, updated, comment, journal_ref, doi)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (paper["id"], paper["title"], authors, paper["summary"], categories,
+                      paper["primaryCategory"], paper["published"], paper["updated"],
+                      paper.get("comment"), paper.get("journalRef"), paper.get("doi")))
+                conn.execute(
+                    "INSERT INTO papers_fts (rowid, title, summary, authors, categories) VALUES (?, ?, ?, ?, ?)",
+                    (cursor.lastrowid, paper["title"], paper["summary"], " ".join(paper["authors"]), categories)
+                )
+                count += 1
+        self._paper_count = None
+        return count
+
+    @staticmethod
+    def _clean(text: Optional[str]) -> str:
+        return " ".join((text or "").split())
+
+    def _from_snapshot(self, record: Dict) -> Dict:
+        """Registro del snapshot JSON de arXiv (formato arxiv-metadata-oai-snapshot)"""
+        versions = record.get("versions") or []
+        published = versions[0].get("created") if versions else None
+        if published:
+            published = datetime.strptime(published, "%a, %d %b %Y %H:%M:%S %Z").strftime("%Y-%m-%dT%H:%M:%SZ")
+
+        if record.get("authors_parsed"):
+            authors = [" ".join(p for p in reversed(parts[:2]) if p) for parts in record["authors_parsed"]]
+        else:
+            authors = [a.strip() for a in re.split(r",| and ", record.get("authors", "")) if a.strip()]
+
+        categories = (record.get("categories") or "").split()
+        return {
+            "id": record["id"],
+            "title": self._clean(record.get("title")),
+            "authors": authors,
+            "summary": (record.get("abstract") or "").strip(),
+            "categories": categories,
+            "primaryCategory": categories[0] if categories else None,
+            "published": published or record.get("update_date"),
+            "updated": record.get("update_date"),
+            "comment": record.get("comments"),
+            "journalRef": record.get("journal-ref"),
+            "doi": record.get("doi")
+        }
+
+    def load_snapshot(self, path: str, batch_size: int = 1000) -> int:
+        """Carga un snapshot JSON-lines (opcionalmente .gz)"""
+        opener = gzip.open if path.endswith(".gz") else open
+        total, batch = 0, []
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                batch.append(self._from_snapshot(json.loads(line)))
+                if len(batch) >= batch_size:
+                    total += self.upsert_papers(batch)
+                    batch = []
+        total += self.upsert_papers(batch)
+        logger.info(f"📥 Snapshot {path}: {total} papers cargados")
+        return total
+
+    def _from_oai(self, metadata: ET.Element) -> Dict:
+        """Registro OAI-PMH con metadataPrefix=arXiv"""
+        def text(tag):
+            element = metadata.find(f"{ARXIV_OAI_NS}{tag}")
+            return element.text if element is not None else None
+
+        authors = []
+        for author in metadata.findall(f"{ARXIV_OAI_NS}authors/{ARXIV_OAI_NS}author"):
+            forenames = author.findtext(f"{ARXIV_OAI_NS}forenames") or ""
+            keyname = author.findtext(f"{ARXIV_OAI_NS}keyname") or ""
+            authors.append(f"{forenames} {keyname}".strip())
+
+        categories = (text("categories") or "").split()
+        created = text("created")
+        return {
+            "id": text("id"),
+            "title": self._clean(text("title")),
+            "authors": authors,
+            "summary": (text("abstract") or "").strip(),
+            "categories": categories,
+            "primaryCategory": categories[0] if categories else None,
+            "published": f"{created}T00:00:00Z" if created else None,
+            "updated": text("updated") or created,
+            "comment": text("comments"),
+            "journalRef": text("journal-ref"),
+            "doi": text("doi")
+        }
+
+    def _oai_sets(self) -> List[str]:
+        """Sets OAI a cosechar (archivo de nivel superior: cs, stat, ...)"""
+        return sorted({category.split(".")[0] for category in self.categories})
+
+    def harvest_oai(self, from_date: str = None) -> int:
+        """Cosecha OAI-PMH siguiendo resumptionToken, respetando el intervalo y Retry-After"""
+        total = 0
+        for oai_set in self._oai_sets():
+            params = {"verb": "ListRecords", "metadataPrefix": "arXiv", "set": oai_set}
+            if from_date:
+                params["from"] = from_date
+
+            while params:
+                response = requests.get(self.oai_url, params=params, stream=True, timeout=120)
+                if response.status_code == 503:
+                    retry_after = int(response.headers.get("Retry-After", "30"))
+                    logger.info(f"⏳ OAI-PMH pide esperar {retry_after}s")
+                    time.sleep(retry_after)
+                    continue
+                response.raise_for_status()
+                response.raw.decode_content = True
+
+                papers, token = [], None
+                for _, element in ET.iterparse(response.raw, events=("end",)):
+                    if element.tag == f"{ARXIV_OAI_NS}arXiv":
+                        papers.append(self._from_oai(element))
+                        element.clear()
+                    elif element.tag == f"{OAI_NS}resumptionToken":
+                        token = (element.text or "").strip() or None
+
+                total += self.upsert_papers(papers)
+                logger.info(f"📥 OAI {oai_set}: {len(papers)} registros (total {total})")
+                params = {"verb": "ListRecords", "resumptionToken": token} if token else None
+                time.sleep(self.min_interval)
+
+        return total
+
+    def update(self) -> Optional[int]:
+        """
+        Actualización incremental desde la última cosecha (o completa si es la primera)
+
+        Returns:
+            Papers actualizados, o None si la cosecha falló (last_harvest no avanza)
+        """
+        last = self._get_state("last_harvest")
+        today = datetime.utcnow().strftime("%Y-%m-%d")
+        try:
+            total = self.harvest_oai(from_date=last)
+            self._set_state("last_harvest", today)
+            logger.info(f"✅ Mirror de arXiv actualizado: {total} papers desde {last or 'el inicio'}")
+            return total
+        except Exception as e:
+            logger.error(f"❌ Error actualizando mirror de arXiv: {e}")
+            return None
+
+    def start_daily_updates(self):
+        """Hilo de fondo que actualiza el mirror cada ARXIV_MIRROR_UPDATE_HOURS"""
+        if not self.enabled or (self._update_thread and self._update_thread.is_alive()):
+            return
+
+        self._update_thread = threading.Thread(target=self._update_loop, name="arxiv-mirror-update", daemon=True)
+        self._update_thread.start()
+        logger.info(f"🗓️ Actualización diaria del mirror de arXiv programada ({', '.join(self.categories)})")
+
+    def retry_delay(self, failures: int) -> float:
+        """Espera tras `failures` cosechas fallidas seguidas"""
+        return min(self.retry_base * 2 ** (failures - 1), self.retry_max)
+
+    def _update_loop(self):
+        """Cosecha cuando vence el intervalo; tras un fallo espera con backoff en vez de reintentar al instante"""
+        failures = 0
+        while True:
+            if failures:
+                wait = self.retry_delay(failures)
+                logger.warning(f"⏳ Reintentando la cosecha de arXiv en {wait:.0f}s ({failures} fallos seguidos)")
+            else:
+                last = self._get_state("last_harvest")
+                due = (datetime.strptime(last, "%Y-%m-%d") + timedelta(hours=self.update_hours)
+                       if last else datetime.utcnow())
+                wait = (due - datetime.utcnow()).total_seconds()
+            if wait > 0:
+                time.sleep(wait)
+            failures = 0 if self.update() is not None else failures + 1
+
+    def _get_state(self, key: str) -> Optional[str]:
+        with sqlite_connect(self.db_path) as conn:
+            row = conn.execute("SELECT value FROM mirror_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, key: str, value: str):
+        with sqlite_connect(self.db_path) as conn:
+            conn.execute("INSERT OR REPLACE INTO mirror_state (key, value) VALUES (?, ?)", (key, value))
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def paper_count(self) -> int:
+        """Cantidad de papers (solo se memoriza cuando hay datos: otro proceso puede cargarlos)"""
+        if self._paper_count:
+            return self._paper_count
+        try:
+            with sqlite_connect(self.db_path) as conn:
+                self._paper_count = conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+        except Exception:
+            self._paper_count = 0
+        return self._paper_count
+
+    def is_ready(self) -> bool:
+        """Habilitado y con datos cargados"""
+        return self.enabled and self.paper_count() > 0
+
+    def covers(self, category: Optional[str]) -> bool:
+        return category is None or category in self.categories
+
+    @staticmethod
+    def _to_paper(row) -> Dict:
+        """Fila -> mismo dict que produce el cliente arXiv"""
+        (paper_id, title, authors, summary, categories, primary, published,
+         updated, comment, journal_ref, doi) = row
+        return {
+            "id": paper_id,
+            "title": title,
+            "authors": json.loads(authors),
+            "summary": summary,
+            "categories": categories.split(),
+            "published": published,
+            "updated": updated,
+            "pdfUrl": f"http://arxiv.org/pdf/{paper_id}",
+            "arxivUrl": f"http://arxiv.org/abs/{paper_id}",
+            "comment": comment,
+            "journalRef": journal_ref,
+            "doi": doi,
+            "primaryCategory": primary
+        }
+
+    @staticmethod
+    def _fts_query(query: str) -> str:
+        """Consulta FTS5 segura: cada término entre comillas, todos obligatorios"""
+        terms = re.findall(r"\w+", query.lower())
+        return " ".join(f'"{term}"' for term in terms)
+
+    def search(self, query: str, max_results: int = 10, category: str = None) -> List[Dict]:
+        """Búsqueda por relevancia (bm25, título con más peso que el resumen)"""
+        match = self._fts_query(query)
+        if not match:
+            return []
+        sql = """
+        SELECT p.id, p.title, p.authors, p.summary, p.categories, p.primary_category,
+               p.published, p.updated, p.comment, p.journal_ref, p.doi
+        FROM papers_fts f JOIN papers p ON p.rowid = f.rowid
+        WHERE papers_fts MATCH ?
+        """
+        params: list = [match]
+        if category:
+            sql += " AND (' ' || p.categories || ' ') LIKE ?"
+            params.append(f"% {category} %")
+        sql += " ORDER BY bm25(papers_fts, 10.0, 1.0, 2.0, 0.5) LIMIT ?"
+        params.append(max_results)
+
+        with sqlite_connect(self.db_path) as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [self._to_paper(row) for row in rows]
+
+    def get_paper(self, arxiv_id: str) -> Optional[Dict]:
+        """Paper por id (se ignora el sufijo de versión)"""
+        base_id = re.sub(r"v\d+$", "", arxiv_id)
+        with sqlite_connect(self.db_path) as conn:
+            row = conn.execute("""
+            SELECT id, title, authors, summary, categories, primary_category,
+                   published, updated, comment, journal_ref, doi
+            FROM papers WHERE id = ?
+            """, (base_id,)).fetchone()
+        return self._to_paper(row) if row else None
+
+    def get_stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "papers": self.paper_count(),
+            "categories": self.categories,
+            "last_harvest": self._get_state("last_harvest")
+        }
+
+# Instancia global
+arxiv_mirror = ArxivMirror()
+
+
+def main(argv: List[str]) -> int:
+    """CLI del mirror"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Mirror local de metadatos de arXiv")
+    sub = parser.add_subparsers(dest="command", required=True)
+    harvest = sub.add_parser("harvest", help="Cosecha OAI-PMH (incremental si no se indica --from)")
+    harvest.add_argument("--from", dest="from_date")
+    load = sub.add_parser("load", help="Carga un snapshot JSON-lines")
+    load.add_argument("path")
+    search = sub.add_parser("search", help="Busca en el índice local")
+    search.add_argument("query")
+    search.add_argument("--category")
+    search.add_argument("--max-results", type=int, default=5)
+    sub.add_parser("stats", help="Estado del mirror")
+    args = parser.parse_args(argv)
+
+    if args.command == "harvest":
+        if args.from_date:
+            arxiv_mirror.harvest_oai(from_date=args.from_date)
+        else:
+            arxiv_mirror.update()
+    elif args.command == "load":
+        arxiv_mirror.load_snapshot(args.path)
+    elif args.command == "search":
+        start = time.perf_counter()
+        papers = arxiv_mirror.search(args.query, args.max_results, args.category)
+        elapsed = (time.perf_counter() - start) * 1000
+        for paper in papers:
+            print(f"{paper['id']}  {paper['title']}")
+        print(f"({len(papers)} resultados en {elapsed:.2f}ms)")
+    elif args.command == "stats":
+        print(json.dumps(arxiv_mirror.get_stats(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    sys.exit(main(sys.argv[1:]))
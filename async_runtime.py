@@ -0,0 +1,94 @@
+"""
+Runtime asyncio compartido para Dona Bot
+Un event loop de larga vida en un hilo de fondo, con un pool aiohttp compartido,
+para que el código síncrono de Bolt pueda ejecutar I/O async sin crear loops por request
+"""
+
+import os
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRuntime:
+    """Event loop en segundo plano con sesión HTTP compartida"""
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.pool_size = int(os.getenv("HTTP_POOL_SIZE", "20"))
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """Event loop del runtime (se arranca en el primer uso)"""
+        with self._lock:
+            if self._loop is None or not self._thread.is_alive():
+                ready = threading.Event()
+
+                def _run():
+                    self._loop = asyncio.new_event_loop()
+                    asyncio.set_event_loop(self._loop)
+                    ready.set()
+                    self._loop.run_forever()
+
+                self._thread = threading.Thread(target=_run, name="async-runtime", daemon=True)
+                self._thread.start()
+                ready.wait()
+                logger.info("🔁 Async runtime iniciado")
+            return self._loop
+
+    def in_runtime(self) -> bool:
+        """True si el código actual ya corre dentro del loop del runtime"""
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def submit(self, coro: Awaitable) -> Future:
+        """Programa una corrutina en el runtime y devuelve un Future thread-safe"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Awaitable, timeout: Optional[float] = None) -> Any:
+        """Ejecuta una corrutina en el runtime y espera el resultado (desde código síncrono)"""
+        if self.in_runtime():
+            raise RuntimeError("AsyncRuntime.run() no puede llamarse desde el propio loop del runtime")
+        future = self.submit(coro)
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    async def run_async(self, coro: Awaitable) -> Any:
+        """Await de una corrutina del runtime desde cualquier otro event loop"""
+        if self.in_runtime():
+            return await coro
+        return await asyncio.wrap_future(self.submit(coro))
+
+    async def get_http_session(self) -> aiohttp.ClientSession:
+        """Sesión aiohttp compartida (keep-alive y pool de conexiones); solo dentro del runtime"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    def shutdown(self):
+        """Cierra la sesión HTTP y detiene el loop"""
+        if self._loop is None:
+            return
+        if self._session is not None and not self._session.closed:
+            self.run(self._session.close(), timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop = None
+
+# Instancia global
+async_runtime = AsyncRuntime()
@@ -0,0 +1,194 @@
+"""
+Circuit breakers por capacidad MCP
+Tras varios fallos de disponibilidad seguidos (worker caído, timeout, Node
+roto) el circuito se abre y las requests van directo al fallback sin lanzar
+subprocesos ni esperar timeouts. Pasado el tiempo de reset se deja pasar una
+sola request de prueba (half-open); si falla, el circuito vuelve a abrirse con
+un tiempo de reset mayor. El monitor de salud comparte el mismo registro: un
+ping fallido abre los circuitos del worker y uno exitoso los pasa a half-open.
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Capacidades servidas por el worker Node persistente
+WORKER_CAPABILITIES = ("arxiv", "weather", "github", "puppeteer", "system")
+
+
+class CircuitOpenError(Exception):
+    """El circuito de la capacidad está abierto; la llamada no se intentó"""
+
+
+class CircuitBreaker:
+    """Circuito de una capacidad: closed → open → half_open → closed"""
+
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 30.0,
+                 max_reset_timeout: float = 600.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self.stats = {"rejected": 0, "opened": 0, "trials": 0}
+
+    def _reset_elapsed(self) -> bool:
+        return self.opened_at is not None and time.monotonic() - self.opened_at >= self.reset_timeout
+
+    def available(self) -> bool:
+        """Chequeo sin efectos: False si una request sería rechazada ahora mismo"""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            return self._reset_elapsed()
+        return not self._trial_in_flight
+
+    def allow(self) -> bool:
+        """Reserva el paso de una request (en half-open, una sola de prueba a la vez)"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and self._reset_elapsed():
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                self.stats["trials"] += 1
+                return True
+            self.stats["rejected"] += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info(f"✅ Circuito {self.name} cerrado")
+            self.state = CLOSED
+            self.failures = 0
+            self.opened_at = None
+            self.reset_timeout = self.base_reset_timeout
+            self._trial_in_flight = False
+
+    def record_failure(self, error: str = ""):
+        with self._lock:
+            self.last_error = error or self.last_error
+            self._trial_in_flight = False
+            if self.state == HALF_OPEN:
+                # La prueba falló: reabrir con backoff
+                self.reset_timeout = min(self.max_reset_timeout, self.reset_timeout * 2)
+                self._open()
+                return
+            self.failures += 1
+            if self.state == CLOSED and self.failures >= self.failure_threshold:
+                self._open()
+
+    def release(self):
+        """Libera la prueba reservada sin resultado (la request se canceló)"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def trip(self, error: str = ""):
+        """Abre el circuito sin esperar al umbral (lo usa el monitor de salud)"""
+        with self._lock:
+            self.last_error = error or self.last_error
+            self._trial_in_flight = False
+            if self.state != OPEN:
+                self._open()
+
+    def half_open(self):
+        """Un probe externo tuvo éxito: la próxima request hace de prueba"""
+        with self._lock:
+            if self.state == OPEN:
+                self.state = HALF_OPEN
+                self._trial_in_flight = False
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.stats["opened"] += 1
+        logger.warning(f"🔌 Circuito {self.name} abierto por {self.reset_timeout:g}s: {(self.last_error or '')[:150]}")
+
+    def snapshot(self) -> Dict:
+        retry_in = None
+        if self.state == OPEN and self.opened_at is not None:
+            retry_in = max(0.0, round(self.reset_timeout - (time.monotonic() - self.opened_at), 1))
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "retry_in": retry_in,
+            "last_error": self.last_error,
+            **self.stats
+        }
+
+
+class CircuitBreakerRegistry:
+    """Un circuito por capacidad, compartido por MCPIntegration, el bridge y el monitor"""
+
+    def __init__(self):
+        self.failure_threshold = int(os.getenv("MCP_BREAKER_FAILURES", "3"))
+        self.reset_timeout = float(os.getenv("MCP_BREAKER_RESET_SECONDS", "30"))
+        self.max_reset_timeout = float(os.getenv("MCP_BREAKER_MAX_RESET_SECONDS", "600"))
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> CircuitBreaker:
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(name, CircuitBreaker(
+                    name, self.failure_threshold, self.reset_timeout, self.max_reset_timeout
+                ))
+        return breaker
+
+    def available(self, name: str) -> bool:
+        return self.get(name).available()
+
+    def allow(self, name: str) -> bool:
+        return self.get(name).allow()
+
+    def record(self, name: str, success: bool, error: str = ""):
+        if success:
+            self.get(name).record_success()
+        else:
+            self.get(name).record_failure(error)
+
+    def trip_worker(self, error: str = ""):
+        """El worker no responde: abre todas sus capacidades"""
+        for name in WORKER_CAPABILITIES:
+            self.get(name).trip(error)
+
+    def worker_alive(self):
+        """El worker volvió a responder: sus circuitos abiertos pasan a half-open"""
+        for name in WORKER_CAPABILITIES:
+            self.get(name).half_open()
+
+    def open_names(self) -> List[str]:
+        return [name for name, breaker in self._breakers.items() if breaker.state != CLOSED]
+
+    @staticmethod
+    def open_result(name: str) -> Dict:
+        """Resultado de fallo rápido con el mismo contrato que un worker caído"""
+        return {"success": False, "error": f"Circuito {name} abierto", "unavailable": True, "circuit_open": True}
+
+    @staticmethod
+    def is_availability_failure(result: Dict) -> bool:
+        """Solo cuentan caídas y timeouts; 'not found' o rate limit no abren el circuito"""
+        return bool(result.get("unavailable")) or result.get("error") == "Command timed out"
+
+    def snapshot(self) -> Dict[str, Dict]:
+        return {name: breaker.snapshot() for name, breaker in self._breakers.items()}
+
+# Instancia global
+circuit_breakers = CircuitBreakerRegistry()
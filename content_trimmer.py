@@ -0,0 +1,88 @@
+"""
+Recorte extractivo de contenido web
+Reduce el texto de una página a sus oraciones más informativas (puntuación por
+frecuencia de términos y afinidad con la pregunta) para que el LLM pueda
+resumirla en una sola llamada
+"""
+
+import re
+from collections import Counter
+from typing import List
+
+# Palabras vacías en español e inglés (no aportan a la puntuación)
+STOPWORDS = {
+    "el", "la", "los", "las", "un", "una", "unos", "unas", "de", "del", "al", "y", "o", "en",
+    "que", "por", "para", "con", "sin", "se", "su", "sus", "es", "son", "lo", "como", "más",
+    "pero", "este", "esta", "estos", "estas", "ese", "esa", "the", "a", "an", "of", "and", "or",
+    "in", "on", "to", "for", "with", "is", "are", "was", "were", "be", "by", "as", "at", "it",
+    "this", "that", "these", "those", "from", "has", "have", "not", "you", "your", "we", "our"
+}
+
+# Líneas típicas de navegación, cookies y pies de página
+BOILERPLATE_PATTERN = re.compile(
+    r"(cookie|privacy policy|política de privacidad|all rights reserved|derechos reservados|"
+    r"subscribe|suscríbete|sign in|iniciar sesión|log in|newsletter|skip to content)",
+    re.IGNORECASE
+)
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?¿¡])\s+")
+WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def _clean_lines(text: str) -> List[str]:
+    """Descarta líneas cortas de menú, boilerplate y duplicados"""
+    seen = set()
+    lines = []
+    for line in (text or "").splitlines():
+        line = " ".join(line.split())
+        if len(line) < 40 or BOILERPLATE_PATTERN.search(line):
+            continue
+        key = line.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        lines.append(line)
+    return lines
+
+
+def _words(text: str) -> List[str]:
+    return [w for w in WORD_PATTERN.findall(text.lower()) if w not in STOPWORDS and len(w) > 2]
+
+
+def trim_content(text: str, query: str = "", max_chars: int = 4000) -> str:
+    """
+    Devuelve un extracto de hasta max_chars con las oraciones más relevantes,
+    en el orden original del documento
+    """
+    sentences = []
+    for line in _clean_lines(text):
+        sentences.extend(s for s in SENTENCE_SPLIT.split(line) if len(s) >= 25)
+    if not sentences:
+        return (text or "").strip()[:max_chars]
+
+    joined = " ".join(sentences)
+    if len(joined) <= max_chars:
+        return joined
+
+    frequencies = Counter(_words(joined))
+    top = frequencies.most_common(1)[0][1] if frequencies else 1
+    query_terms = set(_words(query))
+
+    scored = []
+    for index, sentence in enumerate(sentences):
+        words = _words(sentence)
+        if not words:
+            continue
+        score = sum(frequencies[w] / top for w in words) / len(words) ** 0.5
+        score += 2.0 * sum(1 for w in set(words) if w in query_terms)
+        # Leve preferencia por el inicio del documento (títulos, entradilla)
+        score *= 1.0 + 0.3 / (1 + index / 10)
+        scored.append((score, index, sentence))
+
+    selected, used = [], 0
+    for score, index, sentence in sorted(scored, reverse=True):
+        if used + len(sentence) + 1 > max_chars:
+            continue
+        selected.append((index, sentence))
+        used += len(sentence) + 1
+
+    return " ".join(sentence for _, sentence in sorted(selected))
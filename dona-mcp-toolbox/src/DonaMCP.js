@@ -1,4 +1,7 @@
 const ArxivMCP = require('./mcps/ArxivMCP');
+const PuppeteerMCP = require('./mcps/PuppeteerMCP');
+const GitHubMCP = require('./mcps/GitHubMCP');
+const WeatherMCP = require('./mcps/WeatherMCP');
 const logger = require('./utils/logger').createModuleLogger('DonaMCP');
 const mcpConfig = require('./config/mcpConfig');
 
@@ -35,10 +38,17 @@ class DonaMCP {
             this.mcps.arxiv = new ArxivMCP();
             logger.info('ArXiv MCP initialized successfully');
 
-            // TODO: Initialize other MCPs when implemented
-            // this.mcps.puppeteer = new PuppeteerMCP();
-            // this.mcps.github = new GitHubMCP();
-            // this.mcps.weather = new WeatherMCP();
+            // Puppeteer MCP (the browser pool launches lazily on first scrape)
+            this.mcps.puppeteer = new PuppeteerMCP();
+            logger.info('Puppeteer MCP initialized successfully');
+
+            // GitHub MCP (Octokit client is created lazily on first call)
+            this.mcps.github = new GitHubMCP();
+            logger.info('GitHub MCP initialized successfully');
+
+            // Weather MCP (cache lives as long as the worker process)
+            this.mcps.weather = new WeatherMCP();
+            logger.info('Weather MCP initialized successfully');
 
             this.initialized = true;
             
@@ -74,6 +84,32 @@ class DonaMCP {
                 'downloadPaper',
                 'getCategories',
                 'getRecentPapers'
+            ],
+            puppeteer: [
+                'scrapePage',
+                'scrapeUrl',
+                'getPoolStats'
+            ],
+            github: [
+                'searchRepositories',
+                'getRepository',
+                'getFileContent',
+                'getBranches',
+                'getCommits',
+                'getIssues',
+                'getUser',
+                'getRateLimit',
+                'getCacheStats'
+            ],
+            weather: [
+                'getCurrentWeather',
+                'getForecast',
+                'getWeatherByCoordinates',
+                'getForecastByCoordinates',
+                'getAirQuality',
+                'searchLocations',
+                'getWeatherAlerts',
+                'getCacheStats'
             ]
             // TODO: Add other MCP capabilities when implemented
         };
@@ -129,6 +165,41 @@ class DonaMCP {
         }
     }
 
+    /**
+     * Execute several capability calls in one request
+     * Calls run concurrently (Promise.allSettled); results keep the input order
+     * and a failing call only fails its own slot. The pseudo-MCP 'system'
+     * exposes getSystemStatus and healthCheck.
+     * @param {Array<Object>} calls - [{ mcp, method, params }]
+     * @returns {Promise<Array<Object>>} [{ success, result } | { success: false, error }]
+     */
+    async executeBatch(calls = []) {
+        if (!this.initialized) {
+            throw new Error('DonaMCP not initialized. Call initialize() first.');
+        }
+
+        const startTime = Date.now();
+        const settled = await Promise.allSettled(calls.map(call => {
+            if (call.mcp === 'system') {
+                if (!['getSystemStatus', 'healthCheck'].includes(call.method)) {
+                    return Promise.reject(new Error(`Method '${call.method}' not found in MCP 'system'`));
+                }
+                return Promise.resolve().then(() => this[call.method]());
+            }
+            return this.executeCapability(call.mcp, call.method, ...(call.params || []));
+        }));
+
+        const results = settled.map(outcome => outcome.status === 'fulfilled'
+            ? { success: true, result: outcome.value }
+            : { success: false, error: outcome.reason ? outcome.reason.message : 'Unknown error' });
+
+        logger.info(`Executed batch of ${calls.length} calls`, {
+            failed: results.filter(r => !r.success).length,
+            duration: `${Date.now() - startTime}ms`
+        });
+        return results;
+    }
+
     /**
      * Get direct access to ArXiv MCP instance
      * @returns {ArxivMCP} ArXiv MCP instance
@@ -170,6 +241,15 @@ class DonaMCP {
         if (this.mcps.arxiv) {
             status.arxivCache = this.mcps.arxiv.getCacheStats();
         }
+        if (this.mcps.puppeteer) {
+            status.browserPool = this.mcps.puppeteer.getPoolStats();
+        }
+        if (this.mcps.github) {
+            status.githubCache = this.mcps.github.getCacheStats();
+        }
+        if (this.mcps.weather) {
+            status.weatherCache = this.mcps.weather.getCacheStats();
+        }
 
         return status;
     }
@@ -225,10 +305,19 @@ class DonaMCP {
                 this.mcps.arxiv.clearCache();
             }
 
+            if (this.mcps.puppeteer) {
+                await this.mcps.puppeteer.close();
+            }
+
+            if (this.mcps.github) {
+                await this.mcps.github.close();
+            }
+
+            if (this.mcps.weather) {
+                this.mcps.weather.clearCache();
+            }
+
             // TODO: Cleanup other MCPs when implemented
-            // if (this.mcps.puppeteer) {
-            //     await this.mcps.puppeteer.close();
-            // }
 
             this.mcps = {};
             this.initialized = false;
@@ -1,6 +1,34 @@
+const os = require('os');
 const path = require('path');
 require('dotenv').config();
 
+/**
+ * Bot worker processes (BOT_WORKERS, "auto" = one per core). Each process runs its
+ * own Node worker pool, so per-process state must not share files and shared
+ * budgets must be split between processes.
+ */
+function botWorkerCount() {
+    const configured = (process.env.BOT_WORKERS || '1').toLowerCase();
+    if (configured === 'auto') {
+        return os.cpus().length || 1;
+    }
+    return Math.max(parseInt(configured, 10) || 1, 1);
+}
+
+/**
+ * Suffix a file path with BOT_WORKER_INDEX so each bot process writes its own file
+ * @param {string} filePath - Base file path
+ * @returns {string} Per-process file path
+ */
+function perWorkerPath(filePath) {
+    const index = process.env.BOT_WORKER_INDEX;
+    if (index === undefined || index === '') {
+        return filePath;
+    }
+    const ext = path.extname(filePath);
+    return `${filePath.slice(0, filePath.length - ext.length)}.${index}${ext}`;
+}
+
 /**
  * Configuration management for MCP modules
  */
@@ -18,14 +46,26 @@ class MCPConfig {
             github: {
                 token: process.env.GITHUB_TOKEN,
                 baseUrl: 'https://api.github.com',
-                timeout: 15000
+                timeout: 15000,
+                // Conditional request cache (ETag / Last-Modified) and rate-limit reserve.
+                // GitHub is pinned to one Node worker per process (MCP_PINNED_CAPABILITIES);
+                // across bot processes the file is per process and the reserve grows with
+                // the process count, since they all draw from the same token budget.
+                cache: {
+                    maxEntries: parseInt(process.env.GITHUB_CACHE_MAX_ENTRIES || '1000', 10),
+                    filePath: perWorkerPath(process.env.GITHUB_HTTP_CACHE_FILE ||
+                        path.join(os.tmpdir(), 'dona_github_http_cache.json')),
+                    reserve: parseInt(process.env.GITHUB_RATE_RESERVE || '5', 10) * botWorkerCount()
+                }
             },
 
             // Weather MCP Configuration
             weather: {
                 apiKey: process.env.WEATHER_API_KEY,
                 baseUrl: 'https://api.openweathermap.org/data/2.5',
-                timeout: 10000
+                timeout: 10000,
+                cacheTTL: parseInt(process.env.WEATHER_CACHE_TTL || '600000', 10),
+                cellDegrees: parseFloat(process.env.WEATHER_CELL_DEGREES || '0.1')
             },
 
             // Puppeteer MCP Configuration
@@ -36,7 +76,18 @@ class MCPConfig {
                     width: 1920,
                     height: 1080
                 },
-                userAgent: 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+                userAgent: 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+                // Persistent browser pool (used by the long-lived worker)
+                pool: {
+                    size: parseInt(process.env.PUPPETEER_POOL_SIZE || '3', 10),
+                    pageMaxUses: parseInt(process.env.PUPPETEER_PAGE_MAX_USES || '50', 10),
+                    domainConcurrency: parseInt(process.env.PUPPETEER_DOMAIN_CONCURRENCY || '2', 10),
+                    cacheTTL: parseInt(process.env.PUPPETEER_CACHE_TTL || '600000', 10),
+                    // Max wait for a free browser slot (ms)
+                    acquireTimeout: parseInt(process.env.PUPPETEER_ACQUIRE_TIMEOUT || '30000', 10),
+                    blockResources: (process.env.PUPPETEER_BLOCK_RESOURCES || 'image,font,media')
+                        .split(',').map(type => type.trim()).filter(Boolean)
+                }
             },
 
             // General Configuration
@@ -1,6 +1,7 @@
 const { Octokit } = require('@octokit/rest');
 const logger = require('../utils/logger').createModuleLogger('GitHubMCP');
 const mcpConfig = require('../config/mcpConfig');
+const ConditionalRequestCache = require('../utils/ConditionalRequestCache');
 
 /**
  * GitHub MCP - Repository management and interaction
@@ -12,6 +13,8 @@ class GitHubMCP {
         this.octokit = null;
         this.authenticated = false;
         this.rateLimitInfo = null;
+        // ETag/Last-Modified revalidation + rate-limit budgeting for every GET
+        this.httpCache = new ConditionalRequestCache(this.config.cache);
     }
 
     /**
@@ -40,6 +43,7 @@ class GitHubMCP {
                 });
                 this.authenticated = true;
             }
+            this.httpCache.install(this.octokit);
 
             // Test authentication and get rate limit info
             await this._updateRateLimitInfo();
@@ -392,9 +396,15 @@ class GitHubMCP {
         try {
             const response = await this.octokit.rest.rateLimit.get();
             this.rateLimitInfo = response.data.rate;
+            this.httpCache.recordRateLimitResources(response.data.resources);
             
             logger.debug('Rate limit updated', this.rateLimitInfo);
-            return this.rateLimitInfo;
+            return {
+                ...this.rateLimitInfo,
+                resources: this.httpCache.rateLimits,
+                reserve: this.httpCache.reserve,
+                hasBudget: this.httpCache.hasBudget('core')
+            };
 
         } catch (error) {
             logger.error(`Error fetching rate limit: ${error.message}`);
@@ -470,12 +480,29 @@ class GitHubMCP {
         try {
             const response = await this.octokit.rest.rateLimit.get();
             this.rateLimitInfo = response.data.rate;
+            this.httpCache.recordRateLimitResources(response.data.resources);
         } catch (error) {
             logger.warn(`Could not fetch rate limit info: ${error.message}`);
             this.rateLimitInfo = null;
         }
     }
 
+    /**
+     * Get conditional cache statistics
+     * @returns {Object} Cache stats and rate-limit budget
+     */
+    getCacheStats() {
+        return this.httpCache.getStats();
+    }
+
+    /**
+     * Flush the conditional cache to disk
+     * @returns {Promise<void>}
+     */
+    async close() {
+        await this.httpCache.save();
+    }
+
     /**
      * Get GitHub client status
      * @returns {Object} Client status information
@@ -485,7 +512,8 @@ class GitHubMCP {
             initialized: !!this.octokit,
             authenticated: this.authenticated,
             rateLimit: this.rateLimitInfo,
-            hasToken: !!this.config.token
+            hasToken: !!this.config.token,
+            httpCache: this.httpCache.getStats()
         };
     }
 }
@@ -2,6 +2,7 @@ const puppeteer = require('puppeteer');
 const cheerio = require('cheerio');
 const logger = require('../utils/logger').createModuleLogger('PuppeteerMCP');
 const mcpConfig = require('../config/mcpConfig');
+const BrowserPool = require('../utils/BrowserPool');
 
 /**
  * Puppeteer MCP - Advanced web scraping and browser automation
@@ -13,6 +14,33 @@ class PuppeteerMCP {
         this.browser = null;
         this.activeSessions = new Map();
         this.initialized = false;
+        // Warm pool used by scrapePage (launched lazily on first use)
+        this.pool = new BrowserPool({
+            ...this.config.pool,
+            timeout: this.config.timeout,
+            userAgent: this.config.userAgent
+        });
+    }
+
+    /**
+     * Scrape a page through the persistent browser pool
+     * @param {string} url - Target URL
+     * @param {Object} options - { waitUntil, bypassCache }
+     * @returns {Promise<Object>} Readable page content and metadata
+     */
+    async scrapePage(url, options = {}) {
+        if (!/^https?:\/\//i.test(url)) {
+            throw new Error(`Invalid URL: ${url}`);
+        }
+        return await this.pool.scrape(url, options);
+    }
+
+    /**
+     * Browser pool statistics
+     * @returns {Object} Pool stats
+     */
+    getPoolStats() {
+        return this.pool.getStats();
     }
 
     /**
@@ -486,6 +514,7 @@ class PuppeteerMCP {
                 await this.browser.close();
                 this.browser = null;
             }
+            await this.pool.close();
 
             this.initialized = false;
             logger.info('Puppeteer browser closed successfully');
@@ -10,7 +10,10 @@ class WeatherMCP {
     constructor() {
         this.config = mcpConfig.getMCPConfig('weather');
         this.cache = new Map();
-        this.cacheTTL = 600000; // 10 minutes cache
+        this.cacheTTL = this.config.cacheTTL || 600000; // 10 minutes cache
+        // Coordinates are snapped to cells of this size so nearby points share entries
+        this.cellDegrees = this.config.cellDegrees || 0.1;
+        this.inFlight = new Map();
     }
 
     /**
@@ -126,18 +129,22 @@ class WeatherMCP {
      * @returns {Promise<Object>} Weather data
      */
     async getWeatherByCoordinates(lat, lon, units = 'metric') {
+        this._validateApiKey();
+        [lat, lon] = this._snapToCell(lat, lon);
+
+        const cacheKey = `coords_${lat}_${lon}_${units}`;
+        const cached = this._getFromCache(cacheKey);
+        if (cached) {
+            logger.debug(`Returning cached weather for coordinates ${lat}, ${lon}`);
+            return cached;
+        }
+        return this._coalesce(cacheKey, () => this._fetchWeatherByCoordinates(lat, lon, units, cacheKey));
+    }
+
+    async _fetchWeatherByCoordinates(lat, lon, units, cacheKey) {
         const startTime = Date.now();
         
         try {
-            this._validateApiKey();
-            
-            const cacheKey = `coords_${lat}_${lon}_${units}`;
-            const cached = this._getFromCache(cacheKey);
-            if (cached) {
-                logger.debug(`Returning cached weather for coordinates ${lat}, ${lon}`);
-                return cached;
-            }
-
             logger.info(`Fetching weather for coordinates: ${lat}, ${lon}`, { units });
 
             const params = {
@@ -172,6 +179,47 @@ class WeatherMCP {
         }
     }
 
+    /**
+     * Get weather forecast by geographic coordinates (snapped to a geo cell)
+     * @param {number} lat - Latitude
+     * @param {number} lon - Longitude
+     * @param {number} days - Number of days (1-5 for free tier)
+     * @param {string} units - Temperature units
+     * @returns {Promise<Object>} Weather forecast data
+     */
+    async getForecastByCoordinates(lat, lon, days = 5, units = 'metric') {
+        this._validateApiKey();
+        [lat, lon] = this._snapToCell(lat, lon);
+
+        const cacheKey = `forecast_coords_${lat}_${lon}_${days}_${units}`;
+        const cached = this._getFromCache(cacheKey);
+        if (cached) {
+            logger.debug(`Returning cached forecast for coordinates ${lat}, ${lon}`);
+            return cached;
+        }
+
+        return this._coalesce(cacheKey, async () => {
+            const startTime = Date.now();
+            try {
+                logger.info(`Fetching ${days}-day forecast for coordinates: ${lat}, ${lon}`, { units });
+
+                const response = await axios.get(`${this.config.baseUrl}/forecast`, {
+                    params: { lat, lon, appid: this.config.apiKey, units, cnt: days * 8 },
+                    timeout: this.config.timeout
+                });
+
+                const forecast = this._formatForecast(response.data);
+                forecast.requestTime = Date.now() - startTime;
+                this._setCache(cacheKey, forecast);
+                return forecast;
+
+            } catch (error) {
+                logger.error(`Error fetching forecast by coordinates: ${error.message}`, { lat, lon });
+                throw new Error(`Forecast fetch by coordinates failed: ${error.message}`);
+            }
+        });
+    }
+
     /**
      * Get air quality data for a location
      * @param {number} lat - Latitude
@@ -426,6 +474,31 @@ class WeatherMCP {
         }
     }
 
+    /**
+     * Snap coordinates to the center of their geo cell
+     * @private
+     */
+    _snapToCell(lat, lon) {
+        const snap = value => {
+            const cell = Math.floor(Number(value) / this.cellDegrees);
+            return Number(((cell + 0.5) * this.cellDegrees).toFixed(4));
+        };
+        return [snap(lat), snap(lon)];
+    }
+
+    /**
+     * Share one in-flight request between concurrent callers of the same key
+     * @private
+     */
+    _coalesce(key, fetcher) {
+        if (this.inFlight.has(key)) {
+            return this.inFlight.get(key);
+        }
+        const promise = fetcher().finally(() => this.inFlight.delete(key));
+        this.inFlight.set(key, promise);
+        return promise;
+    }
+
     /**
      * Get item from cache if valid
      * @private
@@ -468,7 +541,9 @@ class WeatherMCP {
         return {
             size: this.cache.size,
             keys: Array.from(this.cache.keys()),
-            ttl: this.cacheTTL
+            ttl: this.cacheTTL,
+            cellDegrees: this.cellDegrees,
+            inFlight: this.inFlight.size
         };
     }
 
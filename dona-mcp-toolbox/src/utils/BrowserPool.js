@@ -0,0 +1,369 @@
+const puppeteer = require('puppeteer');
+const logger = require('./logger').createModuleLogger('BrowserPool');
+
+/**
+ * BrowserPool - Long-lived Chromium with warm browser contexts
+ * Keeps N incognito contexts with a pre-opened page each, recycles pages after
+ * a number of uses, blocks heavy resources, caps concurrency per domain and
+ * caches extracted content per URL. A slot whose page cannot be recycled is
+ * rebuilt with a fresh context; waiting for a slot is bounded by acquireTimeout
+ */
+class BrowserPool {
+    constructor(options = {}) {
+        this.size = options.size || 3;
+        this.pageMaxUses = options.pageMaxUses || 50;
+        this.domainConcurrency = options.domainConcurrency || 2;
+        this.cacheTTL = options.cacheTTL || 600000; // 10 minutes
+        this.maxCacheEntries = options.maxCacheEntries || 500;
+        this.blockResources = options.blockResources || ['image', 'font', 'media'];
+        this.navigationTimeout = options.timeout || 30000;
+        this.acquireTimeout = options.acquireTimeout || this.navigationTimeout;
+        this.viewport = options.viewport || { width: 1280, height: 800 };
+        this.userAgent = options.userAgent;
+        this.launchArgs = options.launchArgs || [
+            '--no-sandbox',
+            '--disable-setuid-sandbox',
+            '--disable-dev-shm-usage'
+        ];
+
+        this.browser = null;
+        this.slots = [];
+        this.freeSlots = [];
+        this.slotWaiters = [];
+        this.domainActive = new Map();
+        this.domainWaiters = new Map();
+        this.cache = new Map();
+        this.inFlight = new Map();
+        this.initializing = null;
+        this.stats = {
+            scrapes: 0,
+            cacheHits: 0,
+            coalesced: 0,
+            errors: 0,
+            recycledPages: 0,
+            rebuiltSlots: 0,
+            droppedSlots: 0,
+            acquireTimeouts: 0,
+            blockedRequests: 0
+        };
+    }
+
+    /**
+     * Launch the browser and warm up the contexts (idempotent)
+     * @returns {Promise<void>}
+     */
+    async initialize() {
+        if (this.browser) {
+            return;
+        }
+        if (!this.initializing) {
+            this.initializing = this._launch().finally(() => {
+                this.initializing = null;
+            });
+        }
+        return this.initializing;
+    }
+
+    async _launch() {
+        const startTime = Date.now();
+        this.browser = await puppeteer.launch({ headless: 'new', args: this.launchArgs });
+        const browser = this.browser;
+        browser.on('disconnected', () => {
+            if (this.browser !== browser) {
+                return;
+            }
+            logger.warn('Browser disconnected - pool will relaunch on next use');
+            this.browser = null;
+            this.slots = [];
+            this.freeSlots = [];
+            this._rejectWaiters(new Error('Browser disconnected'));
+        });
+
+        for (let i = 0; i < this.size; i++) {
+            const context = await this.browser.createIncognitoBrowserContext();
+            const slot = { id: i, context, page: null, uses: 0 };
+            slot.page = await this._newPage(slot);
+            this.slots.push(slot);
+            this.freeSlots.push(slot);
+        }
+
+        logger.info(`Browser pool ready with ${this.size} warm contexts in ${Date.now() - startTime}ms`);
+    }
+
+    async _newPage(slot) {
+        const page = await slot.context.newPage();
+        await page.setViewport(this.viewport);
+        if (this.userAgent) {
+            await page.setUserAgent(this.userAgent);
+        }
+        page.setDefaultNavigationTimeout(this.navigationTimeout);
+
+        if (this.blockResources.length > 0) {
+            await page.setRequestInterception(true);
+            page.on('request', (req) => {
+                if (this.blockResources.includes(req.resourceType())) {
+                    this.stats.blockedRequests++;
+                    req.abort();
+                } else {
+                    req.continue();
+                }
+            });
+        }
+        return page;
+    }
+
+    async _acquireSlot() {
+        await this.initialize();
+        if (this.slots.length === 0) {
+            // Browser disconnected while launching
+            throw new Error('No browser slots available');
+        }
+        if (this.freeSlots.length > 0) {
+            return this.freeSlots.pop();
+        }
+        return new Promise((resolve, reject) => {
+            const waiter = { resolve, reject };
+            waiter.timer = setTimeout(() => {
+                this.slotWaiters = this.slotWaiters.filter(w => w !== waiter);
+                this.stats.acquireTimeouts++;
+                reject(new Error(`No browser slot free after ${this.acquireTimeout}ms`));
+            }, this.acquireTimeout);
+            this.slotWaiters.push(waiter);
+        });
+    }
+
+    async _releaseSlot(slot) {
+        if (!this.slots.includes(slot)) {
+            // Slot of a browser that disconnected or was closed meanwhile
+            return;
+        }
+        slot.uses++;
+        if (slot.uses >= this.pageMaxUses || slot.page.isClosed()) {
+            try {
+                // Page recycling: drop accumulated memory/listeners after N uses
+                await slot.page.close().catch(() => {});
+                slot.page = await this._newPage(slot);
+                slot.uses = 0;
+                this.stats.recycledPages++;
+            } catch (error) {
+                logger.warn(`Page recycling failed on slot ${slot.id}, rebuilding context: ${error.message}`);
+                if (!await this._rebuildSlot(slot)) {
+                    return;
+                }
+            }
+        }
+        this._handOff(slot);
+    }
+
+    /**
+     * Replace the slot's context and page; drops the slot if that fails too
+     * @returns {Promise<boolean>} Whether the slot is usable again
+     */
+    async _rebuildSlot(slot) {
+        try {
+            await slot.context.close().catch(() => {});
+            slot.context = await this.browser.createIncognitoBrowserContext();
+            slot.page = await this._newPage(slot);
+            slot.uses = 0;
+            this.stats.rebuiltSlots++;
+            return true;
+        } catch (error) {
+            logger.error(`Dropping browser slot ${slot.id}: ${error.message}`);
+            this.slots = this.slots.filter(s => s !== slot);
+            this.stats.droppedSlots++;
+            if (this.slots.length === 0) {
+                // Nothing left to hand out: fail the waiters and relaunch on next use
+                this._rejectWaiters(new Error('No browser slots available'));
+                const browser = this.browser;
+                this.browser = null;
+                if (browser) {
+                    await browser.close().catch(() => {});
+                }
+            }
+            return false;
+        }
+    }
+
+    _handOff(slot) {
+        const waiter = this.slotWaiters.shift();
+        if (waiter) {
+            clearTimeout(waiter.timer);
+            waiter.resolve(slot);
+        } else {
+            this.freeSlots.push(slot);
+        }
+    }
+
+    _rejectWaiters(error) {
+        const waiters = this.slotWaiters;
+        this.slotWaiters = [];
+        for (const waiter of waiters) {
+            clearTimeout(waiter.timer);
+            waiter.reject(error);
+        }
+    }
+
+    async _acquireDomain(domain) {
+        const active = this.domainActive.get(domain) || 0;
+        if (active < this.domainConcurrency) {
+            this.domainActive.set(domain, active + 1);
+            return;
+        }
+        await new Promise(resolve => {
+            const waiters = this.domainWaiters.get(domain) || [];
+            waiters.push(resolve);
+            this.domainWaiters.set(domain, waiters);
+        });
+    }
+
+    _releaseDomain(domain) {
+        const waiters = this.domainWaiters.get(domain) || [];
+        const next = waiters.shift();
+        if (next) {
+            // Hand the domain slot directly to the next waiter
+            next();
+            return;
+        }
+        this.domainWaiters.delete(domain);
+        const active = (this.domainActive.get(domain) || 1) - 1;
+        if (active <= 0) {
+            this.domainActive.delete(domain);
+        } else {
+            this.domainActive.set(domain, active);
+        }
+    }
+
+    _getCached(url) {
+        const entry = this.cache.get(url);
+        if (!entry) {
+            return null;
+        }
+        if (Date.now() - entry.timestamp > this.cacheTTL) {
+            this.cache.delete(url);
+            return null;
+        }
+        return entry.data;
+    }
+
+    _setCached(url, data) {
+        if (this.cache.size >= this.maxCacheEntries) {
+            // Map keeps insertion order: drop the oldest entry
+            this.cache.delete(this.cache.keys().next().value);
+        }
+        this.cache.set(url, { data, timestamp: Date.now() });
+    }
+
+    /**
+     * Scrape a URL and return its readable text
+     * @param {string} url - Target URL
+     * @param {Object} options - { waitUntil, bypassCache }
+     * @returns {Promise<Object>} { url, finalUrl, statusCode, title, description, text, cached, scrapingTime }
+     */
+    async scrape(url, options = {}) {
+        if (!options.bypassCache) {
+            const cached = this._getCached(url);
+            if (cached) {
+                this.stats.cacheHits++;
+                return { ...cached, cached: true };
+            }
+            // Coalesce concurrent requests for the same URL
+            if (this.inFlight.has(url)) {
+                this.stats.coalesced++;
+                return this.inFlight.get(url);
+            }
+        }
+
+        const promise = this._scrape(url, options).finally(() => this.inFlight.delete(url));
+        this.inFlight.set(url, promise);
+        return promise;
+    }
+
+    async _scrape(url, options) {
+        const startTime = Date.now();
+        const domain = new URL(url).hostname;
+
+        await this._acquireDomain(domain);
+        let slot = null;
+        try {
+            slot = await this._acquireSlot();
+            const response = await slot.page.goto(url, {
+                waitUntil: options.waitUntil || 'domcontentloaded'
+            });
+
+            const extracted = await slot.page.evaluate(() => {
+                const meta = document.querySelector('meta[name="description"], meta[property="og:description"]');
+                document.querySelectorAll('script, style, noscript, svg, iframe').forEach(el => el.remove());
+                return {
+                    title: document.title,
+                    description: meta ? meta.getAttribute('content') : null,
+                    text: document.body ? document.body.innerText : ''
+                };
+            });
+
+            const data = {
+                url,
+                finalUrl: slot.page.url(),
+                statusCode: response ? response.status() : null,
+                title: extracted.title,
+                description: extracted.description,
+                text: extracted.text,
+                cached: false,
+                scrapingTime: Date.now() - startTime
+            };
+
+            this.stats.scrapes++;
+            if (data.statusCode && data.statusCode < 400) {
+                this._setCached(url, data);
+            }
+            logger.info(`Scraped ${url} in ${data.scrapingTime}ms`, { statusCode: data.statusCode });
+            return data;
+
+        } catch (error) {
+            this.stats.errors++;
+            logger.error(`Error scraping ${url}: ${error.message}`);
+            throw new Error(`Scraping failed: ${error.message}`);
+        } finally {
+            if (slot) {
+                await this._releaseSlot(slot).catch(err => {
+                    logger.error(`Error recycling page: ${err.message}`);
+                });
+            }
+            this._releaseDomain(domain);
+        }
+    }
+
+    /**
+     * Pool statistics
+     * @returns {Object} Stats
+     */
+    getStats() {
+        return {
+            ...this.stats,
+            launched: !!this.browser,
+            contexts: this.slots.length,
+            busy: this.slots.length - this.freeSlots.length,
+            queued: this.slotWaiters.length,
+            cacheSize: this.cache.size,
+            activeDomains: this.domainActive.size
+        };
+    }
+
+    /**
+     * Close all contexts and the browser
+     * @returns {Promise<void>}
+     */
+    async close() {
+        if (this.browser) {
+            const browser = this.browser;
+            this.browser = null;
+            await browser.close();
+        }
+        this.slots = [];
+        this.freeSlots = [];
+        this._rejectWaiters(new Error('Browser pool closed'));
+        this.cache.clear();
+        logger.info('Browser pool closed');
+    }
+}
+
+module.exports = BrowserPool;
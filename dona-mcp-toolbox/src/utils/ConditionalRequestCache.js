@@ -0,0 +1,248 @@
+const fs = require('fs');
+const path = require('path');
+const logger = require('./logger').createModuleLogger('ConditionalRequestCache');
+
+/**
+ * ConditionalRequestCache - HTTP cache layer for Octokit
+ * Stores ETag / Last-Modified per GET resource and revalidates with
+ * conditional requests (GitHub does not charge 304 responses against the
+ * rate limit). Tracks x-ratelimit-* headers per resource and, once the
+ * remaining budget drops to the reserve, serves cached bodies instead of
+ * spending the last requests.
+ */
+class ConditionalRequestCache {
+    constructor(options = {}) {
+        this.maxEntries = options.maxEntries || 1000;
+        this.filePath = options.filePath || null;
+        this.reserve = options.reserve !== undefined ? options.reserve : 5;
+        this.saveDelay = options.saveDelay || 2000;
+
+        this.entries = new Map();
+        this.rateLimits = {};
+        this.saveTimer = null;
+        this.stats = {
+            requests: 0,
+            notModified: 0,
+            stored: 0,
+            budgetServed: 0,
+            budgetRejected: 0
+        };
+
+        this._load();
+    }
+
+    /**
+     * Install the cache as an Octokit request hook
+     * @param {Octokit} octokit - Octokit instance
+     */
+    install(octokit) {
+        octokit.hook.wrap('request', (request, options) => this._handle(request, options));
+    }
+
+    async _handle(request, options) {
+        const { method, url } = request.endpoint.parse(options);
+        const resource = this._resourceFor(url);
+
+        if (method !== 'GET') {
+            const response = await request(options);
+            this.recordRateLimit(response.headers, resource);
+            return response;
+        }
+
+        const key = url;
+        const entry = this.entries.get(key);
+        this.stats.requests++;
+
+        // Out of budget: answer locally (even if stale) or fail fast
+        if (!this.hasBudget(resource)) {
+            if (entry) {
+                this.stats.budgetServed++;
+                return this._fromEntry(entry, url);
+            }
+            this.stats.budgetRejected++;
+            const reset = new Date(this.rateLimits[resource].reset * 1000).toISOString();
+            throw new Error(`GitHub rate limit budget exhausted for ${resource} until ${reset}`);
+        }
+
+        if (entry) {
+            options.headers = { ...options.headers };
+            if (entry.etag) {
+                options.headers['if-none-match'] = entry.etag;
+            } else if (entry.lastModified) {
+                options.headers['if-modified-since'] = entry.lastModified;
+            }
+        }
+
+        try {
+            const response = await request(options);
+            this.recordRateLimit(response.headers, resource);
+            if (response.headers.etag || response.headers['last-modified']) {
+                this._store(key, response);
+            }
+            return response;
+
+        } catch (error) {
+            const headers = error.response ? error.response.headers : null;
+            if (headers) {
+                this.recordRateLimit(headers, resource);
+            }
+            if (error.status === 304 && entry) {
+                this.stats.notModified++;
+                this._touch(key, entry);
+                return this._fromEntry(entry, url);
+            }
+            if ((error.status === 403 || error.status === 429) && entry &&
+                headers && headers['x-ratelimit-remaining'] === '0') {
+                this.stats.budgetServed++;
+                return this._fromEntry(entry, url);
+            }
+            throw error;
+        }
+    }
+
+    _resourceFor(url) {
+        if (url.includes('/search/')) {
+            return 'search';
+        }
+        if (url.includes('/graphql')) {
+            return 'graphql';
+        }
+        return 'core';
+    }
+
+    _fromEntry(entry, url) {
+        return { status: 200, url, headers: entry.headers, data: entry.data };
+    }
+
+    _store(key, response) {
+        this.entries.delete(key);
+        this.entries.set(key, {
+            etag: response.headers.etag || null,
+            lastModified: response.headers['last-modified'] || null,
+            headers: {
+                etag: response.headers.etag,
+                'last-modified': response.headers['last-modified'],
+                'content-type': response.headers['content-type']
+            },
+            data: response.data,
+            storedAt: Date.now()
+        });
+        this.stats.stored++;
+
+        while (this.entries.size > this.maxEntries) {
+            // Map keeps insertion order: drop the least recently used entry
+            this.entries.delete(this.entries.keys().next().value);
+        }
+        this._scheduleSave();
+    }
+
+    _touch(key, entry) {
+        this.entries.delete(key);
+        this.entries.set(key, entry);
+    }
+
+    /**
+     * Update the budget from x-ratelimit-* response headers
+     * @param {Object} headers - Response headers
+     * @param {string} fallbackResource - Resource when the header is missing
+     */
+    recordRateLimit(headers, fallbackResource = 'core') {
+        if (!headers || headers['x-ratelimit-remaining'] === undefined) {
+            return;
+        }
+        const resource = headers['x-ratelimit-resource'] || fallbackResource;
+        this.rateLimits[resource] = {
+            limit: parseInt(headers['x-ratelimit-limit'], 10),
+            remaining: parseInt(headers['x-ratelimit-remaining'], 10),
+            reset: parseInt(headers['x-ratelimit-reset'], 10),
+            used: parseInt(headers['x-ratelimit-used'] || '0', 10)
+        };
+    }
+
+    /**
+     * Seed the budget from the /rate_limit endpoint (does not count against the quota)
+     * @param {Object} resources - response.data.resources
+     */
+    recordRateLimitResources(resources) {
+        Object.entries(resources || {}).forEach(([resource, info]) => {
+            this.rateLimits[resource] = {
+                limit: info.limit,
+                remaining: info.remaining,
+                reset: info.reset,
+                used: info.used
+            };
+        });
+    }
+
+    /**
+     * Whether live requests are still allowed for a resource
+     * @param {string} resource - core | search | graphql
+     * @returns {boolean}
+     */
+    hasBudget(resource = 'core') {
+        const info = this.rateLimits[resource];
+        if (!info || Date.now() / 1000 >= info.reset) {
+            return true;
+        }
+        return info.remaining > this.reserve;
+    }
+
+    _load() {
+        if (!this.filePath || !fs.existsSync(this.filePath)) {
+            return;
+        }
+        try {
+            const saved = JSON.parse(fs.readFileSync(this.filePath, 'utf8'));
+            (saved.entries || []).slice(-this.maxEntries).forEach(([key, entry]) => {
+                this.entries.set(key, entry);
+            });
+            logger.info(`Loaded ${this.entries.size} conditional cache entries from disk`);
+        } catch (error) {
+            logger.warn(`Could not load conditional cache: ${error.message}`);
+        }
+    }
+
+    _scheduleSave() {
+        if (!this.filePath || this.saveTimer) {
+            return;
+        }
+        this.saveTimer = setTimeout(() => {
+            this.saveTimer = null;
+            this.save().catch(error => logger.warn(`Could not save conditional cache: ${error.message}`));
+        }, this.saveDelay);
+        this.saveTimer.unref();
+    }
+
+    /**
+     * Persist entries to disk (atomic rename)
+     * @returns {Promise<void>}
+     */
+    async save() {
+        if (!this.filePath) {
+            return;
+        }
+        if (this.saveTimer) {
+            clearTimeout(this.saveTimer);
+            this.saveTimer = null;
+        }
+        const tmpPath = `${this.filePath}.${process.pid}.tmp`;
+        await fs.promises.mkdir(path.dirname(this.filePath), { recursive: true });
+        await fs.promises.writeFile(tmpPath, JSON.stringify({ entries: [...this.entries] }));
+        await fs.promises.rename(tmpPath, this.filePath);
+    }
+
+    /**
+     * Cache statistics and current rate-limit budget
+     * @returns {Object} Stats
+     */
+    getStats() {
+        return {
+            ...this.stats,
+            entries: this.entries.size,
+            reserve: this.reserve,
+            rateLimits: this.rateLimits
+        };
+    }
+}
+
+module.exports = ConditionalRequestCache;
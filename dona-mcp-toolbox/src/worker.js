@@ -0,0 +1,93 @@
+#!/usr/bin/env node
+const readline = require('readline');
+
+/**
+ * Persistent MCP worker - JSON lines over stdio
+ *
+ * Keeps one DonaMCP instance (and its caches / browser pool) alive across
+ * requests instead of paying a Node cold start per call.
+ *
+ * Request (stdin, one JSON object per line):
+ *   {"id": 1, "mcp": "puppeteer", "method": "scrapePage", "params": ["https://..."]}
+ *   {"id": 2, "op": "ping"}
+ *   {"id": 3, "op": "batch", "calls": [{"mcp": "system", "method": "healthCheck"}, ...]}
+ *
+ * Response (stdout, prefixed with the sentinel so logger output can be skipped):
+ *   @@DONA@@{"id": 1, "success": true, "result": {...}}
+ *   @@DONA@@{"id": 1, "success": false, "error": "..."}
+ */
+const SENTINEL = '@@DONA@@';
+
+function send(message) {
+    process.stdout.write(`${SENTINEL}${JSON.stringify(message)}\n`);
+}
+
+async function main() {
+    let dona;
+    try {
+        const DonaMCP = require('./DonaMCP');
+        dona = new DonaMCP();
+        await dona.initialize();
+    } catch (error) {
+        send({ id: 0, event: 'error', error: error.message });
+        process.exit(1);
+    }
+
+    const startTime = Date.now();
+    let handled = 0;
+
+    async function handle(request) {
+        if (request.op === 'ping') {
+            // Liveness + readiness without touching any MCP: answered from memory
+            return {
+                ready: dona.initialized,
+                pid: process.pid,
+                uptimeMs: Date.now() - startTime,
+                handled,
+                rssBytes: process.memoryUsage().rss,
+                status: dona.getSystemStatus()
+            };
+        }
+        if (request.op === 'batch') {
+            return await dona.executeBatch(request.calls || []);
+        }
+        if (request.op === 'status') {
+            return { status: dona.getSystemStatus(), health: await dona.healthCheck() };
+        }
+        return await dona.executeCapability(request.mcp, request.method, ...(request.params || []));
+    }
+
+    const rl = readline.createInterface({ input: process.stdin, terminal: false });
+    rl.on('line', (line) => {
+        if (!line.trim()) {
+            return;
+        }
+        let request;
+        try {
+            request = JSON.parse(line);
+        } catch (error) {
+            send({ id: null, success: false, error: `Invalid JSON: ${error.message}` });
+            return;
+        }
+
+        // Requests run concurrently; responses are matched by id
+        handle(request)
+            .then(result => send({ id: request.id, success: true, result }))
+            .catch(error => send({ id: request.id, success: false, error: error.message }))
+            .finally(() => { handled++; });
+    });
+
+    const shutdown = async () => {
+        try {
+            await dona.dispose();
+        } finally {
+            process.exit(0);
+        }
+    };
+    rl.on('close', shutdown);
+    process.on('SIGTERM', shutdown);
+
+    send({ id: 0, event: 'ready', pid: process.pid });
+}
+
+main();
@@ -96,6 +96,26 @@ describe('DonaMCP Main Class', () => {
         });
     });
 
+    describe('Batch Execution', () => {
+        test('should return results in order with per-item errors', async () => {
+            await dona.initialize();
+            const results = await dona.executeBatch([
+                { mcp: 'system', method: 'getSystemStatus' },
+                { mcp: 'arxiv', method: 'getCategories' },
+                { mcp: 'missing', method: 'anything' },
+                { mcp: 'system', method: 'healthCheck' }
+            ]);
+
+            expect(results).toHaveLength(4);
+            expect(results[0].success).toBe(true);
+            expect(results[0].result).toHaveProperty('initialized', true);
+            expect(results[1].success).toBe(true);
+            expect(results[2].success).toBe(false);
+            expect(results[2].error).toContain('not found');
+            expect(results[3].result).toHaveProperty('healthy');
+        });
+    });
+
     describe('Configuration', () => {
         beforeEach(async () => {
             await dona.initialize();
@@ -0,0 +1,165 @@
+const mockCreatePage = () => {
+    let url = 'about:blank';
+    return {
+        setViewport: jest.fn(),
+        setUserAgent: jest.fn(),
+        setDefaultNavigationTimeout: jest.fn(),
+        setRequestInterception: jest.fn(),
+        on: jest.fn(),
+        goto: jest.fn(async (target) => {
+            url = target;
+            await new Promise(resolve => setTimeout(resolve, 20));
+            return { status: () => 200 };
+        }),
+        evaluate: jest.fn(async () => ({ title: 'Test page', description: null, text: 'Hello world' })),
+        url: () => url,
+        isClosed: () => false,
+        close: jest.fn(async () => {})
+    };
+};
+
+// Browser whose n-th created context/page (1-based) fails
+const mockBrowser = ({ failPages = [], failContexts = [] } = {}) => {
+    let pages = 0;
+    let contexts = 0;
+    const handlers = {};
+    return {
+        handlers,
+        on: jest.fn((event, handler) => { handlers[event] = handler; }),
+        createIncognitoBrowserContext: jest.fn(async () => {
+            if (failContexts.includes(++contexts)) {
+                throw new Error('context failed');
+            }
+            return {
+                newPage: jest.fn(async () => {
+                    if (failPages.includes(++pages)) {
+                        throw new Error('newPage failed');
+                    }
+                    return mockCreatePage();
+                }),
+                close: jest.fn(async () => {})
+            };
+        }),
+        close: jest.fn(async () => {})
+    };
+};
+
+jest.mock('puppeteer', () => ({ launch: jest.fn(async () => mockBrowser()) }));
+
+const puppeteer = require('puppeteer');
+const BrowserPool = require('../../src/utils/BrowserPool');
+
+describe('BrowserPool', () => {
+    let pool;
+
+    beforeEach(() => {
+        puppeteer.launch.mockClear();
+        puppeteer.launch.mockImplementation(async () => mockBrowser());
+        pool = new BrowserPool({ size: 2, pageMaxUses: 3, domainConcurrency: 1 });
+    });
+
+    afterEach(async () => {
+        await pool.close();
+    });
+
+    test('should launch the browser once for many scrapes', async () => {
+        await Promise.all([
+            pool.scrape('https://a.example.com/1'),
+            pool.scrape('https://b.example.com/2'),
+            pool.scrape('https://c.example.com/3')
+        ]);
+
+        expect(puppeteer.launch).toHaveBeenCalledTimes(1);
+        expect(pool.getStats().contexts).toBe(2);
+        expect(pool.getStats().scrapes).toBe(3);
+    });
+
+    test('should serve repeated URLs from cache', async () => {
+        const first = await pool.scrape('https://a.example.com/page');
+        const second = await pool.scrape('https://a.example.com/page');
+
+        expect(first.cached).toBe(false);
+        expect(second.cached).toBe(true);
+        expect(second.text).toBe('Hello world');
+        expect(pool.getStats().cacheHits).toBe(1);
+    });
+
+    test('should coalesce concurrent requests for the same URL', async () => {
+        const results = await Promise.all([
+            pool.scrape('https://a.example.com/same'),
+            pool.scrape('https://a.example.com/same')
+        ]);
+
+        expect(results[0]).toBe(results[1]);
+        expect(pool.getStats().scrapes).toBe(1);
+        expect(pool.getStats().coalesced).toBe(1);
+    });
+
+    test('should recycle pages after pageMaxUses', async () => {
+        for (let i = 0; i < 6; i++) {
+            await pool.scrape(`https://a.example.com/${i}`);
+        }
+
+        expect(pool.getStats().recycledPages).toBeGreaterThanOrEqual(1);
+    });
+
+    test('should rebuild the slot when page recycling fails', async () => {
+        puppeteer.launch.mockImplementation(async () => mockBrowser({ failPages: [2] }));
+        pool = new BrowserPool({ size: 1, pageMaxUses: 1 });
+
+        await pool.scrape('https://a.example.com/1');
+        await pool.scrape('https://a.example.com/2');
+
+        expect(pool.getStats().rebuiltSlots).toBe(1);
+        expect(pool.getStats().contexts).toBe(1);
+        expect(pool.getStats().busy).toBe(0);
+    });
+
+    test('should reject waiters and relaunch when no slot can be rebuilt', async () => {
+        puppeteer.launch.mockImplementationOnce(async () => mockBrowser({ failPages: [2], failContexts: [2] }));
+        pool = new BrowserPool({ size: 1, pageMaxUses: 1 });
+
+        const results = await Promise.allSettled([
+            pool.scrape('https://a.example.com/1'),
+            pool.scrape('https://b.example.com/2')
+        ]);
+
+        expect(results[0].status).toBe('fulfilled');
+        expect(results[1].status).toBe('rejected');
+        expect(pool.getStats().droppedSlots).toBe(1);
+        expect(pool.inFlight.size).toBe(0);
+        expect(pool.getStats().activeDomains).toBe(0);
+
+        const retry = await pool.scrape('https://b.example.com/2');
+        expect(retry.cached).toBe(false);
+        expect(puppeteer.launch).toHaveBeenCalledTimes(2);
+    });
+
+    test('should reject pending waiters when the browser disconnects', async () => {
+        const browser = mockBrowser();
+        puppeteer.launch.mockImplementationOnce(async () => browser);
+        pool = new BrowserPool({ size: 1 });
+
+        const held = await pool._acquireSlot();
+        const waiting = pool._acquireSlot();
+        await new Promise(resolve => setImmediate(resolve));
+        browser.handlers.disconnected();
+
+        await expect(waiting).rejects.toThrow('Browser disconnected');
+        await pool._releaseSlot(held);
+        expect(pool.getStats().contexts).toBe(0);
+        expect(pool.freeSlots).toHaveLength(0);
+    });
+
+    test('should time out waiting for a slot and release the domain', async () => {
+        pool = new BrowserPool({ size: 1, acquireTimeout: 50 });
+
+        const held = await pool._acquireSlot();
+        await expect(pool.scrape('https://a.example.com/slow')).rejects.toThrow('No browser slot free');
+
+        expect(pool.getStats().acquireTimeouts).toBe(1);
+        expect(pool.getStats().activeDomains).toBe(0);
+        expect(pool.inFlight.size).toBe(0);
+        await pool._releaseSlot(held);
+    });
+});
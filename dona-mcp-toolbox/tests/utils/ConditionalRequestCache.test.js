@@ -0,0 +1,64 @@
+const ConditionalRequestCache = require('../../src/utils/ConditionalRequestCache');
+
+/**
+ * Fake Octokit request function: answers 304 when the ETag matches
+ */
+function createRequest(etag = '"v1"', remaining = 59) {
+    const request = jest.fn(async (options) => {
+        const headers = {
+            'x-ratelimit-limit': '60',
+            'x-ratelimit-remaining': String(remaining),
+            'x-ratelimit-reset': String(Math.floor(Date.now() / 1000) + 3600),
+            'x-ratelimit-resource': 'core'
+        };
+        if (options.headers && options.headers['if-none-match'] === etag) {
+            const error = new Error('Not modified');
+            error.status = 304;
+            error.response = { headers };
+            throw error;
+        }
+        remaining--;
+        return { status: 200, url: options.url, headers: { ...headers, etag }, data: { full_name: 'octo/repo' } };
+    });
+    request.endpoint = { parse: (options) => ({ method: options.method, url: options.url }) };
+    return request;
+}
+
+describe('ConditionalRequestCache', () => {
+    const options = () => ({ method: 'GET', url: 'https://api.github.com/repos/octo/repo', headers: {} });
+
+    test('should revalidate with If-None-Match and reuse the cached body on 304', async () => {
+        const cache = new ConditionalRequestCache({ reserve: 0 });
+        const request = createRequest();
+
+        const first = await cache._handle(request, options());
+        const second = await cache._handle(request, options());
+
+        expect(second.data).toEqual(first.data);
+        expect(request.mock.calls[1][0].headers['if-none-match']).toBe('"v1"');
+        expect(cache.getStats().notModified).toBe(1);
+    });
+
+    test('should serve cached data once the budget reaches the reserve', async () => {
+        const cache = new ConditionalRequestCache({ reserve: 10 });
+        const request = createRequest('"v1"', 11);
+
+        await cache._handle(request, options());
+        expect(cache.hasBudget('core')).toBe(false);
+
+        const cached = await cache._handle(request, options());
+        expect(cached.data.full_name).toBe('octo/repo');
+        expect(request).toHaveBeenCalledTimes(1);
+        expect(cache.getStats().budgetServed).toBe(1);
+    });
+
+    test('should fail fast without budget and without a cached entry', async () => {
+        const cache = new ConditionalRequestCache({ reserve: 10 });
+        const request = createRequest('"v1"', 11);
+        await cache._handle(request, options());
+
+        await expect(cache._handle(request, {
+            method: 'GET', url: 'https://api.github.com/repos/octo/other', headers: {}
+        })).rejects.toThrow('rate limit budget exhausted');
+    });
+});
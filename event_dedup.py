@@ -0,0 +1,126 @@
+"""
+Deduplicación de eventos de Slack en la entrada
+Slack reintenta los eventos cuyo ack llega tarde; cada reintento volvía a
+llamar al LLM, guardar el mensaje y responder. Cada evento se identifica por
+su event_id y por el mensaje que lo originó (client_msg_id o canal + ts);
+un LRU acotado en memoria descarta los repetidos del mismo proceso y un
+SET NX con TTL en Redis los de otros workers.
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List
+
+from slack_bolt import BoltResponse
+
+logger = logging.getLogger(__name__)
+
+
+class EventDeduplicator:
+    """Seen-set de eventos: LRU local + Redis compartido entre workers"""
+
+    def __init__(self, redis_client=None, use_redis: bool = True):
+        self.enabled = os.getenv("EVENT_DEDUP_ENABLED", "true").lower() == "true"
+        # Slack reintenta durante unos minutos; la ventana cubre todos los reintentos
+        self.ttl = int(os.getenv("EVENT_DEDUP_TTL", "900"))
+        self.max_entries = int(os.getenv("EVENT_DEDUP_MAX_ENTRIES", "10000"))
+        self.key_prefix = os.getenv("EVENT_DEDUP_REDIS_PREFIX", "dona:event:")
+        self._redis = redis_client
+        self._use_redis = use_redis
+        # Tras un error de Redis se usa solo el LRU local durante un rato
+        self.redis_retry_seconds = float(os.getenv("EVENT_DEDUP_REDIS_RETRY", "30"))
+        self._redis_down_until = 0.0
+        self._seen: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"checked": 0, "duplicates": 0, "redis_duplicates": 0, "redis_errors": 0}
+
+    def _redis_client(self):
+        if self._redis is None and self._use_redis:
+            # Import diferido: redis_memory conecta al importarse
+            from redis_memory import redis_memory
+            self._redis = redis_memory.redis_client
+            self._use_redis = self._redis is not None
+        return self._redis
+
+    @staticmethod
+    def event_keys(body: Dict) -> List[str]:
+        """Claves del evento: su event_id y el mensaje de origen por tipo de evento"""
+        keys = []
+        if body.get("event_id"):
+            keys.append(f"id:{body['event_id']}")
+        event = body.get("event") or {}
+        message_id = event.get("client_msg_id")
+        if not message_id and event.get("channel") and event.get("ts"):
+            message_id = f"{event['channel']}:{event['ts']}"
+        if message_id:
+            # Un mismo mensaje genera app_mention y message; cada tipo se procesa una vez
+            keys.append(f"msg:{event.get('type', '')}:{event.get('subtype') or ''}:{message_id}")
+        return keys
+
+    def _claim_local(self, keys: List[str]) -> bool:
+        """Marca las claves como vistas; False si alguna ya estaba"""
+        now = time.monotonic()
+        with self._lock:
+            fresh = True
+            for key in keys:
+                expires = self._seen.get(key)
+                if expires is not None and expires > now:
+                    fresh = False
+                self._seen[key] = now + self.ttl
+                self._seen.move_to_end(key)
+            while len(self._seen) > self.max_entries:
+                self._seen.popitem(last=False)
+            return fresh
+
+    def _claim_redis(self, keys: List[str]) -> bool:
+        """SET NX EX por clave; False si otro worker ya lo tomó. Sin Redis no bloquea"""
+        client = self._redis_client()
+        if client is None or time.monotonic() < self._redis_down_until:
+            return True
+        try:
+            fresh = True
+            for key in keys:
+                if not client.set(self.key_prefix + key, "1", nx=True, ex=self.ttl):
+                    fresh = False
+            return fresh
+        except Exception as e:
+            self.stats["redis_errors"] += 1
+            self._redis_down_until = time.monotonic() + self.redis_retry_seconds
+            logger.warning(f"⚠️ Dedup en Redis no disponible, solo LRU local: {e}")
+            return True
+
+    def is_duplicate(self, body: Dict) -> bool:
+        """True si el evento (o el mensaje que lo originó) ya se procesó"""
+        if not self.enabled:
+            return False
+        keys = self.event_keys(body)
+        if not keys:
+            return False
+        self.stats["checked"] += 1
+        if not self._claim_local(keys):
+            self.stats["duplicates"] += 1
+            return True
+        if not self._claim_redis(keys):
+            self.stats["duplicates"] += 1
+            self.stats["redis_duplicates"] += 1
+            return True
+        return False
+
+    def middleware(self, body: Dict, next):
+        """Middleware global de Bolt: los duplicados se confirman a Slack sin llegar a los handlers"""
+        if body.get("type") == "event_callback" and self.is_duplicate(body):
+            event = body.get("event") or {}
+            logger.info(f"♻️ Evento duplicado ignorado: {body.get('event_id')} ({event.get('type')} {event.get('ts')})")
+            return BoltResponse(status=200, body="")
+        return next()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            entries = len(self._seen)
+        return {**self.stats, "entries": entries, "redis": self._redis is not None}
+
+# Instancia global
+event_deduplicator = EventDeduplicator()
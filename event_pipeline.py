@@ -0,0 +1,288 @@
+"""
+Pipeline de eventos: ack inmediato, procesamiento en etapas
+Los listeners de Bolt solo validan y encolan; etapas con colas acotadas y
+workers propios hacen el trabajo (contexto → LLM → publicación). Si la
+entrada está llena el evento se descarta con aviso en vez de ocupar los
+hilos de Bolt. Con un KeyedExecutor los jobs con la misma clave
+(conversación) pasan de a uno. Una etapa con prioridad atiende su cola por
+nivel con envejecimiento, como el scheduler. Cada etapa expone profundidad,
+espera y duración.
+"""
+
+import os
+import math
+import time
+import queue
+import itertools
+import logging
+import threading
+from typing import Callable, Dict, List, Optional
+
+from metrics import LatencyHistogram
+from keyed_executor import KeyedExecutor
+
+logger = logging.getLogger(__name__)
+
+# Marca de fin para los workers de una etapa
+_STOP = object()
+
+
+class PipelineStage:
+    """
+    Etapa con cola acotada y su pool de workers
+
+    Con priority (job → nivel, menor = antes) la cola se ordena por nivel menos
+    espera / aging_seconds, igual que PriorityScheduler: como la espera crece
+    igual para todos, basta ordenar por nivel × aging_seconds + hora de llegada.
+    """
+
+    def __init__(self, name: str, handler: Callable[[Dict], Optional[Dict]], workers: int, max_queue: int,
+                 bounded: bool = True, priority: Optional[Callable[[Dict], int]] = None,
+                 aging_seconds: float = 10.0):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.max_queue = max_queue
+        self.priority = priority
+        self.aging_seconds = aging_seconds
+        maxsize = max_queue if bounded else 0
+        self.queue: "queue.Queue" = queue.PriorityQueue(maxsize) if priority else queue.Queue(maxsize)
+        # Desempate FIFO en la cola con prioridad (los jobs no se comparan)
+        self._sequence = itertools.count()
+        self.next_stage: Optional["PipelineStage"] = None
+        self.threads: List[threading.Thread] = []
+        self.busy = 0
+        self.wait = LatencyHistogram()
+        self.duration = LatencyHistogram()
+        self.counters = {"processed": 0, "failed": 0, "dropped": 0}
+        self._lock = threading.Lock()
+
+    def put(self, job, block: bool = True):
+        """Encola (hora de llegada, job); _STOP va detrás de todo lo pendiente"""
+        enqueued_at = time.monotonic()
+        if self.priority is None:
+            self.queue.put(job if job is _STOP else (enqueued_at, job), block=block)
+            return
+        if job is _STOP:
+            rank = math.inf
+        else:
+            rank = self.priority(job) * self.aging_seconds + enqueued_at
+        self.queue.put((rank, next(self._sequence), enqueued_at, job), block=block)
+
+    def get(self):
+        """Siguiente (hora de llegada, job) o _STOP"""
+        item = self.queue.get()
+        if self.priority is None:
+            return item
+        _, _, enqueued_at, job = item
+        return job if job is _STOP else (enqueued_at, job)
+
+    def get_metrics(self) -> Dict:
+        with self._lock:
+            busy, counters = self.busy, dict(self.counters)
+        return {
+            "workers": self.workers,
+            "busy": busy,
+            "queue_depth": self.queue.qsize(),
+            "max_queue": self.max_queue,
+            "prioritized": self.priority is not None,
+            **counters,
+            "wait_seconds": self.wait.snapshot(),
+            "duration_seconds": self.duration.snapshot()
+        }
+
+
+class EventPipeline:
+    """
+    Cadena de etapas: cada handler recibe el job (dict), lo completa y lo
+    devuelve para la siguiente etapa; devolver None lo termina ahí
+    """
+
+    def __init__(self, name: str = "events", max_queue: int = None,
+                 on_error: Optional[Callable[[Dict, Exception], None]] = None,
+                 ordering: Optional[KeyedExecutor] = None):
+        self.name = name
+        self.enabled = os.getenv("PIPELINE_ENABLED", "true").lower() == "true"
+        self.max_queue = max_queue or int(os.getenv("PIPELINE_QUEUE_SIZE", "100"))
+        self.on_error = on_error
+        self.ordering = None
+        if ordering is not None:
+            self.set_ordering(ordering)
+        self.stages: List[PipelineStage] = []
+        # Jobs admitidos que aún no tomó la primera etapa (en su cola o esperando su lane)
+        self._intake = 0
+        self.end_to_end = LatencyHistogram()
+        self.counters = {"submitted": 0, "completed": 0, "failed": 0, "dropped": 0, "shed": 0}
+        self._lock = threading.Lock()
+        self._running = False
+
+    def set_ordering(self, ordering: KeyedExecutor):
+        """Jobs con 'key' pasan de a uno por clave; los demás siguen en paralelo"""
+        ordering.dispatch = self._enqueue
+        self.ordering = ordering
+
+    def add_stage(self, name: str, handler: Callable[[Dict], Optional[Dict]], workers: int = 1,
+                  priority: Optional[Callable[[Dict], int]] = None, aging_seconds: float = 10.0):
+        """
+        Agrega una etapa al final; las colas intermedias aplican backpressure
+
+        priority (job → nivel) ordena la cola de la etapa por urgencia con envejecimiento
+        """
+        # La entrada se acota con el contador de admitidos; las demás colas con su tamaño
+        stage = PipelineStage(name, handler, workers, self.max_queue, bounded=bool(self.stages),
+                              priority=priority, aging_seconds=aging_seconds)
+        if self.stages:
+            self.stages[-1].next_stage = stage
+        self.stages.append(stage)
+        return stage
+
+    def start(self):
+        """Arranca los workers de todas las etapas (se llama en el primer submit)"""
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            for stage in self.stages:
+                for index in range(stage.workers):
+                    thread = threading.Thread(
+                        target=self._worker_loop, args=(stage,),
+                        name=f"{self.name}-{stage.name}-{index}", daemon=True
+                    )
+                    thread.start()
+                    stage.threads.append(thread)
+        layout = ", ".join(f"{stage.name}×{stage.workers}" for stage in self.stages)
+        logger.info(f"🛤️ Pipeline '{self.name}' iniciado: {layout} (cola {self.max_queue})")
+
+    def shutdown(self, timeout: float = 5.0):
+        """Detiene los workers tras terminar lo que ya está encolado"""
+        with self._lock:
+            if not self._running:
+                return
+            self._running = False
+        for stage in self.stages:
+            for _ in stage.threads:
+                stage.put(_STOP)
+            for thread in stage.threads:
+                thread.join(timeout=timeout)
+            stage.threads = []
+
+    def submit(self, job: Dict) -> bool:
+        """Encola un evento sin bloquear; False si la primera cola está llena (load shedding)"""
+        if not self._running:
+            self.start()
+        job.setdefault("submitted_at", time.monotonic())
+        with self._lock:
+            if self._intake >= self.max_queue:
+                self.counters["shed"] += 1
+                shed = True
+            else:
+                self._intake += 1
+                self.counters["submitted"] += 1
+                shed = False
+        if shed:
+            logger.warning(f"🚦 Pipeline '{self.name}' lleno ({self.max_queue}), evento descartado")
+            return False
+        if self.ordering is not None and job.get("key"):
+            self.ordering.submit(job["key"], job)
+        else:
+            self._enqueue(job)
+        return True
+
+    def _enqueue(self, job: Dict):
+        self.stages[0].put(job, block=False)
+
+    def _defer(self, job: Dict):
+        """Vuelve a encolar el job en la entrada tras retry_seconds (sigue contando como admitido)"""
+        timer = threading.Timer(self.ordering.retry_seconds, self._enqueue, args=(job,))
+        timer.daemon = True
+        timer.start()
+
+    def run_inline(self, job: Dict):
+        """Ejecuta todas las etapas en el hilo actual (pipeline desactivado)"""
+        job.setdefault("submitted_at", time.monotonic())
+        self._count("submitted")
+        for stage in self.stages:
+            job = self._process(stage, job, time.monotonic())
+            if job is None:
+                return
+        self._finish(job)
+
+    def _worker_loop(self, stage: PipelineStage):
+        while True:
+            item = stage.get()
+            if item is _STOP:
+                return
+            enqueued_at, job = item
+            if stage is self.stages[0]:
+                if self.ordering is not None and job.get("key") and not self.ordering.begin(job["key"], job):
+                    # Otro proceso atiende la conversación: reintentar sin ocupar el worker
+                    self._defer(job)
+                    continue
+                with self._lock:
+                    self._intake -= 1
+            result = self._process(stage, job, enqueued_at)
+            if result is None:
+                self._release(job)
+                continue
+            if stage.next_stage is not None:
+                # Bloqueante: una etapa lenta frena a la anterior hasta llenar la entrada
+                stage.next_stage.put(result)
+            else:
+                self._finish(result)
+                self._release(result)
+
+    def _process(self, stage: PipelineStage, job: Dict, enqueued_at: float) -> Optional[Dict]:
+        started_at = time.monotonic()
+        stage.wait.observe(started_at - enqueued_at)
+        with stage._lock:
+            stage.busy += 1
+        try:
+            result = stage.handler(job)
+            outcome = "processed" if result is not None else "dropped"
+        except Exception as e:
+            result, outcome = None, "failed"
+            logger.error(f"❌ Error en etapa '{stage.name}' del pipeline: {e}")
+            if self.on_error:
+                try:
+                    self.on_error(job, e)
+                except Exception as handler_error:
+                    logger.error(f"❌ Error notificando fallo del pipeline: {handler_error}")
+        finally:
+            stage.duration.observe(time.monotonic() - started_at)
+            with stage._lock:
+                stage.busy -= 1
+        with stage._lock:
+            stage.counters[outcome] += 1
+        if result is None:
+            self._count("failed" if outcome == "failed" else "dropped")
+        return result
+
+    def _release(self, job: Dict):
+        """Fin del job (completo, descartado o fallido): libera su conversación"""
+        if self.ordering is not None and job.get("key"):
+            self.ordering.done(job["key"])
+
+    def _finish(self, job: Dict):
+        self.end_to_end.observe(time.monotonic() - job["submitted_at"])
+        self._count("completed")
+
+    def _count(self, counter: str):
+        with self._lock:
+            self.counters[counter] += 1
+
+    def get_metrics(self) -> Dict:
+        """Profundidad, espera y duración por etapa, más la latencia total"""
+        with self._lock:
+            counters = dict(self.counters)
+        return {
+            "name": self.name,
+            "enabled": self.enabled,
+            **counters,
+            "queue_depth": self._intake + sum(stage.queue.qsize() for stage in self.stages[1:]),
+            "stages": {stage.name: stage.get_metrics() for stage in self.stages},
+            "end_to_end_seconds": self.end_to_end.snapshot(),
+            "ordering": self.ordering.get_metrics() if self.ordering is not None else None
+        }
+
+# Instancia global; las etapas las registra app_ai_production
+event_pipeline = EventPipeline()
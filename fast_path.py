@@ -0,0 +1,176 @@
+"""
+Fast path sin LLM para mensajes triviales
+Saludos, agradecimientos, confirmaciones y pedidos de ayuda se responden
+con plantillas localizadas, sin OpenRouter, Redis ni SQLite en el camino crítico
+"""
+
+import os
+import re
+import json
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Callable
+
+from intelligent_memory import intelligent_memory
+
+logger = logging.getLogger(__name__)
+
+# Mensajes triviales completos (precompilados una sola vez)
+TRIVIAL_PATTERN = re.compile(
+    r"^(?:"
+    r"(?P<greeting>hola|holi|holaa+|buenas|buenos d[ií]as|buenas tardes|buenas noches|qu[eé] tal|"
+    r"hey|hi|hello|good morning|good afternoon)"
+    r"|(?P<thanks>gracias|muchas gracias|mil gracias|gracias dona|thanks|thank you|thx|ty)"
+    r"|(?P<ok>ok|okay|oki|vale|listo|dale|perfecto|genial|excelente|entendido|got it|cool|great|👍|👌)"
+    r")(?:\s+(?:dona|bot))?[\s!.,:;)]*$",
+    re.IGNORECASE
+)
+
+HELP_PATTERN = re.compile(r"^(?:ayuda|help|menu|menú|opciones|options|\?)[\s!.]*$", re.IGNORECASE)
+
+ENGLISH_PATTERN = re.compile(
+    r"^(?:hey|hi|hello|good morning|good afternoon|thanks|thank you|thx|ty|okay|got it|cool|great|help|options)\b",
+    re.IGNORECASE
+)
+
+# Signos iniciales del español y menciones que no cambian la intención
+LEADING_NOISE_PATTERN = re.compile(r"^[\s¡¿]+")
+MENTION_PATTERN = re.compile(r"<@[A-Z0-9]+>")
+
+TEMPLATES = {
+    "es": {
+        "greeting": "¡Hola! 👋 ¿En qué puedo ayudarte hoy?",
+        "acknowledgment": "¡Con gusto! 😊 Aquí estoy si necesitas algo más.",
+        "confirmation": "👍 Perfecto. Avísame si necesitas algo más.",
+        "help": "¡Hola! 👋"
+    },
+    "en": {
+        "greeting": "Hi! 👋 How can I help you today?",
+        "acknowledgment": "You're welcome! 😊 I'm here if you need anything else.",
+        "confirmation": "👍 Great. Let me know if you need anything else.",
+        "help": "Hi! 👋"
+    }
+}
+
+
+class FastPathResponder:
+    """Responde mensajes triviales con plantillas, configurable por workspace"""
+
+    def __init__(self):
+        self.enabled = os.getenv("FAST_PATH_ENABLED", "true").lower() == "true"
+        self.default_language = os.getenv("FAST_PATH_LANGUAGE", "es")
+        self.max_length = int(os.getenv("FAST_PATH_MAX_LENGTH", "40"))
+
+        # Configuración por workspace: {"T0123": {"enabled": false}, "T0456": {"language": "en"}}
+        try:
+            self.workspace_config = json.loads(os.getenv("FAST_PATH_WORKSPACES", "{}"))
+        except json.JSONDecodeError as e:
+            logger.warning(f"⚠️ FAST_PATH_WORKSPACES inválido, se ignora: {e}")
+            self.workspace_config = {}
+
+        self.stats = {"hits": 0, "misses": 0, "total_ms": 0.0}
+        self._stats_lock = threading.Lock()
+
+        # Un solo hilo para registrar turnos fuera del camino crítico (mantiene el orden)
+        self._log_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fast-path-log")
+
+    def is_enabled_for(self, team_id: Optional[str]) -> bool:
+        """Verifica si el fast path está activo para un workspace"""
+        workspace = self.workspace_config.get(team_id or "", {})
+        return workspace.get("enabled", self.enabled)
+
+    def _normalize(self, text: str) -> str:
+        """Quita menciones, signos iniciales y espacios sobrantes"""
+        text = MENTION_PATTERN.sub("", text or "")
+        return LEADING_NOISE_PATTERN.sub("", text).strip()
+
+    def classify(self, text: str) -> Optional[str]:
+        """
+        Clasifica un mensaje trivial
+
+        Returns:
+            "greeting", "acknowledgment", "confirmation", "help" o None si requiere LLM
+        """
+        normalized = self._normalize(text)
+        if not normalized or HELP_PATTERN.match(normalized):
+            return "help"
+        if len(normalized) > self.max_length:
+            return None
+
+        match = TRIVIAL_PATTERN.match(normalized)
+        if not match:
+            return None
+
+        intent = intelligent_memory._detect_intent(normalized)
+        if intent in ("greeting", "acknowledgment"):
+            return intent
+
+        if match.group("greeting"):
+            return "greeting"
+        if match.group("thanks"):
+            return "acknowledgment"
+
+        # "ok", "vale", "genial": el sentimiento decide entre agradecer o confirmar
+        sentiment = intelligent_memory._analyze_sentiment(normalized)
+        return "acknowledgment" if sentiment == "positive" else "confirmation"
+
+    def _language_for(self, normalized: str, team_id: Optional[str]) -> str:
+        """Elige idioma: inglés si el mensaje lo está, si no el del workspace"""
+        if ENGLISH_PATTERN.match(normalized):
+            return "en"
+        workspace = self.workspace_config.get(team_id or "", {})
+        language = workspace.get("language", self.default_language)
+        return language if language in TEMPLATES else "es"
+
+    def respond(self, text: str, team_id: Optional[str] = None) -> Optional[Dict]:
+        """
+        Intenta responder sin LLM
+
+        Returns:
+            {"kind", "text", "show_help"} o None si el mensaje debe ir al LLM
+        """
+        if not self.is_enabled_for(team_id):
+            return None
+
+        start = time.perf_counter()
+        kind = self.classify(text)
+
+        with self._stats_lock:
+            if kind is None:
+                self.stats["misses"] += 1
+                return None
+            self.stats["hits"] += 1
+            self.stats["total_ms"] += (time.perf_counter() - start) * 1000
+
+        language = self._language_for(self._normalize(text), team_id)
+        return {
+            "kind": kind,
+            "text": TEMPLATES[language][kind],
+            "show_help": kind == "help"
+        }
+
+    def log_async(self, log_fn: Callable, *args, **kwargs):
+        """Ejecuta el registro del turno en segundo plano"""
+        def _run():
+            try:
+                log_fn(*args, **kwargs)
+            except Exception as e:
+                logger.error(f"❌ Error registrando turno del fast path: {e}")
+
+        self._log_executor.submit(_run)
+
+    def get_stats(self) -> Dict:
+        """Estadísticas de uso del fast path"""
+        with self._stats_lock:
+            hits = self.stats["hits"]
+            return {
+                "enabled": self.enabled,
+                "hits": hits,
+                "misses": self.stats["misses"],
+                "avg_ms": round(self.stats["total_ms"] / hits, 3) if hits else 0.0
+            }
+
+# Instancia global
+fast_path_responder = FastPathResponder()
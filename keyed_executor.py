@@ -0,0 +1,191 @@
+"""
+Orden por conversación con paralelismo entre conversaciones
+Cada conversación (usuario, canal, hilo) tiene su lane serial: mientras un
+mensaje está en proceso, los siguientes de la misma conversación esperan
+su turno y no leen un contexto al que le faltan turnos. Conversaciones
+distintas avanzan en paralelo. Con Redis, un lock por clave extiende el
+orden a varios procesos.
+"""
+
+import os
+import time
+import uuid
+import logging
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+from metrics import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+# Libera el lock solo si sigue siendo nuestro (el TTL pudo vencer y otro tomarlo)
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def conversation_key(user: str, channel: str, thread_ts: Optional[str] = None) -> str:
+    """Clave de la lane: mensajes del mismo usuario en el mismo canal e hilo"""
+    return f"{user}:{channel}:{thread_ts or '-'}"
+
+
+class RedisKeyLock:
+    """Lock por clave en Redis (SET NX PX + liberación con token) para varios workers"""
+
+    def __init__(self, redis_client=None, use_redis: bool = True):
+        self.ttl_ms = int(float(os.getenv("KEYED_LOCK_TTL", "120")) * 1000)
+        self.wait_seconds = float(os.getenv("KEYED_LOCK_WAIT", "60"))
+        # Espera entre intentos de un job cuya conversación tiene otro proceso
+        self.poll_seconds = float(os.getenv("KEYED_LOCK_POLL", "0.1"))
+        self.key_prefix = os.getenv("KEYED_LOCK_PREFIX", "dona:conversation:")
+        self._redis = redis_client
+        self._use_redis = use_redis
+        self.stats = {"acquired": 0, "contended": 0, "timeouts": 0, "errors": 0}
+
+    def _redis_client(self):
+        if self._redis is None and self._use_redis:
+            # Import diferido: redis_memory conecta al importarse
+            from redis_memory import redis_memory
+            self._redis = redis_memory.redis_client
+            self._use_redis = self._redis is not None
+        return self._redis
+
+    def try_acquire(self, key: str, waiting_since: Optional[float] = None) -> Tuple[bool, Optional[str]]:
+        """
+        Intenta tomar el lock de la clave sin esperar
+
+        Devuelve (True, token) si el job puede correr y (False, None) si otro
+        proceso tiene la conversación: el llamador lo reintenta más tarde sin
+        ocupar un worker. Sin Redis, con error o pasados wait_seconds desde
+        waiting_since se corre sin lock (token None): el orden entre procesos
+        es best-effort y nunca deja una conversación sin respuesta.
+        """
+        client = self._redis_client()
+        if client is None:
+            return True, None
+        token = uuid.uuid4().hex
+        try:
+            if client.set(self.key_prefix + key, token, nx=True, px=self.ttl_ms):
+                self.stats["acquired"] += 1
+                return True, token
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"⚠️ Lock de conversación en Redis no disponible: {e}")
+            return True, None
+        if waiting_since is None:
+            self.stats["contended"] += 1
+        elif time.monotonic() - waiting_since >= self.wait_seconds:
+            self.stats["timeouts"] += 1
+            logger.warning(f"⏳ Lock de conversación {key} no liberado en {self.wait_seconds:g}s, se continúa")
+            return True, None
+        return False, None
+
+    def release(self, key: str, token: Optional[str]):
+        if token is None or self._redis is None:
+            return
+        try:
+            self._redis.eval(_RELEASE_SCRIPT, 1, self.key_prefix + key, token)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"⚠️ Error liberando lock de conversación {key}: {e}")
+
+
+class KeyedExecutor:
+    """
+    Lanes seriales por clave delante de un ejecutor concurrente
+
+    submit() despacha el trabajo si su conversación está libre o lo deja en
+    la lane; done() despacha el siguiente de la lane. begin() intenta tomar
+    el lock distribuido (si hay) justo antes de ejecutar; si otro proceso lo
+    tiene, el job se difiere en vez de bloquear al worker.
+    """
+
+    def __init__(self, dispatch: Callable[[Dict], None] = None, distributed_lock: Optional[RedisKeyLock] = None):
+        self.dispatch = dispatch
+        self.distributed_lock = distributed_lock
+        self._lanes: Dict[str, Deque] = {}
+        self._tokens: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+        self.lane_wait = LatencyHistogram()
+        self.counters = {"submitted": 0, "queued_behind": 0, "max_lane_depth": 0, "deferred": 0}
+
+    def submit(self, key: str, job: Dict):
+        with self._lock:
+            self.counters["submitted"] += 1
+            lane = self._lanes.get(key)
+            if lane is not None:
+                # La conversación tiene un mensaje en curso: esperar su turno
+                lane.append((time.monotonic(), job))
+                self.counters["queued_behind"] += 1
+                self.counters["max_lane_depth"] = max(self.counters["max_lane_depth"], len(lane))
+                return
+            self._lanes[key] = deque()
+        self.lane_wait.observe(0.0)
+        self.dispatch(job)
+
+    def is_busy(self, key: str) -> bool:
+        """La conversación tiene un mensaje en curso en este proceso"""
+        with self._lock:
+            return key in self._lanes
+
+    @property
+    def retry_seconds(self) -> float:
+        return self.distributed_lock.poll_seconds if self.distributed_lock is not None else 0.0
+
+    def begin(self, key: str, job: Dict) -> bool:
+        """
+        Se llama en el worker antes de ejecutar: toma el lock entre procesos
+
+        False si otro proceso tiene la conversación; el job guarda desde cuándo
+        espera y el llamador debe reintentarlo en retry_seconds.
+        """
+        if self.distributed_lock is None:
+            return True
+        ready, token = self.distributed_lock.try_acquire(key, job.get("lock_waiting_since"))
+        if not ready:
+            job.setdefault("lock_waiting_since", time.monotonic())
+            with self._lock:
+                self.counters["deferred"] += 1
+            return False
+        with self._lock:
+            self._tokens[key] = token
+        return True
+
+    def done(self, key: str):
+        """El trabajo de la clave terminó (bien, descartado o con error): pasa el siguiente"""
+        with self._lock:
+            token = self._tokens.pop(key, None)
+        if self.distributed_lock is not None:
+            self.distributed_lock.release(key, token)
+        with self._lock:
+            lane = self._lanes.get(key)
+            if not lane:
+                self._lanes.pop(key, None)
+                return
+            enqueued_at, job = lane.popleft()
+        self.lane_wait.observe(time.monotonic() - enqueued_at)
+        self.dispatch(job)
+
+    def get_metrics(self) -> Dict:
+        with self._lock:
+            active = len(self._lanes)
+            waiting = sum(len(lane) for lane in self._lanes.values())
+            counters = dict(self.counters)
+        metrics = {
+            "active_conversations": active,
+            "waiting": waiting,
+            **counters,
+            "lane_wait_seconds": self.lane_wait.snapshot()
+        }
+        if self.distributed_lock is not None:
+            metrics["redis_lock"] = dict(self.distributed_lock.stats)
+        return metrics
+
+# Instancia global para el pipeline de eventos (el lock en Redis solo hace falta con varios workers)
+conversation_executor = KeyedExecutor(
+    distributed_lock=RedisKeyLock() if os.getenv("KEYED_LOCK_REDIS", "false").lower() == "true" else None
+)
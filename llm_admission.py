@@ -0,0 +1,200 @@
+"""
+Control de admisión global para llamadas al LLM
+Límite de concurrencia, presupuesto de tokens por minuto, clases de prioridad
+y una cola de espera acotada que descarta carga cuando se llena
+"""
+
+import os
+import time
+import heapq
+import asyncio
+import logging
+import itertools
+import threading
+from typing import Dict, Optional
+
+from metrics import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+# Menor número = mayor prioridad
+PRIORITY_CLASSES = {
+    "command": 0,
+    "dm": 0,
+    "mention": 1,
+    "background": 2
+}
+
+SHED_MESSAGE = "🚦 Estoy atendiendo muchas solicitudes en este momento. Intenta de nuevo en unos segundos."
+
+
+class AdmissionRejected(Exception):
+    """La solicitud fue descartada (cola llena o espera máxima superada)"""
+
+
+class TokenBucket:
+    """Token bucket de tokens LLM por minuto (capacity=0 lo desactiva)"""
+
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = tokens_per_minute
+        self.rate = tokens_per_minute / 60.0
+        self.tokens = float(tokens_per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_consume(self, amount: int) -> bool:
+        if not self.capacity:
+            return True
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return True
+        return False
+
+    def time_until(self, amount: int) -> float:
+        """Segundos hasta que haya tokens suficientes"""
+        if not self.capacity:
+            return 0.0
+        self._refill()
+        missing = min(amount, self.capacity) - self.tokens
+        return max(0.0, missing / self.rate)
+
+    def adjust(self, delta: float):
+        """Devuelve (delta > 0) o cobra (delta < 0) tokens tras conocer el uso real"""
+        if not self.capacity:
+            return
+        self._refill()
+        # Se permite deuda acotada para frenar ráfagas que subestimaron su consumo
+        self.tokens = max(-self.capacity, min(self.capacity, self.tokens + delta))
+
+
+class LLMAdmissionController:
+    """Admisión de requests al LLM compartida por todos los hilos del bot"""
+
+    def __init__(self, max_concurrent: int = None, tokens_per_minute: int = None,
+                 max_queue: int = None, max_wait: float = None):
+        self.max_concurrent = max_concurrent or int(os.getenv("LLM_MAX_CONCURRENT", "4"))
+        self.max_queue = max_queue if max_queue is not None else int(os.getenv("LLM_ADMISSION_QUEUE", "20"))
+        self.max_wait = max_wait or float(os.getenv("LLM_ADMISSION_MAX_WAIT", "20"))
+        tpm = tokens_per_minute if tokens_per_minute is not None else int(os.getenv("LLM_TOKENS_PER_MINUTE", "40000"))
+        self.bucket = TokenBucket(tpm)
+
+        self._cond = threading.Condition()
+        self._waiters = []  # heap de (prioridad, secuencia)
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._paused_until = 0.0
+
+        self.wait_histogram = LatencyHistogram()
+        self.counters = {"admitted": 0, "shed_queue_full": 0, "shed_timeout": 0, "rate_limited": 0}
+
+    @staticmethod
+    def estimate_tokens(prompt_chars: int, max_tokens: int) -> int:
+        """Estimación barata: ~4 caracteres por token más el máximo de completion"""
+        return prompt_chars // 4 + max_tokens
+
+    def acquire(self, priority: str = "mention", tokens: int = 0, timeout: float = None) -> Dict:
+        """
+        Espera turno para llamar al LLM
+
+        Returns:
+            Ticket a devolver con release()
+
+        Raises:
+            AdmissionRejected: si la cola está llena o se supera la espera máxima
+        """
+        timeout = self.max_wait if timeout is None else timeout
+        entry = (PRIORITY_CLASSES.get(priority, 1), next(self._sequence))
+        start = time.monotonic()
+        deadline = start + timeout
+
+        with self._cond:
+            if len(self._waiters) >= self.max_queue:
+                self.counters["shed_queue_full"] += 1
+                logger.warning(f"🚦 Cola LLM llena ({len(self._waiters)}), descartando request {priority}")
+                raise AdmissionRejected("queue full")
+
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait_for = deadline - now
+                    is_head = self._waiters[0] == entry
+
+                    if is_head and now >= self._paused_until and self._in_flight < self.max_concurrent:
+                        if self.bucket.try_consume(tokens):
+                            heapq.heappop(self._waiters)
+                            self._in_flight += 1
+                            self.counters["admitted"] += 1
+                            waited = time.monotonic() - start
+                            self.wait_histogram.observe(waited)
+                            # El siguiente en la cola puede evaluar su turno
+                            self._cond.notify_all()
+                            return {"priority": priority, "tokens": tokens, "waited": waited}
+                        wait_for = min(wait_for, self.bucket.time_until(tokens))
+                    elif is_head and now < self._paused_until:
+                        wait_for = min(wait_for, self._paused_until - now)
+
+                    if deadline - now <= 0:
+                        self.counters["shed_timeout"] += 1
+                        logger.warning(f"⏳ Espera máxima superada para request {priority}")
+                        raise AdmissionRejected("wait timeout")
+
+                    self._cond.wait(timeout=max(wait_for, 0.01))
+            except AdmissionRejected:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+                raise
+
+    def release(self, ticket: Dict, actual_tokens: Optional[int] = None):
+        """Libera el cupo y ajusta el presupuesto con el uso real de tokens"""
+        with self._cond:
+            self._in_flight = max(0, self._in_flight - 1)
+            if actual_tokens is not None:
+                self.bucket.adjust(ticket["tokens"] - actual_tokens)
+            self._cond.notify_all()
+
+    async def acquire_async(self, priority: str = "mention", tokens: int = 0,
+                            timeout: float = None) -> Dict:
+        """Versión async: espera en un hilo para no bloquear el event loop"""
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(None, self.acquire, priority, tokens, timeout)
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # Si el cupo llega después de cancelar, devolverlo para no perderlo
+            future.add_done_callback(
+                lambda f: self.release(f.result()) if not f.cancelled() and f.exception() is None else None
+            )
+            raise
+
+    def report_rate_limited(self, retry_after: float = 5.0):
+        """El proveedor respondió 429: pausar nuevas admisiones un momento"""
+        with self._cond:
+            self.counters["rate_limited"] += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            logger.warning(f"🚦 Proveedor saturado, pausando admisiones {retry_after:.0f}s")
+
+    def get_metrics(self) -> Dict:
+        """Métricas exportables: profundidad de cola, en vuelo, tiempos de espera"""
+        with self._cond:
+            metrics = {
+                "queue_depth": len(self._waiters),
+                "in_flight": self._in_flight,
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+                "tokens_available": int(self.bucket.tokens) if self.bucket.capacity else None,
+                "tokens_per_minute": self.bucket.capacity,
+                **self.counters
+            }
+        metrics["wait_seconds"] = self.wait_histogram.snapshot()
+        return metrics
+
+# Instancia global compartida por todos los handlers
+llm_admission = LLMAdmissionController()
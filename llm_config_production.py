@@ -24,7 +24,38 @@ class ProductionLLMConfig:
             "site_url": os.getenv("OPENROUTER_SITE_URL", "https://slack.com"),
             "app_name": os.getenv("OPENROUTER_APP_NAME", "Dona Bot")
         }
-        
+
+        # Cascada de modelos: modelo rápido para mensajes simples, fuerte para los complejos
+        # Por defecto todos los tiers usan OPENROUTER_MODEL; solo cambian los límites de tokens
+        self.cascade = {
+            "enabled": os.getenv("LLM_CASCADE_ENABLED", "true").lower() == "true",
+            "escalation_enabled": os.getenv("LLM_CASCADE_ESCALATION", "true").lower() == "true",
+            "tiers": {
+                "fast": {
+                    "model": os.getenv("OPENROUTER_FAST_MODEL", self.config["model"]),
+                    "max_tokens": int(os.getenv("OPENROUTER_FAST_MAX_TOKENS", "200"))
+                },
+                "standard": {
+                    "model": self.config["model"],
+                    "max_tokens": self.config["max_tokens"]
+                },
+                "strong": {
+                    "model": os.getenv("OPENROUTER_STRONG_MODEL", self.config["model"]),
+                    "max_tokens": int(os.getenv("OPENROUTER_STRONG_MAX_TOKENS", str(self.config["max_tokens"])))
+                }
+            }
+        }
+
+        # Function calling: el modelo decide cuándo usar las capacidades MCP (llm_tools)
+        # en lugar de los detectores por palabras clave
+        self.tool_calling = {
+            "enabled": os.getenv("LLM_TOOL_CALLING", "false").lower() == "true",
+            # Tool calls ejecutadas como máximo por turno del usuario
+            "budget": int(os.getenv("LLM_TOOL_CALL_BUDGET", "4")),
+            # Rondas modelo → tools antes de forzar la respuesta final
+            "max_rounds": int(os.getenv("LLM_TOOL_MAX_ROUNDS", "2"))
+        }
+
         # Prompt del sistema
         self.system_prompt = os.getenv("BOT_SYSTEM_PROMPT", """
 Eres Dona, un asistente útil y amigable en Slack para el equipo de Autonomos.
@@ -40,7 +71,12 @@ Tus características:
     def get_config(self) -> Dict[str, Any]:
         """Obtiene la configuración de OpenRouter"""
         return self.config
-    
+
+    def get_tier_config(self, tier: str) -> Dict[str, Any]:
+        """Obtiene modelo y límite de tokens para un tier de la cascada"""
+        tiers = self.cascade["tiers"]
+        return tiers.get(tier, tiers["standard"])
+
     def is_configured(self) -> bool:
         """Verifica si OpenRouter está configurado correctamente"""
         return bool(self.config.get("api_key"))
@@ -5,7 +5,7 @@ Abstrae la comunicación con diferentes proveedores de IA
 
 import os
 import logging
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 import aiohttp
 import json
 
@@ -13,6 +13,35 @@ from llm_config import llm_config
 
 logger = logging.getLogger(__name__)
 
+def build_anthropic_messages(system_prompt: str, context: Optional[List[Dict]],
+                             message: str) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Bloques de system y mensajes con prefijo estable para el prompt caching de Anthropic
+
+    System prompt + resúmenes de contexto como bloques de system, luego los turnos
+    anteriores en forma canónica y el mensaje actual (sin repetirlo si el historial
+    ya lo trae como último turno). Breakpoints solo tras el system prompt y el último
+    resumen: los turnos cambian en cada request y ahí solo pagarían escrituras de cache.
+    """
+    system_blocks = [{"type": "text", "text": system_prompt}]
+    messages = []
+    for msg in context or []:
+        content = (msg.get("content") or "").strip()
+        if not content:
+            continue
+        if msg.get("role") == "system":
+            system_blocks.append({"type": "text", "text": content})
+        else:
+            messages.append({"role": msg.get("role", "user"), "content": content})
+    
+    if messages and messages[-1] == {"role": "user", "content": message.strip()}:
+        messages.pop()
+    
+    for index in {0, len(system_blocks) - 1}:
+        system_blocks[index]["cache_control"] = {"type": "ephemeral"}
+    messages.append({"role": "user", "content": message})
+    return system_blocks, messages
+
 class LLMHandler:
     """Maneja las llamadas a diferentes LLMs de forma unificada"""
     
@@ -62,16 +91,12 @@ class LLMHandler:
             "content-type": "application/json"
         }
         
-        # Construir mensajes
-        messages = []
-        if context:
-            messages.extend(context)
-        messages.append({"role": "user", "content": message})
+        system_blocks, messages = build_anthropic_messages(self.config.system_prompt, context, message)
         
         data = {
             "model": config["model"],
             "messages": messages,
-            "system": self.config.system_prompt,
+            "system": system_blocks,
             "max_tokens": config["max_tokens"],
             "temperature": config["temperature"]
         }
@@ -84,6 +109,12 @@ class LLMHandler:
             ) as response:
                 if response.status == 200:
                     result = await response.json()
+                    usage = result.get("usage", {})
+                    logger.info(
+                        f"🗄️ Prompt cache: {usage.get('cache_read_input_tokens', 0)} leídos, "
+                        f"{usage.get('cache_creation_input_tokens', 0)} escritos, "
+                        f"{usage.get('input_tokens', 0)} sin cache"
+                    )
                     return result["content"][0]["text"]
                 else:
                     error = await response.text()
@@ -4,29 +4,153 @@ Manejador de LLM simplificado para producción - Solo OpenRouter
 
 import os
 import logging
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable
+from contextlib import asynccontextmanager
 import aiohttp
 import asyncio
 import re
+import threading
 
 from llm_config_production import llm_config
 from mcp_integration import mcp_integration
+from llm_tools import tool_router
+from intelligent_memory import intelligent_memory
+from llm_admission import llm_admission, AdmissionRejected, SHED_MESSAGE
+from content_trimmer import trim_content
+from weather_service import weather_service
 
 logger = logging.getLogger(__name__)
 
+# Frases que delatan una respuesta de baja confianza (disparan escalado al siguiente tier).
+# Cuentan al inicio de la respuesta o en respuestas cortas: "no sé si te sirve, pero…"
+# al comienzo de una respuesta completa no es una duda
+LOW_CONFIDENCE_MARKERS = (
+    r"no estoy segur[oa]", r"no (?:lo )?sé(?! si\b)", r"no tengo (?:suficiente )?información",
+    r"i'?m not sure", r"i am not sure", r"i don'?t know(?! if\b)", r"not enough information"
+)
+_MARKERS = "|".join(LOW_CONFIDENCE_MARKERS)
+LOW_CONFIDENCE_START = re.compile(rf"^\W*(?:{_MARKERS})", re.IGNORECASE)
+LOW_CONFIDENCE_ANYWHERE = re.compile(rf"\b(?:{_MARKERS})", re.IGNORECASE)
+# Hasta este largo, una duda en cualquier parte es la respuesta entera
+LOW_CONFIDENCE_SHORT_CHARS = 160
+
+# Tamaño máximo del extracto de una página que se pasa al LLM para resumir
+SCRAPE_EXCERPT_CHARS = int(os.getenv("SCRAPE_EXCERPT_CHARS", "4000"))
+
+# Referencias a repositorios: URL de GitHub o "owner/repo" suelto
+GITHUB_URL_PATTERN = re.compile(r'github\.com/([A-Za-z0-9-]+)/([A-Za-z0-9_.-]+)')
+GITHUB_REPO_PATTERN = re.compile(r'(?<![\w/.:-])([A-Za-z0-9][A-Za-z0-9-]{1,38})/([A-Za-z0-9_.-]+)(?![\w/])')
+
+# Fan-out científico: búsqueda en arXiv, memoria y warm-up del LLM en paralelo.
+# Cada rama tiene su propio límite; la síntesis usa el tiempo que quede del deadline.
+SCIENTIFIC_FANOUT_ENABLED = os.getenv("SCIENTIFIC_FANOUT_ENABLED", "true").lower() == "true"
+FANOUT_RETRIEVAL_SECONDS = float(os.getenv("FANOUT_RETRIEVAL_SECONDS", "10"))
+FANOUT_DEADLINE_SECONDS = float(os.getenv("FANOUT_DEADLINE_SECONDS", "30"))
+FANOUT_TOP_PAPERS = int(os.getenv("FANOUT_TOP_PAPERS", "3"))
+# Caracteres del abstract de cada paper que entran al prompt de síntesis
+FANOUT_ABSTRACT_CHARS = int(os.getenv("FANOUT_ABSTRACT_CHARS", "600"))
+
+OPENROUTER_CHAT_URL = "https://openrouter.ai/api/v1/chat/completions"
+# Endpoint liviano para abrir la conexión TLS antes de la síntesis
+OPENROUTER_KEY_URL = "https://openrouter.ai/api/v1/auth/key"
+
+# Orden de escalado entre tiers de la cascada
+TIER_ESCALATION = {"fast": "standard", "standard": "strong"}
+
+# Proveedores que aceptan breakpoints explícitos de cache (cache_control).
+# OpenAI y DeepSeek cachean prefijos automáticamente y no necesitan hints.
+CACHE_CONTROL_MODEL_PREFIXES = ("anthropic/", "google/gemini")
+
+
+def build_cacheable_messages(system_prompt: str, context: Optional[List[Dict]], message: str,
+                             cache_hints: bool = False) -> List[Dict]:
+    """
+    Construye mensajes con prefijo estable byte a byte para el cache del proveedor
+
+    Orden fijo: system prompt, resumen(es) de contexto, turnos anteriores canónicos
+    (solo role/content, sin espacios sobrantes) y al final el mensaje actual. Si el
+    historial ya trae el mensaje actual como último turno (se registra antes de
+    cargarlo) no se repite. Con cache_hints se marcan breakpoints tras el system
+    prompt y tras el último resumen: los turnos salen de una ventana deslizante y
+    cambian en cada request, un breakpoint ahí solo pagaría escrituras de cache.
+    """
+    summaries, turns = [], []
+    for msg in context or []:
+        content = (msg.get("content") or "").strip()
+        if not content:
+            continue
+        if msg.get("role") == "system":
+            summaries.append({"role": "system", "content": content})
+        else:
+            turns.append({"role": msg.get("role", "user"), "content": content})
+    
+    if turns and turns[-1] == {"role": "user", "content": message.strip()}:
+        turns.pop()
+    
+    messages = [{"role": "system", "content": system_prompt}] + summaries
+    
+    if cache_hints:
+        for index in {0, len(messages) - 1}:
+            messages[index] = {
+                "role": messages[index]["role"],
+                "content": [{
+                    "type": "text",
+                    "text": messages[index]["content"],
+                    "cache_control": {"type": "ephemeral"}
+                }]
+            }
+    
+    return messages + turns + [{"role": "user", "content": message}]
+
+
+class PromptCacheStats:
+    """Acumula tokens de prompt cacheados reportados por el proveedor"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+    
+    def record(self, usage: Dict):
+        details = usage.get("prompt_tokens_details") or {}
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += usage.get("prompt_tokens") or 0
+            self.cached_tokens += details.get("cached_tokens") or 0
+    
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "prompt_tokens": self.prompt_tokens,
+                "cached_tokens": self.cached_tokens,
+                "cache_hit_ratio": round(self.cached_tokens / self.prompt_tokens, 3) if self.prompt_tokens else 0.0
+            }
+
+# Estadísticas globales de cache de prompts
+prompt_cache_stats = PromptCacheStats()
+
 class ProductionLLMHandler:
     """Maneja las llamadas a OpenRouter de forma optimizada para producción"""
     
-    def __init__(self):
+    def __init__(self, priority: str = "mention"):
         self.config = llm_config.get_config()
+        # Clase de prioridad para el control de admisión (dm, command, mention)
+        self.priority = priority
         
-    async def get_response(self, message: str, context: Optional[List[Dict]] = None) -> str:
+    async def get_response(self, message: str, context: Optional[List[Dict]] = None,
+                           analysis: Optional[Dict] = None,
+                           context_loader: Optional[Callable[[], List[Dict]]] = None) -> str:
         """
         Obtiene una respuesta de OpenRouter con capacidades MCP automáticas
         
         Args:
             message: El mensaje del usuario
             context: Historial de conversación opcional
+            analysis: Análisis de IntelligentMemory (se calcula si no se pasa)
+            context_loader: Carga diferida del historial (se ejecuta en un hilo; en las
+                consultas científicas corre en paralelo con la búsqueda)
             
         Returns:
             La respuesta del LLM
@@ -49,63 +173,242 @@ class ProductionLLMHandler:
                 'inteligencia artificial', 'neural network', 'redes neuronales'
             ]
             
-            if self._detect_scientific_query(message, scientific_keywords):
+            # Con function calling el modelo decide qué capacidades usar (sin detectores)
+            tool_calling = llm_config.tool_calling["enabled"]
+            is_scientific = not tool_calling and self._detect_scientific_query(message, scientific_keywords)
+            if is_scientific:
+                # Circuito abierto: directo al fallback, sin intentar la búsqueda
+                if not mcp_integration.capability_available("arxiv"):
+                    logger.info("🔌 Circuito de arXiv abierto - respuesta de fallback")
+                    return self._scientific_fallback(message)
+                if SCIENTIFIC_FANOUT_ENABLED:
+                    logger.info("🔬 Búsqueda científica detectada - fan-out arXiv + memoria + LLM")
+                    return await self._scientific_fanout(message, context, context_loader)
+            
+            if context is None and context_loader:
+                context = await asyncio.to_thread(context_loader)
+                logger.info(f"🧠 Contexto: {len(context)} mensajes")
+            
+            if tool_calling:
+                if analysis is None:
+                    analysis = intelligent_memory.analyze_message_context(message, context or [])
+                return await self._call_with_tools(message, context, analysis)
+            
+            if is_scientific:
                 logger.info("🔬 Búsqueda científica detectada - intentando ArXiv MCP")
                 mcp_result = await self._handle_scientific_query(message)
                 # Si MCP falla, proporcionar respuesta útil
                 if "MCP no disponible" in mcp_result:
-                    search_terms = self._extract_search_terms(message)
-                    fallback_response = f"🔬 **Búsqueda científica: '{search_terms}'**\n\n"
-                    fallback_response += "📋 *Sistema de búsqueda académica temporalmente no disponible*\n\n"
-                    fallback_response += "**Alternativas recomendadas:**\n"
-                    fallback_response += f"• [ArXiv.org](https://arxiv.org/search/?query={search_terms.replace(' ', '+')}) - Búsqueda directa\n"
-                    fallback_response += f"• [Google Scholar](https://scholar.google.com/scholar?q={search_terms.replace(' ', '+')}) - Búsqueda académica\n"
-                    fallback_response += f"• [Semantic Scholar](https://www.semanticscholar.org/search?q={search_terms.replace(' ', '+')}) - Papers con análisis\n\n"
-                    fallback_response += "💡 *El sistema se restaurará automáticamente*"
-                    return fallback_response
+                    return self._scientific_fallback(message)
                 return mcp_result
             
             # 2. Detectar consultas de clima (Weather)
             if self._detect_weather_query(message):
+                if not mcp_integration.capability_available("weather"):
+                    return await self._answer_without_mcp(message, context, analysis, "El servicio de clima")
                 logger.info("🌤️ Consulta de clima detectada - usando Weather MCP")
-                return await self._handle_weather_query(message)
+                weather_result = await self._handle_weather_query(message)
+                if "MCP no disponible" in weather_result:
+                    return await self._answer_without_mcp(message, context, analysis, "El servicio de clima")
+                return weather_result
             
             # 3. Detectar consultas de GitHub
             if self._detect_github_query(message):
+                if not mcp_integration.capability_available("github"):
+                    return await self._answer_without_mcp(message, context, analysis, "La integración con GitHub")
                 logger.info("🐙 Consulta de GitHub detectada - usando GitHub MCP")
-                return await self._handle_github_query(message)
+                github_result = await self._handle_github_query(message)
+                if "MCP no disponible" in github_result:
+                    return await self._answer_without_mcp(message, context, analysis, "La integración con GitHub")
+                return github_result
             
             # 4. Detectar solicitudes de scraping/web content
             if self._detect_web_scraping_query(message):
+                if not mcp_integration.capability_available("puppeteer"):
+                    logger.info("🔌 Circuito de Puppeteer abierto - respuesta de fallback")
+                    return self._scraping_fallback(message)
                 logger.info("🕷️ Web scraping detectado - intentando Puppeteer MCP")
                 scraping_result = await self._handle_web_scraping_query(message)
                 # Si MCP falla, proporcionar respuesta útil
                 if "MCP no disponible" in scraping_result:
-                    # Extraer URL del mensaje
-                    import re
-                    url_match = re.search(r'https?://[^\s]+', message)
-                    url = url_match.group() if url_match else "la página web"
-                    
-                    fallback_response = f"🕷️ **Web Scraping: {url}**\n\n"
-                    fallback_response += "📋 *Sistema de extracción web temporalmente no disponible*\n\n"
-                    fallback_response += "**Alternativas recomendadas:**\n"
-                    fallback_response += "• **Visita manual**: Copia el contenido que necesites\n"
-                    fallback_response += "• **Reader Mode**: Usa el modo lectura de tu navegador\n"
-                    fallback_response += "• **Extensiones**: Utiliza Web Clipper, Pocket, etc.\n"
-                    fallback_response += "• **Dev Tools**: F12 → Console para extraer datos específicos\n\n"
-                    fallback_response += "💡 *El sistema se restaurará automáticamente*"
-                    return fallback_response
+                    return self._scraping_fallback(message)
                 return scraping_result
             
-            # Respuesta normal del LLM
-            return await self._call_openrouter(message, context)
+            # Respuesta normal del LLM (cascada de modelos según el análisis)
+            if analysis is None:
+                analysis = intelligent_memory.analyze_message_context(message, context or [])
+            return await self._call_with_cascade(message, context, analysis)
                 
         except Exception as e:
             logger.error(f"❌ Error llamando a OpenRouter: {e}")
             return "😅 Disculpa, tuve un problema técnico. ¿Podrías repetir tu pregunta?"
     
-    async def _call_openrouter(self, message: str, context: Optional[List[Dict]] = None) -> str:
-        """Llama a la API de OpenRouter con manejo robusto de errores"""
+    def _scientific_fallback(self, message: str) -> str:
+        """Enlaces de búsqueda directa cuando arXiv no está disponible"""
+        search_terms = self._extract_search_terms(message)
+        fallback_response = f"🔬 **Búsqueda científica: '{search_terms}'**\n\n"
+        fallback_response += "📋 *Sistema de búsqueda académica temporalmente no disponible*\n\n"
+        fallback_response += "**Alternativas recomendadas:**\n"
+        fallback_response += f"• [ArXiv.org](https://arxiv.org/search/?query={search_terms.replace(' ', '+')}) - Búsqueda directa\n"
+        fallback_response += f"• [Google Scholar](https://scholar.google.com/scholar?q={search_terms.replace(' ', '+')}) - Búsqueda académica\n"
+        fallback_response += f"• [Semantic Scholar](https://www.semanticscholar.org/search?q={search_terms.replace(' ', '+')}) - Papers con análisis\n\n"
+        fallback_response += "💡 *El sistema se restaurará automáticamente*"
+        return fallback_response
+    
+    def _scraping_fallback(self, message: str) -> str:
+        """Alternativas manuales cuando el scraping no está disponible"""
+        url_match = re.search(r'https?://[^\s]+', message)
+        url = url_match.group() if url_match else "la página web"
+        
+        fallback_response = f"🕷️ **Web Scraping: {url}**\n\n"
+        fallback_response += "📋 *Sistema de extracción web temporalmente no disponible*\n\n"
+        fallback_response += "**Alternativas recomendadas:**\n"
+        fallback_response += "• **Visita manual**: Copia el contenido que necesites\n"
+        fallback_response += "• **Reader Mode**: Usa el modo lectura de tu navegador\n"
+        fallback_response += "• **Extensiones**: Utiliza Web Clipper, Pocket, etc.\n"
+        fallback_response += "• **Dev Tools**: F12 → Console para extraer datos específicos\n\n"
+        fallback_response += "💡 *El sistema se restaurará automáticamente*"
+        return fallback_response
+    
+    async def _answer_without_mcp(self, message: str, context: Optional[List[Dict]],
+                                  analysis: Optional[Dict], service: str) -> str:
+        """Respuesta del LLM sin datos en vivo cuando la capacidad MCP está caída"""
+        logger.info(f"🔌 {service} no disponible - respuesta directa del LLM")
+        if analysis is None:
+            analysis = intelligent_memory.analyze_message_context(message, context or [])
+        answer = await self._call_with_cascade(message, context, analysis)
+        return f"_⚠️ {service} no está disponible en este momento; respondo sin datos en vivo._\n\n{answer}"
+    
+    def _select_tier(self, analysis: Dict) -> str:
+        """Mapea el análisis del mensaje a un tier de la cascada (fast/standard/strong)"""
+        if not llm_config.cascade["enabled"] or not analysis:
+            return "standard"
+        
+        intent = analysis.get("intent", "")
+        complexity = analysis.get("complexity", "medium")
+        topics = analysis.get("topics", [])
+        
+        # Saludos y agradecimientos cortos: modelo rápido con límite estricto
+        if complexity == "low" and intent in ("greeting", "acknowledgment"):
+            return "fast"
+        
+        # Preguntas técnicas complejas o reportes de problemas: modelo fuerte
+        if complexity == "high":
+            return "strong"
+        if complexity == "medium" and ("technical" in topics or intent == "issue_report"):
+            return "strong"
+        
+        return "standard"
+    
+    def _is_low_confidence(self, result: Dict) -> bool:
+        """Detecta respuestas truncadas, vacías o que empiezan (o consisten) en una duda del modelo"""
+        content = (result.get("content") or "").strip()
+        if not content or result.get("finish_reason") == "length":
+            return True
+        if LOW_CONFIDENCE_START.search(content):
+            return True
+        return len(content) <= LOW_CONFIDENCE_SHORT_CHARS and bool(LOW_CONFIDENCE_ANYWHERE.search(content))
+    
+    def _escalates_on_error(self, result: Dict, tier: str, next_tier: str) -> bool:
+        """Un error del tier (caído, rate limit, timeout) se reintenta en el siguiente si usa otro modelo"""
+        if result.get("error_message") == SHED_MESSAGE or result.get("status") in (401, 403):
+            return False
+        return llm_config.get_tier_config(next_tier)["model"] != llm_config.get_tier_config(tier)["model"]
+    
+    async def _call_with_cascade(self, message: str, context: Optional[List[Dict]],
+                                 analysis: Dict) -> str:
+        """Llama al tier elegido y escala al siguiente si la respuesta es de baja confianza"""
+        tier = self._select_tier(analysis)
+        logger.info(f"🪜 Tier seleccionado: {tier} (intent={analysis.get('intent')}, "
+                    f"complexity={analysis.get('complexity')})")
+        
+        result = await self._call_openrouter(message, context, tier=tier)
+        
+        next_tier = TIER_ESCALATION.get(tier)
+        if next_tier and llm_config.cascade["escalation_enabled"]:
+            if result.get("success") and self._is_low_confidence(result):
+                reason = "respuesta de baja confianza"
+            elif not result.get("success") and self._escalates_on_error(result, tier, next_tier):
+                reason = "error"
+            else:
+                reason = None
+            if reason:
+                logger.info(f"⬆️ {reason.capitalize()} en tier {tier}, escalando a {next_tier}")
+                escalated = await self._call_openrouter(message, context, tier=next_tier)
+                if escalated.get("success"):
+                    result = escalated
+        
+        if result.get("success"):
+            return result["content"]
+        return result["error_message"]
+    
+    async def _call_with_tools(self, message: str, context: Optional[List[Dict]],
+                               analysis: Dict) -> str:
+        """
+        Respuesta con function calling: el modelo pide tools, se ejecutan en paralelo
+        y se le devuelven los resultados hasta que responde (o se agota el presupuesto)
+        """
+        tools = tool_router.definitions()
+        if not tools:
+            return await self._call_with_cascade(message, context, analysis)
+        
+        tier = self._select_tier(analysis)
+        budget = llm_config.tool_calling["budget"]
+        max_rounds = llm_config.tool_calling["max_rounds"]
+        transcript: List[Dict] = []
+        
+        for round_index in range(max_rounds + 1):
+            # Última ronda o presupuesto agotado: se fuerza la respuesta final
+            final_round = round_index == max_rounds or budget <= 0
+            result = await self._call_openrouter(
+                message, context, tier=tier, tools=tools, extra_messages=transcript,
+                tool_choice="none" if final_round else None
+            )
+            if not result.get("success"):
+                if result.get("status") in (400, 404) and not transcript:
+                    # El modelo del tier no soporta tools: respuesta normal
+                    logger.warning(f"🧰 Tier {tier} sin soporte de tools, usando la cascada")
+                    return await self._call_with_cascade(message, context, analysis)
+                return result["error_message"]
+            
+            tool_calls = result.get("tool_calls")
+            if not tool_calls or final_round:
+                return result["content"] or "😅 Disculpa, no pude completar la respuesta. ¿Podrías reformular?"
+            
+            logger.info(f"🧰 Ronda {round_index + 1}: {len(tool_calls)} tool calls "
+                        f"({', '.join((c.get('function') or {}).get('name', '?') for c in tool_calls)})")
+            transcript.append({"role": "assistant", "content": result["content"], "tool_calls": tool_calls})
+            transcript.extend(await tool_router.execute(tool_calls, budget, user_message=message))
+            budget -= len(tool_calls)
+    
+    @staticmethod
+    @asynccontextmanager
+    async def _session_scope(session: Optional[aiohttp.ClientSession], timeout: aiohttp.ClientTimeout):
+        """Reusa la sesión recibida (ya calentada) o abre una propia para esta llamada"""
+        if session is not None:
+            yield session
+            return
+        async with aiohttp.ClientSession(timeout=timeout) as own_session:
+            yield own_session
+    
+    async def _call_openrouter(self, message: str, context: Optional[List[Dict]] = None,
+                               tier: str = "standard",
+                               session: Optional[aiohttp.ClientSession] = None,
+                               tools: Optional[List[Dict]] = None,
+                               extra_messages: Optional[List[Dict]] = None,
+                               tool_choice: Optional[str] = None) -> Dict:
+        """
+        Llama a la API de OpenRouter con manejo robusto de errores
+        
+        Con session se reutiliza una conexión ya abierta (fan-out científico).
+        Con tools se ofrecen herramientas al modelo; extra_messages lleva las
+        tool calls y sus resultados de rondas anteriores (van después del mensaje).
+        
+        Returns:
+            {"success": True, "content", "tool_calls", "finish_reason", "model", "tier"} o
+            {"success": False, "error_message"} con un texto listo para el usuario
+        """
+        tier_config = llm_config.get_tier_config(tier)
         
         headers = {
             "Authorization": f"Bearer {self.config['api_key']}",
@@ -114,52 +417,86 @@ class ProductionLLMHandler:
             "Content-Type": "application/json"
         }
         
-        # Construir mensajes
-        messages = [{"role": "system", "content": llm_config.system_prompt}]
-        if context:
-            messages.extend(context)
-        messages.append({"role": "user", "content": message})
+        # Construir mensajes con prefijo estable (system prompt + resumen + turnos previos)
+        cache_hints = tier_config["model"].startswith(CACHE_CONTROL_MODEL_PREFIXES)
+        messages = build_cacheable_messages(llm_config.system_prompt, context, message, cache_hints)
+        messages.extend(extra_messages or [])
         
         data = {
-            "model": self.config["model"],
+            "model": tier_config["model"],
             "messages": messages,
-            "max_tokens": self.config["max_tokens"],
-            "temperature": self.config["temperature"]
+            "max_tokens": tier_config["max_tokens"],
+            "temperature": self.config["temperature"],
+            # Pedir el desglose de uso para registrar tokens cacheados
+            "usage": {"include": True}
         }
+        if tools:
+            data["tools"] = tools
+            if tool_choice:
+                data["tool_choice"] = tool_choice
+        
+        # Control de admisión global: concurrencia + presupuesto de tokens por minuto
+        prompt_chars = len(llm_config.system_prompt) + len(message) + sum(
+            len(m.get("content") or "") for m in (context or []) + (extra_messages or [])
+        )
+        estimated_tokens = llm_admission.estimate_tokens(prompt_chars, tier_config["max_tokens"])
+        try:
+            ticket = await llm_admission.acquire_async(self.priority, estimated_tokens)
+        except AdmissionRejected:
+            return {"success": False, "error_message": SHED_MESSAGE}
+        
+        actual_tokens = None
         
         # Timeout más largo para requests en producción
         timeout = aiohttp.ClientTimeout(total=30)
         
         try:
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(
-                    "https://openrouter.ai/api/v1/chat/completions",
+            async with self._session_scope(session, timeout) as http:
+                async with http.post(
+                    OPENROUTER_CHAT_URL,
                     headers=headers,
-                    json=data
+                    json=data,
+                    timeout=timeout
                 ) as response:
                     if response.status == 200:
                         result = await response.json()
-                        response_text = result["choices"][0]["message"]["content"]
-                        logger.info("✅ Respuesta recibida de OpenRouter")
-                        return response_text
+                        choice = result["choices"][0]
+                        usage = result.get("usage") or {}
+                        actual_tokens = usage.get("total_tokens")
+                        if usage:
+                            prompt_cache_stats.record(usage)
+                        logger.info(f"✅ Respuesta recibida de OpenRouter ({tier}: {tier_config['model']})")
+                        return {
+                            "success": True,
+                            "content": choice["message"].get("content") or "",
+                            "tool_calls": choice["message"].get("tool_calls") or [],
+                            "finish_reason": choice.get("finish_reason"),
+                            "model": tier_config["model"],
+                            "tier": tier
+                        }
                     else:
                         error_text = await response.text()
                         logger.error(f"❌ Error HTTP {response.status}: {error_text}")
                         
                         # Respuestas específicas según el error
                         if response.status == 429:
-                            return "⏳ El servicio está muy ocupado. Intenta de nuevo en unos segundos."
+                            retry_after = response.headers.get("Retry-After", "5")
+                            llm_admission.report_rate_limited(float(retry_after) if retry_after.isdigit() else 5.0)
+                            error_message = "⏳ El servicio está muy ocupado. Intenta de nuevo en unos segundos."
                         elif response.status == 401:
-                            return "🔐 Error de autenticación. Contacta al administrador."
+                            error_message = "🔐 Error de autenticación. Contacta al administrador."
                         else:
-                            return "🔧 Error del servicio. Intenta de nuevo más tarde."
+                            error_message = "🔧 Error del servicio. Intenta de nuevo más tarde."
+                        return {"success": False, "status": response.status, "error_message": error_message}
                             
         except asyncio.TimeoutError:
             logger.error("⏰ Timeout en request a OpenRouter")
-            return "⏰ La respuesta está tardando mucho. Intenta con una pregunta más simple."
+            return {"success": False, "error_message": "⏰ La respuesta está tardando mucho. Intenta con una pregunta más simple."}
         except Exception as e:
             logger.error(f"💥 Error inesperado: {e}")
-            return "💥 Error inesperado. Intenta de nuevo."
+            return {"success": False, "error_message": "💥 Error inesperado. Intenta de nuevo."}
+        finally:
+            llm_admission.release(ticket, actual_tokens)
     
     def _detect_scientific_query(self, message: str, keywords: List[str]) -> bool:
         """Detecta si el mensaje es una consulta científica"""
@@ -188,6 +525,139 @@ class ProductionLLMHandler:
         
         return False
     
+    async def _bounded(self, name: str, coro, timeout: float):
+        """Espera una rama del fan-out con su límite; None si tarda o falla"""
+        try:
+            return await asyncio.wait_for(coro, timeout=max(timeout, 0.01))
+        except asyncio.TimeoutError:
+            logger.warning(f"⏳ Fan-out: {name} superó {timeout:.1f}s, se sigue sin esa rama")
+        except Exception as e:
+            logger.error(f"❌ Fan-out: error en {name}: {e}")
+        return None
+    
+    async def _load_memory(self, message: str, context: Optional[List[Dict]],
+                           context_loader: Optional[Callable[[], List[Dict]]]) -> Dict:
+        """Historial del usuario y su resumen relevante para la consulta"""
+        if context is None and context_loader:
+            context = await asyncio.to_thread(context_loader)
+        context = context or []
+        smart = intelligent_memory.generate_smart_context(message, context)
+        return {"context": context, "summary": smart.get("context_summary", "")}
+    
+    async def _warm_llm(self, session: aiohttp.ClientSession) -> bool:
+        """Abre DNS + TLS con OpenRouter mientras corre la búsqueda; la síntesis reusa la conexión"""
+        headers = {"Authorization": f"Bearer {self.config['api_key']}"}
+        async with session.get(OPENROUTER_KEY_URL, headers=headers) as response:
+            await response.read()
+            return response.status == 200
+    
+    def _build_grounded_prompt(self, message: str, papers: List[Dict],
+                               details_by_id: Dict[str, Dict], summary: str = "") -> str:
+        """Prompt de síntesis anclado a los papers encontrados, con citas [n]"""
+        sources = []
+        for i, paper in enumerate(papers, 1):
+            details = details_by_id.get(paper.get('id'), {})
+            abstract = " ".join((details.get('summary') or paper.get('summary') or "").split())
+            if len(abstract) > FANOUT_ABSTRACT_CHARS:
+                abstract = abstract[:FANOUT_ABSTRACT_CHARS].rsplit(" ", 1)[0] + "…"
+            year = (paper.get('published') or "")[:4] or "s/f"
+            sources.append(f"[{i}] {paper.get('title', 'Sin título')} — {self._short_authors(paper)} ({year})\n{abstract}")
+        
+        prompt = (
+            f"Pregunta del usuario: {message}\n\n"
+            "Papers recientes de arXiv relevantes para la pregunta:\n\n"
+            + "\n\n".join(sources)
+            + "\n\nResponde la pregunta apoyándote en estos papers. Cita cada afirmación con [n] "
+            "según el número del paper, no inventes resultados que no aparezcan en los resúmenes "
+            "y sé conciso (máximo 3 párrafos)."
+        )
+        if summary:
+            prompt = f"Contexto de la conversación: {summary}\n\n{prompt}"
+        return prompt
+    
+    def _format_sources(self, papers: List[Dict], details_by_id: Dict[str, Dict]) -> str:
+        """Lista de fuentes numeradas que acompaña a la síntesis"""
+        lines = ["📚 **Fuentes:**"]
+        for i, paper in enumerate(papers, 1):
+            details = details_by_id.get(paper.get('id'), {})
+            url = details.get('arxivUrl') or paper.get('arxivUrl', '')
+            year = (paper.get('published') or "")[:4]
+            line = f"[{i}] {paper.get('title', 'Sin título')} — _{self._short_authors(paper)}_"
+            if year:
+                line += f" ({year})"
+            if url:
+                line += f" {url}"
+            lines.append(line)
+        return "\n".join(lines)
+    
+    async def _scientific_fanout(self, message: str, context: Optional[List[Dict]],
+                                 context_loader: Optional[Callable[[], List[Dict]]] = None) -> str:
+        """
+        Consulta científica con las ramas en paralelo y síntesis anclada a los papers
+        
+        Búsqueda + detalles en arXiv, memoria del usuario y warm-up de la conexión
+        con OpenRouter corren a la vez con asyncio.gather; luego el LLM sintetiza
+        una respuesta citando los papers. Con el deadline global se responde con
+        lo que haya: síntesis sin papers, papers sin síntesis o el fallback.
+        """
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        search_query = self._extract_search_terms(message)
+        logger.info(f"🔍 Términos extraídos: {search_query}")
+        
+        retrieval_timeout = min(FANOUT_RETRIEVAL_SECONDS, FANOUT_DEADLINE_SECONDS)
+        session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=FANOUT_DEADLINE_SECONDS))
+        try:
+            # Si la búsqueda supera el límite, el hilo termina igual y deja el resultado en cache
+            search, memory, warmed = await asyncio.gather(
+                self._bounded("búsqueda arXiv", asyncio.to_thread(
+                    mcp_integration.search_papers_with_details, search_query, 5, FANOUT_TOP_PAPERS
+                ), retrieval_timeout),
+                self._bounded("memoria", self._load_memory(message, context, context_loader), retrieval_timeout),
+                self._bounded("warm-up LLM", self._warm_llm(session), retrieval_timeout)
+            )
+            retrieval_ms = (loop.time() - started) * 1000
+            
+            memory = memory or {"context": context or [], "summary": ""}
+            papers = (search or {}).get("papers", [])[:FANOUT_TOP_PAPERS] if (search or {}).get("success") else []
+            details_by_id = {d.get("id"): d for d in (search or {}).get("details", [])}
+            logger.info(f"🧵 Fan-out: {len(papers)} papers, {len(memory['context'])} mensajes de memoria, "
+                        f"warm-up={'ok' if warmed else 'no'} en {retrieval_ms:.0f} ms")
+            
+            if papers:
+                prompt = self._build_grounded_prompt(message, papers, details_by_id, memory["summary"])
+            else:
+                prompt = message
+            
+            remaining = FANOUT_DEADLINE_SECONDS - (loop.time() - started)
+            synthesis = await self._bounded(
+                "síntesis LLM",
+                self._call_openrouter(prompt, memory["context"], tier="standard", session=session),
+                remaining
+            )
+        finally:
+            await session.close()
+        
+        logger.info(f"⏱️ Fan-out científico completo en {(loop.time() - started) * 1000:.0f} ms")
+        answered = bool(synthesis and synthesis.get("success"))
+        
+        if papers and answered:
+            return (f"🔬 **{search_query}**\n\n{synthesis['content']}\n\n"
+                    f"{self._format_sources(papers, details_by_id)}\n\n"
+                    f"💡 *Usa `/papers {search_query}` para ver más resultados*")
+        if papers:
+            # Sin síntesis a tiempo: al menos la lista de papers
+            return self._format_papers(search_query, papers, details_by_id)
+        if answered:
+            if search is None:
+                note = "⏳ La búsqueda en arXiv tardó demasiado; respondo sin papers."
+            elif search.get("unavailable"):
+                note = "⚠️ La búsqueda en arXiv no está disponible en este momento; respondo sin papers."
+            else:
+                note = f"🔍 No encontré papers en arXiv sobre '{search_query}'; respondo con conocimiento general."
+            return f"_{note}_\n\n{synthesis['content']}"
+        return self._scientific_fallback(message)
+    
     async def _handle_scientific_query(self, message: str) -> str:
         """Maneja consultas científicas usando MCP"""
         try:
@@ -195,39 +665,22 @@ class ProductionLLMHandler:
             search_query = self._extract_search_terms(message)
             logger.info(f"🔍 Términos extraídos: {search_query}")
             
-            # Inicializar MCP si no está listo
-            init_result = mcp_integration.initialize()
-            if not init_result:
+            # Verificar que arXiv esté disponible (el cliente nativo no requiere Node)
+            if not mcp_integration.ensure_arxiv_ready():
                 logger.error("❌ MCP initialization failed for scientific query")
                 return "🔧 Error iniciando sistema de búsqueda científica (MCP no disponible). Intenta más tarde."
             
-            # Buscar papers usando MCP
-            result = mcp_integration.search_papers(search_query, max_results=5)
+            # Buscar papers y detalles de los 3 primeros (detalles en un solo round trip)
+            result = mcp_integration.search_papers_with_details(search_query, max_results=5, top_n=3)
             
             if result.get("success") and result.get("papers"):
                 papers = result["papers"]
+                details_by_id = {d.get("id"): d for d in result.get("details", [])}
                 
-                # Formatear respuesta con contexto
-                response = f"🔬 **Encontré {len(papers)} papers sobre '{search_query}':**\n\n"
-                
-                for i, paper in enumerate(papers[:3], 1):  # Máximo 3 para no saturar
-                    title = paper.get('title', 'Sin título')
-                    authors = paper.get('authors', ['Desconocido'])
-                    published = paper.get('published', 'Fecha desconocida')
-                    
-                    # Tomar solo primeros 2 autores para brevedad
-                    author_text = ', '.join(authors[:2])
-                    if len(authors) > 2:
-                        author_text += f" et al."
-                    
-                    response += f"**{i}. {title}**\n"
-                    response += f"📝 *{author_text}*\n"
-                    response += f"📅 {published}\n\n"
-                
-                # Agregar sugerencia de comandos para más detalles
-                response += f"💡 *Usa `/papers {search_query}` para ver más resultados o `/mcp` para opciones avanzadas*"
-                
-                return response
+                return self._format_papers(search_query, papers, details_by_id)
+            elif result.get("unavailable"):
+                logger.error("❌ arXiv no disponible para consulta científica")
+                return "🔧 Error iniciando sistema de búsqueda científica (MCP no disponible). Intenta más tarde."
             else:
                 error_msg = result.get("error", "Error desconocido")
                 return f"🔍 No encontré papers sobre '{search_query}'. Error: {error_msg}\n\n💡 *Intenta con términos más específicos o en inglés*"
@@ -236,6 +689,40 @@ class ProductionLLMHandler:
             logger.error(f"❌ Error en búsqueda científica: {e}")
             return f"🔧 Error procesando búsqueda científica: {str(e)}\n\n💡 *Puedes intentar con `/papers [tu consulta]`*"
     
+    def _format_papers(self, search_query: str, papers: List[Dict], details_by_id: Dict[str, Dict]) -> str:
+        """Lista formateada de papers con autores, fecha y enlace"""
+        response = f"🔬 **Encontré {len(papers)} papers sobre '{search_query}':**\n\n"
+        
+        for i, paper in enumerate(papers[:3], 1):  # Máximo 3 para no saturar
+            title = paper.get('title', 'Sin título')
+            published = paper.get('published', 'Fecha desconocida')
+            
+            response += f"**{i}. {title}**\n"
+            response += f"📝 *{self._short_authors(paper)}*\n"
+            response += f"📅 {published}\n"
+            
+            details = details_by_id.get(paper.get('id'), {})
+            if details.get('journalRef'):
+                response += f"📰 {details['journalRef']}\n"
+            elif details.get('comment'):
+                response += f"💬 {details['comment'][:120]}\n"
+            if details.get('arxivUrl'):
+                response += f"🔗 {details['arxivUrl']}\n"
+            response += "\n"
+        
+        # Agregar sugerencia de comandos para más detalles
+        response += f"💡 *Usa `/papers {search_query}` para ver más resultados o `/mcp` para opciones avanzadas*"
+        return response
+    
+    @staticmethod
+    def _short_authors(paper: Dict) -> str:
+        """Primeros 2 autores para brevedad"""
+        authors = paper.get('authors') or ['Desconocido']
+        author_text = ', '.join(authors[:2])
+        if len(authors) > 2:
+            author_text += " et al."
+        return author_text
+    
     def _extract_search_terms(self, message: str) -> str:
         """Extrae términos de búsqueda del mensaje del usuario"""
         # Remover palabras comunes y obtener términos clave
@@ -342,69 +829,122 @@ class ProductionLLMHandler:
         return False
     
     async def _handle_weather_query(self, message: str) -> str:
-        """Maneja consultas de clima usando Weather MCP"""
+        """Maneja consultas de clima usando Weather MCP (cache por celda geográfica)"""
         try:
             # Extraer ubicación del mensaje
             location = self._extract_location_from_message(message)
             if not location:
                 return "🌤️ Por favor especifica una ubicación. Ejemplo: '¿Cómo está el clima en Madrid?'"
             
-            # Inicializar MCP
-            if not mcp_integration.initialize():
-                logger.error("❌ MCP initialization failed for weather query")
+            wants_forecast = re.search(
+                r'pron[oó]stico|forecast|mañana|tomorrow|semana|week|pr[oó]ximos d[ií]as', message.lower()
+            )
+            if wants_forecast:
+                result = weather_service.get_forecast(location)
+            else:
+                result = weather_service.get_current(location)
+            
+            if result.get("success"):
+                if wants_forecast:
+                    return weather_service.format_forecast_for_slack(result)
+                return weather_service.format_current_for_slack(result)
+            
+            if result.get("unavailable"):
+                logger.error("❌ Worker MCP no disponible para consulta de clima")
                 return "🔧 Error iniciando sistema de clima (MCP no disponible). Intenta más tarde."
             
-            # Obtener clima actual (necesitaríamos implementar esto en mcp_integration)
-            # Por ahora, respuesta informativa
-            return f"🌤️ **Consulta de clima para {location}**\n\n" + \
-                   "📋 *Sistema de clima disponible pero requiere configuración adicional*\n" + \
-                   "💡 *Usa `/mcp` para ver el estado del sistema*"
+            if result.get("not_found"):
+                return f"🌤️ No encontré la ubicación '{location}'. Prueba con 'ciudad, país'."
+            return f"🌤️ No pude obtener el clima para {location}. Error: {result.get('error', 'Error desconocido')}"
                    
         except Exception as e:
             logger.error(f"❌ Error en consulta de clima: {e}")
             return f"🔧 Error procesando consulta de clima: {str(e)}"
     
+    def _extract_github_repo(self, message: str) -> Optional[tuple]:
+        """Extrae (owner, repo) de una URL de GitHub o de una referencia owner/repo"""
+        match = GITHUB_URL_PATTERN.search(message) or GITHUB_REPO_PATTERN.search(message)
+        if not match:
+            return None
+        owner, repo = match.group(1), match.group(2)
+        if repo.endswith(".git"):
+            repo = repo[:-4]
+        return owner, repo.rstrip(".")
+    
     async def _handle_github_query(self, message: str) -> str:
-        """Maneja consultas de GitHub usando GitHub MCP"""
+        """Maneja consultas de GitHub usando GitHub MCP (worker persistente con cache ETag)"""
         try:
-            # Inicializar MCP
-            if not mcp_integration.initialize():
-                logger.error("❌ MCP initialization failed for GitHub query")
-                return "🔧 Error iniciando sistema GitHub (MCP no disponible). Intenta más tarde."
+            repo_ref = self._extract_github_repo(message)
+            
+            if repo_ref and re.search(r'\b(issues?|bugs?|problemas|incidencias)\b', message.lower()):
+                owner, repo = repo_ref
+                result = mcp_integration.get_github_issues(owner, repo)
+                formatter = lambda r: mcp_integration.format_github_issues_for_slack(r["issues"], f"{owner}/{repo}")
+            elif repo_ref:
+                owner, repo = repo_ref
+                result = mcp_integration.get_github_repository(owner, repo)
+                formatter = lambda r: mcp_integration.format_github_repository_for_slack(r["repository"])
+            else:
+                search_terms = self._extract_search_terms(message)
+                result = mcp_integration.search_github_repositories(search_terms)
+                formatter = lambda r: mcp_integration.format_github_repositories_for_slack(
+                    r["repositories"], r.get("total_count", 0)
+                )
             
-            # Extraer términos de búsqueda
-            search_terms = self._extract_search_terms(message)
+            if result.get("success"):
+                return formatter(result)
             
-            # Respuesta informativa (necesitaríamos implementar en mcp_integration)
-            return f"🐙 **Búsqueda en GitHub: '{search_terms}'**\n\n" + \
-                   "📋 *Sistema GitHub disponible*\n" + \
-                   "🔑 *Para acceso completo, configura GITHUB_TOKEN en las variables de entorno*\n" + \
-                   "💡 *Usa `/mcp` para ver el estado del sistema*"
+            if result.get("unavailable"):
+                logger.error("❌ Worker MCP no disponible para consulta GitHub")
+                return "🔧 Error iniciando sistema GitHub (MCP no disponible). Intenta más tarde."
+            
+            error_msg = result.get("error", "Error desconocido")
+            if "rate limit" in error_msg.lower():
+                return "⏳ Alcancé el límite de consultas a la API de GitHub. " + \
+                       "Las consultas ya cacheadas siguen disponibles; intenta otras más tarde.\n" + \
+                       "🔑 *Configura GITHUB_TOKEN para un límite mayor*"
+            return f"🐙 No pude obtener la información de GitHub. Error: {error_msg}"
                    
         except Exception as e:
             logger.error(f"❌ Error en consulta GitHub: {e}")
             return f"🔧 Error procesando consulta GitHub: {str(e)}"
     
     async def _handle_web_scraping_query(self, message: str) -> str:
-        """Maneja solicitudes de web scraping usando Puppeteer MCP"""
+        """Maneja solicitudes de web scraping usando Puppeteer MCP (pool de navegadores persistente)"""
         try:
             # Extraer URL del mensaje
-            url_match = re.search(r'https?://[^\s]+', message)
+            url_match = re.search(r'https?://[^\s>|]+', message)
             if not url_match:
                 return "🕷️ No detecté una URL válida para extraer contenido."
             
             url = url_match.group()
             
-            # Inicializar MCP
-            if not mcp_integration.initialize():
-                logger.error("❌ MCP initialization failed for web scraping query")
-                return "🔧 Error iniciando sistema de web scraping (MCP no disponible). Intenta más tarde."
+            result = await mcp_integration.scrape_url_async(url)
+            if not result.get("success"):
+                if result.get("unavailable"):
+                    logger.error("❌ Worker MCP no disponible para web scraping")
+                    return "🔧 Error iniciando sistema de web scraping (MCP no disponible). Intenta más tarde."
+                return f"🕷️ No pude extraer contenido de {url}: {result.get('error')}"
+            
+            page = result["page"]
+            title = page.get("title") or url
+            
+            # Recorte extractivo para que el LLM resuma en una sola llamada
+            excerpt = trim_content(page.get("text") or "", query=message, max_chars=SCRAPE_EXCERPT_CHARS)
+            if not excerpt:
+                return f"🕷️ **{title}**\n🔗 {url}\n\n📭 La página no tiene texto legible."
+            
+            prompt = (
+                f"El usuario pidió: {message}\n\n"
+                f"Contenido extraído de {url} (título: {title}):\n\"\"\"\n{excerpt}\n\"\"\"\n\n"
+                "Resume este contenido en español respondiendo a lo que pidió el usuario, "
+                "en viñetas breves y sin inventar datos que no estén en el texto."
+            )
+            summary = await self._call_openrouter(prompt, None, tier="standard")
+            body = summary["content"] if summary.get("success") else excerpt[:800] + "..."
             
-            # Respuesta informativa (necesitaríamos implementar en mcp_integration)
-            return f"🕷️ **Web Scraping: {url}**\n\n" + \
-                   "📋 *Sistema Puppeteer disponible*\n" + \
-                   "🔧 *Función de scraping lista para usar*\n" + \
-                   "💡 *Usa `/mcp` para ver el estado del sistema*"
+            cached_note = " _(desde cache)_" if page.get("cached") else ""
+            return f"🕷️ **{title}**{cached_note}\n🔗 {url}\n\n{body}"
                    
         except Exception as e:
             logger.error(f"❌ Error en web scraping: {e}")
@@ -414,10 +954,9 @@ class ProductionLLMHandler:
         """Extrae la ubicación del mensaje para consultas de clima"""
         # Patrones para extraer ubicaciones
         location_patterns = [
-            r'clima en (\w+)',
-            r'weather in ([^?]+)',
-            r'tiempo en (\w+)',
-            r'temperatura de (\w+)'
+            r'(?:clima|tiempo|temperatura|pron[oó]stico)\s+(?:en|de|para)\s+([^?!¿¡]+)',
+            r'(?:weather|forecast|temperature)\s+(?:in|for)\s+([^?!]+)',
+            r'(-?\d{1,2}\.\d+\s*,\s*-?\d{1,3}\.\d+)'
         ]
         
         message_lower = message.lower()
@@ -435,15 +974,17 @@ class ProductionLLMHandler:
         return ""
 
 # Para uso síncrono en el bot
-def get_llm_response_sync(message: str, context: Optional[List[Dict]] = None) -> str:
+def get_llm_response_sync(message: str, context: Optional[List[Dict]] = None,
+                          analysis: Optional[Dict] = None, priority: str = "mention",
+                          context_loader: Optional[Callable[[], List[Dict]]] = None) -> str:
     """Versión síncrona optimizada para producción"""
-    handler = ProductionLLMHandler()
+    handler = ProductionLLMHandler(priority=priority)
     
     try:
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
         try:
-            return loop.run_until_complete(handler.get_response(message, context))
+            return loop.run_until_complete(handler.get_response(message, context, analysis, context_loader))
         finally:
             loop.close()
     except Exception as e:
@@ -0,0 +1,261 @@
+"""
+Herramientas MCP expuestas al LLM (function calling de OpenRouter)
+En vez de desviar mensajes por palabras clave, el modelo recibe las
+capacidades MCP como tools y decide cuándo usarlas. Las llamadas de un
+mismo turno corren en paralelo, con un presupuesto de llamadas por turno
+y un cache de resultados por herramienta + argumentos.
+"""
+
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from mcp_integration import mcp_integration
+from weather_service import weather_service
+from content_trimmer import trim_content
+
+logger = logging.getLogger(__name__)
+
+
+def _function(name: str, description: str, properties: Dict, required: List[str]) -> Dict:
+    return {
+        "type": "function",
+        "function": {
+            "name": name,
+            "description": description,
+            "parameters": {"type": "object", "properties": properties, "required": required}
+        }
+    }
+
+# Definiciones en formato OpenAI/OpenRouter, con la capacidad MCP que cada una usa
+TOOL_SPECS = {
+    "search_arxiv_papers": {
+        "capability": "arxiv",
+        "definition": _function(
+            "search_arxiv_papers",
+            "Busca papers científicos en arXiv. Úsala solo si el usuario pide papers, "
+            "investigación o literatura académica.",
+            {
+                "query": {"type": "string", "description": "Términos de búsqueda, preferentemente en inglés"},
+                "max_results": {"type": "integer", "description": "Cantidad de papers (1-5)"}
+            },
+            ["query"]
+        )
+    },
+    "get_weather": {
+        "capability": "weather",
+        "definition": _function(
+            "get_weather",
+            "Clima actual o pronóstico de los próximos días para una ubicación.",
+            {
+                "location": {"type": "string", "description": "Ciudad, opcionalmente con país"},
+                "forecast": {"type": "boolean", "description": "true para el pronóstico en vez del clima actual"}
+            },
+            ["location"]
+        )
+    },
+    "search_github_repositories": {
+        "capability": "github",
+        "definition": _function(
+            "search_github_repositories",
+            "Busca repositorios públicos en GitHub. Úsala solo si el usuario pide repositorios o proyectos de GitHub.",
+            {"query": {"type": "string", "description": "Términos de búsqueda"}},
+            ["query"]
+        )
+    },
+    "get_github_repository": {
+        "capability": "github",
+        "definition": _function(
+            "get_github_repository",
+            "Información de un repositorio de GitHub (descripción, estrellas, lenguaje, actividad).",
+            {
+                "owner": {"type": "string", "description": "Usuario u organización dueña"},
+                "repo": {"type": "string", "description": "Nombre del repositorio"}
+            },
+            ["owner", "repo"]
+        )
+    },
+    "get_github_issues": {
+        "capability": "github",
+        "definition": _function(
+            "get_github_issues",
+            "Issues de un repositorio de GitHub.",
+            {
+                "owner": {"type": "string", "description": "Usuario u organización dueña"},
+                "repo": {"type": "string", "description": "Nombre del repositorio"},
+                "state": {"type": "string", "enum": ["open", "closed", "all"]}
+            },
+            ["owner", "repo"]
+        )
+    },
+    "scrape_web_page": {
+        "capability": "puppeteer",
+        "definition": _function(
+            "scrape_web_page",
+            "Extrae el texto legible de una URL que el usuario compartió.",
+            {"url": {"type": "string", "description": "URL completa (http/https)"}},
+            ["url"]
+        )
+    }
+}
+
+
+class ToolRouter:
+    """Expone las capacidades MCP como tools y ejecuta las llamadas que pide el modelo"""
+
+    def __init__(self):
+        self.cache_ttl = float(os.getenv("LLM_TOOL_CACHE_TTL", "300"))
+        self.cache_entries = int(os.getenv("LLM_TOOL_CACHE_ENTRIES", "256"))
+        # Caracteres máximos de cada resultado que vuelve al contexto del modelo
+        self.result_chars = int(os.getenv("LLM_TOOL_RESULT_CHARS", "4000"))
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "cache_hits": 0, "errors": 0, "over_budget": 0}
+        self._executors: Dict[str, Callable[..., Dict]] = {
+            "search_arxiv_papers": self._search_arxiv_papers,
+            "get_weather": self._get_weather,
+            "search_github_repositories": self._search_github_repositories,
+            "get_github_repository": self._get_github_repository,
+            "get_github_issues": self._get_github_issues,
+            "scrape_web_page": self._scrape_web_page
+        }
+
+    def definitions(self) -> List[Dict]:
+        """Tools ofrecidas al modelo; las de capacidades con circuito abierto se omiten"""
+        return [
+            spec["definition"] for spec in TOOL_SPECS.values()
+            if mcp_integration.capability_available(spec["capability"])
+        ]
+
+    # ------------------------------------------------------------------
+    # Ejecución
+    # ------------------------------------------------------------------
+
+    async def execute(self, tool_calls: List[Dict], budget: int, user_message: str = "") -> List[Dict]:
+        """
+        Ejecuta en paralelo las tool calls de un turno del modelo
+
+        Devuelve un mensaje role=tool por cada llamada (la API los exige todos).
+        Las que exceden el presupuesto no se ejecutan y devuelven un aviso.
+        """
+        tasks = []
+        for index, call in enumerate(tool_calls):
+            if index >= budget:
+                self.stats["over_budget"] += 1
+                tasks.append(self._immediate({"success": False, "error": "Presupuesto de herramientas agotado"}))
+            else:
+                tasks.append(self._run_call(call, user_message))
+        results = await asyncio.gather(*tasks)
+        return [
+            {"role": "tool", "tool_call_id": call.get("id"), "content": content}
+            for call, content in zip(tool_calls, results)
+        ]
+
+    @staticmethod
+    async def _immediate(result: Dict) -> str:
+        return json.dumps(result, ensure_ascii=False)
+
+    async def _run_call(self, call: Dict, user_message: str) -> str:
+        function = call.get("function") or {}
+        name = function.get("name", "")
+        try:
+            arguments = json.loads(function.get("arguments") or "{}")
+        except json.JSONDecodeError:
+            return json.dumps({"success": False, "error": "Argumentos JSON inválidos"})
+        if name not in self._executors or not isinstance(arguments, dict):
+            return json.dumps({"success": False, "error": f"Herramienta desconocida: {name}"})
+
+        key = f"{name}:{json.dumps(arguments, sort_keys=True, ensure_ascii=False)}"
+        cached = self._cache_get(key)
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            logger.info(f"🧰 Tool {name} desde cache")
+            return cached
+
+        self.stats["calls"] += 1
+        logger.info(f"🧰 Tool {name}({arguments})")
+        try:
+            result = await self._executors[name](user_message=user_message, **arguments)
+        except TypeError as e:
+            result = {"success": False, "error": f"Argumentos inválidos: {e}"}
+        except Exception as e:
+            logger.error(f"❌ Error en tool {name}: {e}")
+            result = {"success": False, "error": str(e)}
+
+        content = json.dumps(result, ensure_ascii=False, default=str)
+        if len(content) > self.result_chars:
+            content = content[:self.result_chars] + "…"
+        if result.get("success"):
+            self._cache_put(key, content)
+        else:
+            self.stats["errors"] += 1
+        return content
+
+    def _cache_get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            if time.time() >= entry[0]:
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return entry[1]
+
+    def _cache_put(self, key: str, content: str):
+        with self._lock:
+            self._cache[key] = (time.time() + self.cache_ttl, content)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Herramientas (resultados compactos para el contexto del modelo)
+    # ------------------------------------------------------------------
+
+    async def _search_arxiv_papers(self, query: str = "", max_results: int = 3, **_: Any) -> Dict:
+        max_results = max(1, min(int(max_results or 3), 5))
+        result = await asyncio.to_thread(mcp_integration.search_papers, query, max_results)
+        if not result.get("success"):
+            return result
+        return {"success": True, "papers": [
+            {
+                "title": paper.get("title"),
+                "authors": (paper.get("authors") or [])[:3],
+                "published": (paper.get("published") or "")[:10],
+                "summary": (paper.get("summary") or "")[:500],
+                "url": paper.get("arxivUrl")
+            }
+            for paper in result.get("papers", [])
+        ]}
+
+    async def _get_weather(self, location: str = "", forecast: bool = False, **_: Any) -> Dict:
+        if forecast:
+            return await asyncio.to_thread(weather_service.get_forecast, location)
+        return await asyncio.to_thread(weather_service.get_current, location)
+
+    async def _search_github_repositories(self, query: str = "", **_: Any) -> Dict:
+        return await asyncio.to_thread(mcp_integration.search_github_repositories, query)
+
+    async def _get_github_repository(self, owner: str = "", repo: str = "", **_: Any) -> Dict:
+        return await asyncio.to_thread(mcp_integration.get_github_repository, owner, repo)
+
+    async def _get_github_issues(self, owner: str = "", repo: str = "", state: str = "open", **_: Any) -> Dict:
+        return await asyncio.to_thread(mcp_integration.get_github_issues, owner, repo, state)
+
+    async def _scrape_web_page(self, url: str = "", user_message: str = "", **_: Any) -> Dict:
+        result = await mcp_integration.scrape_url_async(url)
+        if not result.get("success"):
+            return result
+        page = result["page"]
+        # Extracto relevante a la pregunta, dentro del límite de la herramienta
+        excerpt = trim_content(page.get("text") or "", query=user_message, max_chars=self.result_chars - 500)
+        return {"success": True, "title": page.get("title"), "url": url, "excerpt": excerpt}
+
+# Instancia global
+tool_router = ToolRouter()
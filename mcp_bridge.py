@@ -0,0 +1,500 @@
+"""
+Puente persistente Python ↔ Node para Dona MCP Toolbox
+Mantiene vivos procesos `node src/worker.js` (un pool, uno por core) y les
+habla por stdio con JSON lines; las respuestas llevan un prefijo centinela
+para ignorar el output del logger de Node
+"""
+
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from async_runtime import async_runtime
+from circuit_breaker import circuit_breakers, CircuitBreakerRegistry
+
+logger = logging.getLogger(__name__)
+
+SENTINEL = "@@DONA@@"
+
+
+class MCPBridgeError(Exception):
+    """El worker Node no está disponible o no respondió"""
+
+
+class MCPBridge:
+    """Cliente del worker Node persistente (un proceso, requests concurrentes por id)"""
+
+    def __init__(self, command: List[str] = None, cwd: str = None, breakers: CircuitBreakerRegistry = None):
+        self.cwd = cwd or os.path.join(os.path.dirname(__file__), "dona-mcp-toolbox")
+        self.node_executable = os.getenv("NODE_EXECUTABLE", "node")
+        self._command = command
+        self.timeout = float(os.getenv("MCP_BRIDGE_TIMEOUT", "60"))
+        self.start_timeout = float(os.getenv("MCP_BRIDGE_START_TIMEOUT", "30"))
+
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._next_id = 1
+        self._start_lock: Optional[asyncio.Lock] = None
+        self._ready: Optional[asyncio.Future] = None
+        # Circuitos por capacidad: con el circuito abierto la llamada no llega al worker
+        self.breakers = breakers or circuit_breakers
+        self.stats = {"requests": 0, "errors": 0, "timeouts": 0, "restarts": 0, "started_at": None}
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida del worker (todo corre en el loop del runtime)
+    # ------------------------------------------------------------------
+
+    @property
+    def command(self) -> List[str]:
+        return self._command or [self.node_executable, "src/worker.js"]
+
+    def is_running(self) -> bool:
+        return self._process is not None and self._process.returncode is None
+
+    async def _ensure_started(self):
+        if self.is_running():
+            return
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self.is_running():
+                return
+            if self.stats["started_at"] is not None:
+                self.stats["restarts"] += 1
+                logger.warning("🔄 Reiniciando worker MCP")
+
+            loop = asyncio.get_running_loop()
+            self._ready = loop.create_future()
+            self._process = await asyncio.create_subprocess_exec(
+                *self.command,
+                cwd=self.cwd,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                limit=16 * 1024 * 1024
+            )
+            loop.create_task(self._read_stdout(self._process))
+            loop.create_task(self._drain_stderr(self._process))
+
+            try:
+                ready = await asyncio.wait_for(self._ready, timeout=self.start_timeout)
+            except asyncio.TimeoutError:
+                self._kill()
+                raise MCPBridgeError("El worker MCP no arrancó a tiempo")
+            if ready.get("event") != "ready":
+                raise MCPBridgeError(f"El worker MCP falló al iniciar: {ready.get('error')}")
+
+            self.stats["started_at"] = time.time()
+            logger.info(f"🧩 Worker MCP persistente listo (pid {ready.get('pid')})")
+
+    async def _read_stdout(self, process: asyncio.subprocess.Process):
+        """Lee respuestas con centinela; el resto del output es log del worker"""
+        async for raw in process.stdout:
+            line = raw.decode("utf-8", errors="replace").rstrip("\n")
+            if not line.startswith(SENTINEL):
+                logger.debug(f"[mcp-worker] {line}")
+                continue
+            try:
+                message = json.loads(line[len(SENTINEL):])
+            except json.JSONDecodeError:
+                logger.warning(f"⚠️ Respuesta inválida del worker MCP: {line[:200]}")
+                continue
+
+            if message.get("id") == 0:
+                if self._ready is not None and not self._ready.done():
+                    self._ready.set_result(message)
+                continue
+            future = self._pending.pop(message.get("id"), None)
+            if future is not None and not future.done():
+                future.set_result(message)
+
+        # EOF: el worker terminó; fallar todo lo pendiente
+        await process.wait()
+        logger.warning(f"⚠️ Worker MCP terminó (código {process.returncode})")
+        error = MCPBridgeError(f"El worker MCP terminó (código {process.returncode})")
+        if self._ready is not None and not self._ready.done():
+            self._ready.set_result({"event": "error", "error": str(error)})
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
+
+    async def _drain_stderr(self, process: asyncio.subprocess.Process):
+        async for raw in process.stderr:
+            logger.debug(f"[mcp-worker:stderr] {raw.decode('utf-8', errors='replace').rstrip()}")
+
+    def _kill(self):
+        if self.is_running():
+            self._process.kill()
+
+    # ------------------------------------------------------------------
+    # Llamadas
+    # ------------------------------------------------------------------
+
+    async def _request(self, payload: Dict, timeout: Optional[float]) -> Dict:
+        await self._ensure_started()
+        request_id = self._next_id
+        self._next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self.stats["requests"] += 1
+
+        self._process.stdin.write((json.dumps({"id": request_id, **payload}) + "\n").encode("utf-8"))
+        await self._process.stdin.drain()
+
+        try:
+            message = await asyncio.wait_for(future, timeout=timeout or self.timeout)
+        except asyncio.TimeoutError:
+            self._pending.pop(request_id, None)
+            self.stats["timeouts"] += 1
+            raise
+        if not message.get("success"):
+            self.stats["errors"] += 1
+        return message
+
+    async def _call(self, mcp: str, method: str, params: List[Any], timeout: Optional[float]) -> Dict:
+        try:
+            message = await self._request({"mcp": mcp, "method": method, "params": params}, timeout)
+        except asyncio.TimeoutError:
+            return {"success": False, "error": "Command timed out"}
+        except (MCPBridgeError, OSError) as e:
+            # Worker caído o imposible de lanzar: el llamador puede degradar
+            self.stats["errors"] += 1
+            return {"success": False, "error": str(e), "unavailable": True}
+        if message.get("success"):
+            return {"success": True, "result": message.get("result")}
+        return {"success": False, "error": message.get("error", "Unknown error")}
+
+    def _record(self, mcp: str, result: Optional[Dict]):
+        if result is None:
+            # Cancelada por quien llamó: no dice nada de la capacidad
+            self.breakers.get(mcp).release()
+        else:
+            failed = self.breakers.is_availability_failure(result)
+            self.breakers.record(mcp, not failed, result.get("error", ""))
+
+    async def call(self, mcp: str, method: str, *params, timeout: Optional[float] = None) -> Dict:
+        """Ejecuta mcp.method(*params) en el worker; awaitable desde cualquier loop"""
+        if not self.breakers.allow(mcp):
+            return self.breakers.open_result(mcp)
+        result = None
+        try:
+            result = await async_runtime.run_async(self._call(mcp, method, list(params), timeout))
+            return result
+        finally:
+            self._record(mcp, result)
+
+    def call_sync(self, mcp: str, method: str, *params, timeout: Optional[float] = None) -> Dict:
+        """Versión síncrona para handlers de Bolt"""
+        if not self.breakers.allow(mcp):
+            return self.breakers.open_result(mcp)
+        effective = timeout or self.timeout
+        try:
+            result = async_runtime.run(
+                self._call(mcp, method, list(params), effective), timeout=effective + self.start_timeout
+            )
+        except Exception as e:
+            logger.error(f"❌ Error en llamada al worker MCP: {e}")
+            result = {"success": False, "error": str(e), "unavailable": True}
+        self._record(mcp, result)
+        return result
+
+    async def _batch(self, calls: List[Dict], timeout: Optional[float]) -> Dict:
+        try:
+            message = await self._request({"op": "batch", "calls": calls}, timeout)
+        except asyncio.TimeoutError:
+            return {"success": False, "error": "Command timed out"}
+        except (MCPBridgeError, OSError) as e:
+            self.stats["errors"] += 1
+            return {"success": False, "error": str(e), "unavailable": True}
+        if message.get("success"):
+            return {"success": True, "results": message.get("result", [])}
+        return {"success": False, "error": message.get("error", "Unknown error")}
+
+    def _admit_batch(self, calls: List[Dict]):
+        """Separa las llamadas cuyo circuito está abierto (reciben el fallo rápido en su lugar)"""
+        allowed = {}
+        for call in calls:
+            name = call.get("mcp")
+            if name not in allowed:
+                allowed[name] = self.breakers.allow(name)
+        admitted = [call for call in calls if allowed[call.get("mcp")]]
+        return admitted, [name for name, ok in allowed.items() if ok]
+
+    def _merge_batch(self, calls: List[Dict], admitted: List[Dict], names: List[str], result: Dict) -> Dict:
+        for name in names:
+            self._record(name, result)
+        if not result.get("success") or len(admitted) == len(calls):
+            return result
+        admitted_ids = {id(call) for call in admitted}
+        results = iter(result["results"])
+        return {"success": True, "results": [
+            next(results) if id(call) in admitted_ids else self.breakers.open_result(call.get("mcp"))
+            for call in calls
+        ]}
+
+    async def batch(self, calls: List[Dict], timeout: Optional[float] = None) -> Dict:
+        """Varias llamadas {mcp, method, params} en un solo round trip; resultados en orden"""
+        admitted, names = self._admit_batch(calls)
+        if not admitted:
+            return self._merge_batch(calls, admitted, names, {"success": True, "results": []})
+        result = None
+        try:
+            result = await async_runtime.run_async(self._batch(admitted, timeout))
+        finally:
+            if result is None:
+                for name in names:
+                    self.breakers.get(name).release()
+        return self._merge_batch(calls, admitted, names, result)
+
+    def batch_sync(self, calls: List[Dict], timeout: Optional[float] = None) -> Dict:
+        """Versión síncrona de batch"""
+        admitted, names = self._admit_batch(calls)
+        result = {"success": True, "results": []}
+        if admitted:
+            effective = timeout or self.timeout
+            try:
+                result = async_runtime.run(self._batch(admitted, effective), timeout=effective + self.start_timeout)
+            except Exception as e:
+                logger.error(f"❌ Error en batch al worker MCP: {e}")
+                result = {"success": False, "error": str(e), "unavailable": True}
+        return self._merge_batch(calls, admitted, names, result)
+
+    async def _ping(self, timeout: float) -> Dict:
+        try:
+            message = await self._request({"op": "ping"}, timeout)
+            return {"success": True, **message.get("result", {})}
+        except (asyncio.TimeoutError, MCPBridgeError, OSError) as e:
+            return {"success": False, "error": str(e) or "ping timeout"}
+
+    async def ping(self, timeout: float = 5.0) -> Dict:
+        return await async_runtime.run_async(self._ping(timeout))
+
+    def ping_sync(self, timeout: float = 5.0) -> Dict:
+        try:
+            return async_runtime.run(self._ping(timeout), timeout=timeout + self.start_timeout)
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    def restart(self):
+        """Mata un worker colgado; la próxima request lanza uno nuevo"""
+        async def _restart():
+            if self.is_running():
+                logger.warning("🔪 Matando worker MCP sin respuesta")
+                self._kill()
+                await self._process.wait()
+
+        try:
+            async_runtime.run(_restart(), timeout=10)
+        except Exception as e:
+            logger.error(f"❌ Error reiniciando worker MCP: {e}")
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            "running": self.is_running(),
+            "pid": self._process.pid if self.is_running() else None,
+            "pending": len(self._pending)
+        }
+
+    async def aclose(self, timeout: float = 5.0):
+        """Cierra stdin para que el worker haga dispose() y termine (desde el loop del runtime)"""
+        if not self.is_running():
+            return
+        self._process.stdin.close()
+        try:
+            await asyncio.wait_for(self._process.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            self._kill()
+
+    def shutdown(self, timeout: float = 5.0):
+        """Cierra stdin para que el worker haga dispose() y termine"""
+        try:
+            async_runtime.run(self.aclose(timeout), timeout=timeout + 1)
+        except Exception as e:
+            logger.error(f"❌ Error cerrando worker MCP: {e}")
+
+
+class MCPWorkerPool:
+    """
+    Pool de N workers Node (uno por core) con el mismo API que MCPBridge
+
+    Cada llamada va al worker con menos requests en curso; las capacidades
+    con estado (sesiones de navegador) quedan fijas en un worker. Un worker
+    caído se relanza en la siguiente request y uno que supera el techo de RSS
+    se drena y se recicla cuando el monitor hace ping.
+    """
+
+    def __init__(self, size: int = None, command: List[str] = None, cwd: str = None,
+                 breakers: CircuitBreakerRegistry = None):
+        default_size = min(os.cpu_count() or 1, 4)
+        self.size = max(1, size or int(os.getenv("MCP_WORKERS", str(default_size))))
+        self.workers = [MCPBridge(command=command, cwd=cwd, breakers=breakers) for _ in range(self.size)]
+        self.breakers = self.workers[0].breakers
+        self.max_rss_bytes = float(os.getenv("MCP_WORKER_MAX_RSS_MB", "768")) * 1024 * 1024
+        self.drain_timeout = float(os.getenv("MCP_WORKER_DRAIN_SECONDS", "30"))
+        # Capacidades con estado: todas sus llamadas van al mismo worker (sesiones de navegador;
+        # cache ETag y cuota de GitHub)
+        self.pinned = {
+            name.strip(): index % self.size
+            for index, name in enumerate(os.getenv("MCP_PINNED_CAPABILITIES", "puppeteer,github").split(","))
+            if name.strip()
+        }
+        self._outstanding = [0] * self.size
+        self._draining = set()
+        self._rss: List[Optional[int]] = [None] * self.size
+        self._lock = threading.Lock()
+        self.stats = {"recycled": 0}
+
+    @property
+    def node_executable(self) -> str:
+        return self.workers[0].node_executable
+
+    @node_executable.setter
+    def node_executable(self, value: str):
+        for worker in self.workers:
+            worker.node_executable = value
+
+    # ------------------------------------------------------------------
+    # Despacho
+    # ------------------------------------------------------------------
+
+    def _acquire(self, mcps: List[str]) -> int:
+        """Worker fijo de la capacidad o el de menos requests en curso (sin los que se drenan)"""
+        with self._lock:
+            index = next((self.pinned[mcp] for mcp in mcps if mcp in self.pinned), None)
+            # Un worker fijo que se está reciclando pierde sus sesiones igual: usar otro
+            if index is None or index in self._draining:
+                candidates = [i for i in range(self.size) if i not in self._draining] or list(range(self.size))
+                index = min(candidates, key=lambda i: self._outstanding[i])
+            self._outstanding[index] += 1
+            return index
+
+    def _release(self, index: int):
+        with self._lock:
+            self._outstanding[index] -= 1
+
+    async def call(self, mcp: str, method: str, *params, timeout: Optional[float] = None) -> Dict:
+        index = self._acquire([mcp])
+        try:
+            return await self.workers[index].call(mcp, method, *params, timeout=timeout)
+        finally:
+            self._release(index)
+
+    def call_sync(self, mcp: str, method: str, *params, timeout: Optional[float] = None) -> Dict:
+        index = self._acquire([mcp])
+        try:
+            return self.workers[index].call_sync(mcp, method, *params, timeout=timeout)
+        finally:
+            self._release(index)
+
+    async def batch(self, calls: List[Dict], timeout: Optional[float] = None) -> Dict:
+        index = self._acquire([call.get("mcp") for call in calls])
+        try:
+            return await self.workers[index].batch(calls, timeout=timeout)
+        finally:
+            self._release(index)
+
+    def batch_sync(self, calls: List[Dict], timeout: Optional[float] = None) -> Dict:
+        index = self._acquire([call.get("mcp") for call in calls])
+        try:
+            return self.workers[index].batch_sync(calls, timeout=timeout)
+        finally:
+            self._release(index)
+
+    # ------------------------------------------------------------------
+    # Salud y reciclaje
+    # ------------------------------------------------------------------
+
+    async def _ping_all(self, timeout: float) -> Dict:
+        """Ping a todos los workers en paralelo; recicla los que superan el techo de RSS"""
+        results = await asyncio.gather(*(worker._ping(timeout) for worker in self.workers))
+        for index, result in enumerate(results):
+            if not result.get("success"):
+                continue
+            self._rss[index] = result.get("rssBytes")
+            if self._rss[index] and self._rss[index] > self.max_rss_bytes and index not in self._draining:
+                logger.warning(f"🐘 Worker MCP {index} usa {self._rss[index] // (1024 * 1024)} MB, reciclando")
+                asyncio.get_running_loop().create_task(self._recycle(index))
+
+        alive = [result for result in results if result.get("success")]
+        if not alive:
+            return {"success": False, "error": results[0].get("error", "ping failed")}
+        return {
+            **alive[0],
+            "ready": all(result.get("ready", True) for result in alive),
+            "workers": [
+                {"pid": result.get("pid"), "rssBytes": result.get("rssBytes"), "handled": result.get("handled")}
+                if result.get("success") else {"error": result.get("error")}
+                for result in results
+            ],
+            "alive": len(alive)
+        }
+
+    async def _recycle(self, index: int):
+        """Deja de asignarle trabajo, espera lo que tiene en curso y lo cierra (se relanza solo)"""
+        with self._lock:
+            self._draining.add(index)
+        try:
+            deadline = time.monotonic() + self.drain_timeout
+            while self._outstanding[index] and time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+            await self.workers[index].aclose()
+            self._rss[index] = None
+            self.stats["recycled"] += 1
+        finally:
+            with self._lock:
+                self._draining.discard(index)
+
+    async def ping(self, timeout: float = 5.0) -> Dict:
+        return await async_runtime.run_async(self._ping_all(timeout))
+
+    def ping_sync(self, timeout: float = 5.0) -> Dict:
+        try:
+            return async_runtime.run(self._ping_all(timeout), timeout=timeout + self.workers[0].start_timeout)
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    def restart(self):
+        for worker in self.workers:
+            worker.restart()
+
+    def get_stats(self) -> Dict:
+        workers = []
+        for index, worker in enumerate(self.workers):
+            stats = worker.get_stats()
+            workers.append({
+                "pid": stats["pid"],
+                "running": stats["running"],
+                "outstanding": self._outstanding[index],
+                "requests": stats["requests"],
+                "restarts": stats["restarts"],
+                "rss_mb": round(self._rss[index] / (1024 * 1024), 1) if self._rss[index] else None,
+                "draining": index in self._draining,
+                "pinned": [mcp for mcp, pinned in self.pinned.items() if pinned == index]
+            })
+        running = [w for w in workers if w["running"]]
+        return {
+            "size": self.size,
+            "running": bool(running),
+            "running_workers": len(running),
+            "pid": running[0]["pid"] if running else None,
+            "requests": sum(w["requests"] for w in workers),
+            "restarts": sum(w["restarts"] for w in workers),
+            "errors": sum(worker.stats["errors"] for worker in self.workers),
+            "timeouts": sum(worker.stats["timeouts"] for worker in self.workers),
+            "pending": sum(w["outstanding"] for w in workers),
+            "recycled": self.stats["recycled"],
+            "workers": workers
+        }
+
+    def shutdown(self, timeout: float = 5.0):
+        for worker in self.workers:
+            worker.shutdown(timeout)
+
+# Instancia global: pool de workers Node
+mcp_bridge = MCPWorkerPool()
@@ -0,0 +1,422 @@
+"""
+Cache persistente de resultados MCP
+SQLite en disco con un LRU en memoria al frente: TTL por capacidad,
+stale-while-revalidate, cache negativo de búsquedas vacías o fallidas
+y desalojo por tamaño
+"""
+
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from sqlite_utils import sqlite_connect
+
+logger = logging.getLogger(__name__)
+
+# TTL en segundos por capacidad (los papers publicados casi no cambian)
+DEFAULT_TTLS = {
+    "search_papers": int(os.getenv("MCP_CACHE_TTL_SEARCH", str(6 * 3600))),
+    "get_paper_details": int(os.getenv("MCP_CACHE_TTL_DETAILS", str(7 * 86400))),
+    "get_recent_papers": int(os.getenv("MCP_CACHE_TTL_RECENT", "3600")),
+    "get_arxiv_categories": int(os.getenv("MCP_CACHE_TTL_CATEGORIES", str(30 * 86400))),
+    # GitHub: al vencer, el worker revalida con ETag (un 304 no consume cuota)
+    "github_search": int(os.getenv("MCP_CACHE_TTL_GITHUB_SEARCH", "1800")),
+    "github_repository": int(os.getenv("MCP_CACHE_TTL_GITHUB_REPO", "600")),
+    "github_issues": int(os.getenv("MCP_CACHE_TTL_GITHUB_ISSUES", "300")),
+    # Clima por celda geográfica; la geocodificación de un nombre casi nunca cambia
+    "weather_current": int(os.getenv("MCP_CACHE_TTL_WEATHER", "600")),
+    "weather_forecast": int(os.getenv("MCP_CACHE_TTL_FORECAST", "1800")),
+    "weather_geocode": int(os.getenv("MCP_CACHE_TTL_GEOCODE", str(30 * 86400)))
+}
+
+
+class MCPResultCache:
+    """Cache de resultados MCP por capacidad + argumentos normalizados"""
+
+    def __init__(self, db_path: str = None, ttls: Dict[str, int] = None,
+                 max_bytes: int = None, memory_entries: int = None):
+        if db_path is None:
+            db_path = os.getenv(
+                "MCP_CACHE_DB", os.path.join(tempfile.gettempdir(), "dona_mcp_cache.db")
+            )
+        self.db_path = db_path
+        self.enabled = os.getenv("MCP_CACHE_ENABLED", "true").lower() == "true"
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.default_ttl = int(os.getenv("MCP_CACHE_TTL_DEFAULT", "3600"))
+        # Ventana tras la expiración en la que se sirve el valor viejo mientras se refresca
+        self.stale_seconds = int(os.getenv("MCP_CACHE_STALE_SECONDS", "86400"))
+        self.negative_ttl = int(os.getenv("MCP_CACHE_NEGATIVE_TTL", "900"))
+        self.error_ttl = int(os.getenv("MCP_CACHE_ERROR_TTL", "60"))
+        self.max_bytes = max_bytes or int(os.getenv("MCP_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+        self.memory_entries = memory_entries or int(os.getenv("MCP_CACHE_MEMORY_ENTRIES", "256"))
+
+        self._memory: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        # Single-flight: un solo fetch en vuelo por clave, el resto espera su resultado
+        self._inflight: Dict[str, Future] = {}
+        self._pending_hits: Dict[str, tuple] = {}
+        # Un solo hilo de refresco: serializa las requests a arXiv
+        self._refresher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mcp-cache-refresh")
+        self.stats = {
+            "memory_hits": 0, "disk_hits": 0, "misses": 0, "stale_served": 0,
+            "negative_hits": 0, "refreshes": 0, "evictions": 0, "coalesced": 0
+        }
+
+        self.init_database()
+        logger.info(f"🗃️ MCP result cache inicializado con DB: {db_path}")
+
+    def init_database(self):
+        """Crear la tabla del cache"""
+        try:
+            with sqlite_connect(self.db_path) as conn:
+                conn.execute("""
+                CREATE TABLE IF NOT EXISTS mcp_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    capability TEXT,
+                    args TEXT,  -- JSON normalizado
+                    value TEXT,  -- JSON del resultado
+                    negative INTEGER DEFAULT 0,
+                    size INTEGER,
+                    created_at REAL,
+                    expires_at REAL,
+                    hit_count INTEGER DEFAULT 0,
+                    last_access REAL
+                )
+                """)
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_mcp_cache_access ON mcp_cache(last_access)"
+                )
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_mcp_cache_capability ON mcp_cache(capability)"
+                )
+        except Exception as e:
+            logger.error(f"❌ Error inicializando MCP cache: {e}")
+            self.enabled = False
+
+    @staticmethod
+    def normalize_args(args: Dict) -> str:
+        """Argumentos canónicos: strings en minúscula y sin espacios repetidos, claves ordenadas"""
+        normalized = {}
+        for key, value in (args or {}).items():
+            if value is None:
+                continue
+            if isinstance(value, str):
+                value = " ".join(value.lower().split())
+            normalized[key] = value
+        return json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+
+    def make_key(self, capability: str, args: Dict) -> str:
+        return f"{capability}:{self.normalize_args(args)}"
+
+    def _ttl_for(self, capability: str) -> int:
+        return self.ttls.get(capability, self.default_ttl)
+
+    @staticmethod
+    def _is_negative(result: Dict) -> bool:
+        """Resultado fallido o vacío"""
+        if not result.get("success"):
+            return True
+        if "repositories" in result and not result.get("repositories"):
+            return True
+        return "papers" in result and not result.get("papers")
+
+    # ------------------------------------------------------------------
+    # Lectura / escritura
+    # ------------------------------------------------------------------
+
+    def _remember(self, key: str, entry: Dict):
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _lookup(self, key: str) -> Optional[Dict]:
+        """Busca en memoria y luego en disco; los aciertos se registran para hit_count/last_access"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                self._note_hit(key)
+                flush = len(self._pending_hits) >= 50
+        if entry is not None:
+            # Acierto en memoria: sin I/O salvo cuando toca volcar contadores
+            if flush:
+                self.flush_hits()
+            return entry
+
+        try:
+            with sqlite_connect(self.db_path) as conn:
+                row = conn.execute(
+                    "SELECT value, negative, expires_at FROM mcp_cache WHERE cache_key = ?",
+                    (key,)
+                ).fetchone()
+            if row is None:
+                return None
+            entry = {"value": json.loads(row[0]), "negative": bool(row[1]), "expires_at": row[2]}
+            self._remember(key, entry)
+            with self._lock:
+                self.stats["disk_hits"] += 1
+                self._note_hit(key)
+            return entry
+        except Exception as e:
+            logger.error(f"❌ Error leyendo MCP cache: {e}")
+            return None
+
+    def _note_hit(self, key: str):
+        """Acumula un acierto (llamar con el lock tomado)"""
+        count, _ = self._pending_hits.get(key, (0, 0.0))
+        self._pending_hits[key] = (count + 1, time.time())
+
+    def flush_hits(self):
+        """Vuelca a disco los hit_count/last_access acumulados"""
+        with self._lock:
+            pending, self._pending_hits = self._pending_hits, {}
+        if not pending:
+            return
+        try:
+            with sqlite_connect(self.db_path) as conn:
+                conn.executemany(
+                    "UPDATE mcp_cache SET hit_count = hit_count + ?, last_access = ? WHERE cache_key = ?",
+                    [(count, last_access, key) for key, (count, last_access) in pending.items()]
+                )
+        except Exception as e:
+            logger.error(f"❌ Error actualizando aciertos del MCP cache: {e}")
+
+    def store(self, capability: str, args: Dict, result: Dict):
+        """Guarda un resultado (positivo o negativo) con su TTL"""
+        if not self.enabled or result.get("circuit_open"):
+            # El circuito ya responde al instante; cachearlo demoraría la recuperación
+            return
+        key = self.make_key(capability, args)
+        negative = self._is_negative(result)
+        if not result.get("success"):
+            ttl = self.error_ttl
+        elif negative:
+            ttl = self.negative_ttl
+        else:
+            ttl = self._ttl_for(capability)
+
+        now = time.time()
+        value = json.dumps(result, ensure_ascii=False)
+        entry = {"value": result, "negative": negative, "expires_at": now + ttl}
+        self._remember(key, entry)
+
+        try:
+            with sqlite_connect(self.db_path) as conn:
+                conn.execute("""
+                INSERT INTO mcp_cache (cache_key, capability, args, value, negative, size,
+                                       created_at, expires_at, hit_count, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, ?)
+                ON CONFLICT(cache_key) DO UPDATE SET
+                    value = excluded.value, negative = excluded.negative, size = excluded.size,
+                    created_at = excluded.created_at, expires_at = excluded.expires_at
+                """, (key, capability, self.normalize_args(args), value, int(negative),
+                      len(value), now, now + ttl, now))
+            self._evict_if_needed()
+        except Exception as e:
+            logger.error(f"❌ Error escribiendo MCP cache: {e}")
+
+    def _evict_if_needed(self):
+        """Desaloja por último acceso hasta quedar bajo el 90% del tamaño máximo"""
+        self.flush_hits()
+        with sqlite_connect(self.db_path) as conn:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM mcp_cache").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            target = int(self.max_bytes * 0.9)
+            evicted = []
+            for key, size in conn.execute(
+                "SELECT cache_key, size FROM mcp_cache ORDER BY last_access ASC"
+            ).fetchall():
+                if total <= target:
+                    break
+                evicted.append((key,))
+                total -= size
+            conn.executemany("DELETE FROM mcp_cache WHERE cache_key = ?", evicted)
+
+        with self._lock:
+            for (key,) in evicted:
+                self._memory.pop(key, None)
+            self.stats["evictions"] += len(evicted)
+        logger.info(f"🧹 MCP cache: {len(evicted)} entradas desalojadas")
+
+    # ------------------------------------------------------------------
+    # API principal
+    # ------------------------------------------------------------------
+
+    def get_or_fetch(self, capability: str, args: Dict, fetch: Callable[[], Dict]) -> Dict:
+        """
+        Devuelve el resultado cacheado o lo obtiene con fetch()
+
+        Fresco: se sirve directo. Vencido dentro de la ventana stale: se sirve
+        y se refresca en segundo plano. Sin entrada o demasiado viejo: fetch síncrono.
+        """
+        if not self.enabled:
+            return fetch()
+
+        key = self.make_key(capability, args)
+        entry = self._lookup(key)
+        now = time.time()
+
+        if entry is not None:
+            if entry["negative"] and now < entry["expires_at"]:
+                with self._lock:
+                    self.stats["negative_hits"] += 1
+                return entry["value"]
+            if now < entry["expires_at"]:
+                return entry["value"]
+            if not entry["negative"] and now < entry["expires_at"] + self.stale_seconds:
+                with self._lock:
+                    self.stats["stale_served"] += 1
+                self._schedule_refresh(key, capability, args, fetch)
+                return entry["value"]
+
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+                self.stats["misses"] += 1
+            else:
+                self.stats["coalesced"] += 1
+        if not leader:
+            return future.result()
+
+        try:
+            result = fetch()
+            self.store(capability, args, result)
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def peek(self, capability: str, args: Dict) -> Optional[Dict]:
+        """Valor fresco cacheado sin disparar fetch (None si falta o venció)"""
+        if not self.enabled:
+            return None
+        entry = self._lookup(self.make_key(capability, args))
+        if entry is None or entry["negative"] or time.time() >= entry["expires_at"]:
+            return None
+        return entry["value"]
+
+    def _schedule_refresh(self, key: str, capability: str, args: Dict, fetch: Callable[[], Dict]):
+        """Un solo refresco en vuelo por clave"""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def _refresh():
+            try:
+                result = fetch()
+                # Un refresco fallido no pisa el valor viejo
+                if result.get("success"):
+                    self.store(capability, args, result)
+                    with self._lock:
+                        self.stats["refreshes"] += 1
+            except Exception as e:
+                logger.error(f"❌ Error refrescando {key}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._refresher.submit(_refresh)
+
+    def expires_at(self, capability: str, args: Dict) -> Optional[float]:
+        """Vencimiento de una entrada positiva, sin contarlo como acierto"""
+        key = self.make_key(capability, args)
+        with self._lock:
+            entry = self._memory.get(key)
+        if entry is not None:
+            return None if entry["negative"] else entry["expires_at"]
+        try:
+            with sqlite_connect(self.db_path) as conn:
+                row = conn.execute(
+                    "SELECT negative, expires_at FROM mcp_cache WHERE cache_key = ?", (key,)
+                ).fetchone()
+            return row[1] if row and not row[0] else None
+        except Exception as e:
+            logger.error(f"❌ Error leyendo MCP cache: {e}")
+            return None
+
+    def is_cached(self, capability: str, args: Dict) -> bool:
+        """get_or_fetch respondería sin fetch síncrono (entrada fresca o dentro de la ventana stale)"""
+        if not self.enabled:
+            return False
+        expires_at = self.expires_at(capability, args)
+        return expires_at is not None and time.time() < expires_at + self.stale_seconds
+
+    def top_entries(self, capability: str, limit: int = 10, since: float = 0.0) -> List[Dict]:
+        """Argumentos de las entradas más consultadas de una capacidad (para precarga)"""
+        self.flush_hits()
+        try:
+            with sqlite_connect(self.db_path) as conn:
+                rows = conn.execute("""
+                SELECT args, hit_count, expires_at FROM mcp_cache
+                WHERE capability = ? AND negative = 0 AND last_access >= ?
+                ORDER BY hit_count DESC, last_access DESC LIMIT ?
+                """, (capability, since, limit)).fetchall()
+            return [{"args": json.loads(args), "hit_count": hits, "expires_at": expires_at}
+                    for args, hits, expires_at in rows]
+        except Exception as e:
+            logger.error(f"❌ Error leyendo entradas populares del MCP cache: {e}")
+            return []
+
+    def invalidate(self, capability: str = None):
+        """Borra todo el cache o solo una capacidad"""
+        with self._lock:
+            if capability is None:
+                self._memory.clear()
+            else:
+                for key in [k for k in self._memory if k.startswith(f"{capability}:")]:
+                    del self._memory[key]
+        try:
+            with sqlite_connect(self.db_path) as conn:
+                if capability is None:
+                    conn.execute("DELETE FROM mcp_cache")
+                else:
+                    conn.execute("DELETE FROM mcp_cache WHERE capability = ?", (capability,))
+        except Exception as e:
+            logger.error(f"❌ Error invalidando MCP cache: {e}")
+
+    def get_stats(self) -> Dict:
+        """Contadores de aciertos y tamaño en disco"""
+        self.flush_hits()
+        entries, total_bytes = 0, 0
+        try:
+            with sqlite_connect(self.db_path) as conn:
+                entries, total_bytes = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM mcp_cache"
+                ).fetchone()
+        except Exception as e:
+            logger.error(f"❌ Error leyendo stats del MCP cache: {e}")
+
+        with self._lock:
+            stats = dict(self.stats)
+            memory = len(self._memory)
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        lookups = hits + stats["misses"]
+        stats.update({
+            "entries": entries,
+            "bytes": total_bytes,
+            "memory_entries": memory,
+            "hit_ratio": round(hits / lookups, 3) if lookups else 0.0
+        })
+        return stats
+
+# Instancia global
+mcp_cache = MCPResultCache()
@@ -0,0 +1,227 @@
+"""
+Precalentador del cache de resultados MCP
+Refresca antes de que venzan las búsquedas de /papers más frecuentes y los
+papers recientes de las categorías configuradas, respetando los límites de
+cortesía de arXiv, para que el usuario no espere a la API
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import threading
+from typing import Callable, Dict, List, Optional
+
+from metrics import LatencyHistogram
+from mcp_cache import mcp_cache, MCPResultCache
+from arxiv_client import ARXIV_CATEGORIES
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WARM_CATEGORIES = "cs.AI,cs.LG,cs.CL"
+
+# Las claves del cache se normalizan en minúsculas; arXiv distingue "cs.AI" de "cs.ai"
+_CATEGORY_CASE = {category.lower(): category for category in ARXIV_CATEGORIES}
+
+
+class CacheWarmer:
+    """Refresca en segundo plano las entradas populares del cache MCP"""
+
+    def __init__(self, integration=None, cache: MCPResultCache = None):
+        self._integration = integration
+        self.cache = cache or mcp_cache
+        self.enabled = os.getenv("MCP_WARMER_ENABLED", "true").lower() == "true"
+        self.interval_minutes = float(os.getenv("MCP_WARMER_INTERVAL_MINUTES", "30"))
+        self.top_n = int(os.getenv("MCP_WARMER_TOP_N", "20"))
+        self.lookback_days = float(os.getenv("MCP_WARMER_LOOKBACK_DAYS", "7"))
+        self.categories = [
+            c.strip() for c in os.getenv("MCP_WARMER_CATEGORIES", DEFAULT_WARM_CATEGORIES).split(",") if c.strip()
+        ]
+        self.recent_max_results = int(os.getenv("MCP_WARMER_RECENT_RESULTS", "5"))
+        # Refrescar lo que vence antes de la próxima pasada (más un margen)
+        self.horizon_seconds = float(
+            os.getenv("MCP_WARMER_HORIZON_SECONDS", str(self.interval_minutes * 60 + 300))
+        )
+        # Cortesía con arXiv: tope de requests por pasada y pausa entre ellas
+        self.max_requests = int(os.getenv("MCP_WARMER_MAX_REQUESTS", "30"))
+        self.pause_seconds = float(os.getenv("MCP_WARMER_PAUSE_SECONDS", "3"))
+
+        self._thread: Optional[threading.Thread] = None
+        self._run_lock = threading.Lock()
+        self.stats = {
+            "runs": 0, "refreshed": 0, "skipped_fresh": 0, "errors": 0,
+            "last_run": None, "last_duration": None
+        }
+        # Latencia de /papers según si la respondió el cache o esperó a arXiv: el warmer
+        # sube la proporción de hits (no depende de cuándo corrió ni en qué proceso)
+        self.papers_latency = {"cache_hit": LatencyHistogram(), "cache_miss": LatencyHistogram()}
+
+    @property
+    def integration(self):
+        if self._integration is None:
+            from mcp_integration import mcp_integration
+            self._integration = mcp_integration
+        return self._integration
+
+    # ------------------------------------------------------------------
+    # Selección de objetivos
+    # ------------------------------------------------------------------
+
+    def _fetchers(self) -> Dict[str, Callable[[Dict], Dict]]:
+        integration = self.integration
+        return {
+            "get_recent_papers": lambda args: integration._fetch_recent_papers(
+                args["category"], args.get("max_results", self.recent_max_results)
+            ),
+            "search_papers": lambda args: integration._fetch_search_papers(
+                args["query"], args.get("max_results", 5), args.get("category")
+            )
+        }
+
+    @staticmethod
+    def _restore_category(args: Dict) -> Dict:
+        category = args.get("category")
+        if category:
+            return {**args, "category": _CATEGORY_CASE.get(category.lower(), category)}
+        return args
+
+    def select_targets(self) -> List[Dict]:
+        """Categorías configuradas primero, luego las consultas más frecuentes"""
+        since = time.time() - self.lookback_days * 86400
+        targets, seen = [], set()
+
+        def _add(capability: str, args: Dict, expires_at: Optional[float]):
+            key = self.cache.make_key(capability, args)
+            if key in seen:
+                return
+            seen.add(key)
+            targets.append({"capability": capability, "args": args, "expires_at": expires_at})
+
+        for category in self.categories:
+            args = {"category": category, "max_results": self.recent_max_results}
+            _add("get_recent_papers", args, self.cache.expires_at("get_recent_papers", args))
+
+        for capability in ("get_recent_papers", "search_papers"):
+            for entry in self.cache.top_entries(capability, self.top_n, since=since):
+                _add(capability, self._restore_category(entry["args"]), entry["expires_at"])
+
+        return targets
+
+    # ------------------------------------------------------------------
+    # Pasada de precalentamiento
+    # ------------------------------------------------------------------
+
+    def run_once(self) -> Dict:
+        """Una pasada: refresca lo que falta o vence dentro del horizonte"""
+        if not self._run_lock.acquire(blocking=False):
+            return {"skipped": True}
+        start = time.time()
+        refreshed = skipped = errors = 0
+        try:
+            fetchers = self._fetchers()
+            deadline = start + self.horizon_seconds
+            requests = 0
+            for target in self.select_targets():
+                expires_at = target["expires_at"]
+                if expires_at is not None and expires_at > deadline:
+                    skipped += 1
+                    continue
+                if requests >= self.max_requests:
+                    break
+                if requests:
+                    time.sleep(self.pause_seconds)
+                requests += 1
+
+                try:
+                    result = fetchers[target["capability"]](target["args"])
+                except Exception as e:
+                    result = {"success": False, "error": str(e)}
+                # Un fallo no pisa el valor que todavía sirve
+                if result.get("success"):
+                    self.cache.store(target["capability"], target["args"], result)
+                    refreshed += 1
+                else:
+                    errors += 1
+                    logger.warning(f"⚠️ Warmer no pudo refrescar {target['capability']} "
+                                   f"{target['args']}: {result.get('error')}")
+        finally:
+            duration = round(time.time() - start, 2)
+            self.stats["runs"] += 1
+            self.stats["refreshed"] += refreshed
+            self.stats["skipped_fresh"] += skipped
+            self.stats["errors"] += errors
+            self.stats["last_run"] = start
+            self.stats["last_duration"] = duration
+            self._run_lock.release()
+
+        logger.info(f"🔥 Cache warmer: {refreshed} refrescadas, {skipped} frescas, "
+                    f"{errors} errores en {duration}s")
+        return {"refreshed": refreshed, "skipped_fresh": skipped, "errors": errors, "duration": duration}
+
+    def start(self):
+        """Hilo de fondo con una pasada cada MCP_WARMER_INTERVAL_MINUTES"""
+        if not self.enabled or not self.cache.enabled:
+            logger.info("🔥 Cache warmer deshabilitado")
+            return
+        if self._thread and self._thread.is_alive():
+            return
+
+        def _loop():
+            while True:
+                try:
+                    self.run_once()
+                except Exception as e:
+                    logger.error(f"❌ Error en cache warmer: {e}")
+                time.sleep(self.interval_minutes * 60)
+
+        self._thread = threading.Thread(target=_loop, name="mcp-cache-warmer", daemon=True)
+        self._thread.start()
+        logger.info(f"🔥 Cache warmer cada {self.interval_minutes:g} min "
+                    f"(top {self.top_n}, categorías: {', '.join(self.categories)})")
+
+    # ------------------------------------------------------------------
+    # Latencia de /papers
+    # ------------------------------------------------------------------
+
+    def observe_papers(self, seconds: float, cache_hit: bool):
+        """Registra la latencia de una búsqueda de /papers"""
+        self.papers_latency["cache_hit" if cache_hit else "cache_miss"].observe(seconds)
+
+    def report(self) -> Dict:
+        """p95 de /papers desde cache y sin cache, proporción de hits + contadores"""
+        latency = {outcome: h.snapshot() for outcome, h in self.papers_latency.items()}
+        total = latency["cache_hit"]["count"] + latency["cache_miss"]["count"]
+        return {
+            "papers_latency": latency,
+            "papers_hit_ratio": round(latency["cache_hit"]["count"] / total, 3) if total else 0.0,
+            **self.stats
+        }
+
+# Instancia global
+cache_warmer = CacheWarmer()
+
+
+def main(argv: List[str]) -> int:
+    """CLI del warmer"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Precalentador del cache MCP")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("run", help="Ejecuta una pasada de precalentamiento")
+    sub.add_parser("targets", help="Lista las entradas que se precalentarían")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        print(json.dumps(cache_warmer.run_once(), indent=2))
+    elif args.command == "targets":
+        for target in cache_warmer.select_targets():
+            expires = target["expires_at"]
+            remaining = f"{int(expires - time.time())}s" if expires else "sin entrada"
+            print(f"{target['capability']:<18} {json.dumps(target['args'], ensure_ascii=False)}  ({remaining})")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    sys.exit(main(sys.argv[1:]))
@@ -9,17 +9,32 @@ import time
 import json
 import logging
 import subprocess
+import random
 import threading
 from typing import Dict, Optional, Callable
 from pathlib import Path
 
+from mcp_bridge import mcp_bridge
+from circuit_breaker import circuit_breakers, CircuitBreakerRegistry
+
 logger = logging.getLogger(__name__)
 
 class MCPHealthMonitor:
     """Monitor de salud con auto-recuperación para sistema MCP"""
     
-    def __init__(self, mcp_integration):
+    def __init__(self, mcp_integration, bridge=None, breakers: CircuitBreakerRegistry = None):
         self.mcp_integration = mcp_integration
+        self.bridge = bridge or mcp_bridge
+        # Mismos circuitos que usa MCPIntegration: el ping los abre o los pasa a half-open
+        self.breakers = breakers or circuit_breakers
+        # Intervalos adaptativos: lento mientras está sano, backoff exponencial
+        # desde min_interval hasta max_interval mientras se recupera
+        self.healthy_interval = float(os.getenv("MCP_HEALTH_INTERVAL", "300"))
+        self.min_interval = float(os.getenv("MCP_HEALTH_MIN_INTERVAL", "5"))
+        self.max_interval = float(os.getenv("MCP_HEALTH_MAX_INTERVAL", "120"))
+        self.ping_timeout = float(os.getenv("MCP_PING_TIMEOUT", "5"))
+        self.recovery_threshold = int(os.getenv("MCP_HEALTH_RECOVERY_THRESHOLD", "3"))
+        self.debug_ttl = float(os.getenv("MCP_DEBUG_SNAPSHOT_TTL", "3600"))
         self.health_status = {
             "healthy": False,
             "last_check": None,
@@ -30,9 +45,19 @@ class MCPHealthMonitor:
             "node_path": None,
             "toolbox_verified": False
         }
+        # Snapshot cacheado que leen /health, /mcp y /debug sin ejecutar nada
+        self.snapshot: Dict = {
+            "healthy": False, "checked_at": None, "latency_ms": None,
+            "worker": None, "error": None, "next_check_at": None
+        }
+        self._debug_snapshot: Optional[Dict] = None
+        self._debug_refreshing = False
+        self._debug_lock = threading.Lock()
+        self.debug_collector: Optional[Callable[[], Dict]] = None
         self.health_callbacks = []
         self.monitoring = False
         self.monitor_thread = None
+        self._wake = threading.Event()
         
     def add_health_callback(self, callback: Callable[[Dict], None]):
         """Agregar callback para notificaciones de cambio de estado"""
@@ -128,14 +153,14 @@ class MCPHealthMonitor:
         return verification
     
     def perform_health_check(self) -> bool:
-        """Realizar check de salud completo"""
+        """Check liviano: ping al worker persistente (el environment se verifica una sola vez)"""
         old_healthy = self.health_status["healthy"]
         
         try:
             self.health_status["total_checks"] += 1
             self.health_status["last_check"] = time.time()
             
-            # 1. Verificar environment si no se ha hecho
+            # 1. Verificar environment si no se ha hecho (subprocesos, solo al inicio o tras recuperación)
             if not self.health_status["environment_verified"]:
                 env_check = self.verify_environment()
                 self.health_status["environment_verified"] = (
@@ -147,33 +172,25 @@ class MCPHealthMonitor:
                 
                 if not self.health_status["environment_verified"]:
                     logger.warning(f"Environment verification failed: {env_check['errors']}")
-                    self.health_status["consecutive_failures"] += 1
-                    self.health_status["healthy"] = False
+                    self._record_result(False, error=f"Environment: {env_check['errors'][:2]}")
                     return False
             
-            # 2. Test inicialización MCP
-            if self.health_status["environment_verified"]:
-                try:
-                    init_success = self.mcp_integration.initialize()
-                    
-                    if init_success:
-                        self.health_status["healthy"] = True
-                        self.health_status["consecutive_failures"] = 0
-                        logger.info("✅ MCP health check passed")
-                        return True
-                    else:
-                        raise Exception("MCP initialization returned False")
-                        
-                except Exception as e:
-                    logger.warning(f"MCP initialization failed: {e}")
-                    self.health_status["consecutive_failures"] += 1
-                    self.health_status["healthy"] = False
-                    return False
+            # 2. Liveness + readiness: un ping respondido desde memoria por el worker
+            start = time.perf_counter()
+            ping = self.bridge.ping_sync(timeout=self.ping_timeout)
+            latency_ms = round((time.perf_counter() - start) * 1000, 1)
+            
+            healthy = bool(ping.get("success") and ping.get("ready", True))
+            error = None if healthy else ping.get("error", "worker not ready")
+            if not healthy:
+                logger.warning(f"MCP ping failed: {error}")
+            self._record_result(healthy, latency_ms=latency_ms, worker=ping if ping.get("success") else None,
+                                error=error)
+            return healthy
                     
         except Exception as e:
             logger.error(f"Health check error: {e}")
-            self.health_status["consecutive_failures"] += 1
-            self.health_status["healthy"] = False
+            self._record_result(False, error=str(e))
             return False
         
         finally:
@@ -181,37 +198,79 @@ class MCPHealthMonitor:
             if old_healthy != self.health_status["healthy"]:
                 self.notify_health_change(old_healthy, self.health_status["healthy"])
     
-    def start_monitoring(self, interval: int = 300):  # 5 minutos
-        """Iniciar monitoreo continuo (patrón de auto-recuperación)"""
+    def _record_result(self, healthy: bool, latency_ms: float = None, worker: Dict = None, error: str = None):
+        """Actualiza contadores, snapshot y el readiness cacheado de la integración"""
+        self.health_status["healthy"] = healthy
+        if healthy:
+            self.health_status["consecutive_failures"] = 0
+        else:
+            self.health_status["consecutive_failures"] += 1
+        
+        self.snapshot = {
+            "healthy": healthy,
+            "checked_at": self.health_status["last_check"],
+            "latency_ms": latency_ms,
+            # Sin respuesta se conserva el último estado conocido del worker
+            "worker": worker or self.snapshot.get("worker"),
+            "error": error,
+            "next_check_at": self.health_status["last_check"] + self.next_interval()
+        }
+        self.mcp_integration.set_readiness(healthy)
+        if healthy:
+            self.breakers.worker_alive()
+        else:
+            self.breakers.trip_worker(error or "health check failed")
+    
+    def next_interval(self) -> float:
+        """Lento mientras está sano; backoff exponencial (con jitter) mientras se recupera"""
+        failures = self.health_status["consecutive_failures"]
+        if not failures:
+            return self.healthy_interval
+        interval = min(self.max_interval, self.min_interval * (2 ** (failures - 1)))
+        return interval * random.uniform(0.9, 1.1)
+    
+    def request_check(self):
+        """Adelanta el próximo check (p. ej. cuando un comando no encuentra snapshot)"""
+        self._wake.set()
+    
+    def start_monitoring(self, interval: Optional[float] = None):
+        """Iniciar monitoreo continuo con intervalos adaptativos"""
         if self.monitoring:
             return
+        if interval:
+            self.healthy_interval = interval
         
         self.monitoring = True
+        self._wake.clear()
         
         def monitor_loop():
-            logger.info(f"🔍 Starting MCP health monitoring (interval: {interval}s)")
+            logger.info(f"🔍 Starting MCP health monitoring (sano cada {self.healthy_interval:g}s, "
+                        f"recuperación {self.min_interval:g}s → {self.max_interval:g}s)")
             
             while self.monitoring:
                 try:
                     self.perform_health_check()
                     
                     # Auto-recuperación si falla mucho
-                    if self.health_status["consecutive_failures"] >= 3:
+                    if self.health_status["consecutive_failures"] >= self.recovery_threshold:
                         logger.warning("🔧 Attempting MCP auto-recovery...")
                         self.attempt_recovery()
                     
-                    time.sleep(interval)
-                    
+                    delay = self.next_interval()
                 except Exception as e:
                     logger.error(f"Monitor loop error: {e}")
-                    time.sleep(60)  # Wait 1 minute on error
+                    delay = self.max_interval
+                
+                self._wake.wait(delay)
+                self._wake.clear()
         
-        self.monitor_thread = threading.Thread(target=monitor_loop, daemon=True)
+        self.monitor_thread = threading.Thread(target=monitor_loop, name="mcp-health-monitor", daemon=True)
         self.monitor_thread.start()
     
     def stop_monitoring(self):
         """Detener monitoreo"""
         self.monitoring = False
+        self._wake.set()
         if self.monitor_thread:
             self.monitor_thread.join(timeout=5)
     
@@ -220,21 +279,25 @@ class MCPHealthMonitor:
         logger.info("🛠️ Attempting MCP system recovery...")
         
         try:
-            # 1. Reset estado
-            self.mcp_integration.initialized = False
+            # 1. Reset estado y matar un worker colgado (la próxima request lanza otro)
+            self.bridge.restart()
             self.health_status["environment_verified"] = False
             
             # 2. Re-verificar environment
             env_check = self.verify_environment()
+            self.health_status["environment_verified"] = bool(
+                env_check["node_available"] and env_check["mcp_directory"] and env_check["test_execution"]
+            )
             
             if env_check["node_available"] and env_check["mcp_directory"]:
-                # 3. Intentar re-inicialización
-                if self.mcp_integration.initialize():
+                # 3. Intentar re-inicialización con un ping al worker nuevo
+                ping = self.bridge.ping_sync(timeout=self.ping_timeout)
+                if ping.get("success") and ping.get("ready", True):
                     logger.info("✅ MCP recovery successful")
-                    self.health_status["consecutive_failures"] = 0
+                    self._record_result(True, worker=ping)
                     return True
                 else:
-                    logger.warning("❌ MCP recovery failed - initialization failed")
+                    logger.warning(f"❌ MCP recovery failed - {ping.get('error', 'worker not ready')}")
             else:
                 logger.warning("❌ MCP recovery failed - environment not ready")
                 
@@ -243,9 +306,53 @@ class MCPHealthMonitor:
         
         return False
     
+    def get_snapshot(self) -> Dict:
+        """Último estado conocido (instantáneo; nunca lanza un probe)"""
+        snapshot = dict(self.snapshot)
+        if snapshot["checked_at"]:
+            snapshot["age_seconds"] = int(time.time() - snapshot["checked_at"])
+        return snapshot
+    
+    def get_debug_snapshot(self) -> Optional[Dict]:
+        """
+        Diagnóstico completo del entorno cacheado por MCP_DEBUG_SNAPSHOT_TTL
+        
+        Si no hay o está vencido se recolecta en segundo plano; devuelve el
+        último disponible (o None la primera vez).
+        """
+        snapshot = self._debug_snapshot
+        if snapshot is None or time.time() - snapshot["collected_at"] > self.debug_ttl:
+            self.refresh_debug_snapshot()
+        if snapshot is None:
+            return None
+        return {**snapshot, "age_seconds": int(time.time() - snapshot["collected_at"])}
+    
+    def refresh_debug_snapshot(self):
+        """Recolecta el diagnóstico en un hilo aparte (uno a la vez)"""
+        with self._debug_lock:
+            if self._debug_refreshing:
+                return
+            self._debug_refreshing = True
+        
+        def _collect():
+            try:
+                collector = self.debug_collector
+                if collector is None:
+                    import debug_render_mcp
+                    collector = debug_render_mcp.debug_environment
+                self._debug_snapshot = {"info": collector(), "collected_at": time.time()}
+            except Exception as e:
+                logger.error(f"Error collecting debug snapshot: {e}")
+            finally:
+                with self._debug_lock:
+                    self._debug_refreshing = False
+        
+        threading.Thread(target=_collect, name="mcp-debug-snapshot", daemon=True).start()
+    
     def get_health_report(self) -> Dict:
         """Obtener reporte completo de salud"""
         uptime = time.time() - self.health_status["uptime_start"]
+        next_check_at = self.snapshot.get("next_check_at")
         
         return {
             "healthy": self.health_status["healthy"],
@@ -254,6 +361,9 @@ class MCPHealthMonitor:
             "total_checks": self.health_status["total_checks"],
             "consecutive_failures": self.health_status["consecutive_failures"],
             "last_check": self.health_status["last_check"],
+            "latency_ms": self.snapshot.get("latency_ms"),
+            "next_check_in": max(0, int(next_check_at - time.time())) if next_check_at else None,
+            "open_circuits": self.breakers.open_names(),
             "environment_verified": self.health_status["environment_verified"],
             "node_path": self.health_status["node_path"],
             "monitoring_active": self.monitoring
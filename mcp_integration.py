@@ -7,19 +7,54 @@ Proporciona acceso a capacidades MCP desde Python
 import os
 import sys
 import json
+import time
+import asyncio
 import logging
+import threading
 import subprocess
 from typing import Dict, List, Optional, Any
 
+import aiohttp
+
+from async_runtime import async_runtime
+from circuit_breaker import circuit_breakers, CircuitOpenError
+from arxiv_client import arxiv_client, ARXIV_CATEGORIES
+from mcp_cache import mcp_cache
+from arxiv_mirror import arxiv_mirror
+from mcp_bridge import mcp_bridge
+
 logger = logging.getLogger(__name__)
 
+# Errores del cliente arXiv que indican caída (abren el circuito), no un mal pedido
+NATIVE_AVAILABILITY_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError, TimeoutError, OSError)
+
 class MCPIntegration:
     """Integración con Dona MCP Toolbox desde Python"""
     
     def __init__(self):
         self.mcp_path = os.path.join(os.path.dirname(__file__), "dona-mcp-toolbox")
         self.node_executable = self._find_node_executable()
+        # Worker Node persistente (navegador, caches) para capacidades que no toleran cold start
+        mcp_bridge.node_executable = self.node_executable
+        self.scrape_timeout = float(os.getenv("SCRAPE_TIMEOUT", "45"))
+        self.github_timeout = float(os.getenv("GITHUB_TIMEOUT", "20"))
         self.initialized = False
+        # Concurrencia máxima de procesos Node
+        self.max_concurrent = int(os.getenv("MCP_MAX_CONCURRENT", "4"))
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # Estado de readiness cacheado (lo refresca el monitor de salud)
+        self.ready_ttl = float(os.getenv("MCP_READY_TTL", "600"))
+        self._ready_checked_at: Optional[float] = None
+        self._probe_lock = threading.Lock()
+        self._probing = False
+        self._probe_scheduled = False
+        self._state_lock = threading.Lock()
+        self.ping_timeout = float(os.getenv("MCP_PING_TIMEOUT", "5"))
+        # Cliente arXiv nativo en Python (sin pasar por Node)
+        self.native_arxiv = os.getenv("ARXIV_NATIVE_CLIENT", "true").lower() == "true"
+        self.arxiv_timeout = float(os.getenv("ARXIV_TIMEOUT", "30")) + 15
+        # Circuitos por capacidad (compartidos con el bridge y el monitor de salud)
+        self.breakers = circuit_breakers
     
     def _find_node_executable(self) -> str:
         """Find Node.js executable in different environments"""
@@ -45,98 +80,272 @@ class MCPIntegration:
         return "node"
         
     def _run_mcp_command(self, script: str, timeout: int = 30) -> Dict:
-        """Ejecutar comando MCP vía Node.js"""
+        """Ejecutar comando MCP vía Node.js (bloquea solo el hilo que llama)"""
         try:
-            # Cambiar al directorio MCP
-            original_cwd = os.getcwd()
-            os.chdir(self.mcp_path)
-            
-            # Ejecutar script Node.js
-            result = subprocess.run(
-                [self.node_executable, "-e", script],
-                capture_output=True,
-                text=True,
-                timeout=timeout,
-                cwd=self.mcp_path
-            )
-            
-            # Restaurar directorio
-            os.chdir(original_cwd)
-            
-            if result.returncode != 0:
-                logger.error(f"MCP command failed: {result.stderr}")
-                return {"success": False, "error": result.stderr}
-            
-            # Parsear salida JSON
-            try:
-                return json.loads(result.stdout)
-            except json.JSONDecodeError:
-                return {"success": True, "output": result.stdout.strip()}
-                
-        except subprocess.TimeoutExpired:
-            logger.error("MCP command timed out")
-            return {"success": False, "error": "Command timed out"}
+            return async_runtime.run(self._run_mcp_command_async(script, timeout), timeout=timeout + 5)
         except Exception as e:
             logger.error(f"Error executing MCP command: {e}")
             return {"success": False, "error": str(e)}
-    
-    def initialize(self) -> bool:
-        """Inicializar la integración MCP"""
+
+    async def run_mcp_command_async(self, script: str, timeout: int = 30) -> Dict:
+        """Versión awaitable desde cualquier event loop (se ejecuta en el runtime compartido)"""
+        return await async_runtime.run_async(self._run_mcp_command_async(script, timeout))
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Límite de procesos Node simultáneos (vive en el loop del runtime)"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        return self._semaphore
+
+    @staticmethod
+    def _parse_output(lines: List[str]) -> Optional[Dict]:
+        """Última línea JSON de la salida (el logger de Node también escribe en stdout)"""
+        for line in reversed(lines):
+            line = line.strip()
+            if not line.startswith("{"):
+                continue
+            try:
+                return json.loads(line)
+            except json.JSONDecodeError:
+                continue
+        return None
+
+    async def _run_mcp_command_async(self, script: str, timeout: int = 30) -> Dict:
+        """Scripts Node de un solo uso detrás del circuito node_cli (abierto: sin subproceso)"""
+        breaker = self.breakers.get("node_cli")
+        if not breaker.allow():
+            return self.breakers.open_result("node_cli")
+        result = None
+        try:
+            result = await self._spawn_mcp_command(script, timeout)
+            return result
+        finally:
+            if result is None:
+                breaker.release()
+            elif result.get("spawn_failed") or result.get("error") == "Command timed out":
+                breaker.record_failure(result.get("error", ""))
+            else:
+                breaker.record_success()
+
+    async def _spawn_mcp_command(self, script: str, timeout: int) -> Dict:
+        """Lanza Node con cwd propio (sin os.chdir), lee stdout en streaming y mata el proceso al vencer"""
+        async with self._get_semaphore():
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    self.node_executable, "-e", script,
+                    cwd=self.mcp_path,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE
+                )
+            except FileNotFoundError as e:
+                logger.error(f"Error executing MCP command: {e}")
+                self.mark_failed(str(e))
+                return {"success": False, "error": str(e), "spawn_failed": True}
+
+            lines: List[str] = []
+
+            async def _read_stdout():
+                async for raw in process.stdout:
+                    lines.append(raw.decode("utf-8", errors="replace"))
+
+            try:
+                _, stderr = await asyncio.wait_for(
+                    asyncio.gather(_read_stdout(), process.stderr.read()), timeout=timeout
+                )
+                await process.wait()
+            except asyncio.TimeoutError:
+                logger.error("MCP command timed out")
+                self.mark_failed("Command timed out")
+                return {"success": False, "error": "Command timed out"}
+            except asyncio.CancelledError:
+                logger.warning("MCP command cancelled")
+                raise
+            finally:
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+
+            if process.returncode != 0:
+                error = stderr.decode("utf-8", errors="replace")
+                logger.error(f"MCP command failed: {error}")
+                self.mark_failed(error)
+                return {"success": False, "error": error, "spawn_failed": True}
+
+            result = self._parse_output(lines)
+            if result is not None:
+                return result
+            return {"success": True, "output": "".join(lines).strip()}
+
+    def initialize(self, force: bool = False) -> bool:
+        """
+        Inicializar la integración MCP (idempotente)
+
+        Si hay un estado de readiness vigente (dentro del TTL) se devuelve sin
+        probar; force=True hace ping al worker persistente.
+        """
+        if not force and self._readiness_fresh():
+            return self.initialized
+
+        with self._probe_lock:
+            # Otro hilo pudo completar el probe mientras esperábamos
+            if not force and self._readiness_fresh():
+                return self.initialized
+            self._probing = True
+            try:
+                ready = self._probe()
+            finally:
+                self._probing = False
+            self.initialized = ready
+            self._ready_checked_at = time.time()
+            return ready
+
+    def _probe(self) -> bool:
+        """Probe liviano: ping al worker persistente (lo lanza si no está corriendo)"""
         try:
-            logger.info("🚀 Inicializando integración MCP...")
-            
-            # Verificar que existe el directorio MCP
             if not os.path.exists(self.mcp_path):
                 logger.error(f"❌ MCP directory not found: {self.mcp_path}")
                 return False
             
-            logger.info(f"✅ MCP directory found: {self.mcp_path}")
-            
-            # Verificar Node.js
-            try:
-                result = subprocess.run([self.node_executable, "--version"], 
-                                     capture_output=True, check=True, text=True)
-                logger.info(f"✅ Node.js version: {result.stdout.strip()}")
-            except (subprocess.CalledProcessError, FileNotFoundError) as e:
-                logger.error(f"❌ Node.js not found or not working: {e}")
-                return False
-            
-            # Test básico de MCP
-            script = """
-            const DonaMCP = require('./src/DonaMCP');
-            (async () => {
-                try {
-                    const dona = new DonaMCP();
-                    await dona.initialize();
-                    const status = dona.getSystemStatus();
-                    await dona.dispose();
-                    console.log(JSON.stringify({success: true, status}));
-                } catch (error) {
-                    console.log(JSON.stringify({success: false, error: error.message}));
-                }
-            })();
-            """
-            
-            logger.info("🧪 Testing MCP initialization...")
-            result = self._run_mcp_command(script)
-            logger.info(f"🔍 MCP test result: {result}")
-            
-            if result.get("success"):
-                self.initialized = True
-                logger.info("✅ MCP integration initialized successfully")
+            result = mcp_bridge.ping_sync(timeout=self.ping_timeout)
+            if result.get("success") and result.get("ready", True):
+                logger.info(f"✅ MCP worker listo (pid {result.get('pid')})")
                 return True
-            else:
-                error_msg = result.get('error', 'Unknown error')
-                logger.error(f"❌ MCP initialization failed: {error_msg}")
-                return False
+            
+            logger.error(f"❌ MCP ping failed: {result.get('error', 'worker not ready')}")
+            return False
                 
         except Exception as e:
             logger.error(f"Error initializing MCP: {e}")
             return False
+
+    def _readiness_fresh(self) -> bool:
+        return (self._ready_checked_at is not None and
+                time.time() - self._ready_checked_at < self.ready_ttl)
+
+    def is_ready(self) -> bool:
+        """
+        Estado de readiness cacheado; nunca lanza un probe en el camino de la request
+
+        Sin estado conocido se asume disponible (optimista) y se programa un probe
+        en segundo plano; con estado vencido se devuelve el último valor y se refresca.
+        """
+        if self._readiness_fresh():
+            return self.initialized
+        self.refresh_readiness()
+        if self._ready_checked_at is None:
+            return True
+        return self.initialized
+
+    def refresh_readiness(self):
+        """Programa un probe en segundo plano (uno a la vez)"""
+        with self._state_lock:
+            if self._probe_scheduled or self._probing:
+                return
+            self._probe_scheduled = True
+
+        def _run():
+            try:
+                self.initialize(force=True)
+            finally:
+                with self._state_lock:
+                    self._probe_scheduled = False
+
+        threading.Thread(target=_run, name="mcp-readiness-probe", daemon=True).start()
+
+    def set_readiness(self, ready: bool):
+        """Registra el resultado de un chequeo externo (el monitor de salud) sin lanzar otro probe"""
+        self.initialized = ready
+        self._ready_checked_at = time.time()
+
+    def reset_readiness(self):
+        """Olvida el estado de readiness (el próximo is_ready() será optimista y agenda un probe)"""
+        self.initialized = False
+        self._ready_checked_at = None
+
+    def mark_failed(self, reason: str = ""):
+        """Invalida el estado de readiness tras un fallo de ejecución y agenda un nuevo probe"""
+        if self._probing:
+            return
+        if self.initialized:
+            logger.warning(f"⚠️ MCP marcado como no disponible: {reason[:200]}")
+        self.initialized = False
+        self._ready_checked_at = time.time()
+        self.refresh_readiness()
     
+    def ensure_arxiv_ready(self) -> bool:
+        """True si las capacidades de arXiv están disponibles (el cliente nativo no requiere Node)"""
+        return self.capability_available("arxiv")
+
+    def _run_native(self, coro, timeout: float = None):
+        """Ejecuta una corrutina del cliente arXiv en el runtime async compartido (tras su circuito)"""
+        breaker = self.breakers.get("arxiv_api")
+        if not breaker.allow():
+            coro.close()
+            raise CircuitOpenError("Circuito arxiv_api abierto")
+        try:
+            result = async_runtime.run(coro, timeout=timeout or self.arxiv_timeout)
+        except Exception as e:
+            if isinstance(e, NATIVE_AVAILABILITY_ERRORS) or "HTTP 5" in str(e):
+                breaker.record_failure(str(e) or type(e).__name__)
+            else:
+                breaker.record_success()
+            raise
+        breaker.record_success()
+        return result
+
+    @staticmethod
+    def _native_error(e: Exception) -> Dict:
+        if isinstance(e, CircuitOpenError):
+            return circuit_breakers.open_result("arxiv_api")
+        return {"success": False, "error": str(e)}
+
+    def capability_available(self, capability: str) -> bool:
+        """
+        Chequeo instantáneo del circuito de una capacidad (arxiv, weather, github, puppeteer)
+
+        Con el circuito abierto el handler va directo al fallback sin lanzar nada.
+        """
+        if capability == "arxiv":
+            if self.native_arxiv:
+                return self.breakers.available("arxiv_api")
+            return self.breakers.available("node_cli") and self.is_ready()
+        return self.breakers.available(capability)
+
     def search_papers(self, query: str, max_results: int = 5, category: str = None) -> Dict:
-        """Buscar papers en ArXiv"""
-        if not self.initialized:
+        """Buscar papers en ArXiv (con cache persistente)"""
+        return mcp_cache.get_or_fetch(
+            "search_papers",
+            {"query": query, "max_results": max_results, "category": category},
+            lambda: self._fetch_search_papers(query, max_results, category)
+        )
+
+    def search_is_cached(self, query: str, max_results: int = 5, category: str = None) -> bool:
+        """La búsqueda se respondería desde el cache (para medir la latencia por hit/miss)"""
+        return mcp_cache.is_cached("search_papers", {"query": query, "max_results": max_results, "category": category})
+
+    def _fetch_search_papers(self, query: str, max_results: int = 5, category: str = None) -> Dict:
+        """Buscar papers en ArXiv sin pasar por el cache"""
+        # Primero el mirror local; la API en vivo solo si no cubre la consulta
+        if arxiv_mirror.is_ready() and arxiv_mirror.covers(category):
+            try:
+                papers = arxiv_mirror.search(query, max_results, category)
+                if papers:
+                    logger.info(f"✅ Found {len(papers)} papers (mirror local)")
+                    return {"success": True, "papers": papers, "count": len(papers), "source": "mirror"}
+            except Exception as e:
+                logger.error(f"Error searching local mirror: {e}")
+
+        if self.native_arxiv:
+            try:
+                logger.info(f"🔍 Searching papers (nativo): {query}")
+                papers = self._run_native(arxiv_client.search_papers(query, max_results, category))
+                logger.info(f"✅ Found {len(papers)} papers")
+                return {"success": True, "papers": papers, "count": len(papers)}
+            except Exception as e:
+                logger.error(f"Error searching papers: {e}")
+                return self._native_error(e)
+
+        if not self.is_ready():
             return {"success": False, "error": "MCP not initialized"}
         
         try:
@@ -174,8 +383,32 @@ class MCPIntegration:
             return {"success": False, "error": str(e)}
     
     def get_paper_details(self, arxiv_id: str) -> Dict:
-        """Obtener detalles de un paper específico"""
-        if not self.initialized:
+        """Obtener detalles de un paper específico (con cache persistente)"""
+        return mcp_cache.get_or_fetch(
+            "get_paper_details", {"arxiv_id": arxiv_id},
+            lambda: self._fetch_paper_details(arxiv_id)
+        )
+
+    def _fetch_paper_details(self, arxiv_id: str) -> Dict:
+        """Obtener detalles de un paper sin pasar por el cache"""
+        if arxiv_mirror.is_ready():
+            try:
+                details = arxiv_mirror.get_paper(arxiv_id)
+                if details:
+                    return {"success": True, "details": details, "source": "mirror"}
+            except Exception as e:
+                logger.error(f"Error reading local mirror: {e}")
+
+        if self.native_arxiv:
+            try:
+                logger.info(f"📄 Getting paper details (nativo): {arxiv_id}")
+                details = self._run_native(arxiv_client.get_paper_details(arxiv_id))
+                return {"success": True, "details": details}
+            except Exception as e:
+                logger.error(f"Error getting paper details: {e}")
+                return self._native_error(e)
+
+        if not self.is_ready():
             return {"success": False, "error": "MCP not initialized"}
         
         try:
@@ -211,7 +444,11 @@ class MCPIntegration:
     
     def get_arxiv_categories(self) -> Dict:
         """Obtener categorías disponibles de ArXiv"""
-        if not self.initialized:
+        if self.native_arxiv:
+            # Diccionario estático: no hace falta lanzar Node
+            return {"success": True, "categories": dict(ARXIV_CATEGORIES)}
+
+        if not self.is_ready():
             return {"success": False, "error": "MCP not initialized"}
         
         try:
@@ -244,8 +481,25 @@ class MCPIntegration:
             return {"success": False, "error": str(e)}
     
     def get_recent_papers(self, category: str, max_results: int = 5) -> Dict:
-        """Obtener papers recientes en una categoría"""
-        if not self.initialized:
+        """Obtener papers recientes en una categoría (con cache persistente)"""
+        return mcp_cache.get_or_fetch(
+            "get_recent_papers", {"category": category, "max_results": max_results},
+            lambda: self._fetch_recent_papers(category, max_results)
+        )
+
+    def _fetch_recent_papers(self, category: str, max_results: int = 5) -> Dict:
+        """Obtener papers recientes sin pasar por el cache"""
+        if self.native_arxiv:
+            try:
+                logger.info(f"📅 Getting recent papers in {category} (nativo)")
+                papers = self._run_native(arxiv_client.get_recent_papers(category, max_results))
+                logger.info(f"✅ Found {len(papers)} recent papers")
+                return {"success": True, "papers": papers, "count": len(papers)}
+            except Exception as e:
+                logger.error(f"Error getting recent papers: {e}")
+                return self._native_error(e)
+
+        if not self.is_ready():
             return {"success": False, "error": "MCP not initialized"}
         
         try:
@@ -280,41 +534,181 @@ class MCPIntegration:
             logger.error(f"Error getting recent papers: {e}")
             return {"success": False, "error": str(e)}
     
+    async def scrape_url_async(self, url: str) -> Dict:
+        """Extrae el texto legible de una URL con el pool de navegadores del worker persistente"""
+        logger.info(f"🕷️ Scraping: {url}")
+        result = await mcp_bridge.call("puppeteer", "scrapePage", url, timeout=self.scrape_timeout)
+        if result.get("success"):
+            page = result["result"]
+            logger.info(f"✅ Scraped {url} ({len(page.get('text') or '')} chars, cached={page.get('cached')})")
+            return {"success": True, "page": page}
+        logger.error(f"Scraping failed: {result.get('error')}")
+        return result
+
+    def scrape_url(self, url: str) -> Dict:
+        """Versión síncrona de scrape_url_async"""
+        try:
+            return async_runtime.run(self.scrape_url_async(url), timeout=self.scrape_timeout + 30)
+        except Exception as e:
+            logger.error(f"Error scraping {url}: {e}")
+            return {"success": False, "error": str(e)}
+
+    def _github_call(self, method: str, *params) -> Dict:
+        """Llama a GitHubMCP en el worker persistente (cache ETag + presupuesto de rate limit)"""
+        result = mcp_bridge.call_sync("github", method, *params, timeout=self.github_timeout)
+        if not result.get("success"):
+            logger.error(f"GitHub {method} failed: {result.get('error')}")
+        return result
+
+    def search_github_repositories(self, query: str, limit: int = 5) -> Dict:
+        """Buscar repositorios en GitHub (con cache persistente)"""
+        return mcp_cache.get_or_fetch(
+            "github_search", {"query": query, "limit": limit},
+            lambda: self._fetch_github_search(query, limit)
+        )
+
+    def _fetch_github_search(self, query: str, limit: int) -> Dict:
+        result = self._github_call("searchRepositories", query, {"limit": limit})
+        if not result.get("success"):
+            return result
+        data = result["result"]
+        return {
+            "success": True,
+            "repositories": data.get("repositories", []),
+            "total_count": data.get("totalCount", 0)
+        }
+
+    def get_github_repository(self, owner: str, repo: str) -> Dict:
+        """Obtener detalles de un repositorio (con cache persistente)"""
+        return mcp_cache.get_or_fetch(
+            "github_repository", {"owner": owner, "repo": repo},
+            lambda: self._fetch_github_repository(owner, repo)
+        )
+
+    def _fetch_github_repository(self, owner: str, repo: str) -> Dict:
+        result = self._github_call("getRepository", owner, repo)
+        if not result.get("success"):
+            return result
+        return {"success": True, "repository": result["result"]}
+
+    def get_github_issues(self, owner: str, repo: str, state: str = "open", limit: int = 5) -> Dict:
+        """Obtener issues de un repositorio (con cache persistente)"""
+        return mcp_cache.get_or_fetch(
+            "github_issues", {"owner": owner, "repo": repo, "state": state, "limit": limit},
+            lambda: self._fetch_github_issues(owner, repo, state, limit)
+        )
+
+    def _fetch_github_issues(self, owner: str, repo: str, state: str, limit: int) -> Dict:
+        result = self._github_call("getIssues", owner, repo, {"state": state, "limit": limit})
+        if not result.get("success"):
+            return result
+        return {"success": True, "issues": result["result"]}
+
+    def get_github_rate_limit(self) -> Dict:
+        """Presupuesto actual de la API de GitHub (no consume cuota, sin cache)"""
+        result = self._github_call("getRateLimit")
+        if not result.get("success"):
+            return result
+        return {"success": True, "rate_limit": result["result"]}
+
+    def batch(self, calls: List[Dict], timeout: float = None) -> Dict:
+        """
+        Ejecuta varias capacidades en un solo round trip al worker
+        
+        calls: [{"mcp": "arxiv", "method": "getPaperDetails", "params": ["2301.00001"]}, ...]
+        Devuelve {"success": True, "results": [...]} con un resultado por llamada, en orden
+        """
+        if not calls:
+            return {"success": True, "results": []}
+        result = mcp_bridge.batch_sync(calls, timeout=timeout)
+        if not result.get("success"):
+            logger.error(f"MCP batch failed: {result.get('error')}")
+        return result
+
     def get_system_status(self) -> Dict:
-        """Obtener estado del sistema MCP"""
-        if not self.initialized:
+        """Obtener estado del sistema MCP (status + health en un solo batch)"""
+        if not self.is_ready():
             return {"success": False, "error": "MCP not initialized"}
         
         try:
-            script = """
-            const DonaMCP = require('./src/DonaMCP');
-            (async () => {
-                try {
-                    const dona = new DonaMCP();
-                    await dona.initialize();
-                    const status = dona.getSystemStatus();
-                    const health = await dona.healthCheck();
-                    await dona.dispose();
-                    console.log(JSON.stringify({success: true, status, health}));
-                } catch (error) {
-                    console.log(JSON.stringify({success: false, error: error.message}));
-                }
-            })();
-            """
-            
-            result = self._run_mcp_command(script)
-            
-            if result.get("success"):
-                logger.info("✅ Retrieved MCP system status")
-                return result
-            else:
-                logger.error(f"Status retrieval failed: {result.get('error')}")
+            result = self.batch([
+                {"mcp": "system", "method": "getSystemStatus"},
+                {"mcp": "system", "method": "healthCheck"}
+            ])
+            if not result.get("success"):
                 return result
+            
+            status, health = result["results"]
+            if not status.get("success"):
+                logger.error(f"Status retrieval failed: {status.get('error')}")
+                return status
+            logger.info("✅ Retrieved MCP system status")
+            return {
+                "success": True,
+                "status": status["result"],
+                "health": health.get("result") if health.get("success") else
+                          {"healthy": False, "error": health.get("error")}
+            }
                 
         except Exception as e:
             logger.error(f"Error getting system status: {e}")
             return {"success": False, "error": str(e)}
     
+    def search_papers_with_details(self, query: str, max_results: int = 5, top_n: int = 3) -> Dict:
+        """
+        Búsqueda + detalles de los primeros top_n papers
+        
+        Los detalles que no estén en cache se piden juntos: una sola request
+        id_list con el cliente nativo o un solo batch al worker Node.
+        """
+        result = self.search_papers(query, max_results=max_results)
+        if not result.get("success") or not result.get("papers"):
+            return result
+        
+        ids = [paper["id"] for paper in result["papers"][:top_n] if paper.get("id")]
+        details = {}
+        missing = []
+        for arxiv_id in ids:
+            cached = mcp_cache.peek("get_paper_details", {"arxiv_id": arxiv_id})
+            if cached:
+                details[arxiv_id] = cached["details"]
+            else:
+                missing.append(arxiv_id)
+        
+        if missing:
+            for arxiv_id, fetched in self._fetch_papers_details(missing).items():
+                mcp_cache.store("get_paper_details", {"arxiv_id": arxiv_id}, fetched)
+                if fetched.get("success"):
+                    details[arxiv_id] = fetched["details"]
+        
+        return {**result, "details": [details[arxiv_id] for arxiv_id in ids if arxiv_id in details]}
+    
+    def _fetch_papers_details(self, arxiv_ids: List[str]) -> Dict[str, Dict]:
+        """Detalles de varios papers en un round trip; {id: resultado}"""
+        if self.native_arxiv:
+            try:
+                papers = self._run_native(arxiv_client.get_papers_details(arxiv_ids))
+                by_id = {paper["id"]: paper for paper in papers}
+                return {
+                    arxiv_id: {"success": True, "details": by_id[arxiv_id]} if arxiv_id in by_id
+                    else {"success": False, "error": f"Paper {arxiv_id} not found"}
+                    for arxiv_id in arxiv_ids
+                }
+            except Exception as e:
+                logger.error(f"Error getting papers details: {e}")
+                return {}
+        
+        result = self.batch([
+            {"mcp": "arxiv", "method": "getPaperDetails", "params": [arxiv_id]} for arxiv_id in arxiv_ids
+        ], timeout=45)
+        if not result.get("success"):
+            return {}
+        return {
+            arxiv_id: {"success": True, "details": item["result"]} if item.get("success")
+            else {"success": False, "error": item.get("error")}
+            for arxiv_id, item in zip(arxiv_ids, result["results"])
+        }
+    
     def format_papers_for_slack(self, papers: List[Dict]) -> str:
         """Formatear papers para mostrar en Slack"""
         if not papers:
@@ -376,5 +770,57 @@ class MCPIntegration:
         
         return formatted
 
+    def format_github_repositories_for_slack(self, repositories: List[Dict], total_count: int = 0) -> str:
+        """Formatear resultados de búsqueda de GitHub para Slack"""
+        if not repositories:
+            return "No se encontraron repositorios."
+        
+        formatted = f"🐙 **Encontré {total_count or len(repositories)} repositorios:**\n\n"
+        for i, repo in enumerate(repositories[:5], 1):
+            description = (repo.get('description') or 'Sin descripción')[:150]
+            formatted += f"**{i}. {repo.get('fullName')}** ⭐ {repo.get('stars', 0)}\n"
+            formatted += f"📝 {description}\n"
+            if repo.get('language'):
+                formatted += f"💻 *{repo['language']}*\n"
+            formatted += f"🔗 {repo.get('url')}\n\n"
+        
+        return formatted
+    
+    def format_github_repository_for_slack(self, repo: Dict) -> str:
+        """Formatear detalles de un repositorio para Slack"""
+        if not repo:
+            return "No se encontraron detalles del repositorio."
+        
+        formatted = f"🐙 **{repo.get('fullName')}**\n\n"
+        formatted += f"📝 {repo.get('description') or 'Sin descripción'}\n\n"
+        formatted += f"⭐ **Estrellas:** {repo.get('stars', 0)} | 🍴 **Forks:** {repo.get('forks', 0)} | "
+        formatted += f"🐛 **Issues abiertos:** {repo.get('openIssues', 0)}\n"
+        if repo.get('language'):
+            formatted += f"💻 **Lenguaje:** {repo['language']}\n"
+        if repo.get('license'):
+            formatted += f"📄 **Licencia:** {repo['license'].get('name')}\n"
+        formatted += f"📅 **Último push:** {(repo.get('pushedAt') or '')[:10]}\n"
+        if repo.get('topics'):
+            formatted += f"🏷️ **Topics:** {', '.join(repo['topics'][:5])}\n"
+        formatted += f"🔗 {repo.get('url')}\n"
+        
+        return formatted
+    
+    def format_github_issues_for_slack(self, issues: List[Dict], full_name: str) -> str:
+        """Formatear issues de un repositorio para Slack"""
+        if not issues:
+            return f"No hay issues abiertos en {full_name}."
+        
+        formatted = f"🐛 **Issues de {full_name}:**\n\n"
+        for issue in issues[:5]:
+            labels = ', '.join(label['name'] for label in issue.get('labels', [])[:3])
+            formatted += f"**#{issue.get('number')} {issue.get('title')}**\n"
+            formatted += f"👤 {issue.get('author')} | 💬 {issue.get('comments', 0)}"
+            if labels:
+                formatted += f" | 🏷️ {labels}"
+            formatted += f"\n🔗 {issue.get('url')}\n\n"
+        
+        return formatted
+
 # Instancia global
 mcp_integration = MCPIntegration()
\ No newline at end of file
@@ -4,7 +4,6 @@ Memory Manager para Dona Slack Bot
 Gestiona conversaciones, contexto y preferencias de usuario
 """
 
-import sqlite3
 import json
 import logging
 from datetime import datetime, timedelta
@@ -17,6 +16,9 @@ from redis_memory import redis_memory
 # Importar memoria inteligente para FASE 3
 from intelligent_memory import intelligent_memory
 
+# Conexiones con WAL y busy timeout (base compartida entre workers)
+from sqlite_utils import sqlite_connect
+
 logger = logging.getLogger(__name__)
 
 class MemoryManager:
@@ -39,7 +41,7 @@ class MemoryManager:
     def init_database(self):
         """Crear tablas de la base de datos"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with sqlite_connect(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 # Tabla de usuarios y preferencias
@@ -89,6 +91,23 @@ class MemoryManager:
                 cursor.execute("CREATE INDEX IF NOT EXISTS idx_conversations_timestamp ON conversations(created_at)")
                 cursor.execute("CREATE INDEX IF NOT EXISTS idx_active_context_user ON active_context(user_id)")
                 
+                # Un mensaje de Slack se guarda una sola vez (los reintentos no duplican filas).
+                # Las bases existentes pueden tener duplicados: se conserva la primera fila.
+                cursor.execute("""
+                DELETE FROM conversations
+                WHERE message_ts IS NOT NULL AND id NOT IN (
+                    SELECT MIN(id) FROM conversations
+                    WHERE message_ts IS NOT NULL
+                    GROUP BY channel_id, message_ts
+                )
+                """)
+                if cursor.rowcount:
+                    logger.info(f"🧹 {cursor.rowcount} mensajes duplicados eliminados")
+                cursor.execute("""
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_conversations_message_ts
+                ON conversations(channel_id, message_ts) WHERE message_ts IS NOT NULL
+                """)
+                
                 conn.commit()
                 logger.info("✅ Base de datos inicializada correctamente")
                 
@@ -99,7 +118,7 @@ class MemoryManager:
     def add_user(self, user_id: str, username: str = None, display_name: str = None, preferences: Dict = None):
         """Agregar o actualizar usuario"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with sqlite_connect(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 preferences_json = json.dumps(preferences or {})
@@ -116,42 +135,54 @@ class MemoryManager:
             logger.error(f"❌ Error agregando usuario {user_id}: {e}")
 
     def log_conversation(self, user_id: str, channel_id: str, role: str, content: str, 
-                        thread_ts: str = None, message_ts: str = None, metadata: Dict = None):
-        """Guardar mensaje en historial de conversaciones"""
+                        thread_ts: str = None, message_ts: str = None, metadata: Dict = None) -> Optional[bool]:
+        """
+        Guardar mensaje en historial de conversaciones
+        
+        Returns:
+            True si se guardó, False si el mensaje (canal + message_ts) ya estaba
+            guardado, None si hubo un error
+        """
         try:
-            # FASE 2: Actualizar sesión activa en Redis
-            if redis_memory.is_available():
-                if role == "user":
-                    # Iniciar/actualizar sesión para mensajes de usuario
-                    redis_memory.start_active_session(user_id, channel_id, metadata)
-                    redis_memory.increment_message_counter("user")
-                else:
-                    redis_memory.update_session_activity(user_id, channel_id)
-                    redis_memory.increment_message_counter("bot")
-            
             # Guardar en SQLite (persistente)
-            with sqlite3.connect(self.db_path) as conn:
+            with sqlite_connect(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 metadata_json = json.dumps(metadata or {})
                 
                 cursor.execute("""
-                INSERT INTO conversations (user_id, channel_id, thread_ts, message_ts, role, content, metadata)
+                INSERT OR IGNORE INTO conversations (user_id, channel_id, thread_ts, message_ts, role, content, metadata)
                 VALUES (?, ?, ?, ?, ?, ?, ?)
                 """, (user_id, channel_id, thread_ts, message_ts, role, content, metadata_json))
                 
                 conn.commit()
-                logger.info(f"💬 Conversación guardada: {user_id} en {channel_id} - {role}: {content[:50]}...")
+                if cursor.rowcount != 1:
+                    logger.info(f"♻️ Mensaje {message_ts} de {channel_id} ya guardado, se ignora")
+                    return False
+            
+            # FASE 2: Actualizar sesión activa en Redis (solo mensajes nuevos, no reintentos)
+            if redis_memory.is_available():
+                if role == "user":
+                    # Iniciar/actualizar sesión para mensajes de usuario
+                    redis_memory.start_active_session(user_id, channel_id, metadata)
+                    redis_memory.increment_message_counter("user")
+                else:
+                    redis_memory.update_session_activity(user_id, channel_id)
+                    redis_memory.increment_message_counter("bot")
+            
+            logger.info(f"💬 Conversación guardada: {user_id} en {channel_id} - {role}: {content[:50]}...")
+            return True
                 
         except Exception as e:
             logger.error(f"❌ Error guardando conversación: {e}")
             logger.exception("Stack trace:")
+            return None
 
     def get_conversation_history(self, user_id: str, channel_id: str = None, 
                                limit: int = 20, hours_back: int = 24) -> List[Dict]:
         """Obtener historial de conversaciones recientes"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with sqlite_connect(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 # Calcular timestamp de corte
@@ -303,7 +334,7 @@ class MemoryManager:
                             context_summary: str = None, topics: List[str] = None):
         """Actualizar contexto activo de la sesión"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with sqlite_connect(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 session_id = f"{user_id}_{channel_id}"
@@ -325,7 +356,7 @@ class MemoryManager:
     def get_user_preferences(self, user_id: str) -> Dict:
         """Obtener preferencias del usuario"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with sqlite_connect(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute("SELECT preferences FROM users WHERE user_id = ?", (user_id,))
@@ -352,7 +383,7 @@ class MemoryManager:
             current_prefs = self.get_user_preferences(user_id)
             current_prefs.update(preferences)
             
-            with sqlite3.connect(self.db_path) as conn:
+            with sqlite_connect(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 preferences_json = json.dumps(current_prefs)
@@ -370,7 +401,7 @@ class MemoryManager:
     def cleanup_old_data(self, days_to_keep: int = 30):
         """Limpiar datos antiguos para mantener la DB optimizada"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with sqlite_connect(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 cutoff_date = datetime.now() - timedelta(days=days_to_keep)
@@ -393,7 +424,7 @@ class MemoryManager:
         """Obtener estadísticas de memoria para debugging (SQLite + Redis)"""
         try:
             # Stats de SQLite
-            with sqlite3.connect(self.db_path) as conn:
+            with sqlite_connect(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 # Contar usuarios
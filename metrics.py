@@ -0,0 +1,70 @@
+"""
+Métricas en proceso para Dona Bot
+Histogramas de latencia con buckets fijos, seguros entre hilos
+"""
+
+import bisect
+import threading
+from typing import Dict, Optional, Sequence
+
+# Buckets en segundos (límite superior de cada bucket)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class LatencyHistogram:
+    """Histograma de latencias con percentiles aproximados por bucket"""
+
+    def __init__(self, buckets: Optional[Sequence[float]] = None):
+        self.buckets = tuple(sorted(buckets or DEFAULT_BUCKETS))
+        # Un contador extra para valores por encima del último bucket
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        """Registra una observación en segundos"""
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def percentile(self, p: float) -> float:
+        """Percentil aproximado (límite superior del bucket que lo contiene)"""
+        with self._lock:
+            if self.count == 0:
+                return 0.0
+            target = p * self.count
+            cumulative = 0
+            for index, bucket_count in enumerate(self.counts):
+                cumulative += bucket_count
+                if cumulative >= target:
+                    return self.buckets[index] if index < len(self.buckets) else self.max
+            return self.max
+
+    def snapshot(self) -> Dict:
+        """Resumen serializable del histograma"""
+        p50, p95, p99 = self.percentile(0.50), self.percentile(0.95), self.percentile(0.99)
+        with self._lock:
+            labels = [f"{bucket:g}" for bucket in self.buckets] + ["+Inf"]
+            return {
+                "count": self.count,
+                "avg": round(self.total / self.count, 4) if self.count else 0.0,
+                "max": round(self.max, 4),
+                "p50": p50,
+                "p95": p95,
+                "p99": p99,
+                "buckets": dict(zip(labels, self.counts))
+            }
+
+    def reset(self):
+        """Reinicia el histograma"""
+        with self._lock:
+            self.counts = [0] * (len(self.buckets) + 1)
+            self.count = 0
+            self.total = 0.0
+            self.max = 0.0
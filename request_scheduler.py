@@ -0,0 +1,175 @@
+"""
+Scheduler de trabajo con prioridad por urgencia
+Se ubica entre la recepción de eventos y el trabajo LLM/MCP: las solicitudes
+urgentes y los DMs se adelantan al trabajo masivo, con envejecimiento para
+que la prioridad baja no quede postergada indefinidamente
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional
+
+from intelligent_memory import intelligent_memory
+from metrics import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+# Menor nivel = se atiende antes
+PRIORITY_LEVELS = {"high": 0, "medium": 1, "low": 2, "bulk": 3}
+URGENCY_TO_LEVEL = {"high": "high", "medium": "medium", "low": "low"}
+LEVEL_NAMES = {value: key for key, value in PRIORITY_LEVELS.items()}
+
+
+class SchedulerFull(Exception):
+    """La cola del scheduler alcanzó su capacidad máxima"""
+
+
+def classify_priority(text: str, is_direct: bool = False, bulk: bool = False) -> str:
+    """
+    Prioridad de una solicitud según urgencia (IntelligentMemory) y canal
+
+    DMs y comandos directos suben un nivel; el trabajo masivo (resúmenes Canvas) va al final
+    """
+    if bulk:
+        return "bulk"
+
+    level = PRIORITY_LEVELS[URGENCY_TO_LEVEL.get(intelligent_memory._assess_urgency(text or ""), "low")]
+    if is_direct:
+        level = max(0, level - 1)
+    return LEVEL_NAMES[level]
+
+
+class PriorityScheduler:
+    """Pool de workers que atiende colas por prioridad con envejecimiento"""
+
+    def __init__(self, name: str = "scheduler", workers: int = None,
+                 aging_seconds: float = None, max_queue: int = 0):
+        self.name = name
+        self.workers = workers or int(os.getenv("SCHEDULER_WORKERS", "4"))
+        self.aging_seconds = aging_seconds or float(os.getenv("SCHEDULER_AGING_SECONDS", "10"))
+        self.max_queue = max_queue
+
+        self._queues = {level: deque() for level in LEVEL_NAMES}
+        self._cond = threading.Condition()
+        self._threads = []
+        self._running = False
+        self._size = 0
+
+        self.wait_histograms = {name: LatencyHistogram() for name in PRIORITY_LEVELS}
+        self.total_histograms = {name: LatencyHistogram() for name in PRIORITY_LEVELS}
+        self.counters = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0}
+
+    def start(self):
+        """Arranca los workers (se llama automáticamente en el primer submit)"""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            for index in range(self.workers):
+                thread = threading.Thread(
+                    target=self._worker_loop, name=f"{self.name}-{index}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+        logger.info(f"🗂️ Scheduler '{self.name}' iniciado con {self.workers} workers")
+
+    def shutdown(self, timeout: float = 5.0):
+        """Detiene los workers tras vaciar lo que estén ejecutando"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+
+    def submit(self, urgency: str, fn: Callable, *args, **kwargs) -> Future:
+        """Encola trabajo con una prioridad (high, medium, low, bulk)"""
+        if not self._running:
+            self.start()
+
+        level = PRIORITY_LEVELS.get(urgency, PRIORITY_LEVELS["medium"])
+        future = Future()
+
+        with self._cond:
+            if self.max_queue and self._size >= self.max_queue:
+                self.counters["rejected"] += 1
+                raise SchedulerFull(f"{self.name}: cola llena ({self._size})")
+            self._queues[level].append((time.monotonic(), future, fn, args, kwargs))
+            self._size += 1
+            self.counters["submitted"] += 1
+            self._cond.notify()
+
+        return future
+
+    def run(self, urgency: str, fn: Callable, *args, timeout: Optional[float] = None, **kwargs):
+        """Encola y espera el resultado (para handlers síncronos de Bolt)"""
+        return self.submit(urgency, fn, *args, **kwargs).result(timeout=timeout)
+
+    def _pick_next(self):
+        """Elige la cabeza de cola con mejor prioridad efectiva (nivel menos envejecimiento)"""
+        now = time.monotonic()
+        best_level, best_score = None, None
+        for level, queue in self._queues.items():
+            if not queue:
+                continue
+            enqueued_at = queue[0][0]
+            score = (level - (now - enqueued_at) / self.aging_seconds, enqueued_at)
+            if best_score is None or score < best_score:
+                best_level, best_score = level, score
+        if best_level is None:
+            return None, None
+        self._size -= 1
+        return best_level, self._queues[best_level].popleft()
+
+    def _worker_loop(self):
+        while True:
+            with self._cond:
+                level, item = self._pick_next()
+                while item is None:
+                    if not self._running:
+                        return
+                    self._cond.wait()
+                    level, item = self._pick_next()
+
+            enqueued_at, future, fn, args, kwargs = item
+            priority = LEVEL_NAMES[level]
+            started_at = time.monotonic()
+            self.wait_histograms[priority].observe(started_at - enqueued_at)
+
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                result = fn(*args, **kwargs)
+                self._count("completed")
+                future.set_result(result)
+            except Exception as e:
+                self._count("failed")
+                logger.error(f"❌ Error en trabajo '{priority}' de {self.name}: {e}")
+                future.set_exception(e)
+            finally:
+                self.total_histograms[priority].observe(time.monotonic() - enqueued_at)
+
+    def _count(self, counter: str):
+        with self._cond:
+            self.counters[counter] += 1
+
+    def get_metrics(self) -> Dict:
+        """Profundidad por prioridad e histogramas de espera/latencia total"""
+        with self._cond:
+            depth = {LEVEL_NAMES[level]: len(queue) for level, queue in self._queues.items()}
+        return {
+            "name": self.name,
+            "workers": self.workers,
+            "queue_depth": depth,
+            **self.counters,
+            "wait_seconds": {name: h.snapshot() for name, h in self.wait_histograms.items()},
+            "latency_seconds": {name: h.snapshot() for name, h in self.total_histograms.items()}
+        }
+
+# Instancia global para el trabajo LLM/MCP de los handlers
+request_scheduler = PriorityScheduler(name="requests")
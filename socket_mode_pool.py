@@ -0,0 +1,236 @@
+"""
+Intake de Socket Mode con varias conexiones concurrentes
+Slack permite varias conexiones Socket Mode por app y reparte los eventos
+entre ellas: mientras una se reconecta, las demás siguen recibiendo. Cada
+conexión usa el cliente async (aiohttp) en un único event loop, confirma
+los eventos al instante y despacha a la App de Bolt en un pool de hilos.
+Las reconexiones son rápidas con backoff exponencial y jitter.
+"""
+
+import os
+import json
+import time
+import random
+import asyncio
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, Dict, List, Optional
+
+from slack_sdk.socket_mode.request import SocketModeRequest
+from slack_sdk.socket_mode.response import SocketModeResponse
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionStats:
+    """Eventos, tasa y reconexiones de una conexión"""
+
+    def __init__(self, index: int, window_seconds: float = 60.0):
+        self.index = index
+        self.window_seconds = window_seconds
+        self.connected = False
+        self.connected_since: Optional[float] = None
+        self.last_event_at: Optional[float] = None
+        self.counters = {"events": 0, "reconnects": 0, "drops": 0, "errors": 0}
+        self._recent: Deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def record_event(self):
+        now = time.monotonic()
+        with self._lock:
+            self.counters["events"] += 1
+            self.last_event_at = now
+            self._recent.append(now)
+            self._trim(now)
+
+    def count(self, counter: str):
+        with self._lock:
+            self.counters[counter] += 1
+
+    def set_connected(self, connected: bool):
+        with self._lock:
+            if connected and not self.connected:
+                self.connected_since = time.monotonic()
+            elif not connected and self.connected:
+                self.counters["drops"] += 1
+                self.connected_since = None
+            self.connected = connected
+
+    def _trim(self, now: float):
+        while self._recent and now - self._recent[0] > self.window_seconds:
+            self._recent.popleft()
+
+    def snapshot(self) -> Dict:
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            return {
+                "index": self.index,
+                "connected": self.connected,
+                "uptime_seconds": round(now - self.connected_since, 1) if self.connected_since else 0,
+                **self.counters,
+                "events_per_minute": round(len(self._recent) * 60.0 / self.window_seconds, 1),
+                "last_event_age": round(now - self.last_event_at, 1) if self.last_event_at else None
+            }
+
+
+class SocketModePool:
+    """
+    N conexiones Socket Mode async delante de una App de Bolt síncrona
+
+    run() bloquea hasta que stop_requested() devuelve True. Los eventos
+    (events_api) se confirman antes de despachar, así Slack no reintenta
+    mientras el pipeline trabaja; comandos y acciones esperan a Bolt porque
+    su respuesta puede llevar contenido. Los duplicados entre conexiones
+    los descarta el middleware de deduplicación.
+    """
+
+    def __init__(self, connections: int = None, client_factory: Callable = None):
+        self.connections = connections or int(os.getenv("SOCKET_MODE_CONNECTIONS", "2"))
+        self.reconnect_base = float(os.getenv("SOCKET_RECONNECT_BASE", "0.5"))
+        self.reconnect_max = float(os.getenv("SOCKET_RECONNECT_MAX", "15"))
+        # Tiempo que se deja al cliente reconectarse solo antes de recrearlo
+        self.reconnect_grace = float(os.getenv("SOCKET_RECONNECT_GRACE", "10"))
+        self.check_interval = float(os.getenv("SOCKET_CHECK_INTERVAL", "2"))
+        self.dispatch_workers = int(os.getenv("SOCKET_DISPATCH_WORKERS", "16"))
+        self.ping_interval = float(os.getenv("SOCKET_PING_INTERVAL", "5"))
+        self.client_factory = client_factory or self._build_client
+        self.app = None
+        self.stats: List[ConnectionStats] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._running = False
+
+    def _build_client(self, app_token: str):
+        # Import diferido: aiohttp solo hace falta con este modo
+        from slack_sdk.socket_mode.aiohttp import SocketModeClient
+        return SocketModeClient(app_token=app_token, auto_reconnect_enabled=True, ping_interval=self.ping_interval)
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Backoff exponencial con jitter completo: 0.5s, 1s, 2s... hasta el máximo"""
+        return random.uniform(0, min(self.reconnect_max, self.reconnect_base * (2 ** attempt)))
+
+    def run(self, app, app_token: str = None, stop_requested: Callable[[], bool] = None):
+        """Abre las conexiones y atiende eventos hasta que se pida parar"""
+        self.app = app
+        app_token = app_token or os.environ["SLACK_APP_TOKEN"]
+        stop_requested = stop_requested or (lambda: False)
+        self.stats = [ConnectionStats(index) for index in range(self.connections)]
+        self._executor = ThreadPoolExecutor(max_workers=self.dispatch_workers, thread_name_prefix="socket-dispatch")
+        self._running = True
+        logger.info(f"📡 Socket Mode: {self.connections} conexiones async")
+        try:
+            asyncio.run(self._main(app_token, stop_requested))
+        finally:
+            self._running = False
+            self._executor.shutdown(wait=False)
+
+    async def _main(self, app_token: str, stop_requested: Callable[[], bool]):
+        stop = asyncio.Event()
+        tasks = [asyncio.create_task(self._run_connection(stats, app_token, stop)) for stats in self.stats]
+        while not stop_requested():
+            await asyncio.sleep(min(self.check_interval, 0.5))
+        stop.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run_connection(self, stats: ConnectionStats, app_token: str, stop: asyncio.Event):
+        """Mantiene viva una conexión; si no se recupera sola, la recrea con backoff"""
+        attempt = 0
+        while not stop.is_set():
+            client = self.client_factory(app_token)
+
+            async def _listener(socket_client, req: SocketModeRequest):
+                await self._handle_request(socket_client, req, stats)
+
+            client.socket_mode_request_listeners.append(_listener)
+            try:
+                await client.connect()
+                stats.set_connected(True)
+                attempt = 0
+                logger.info(f"✅ Conexión Socket Mode #{stats.index} establecida")
+                await self._watch(client, stats, stop)
+            except Exception as e:
+                stats.count("errors")
+                logger.warning(f"⚠️ Conexión Socket Mode #{stats.index} falló: {e}")
+            finally:
+                stats.set_connected(False)
+                try:
+                    await client.close()
+                except Exception as e:
+                    logger.debug(f"Error cerrando conexión Socket Mode #{stats.index}: {e}")
+            if stop.is_set():
+                break
+            delay = self.backoff_delay(attempt)
+            attempt += 1
+            stats.count("reconnects")
+            logger.info(f"🔄 Reconectando Socket Mode #{stats.index} en {delay:.1f}s")
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _watch(self, client, stats: ConnectionStats, stop: asyncio.Event):
+        """Vigila la sesión; el cliente rota y reconecta solo, aquí solo se cubre si no lo logra"""
+        down_since = None
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=self.check_interval)
+                return
+            except asyncio.TimeoutError:
+                pass
+            connected = await client.is_connected()
+            stats.set_connected(connected)
+            if connected:
+                down_since = None
+                continue
+            down_since = down_since or time.monotonic()
+            if time.monotonic() - down_since >= self.reconnect_grace:
+                raise ConnectionError(f"sin conexión hace más de {self.reconnect_grace:g}s")
+
+    async def _handle_request(self, client, req: SocketModeRequest, stats: ConnectionStats):
+        stats.record_event()
+        loop = asyncio.get_running_loop()
+        if req.type == "events_api":
+            # Ack inmediato: el pipeline responde después por la Web API
+            await client.send_socket_mode_response(SocketModeResponse(envelope_id=req.envelope_id))
+            loop.run_in_executor(self._executor, self._dispatch, req)
+            return
+        bolt_response = await loop.run_in_executor(self._executor, self._dispatch, req)
+        if bolt_response is not None and bolt_response.status == 200:
+            await client.send_socket_mode_response(self._build_response(req, bolt_response))
+
+    def _dispatch(self, req: SocketModeRequest):
+        """Corre la App de Bolt en un hilo del pool (igual que SocketModeHandler)"""
+        # Import diferido para no cargar Bolt al importar el módulo
+        from slack_bolt.adapter.socket_mode.internals import run_bolt_app
+        try:
+            return run_bolt_app(self.app, req)
+        except Exception as e:
+            logger.error(f"❌ Error despachando evento de Socket Mode: {e}")
+            return None
+
+    @staticmethod
+    def _build_response(req: SocketModeRequest, bolt_response) -> SocketModeResponse:
+        if not bolt_response.body:
+            return SocketModeResponse(envelope_id=req.envelope_id)
+        content_type = bolt_response.headers.get("content-type", [""])[0]
+        if content_type.startswith("application/json"):
+            return SocketModeResponse(envelope_id=req.envelope_id, payload=json.loads(bolt_response.body))
+        return SocketModeResponse(envelope_id=req.envelope_id, payload={"text": bolt_response.body})
+
+    def get_metrics(self) -> Dict:
+        """Estado, tasa de eventos y reconexiones por conexión"""
+        connections = [stats.snapshot() for stats in self.stats]
+        return {
+            "running": self._running,
+            "size": self.connections,
+            "connected": sum(1 for c in connections if c["connected"]),
+            "events": sum(c["events"] for c in connections),
+            "events_per_minute": round(sum(c["events_per_minute"] for c in connections), 1),
+            "reconnects": sum(c["reconnects"] for c in connections),
+            "connections": connections
+        }
+
+# Instancia global; start.py la arranca con la App de Bolt
+socket_mode_pool = SocketModePool()
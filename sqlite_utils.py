@@ -0,0 +1,27 @@
+"""
+Conexiones SQLite para Dona Bot
+Con varios procesos worker (BOT_WORKERS) las bases de memoria, cache MCP y
+mirror de arXiv son compartidas: se abren en modo WAL (lectores y un
+escritor a la vez) y esperan SQLITE_BUSY_TIMEOUT si otro proceso escribe.
+"""
+
+import os
+import sqlite3
+import threading
+
+SQLITE_BUSY_TIMEOUT = float(os.getenv("SQLITE_BUSY_TIMEOUT", "15"))
+
+# WAL persiste en el archivo: basta activarlo una vez por base y proceso
+_wal_paths = set()
+_wal_lock = threading.Lock()
+
+
+def sqlite_connect(db_path: str) -> sqlite3.Connection:
+    """sqlite3.connect con busy timeout y journal WAL"""
+    conn = sqlite3.connect(db_path, timeout=SQLITE_BUSY_TIMEOUT)
+    with _wal_lock:
+        enable_wal = db_path not in _wal_paths
+        _wal_paths.add(db_path)
+    if enable_wal:
+        conn.execute("PRAGMA journal_mode=WAL")
+    return conn
@@ -75,17 +75,54 @@ def run_bot_with_retry(max_retries: int = 5, retry_delay: int = 30) -> None:
         from mcp_health_monitor import initialize_health_monitor
         
         monitor = initialize_health_monitor(mcp_integration)
-        monitor.start_monitoring(interval=300)  # Check cada 5 minutos
+        monitor.start_monitoring()  # Intervalo adaptativo (MCP_HEALTH_*)
         logger.info("🔍 MCP Health Monitor iniciado")
     except Exception as e:
         logger.warning(f"⚠️ No se pudo inicializar MCP Health Monitor: {e}")
     
+    # Tareas de fondo que escriben estado compartido: un solo proceso las corre
+    from worker_supervisor import is_primary_worker
+    if is_primary_worker():
+        # Actualización diaria del mirror local de arXiv (si está habilitado)
+        try:
+            from arxiv_mirror import arxiv_mirror
+            arxiv_mirror.start_daily_updates()
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudo iniciar el mirror de arXiv: {e}")
+        
+        # Precalentamiento del cache de arXiv (categorías y búsquedas frecuentes)
+        try:
+            from mcp_cache_warmer import cache_warmer
+            cache_warmer.start()
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudo iniciar el cache warmer: {e}")
+        
+        # Precarga del clima de las ubicaciones más consultadas
+        try:
+            from weather_service import weather_service
+            weather_service.start_prefetch()
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudo iniciar la precarga de clima: {e}")
+    
+    # Varias conexiones async (aiohttp) o el handler clásico de una sola conexión
+    from socket_mode_pool import socket_mode_pool
+    use_pool = os.getenv("SOCKET_MODE_ASYNC", "true").lower() == "true"
+    
     retry_count = 0
     
     while not shutdown_requested and retry_count < max_retries:
         try:
             logger.info("🚀 Iniciando Slack Bot con IA...")
             logger.info("🤖 Proveedor: OpenRouter (Llama 3.3)")
+            
+            if use_pool:
+                logger.info(f"📡 Modo: Socket Mode ({socket_mode_pool.connections} conexiones async)")
+                logger.info("💬 Listo para recibir mensajes")
+                retry_count = 0
+                # Bloquea hasta el shutdown; cada conexión se reconecta sola con backoff
+                socket_mode_pool.run(app, os.environ["SLACK_APP_TOKEN"], stop_requested=lambda: shutdown_requested)
+                continue
+            
             logger.info("📡 Modo: Socket Mode")
             
             # Crear handler de Socket Mode
@@ -110,14 +147,92 @@ def run_bot_with_retry(max_retries: int = 5, retry_delay: int = 30) -> None:
             logger.error(f"❌ Error en conexión del bot (intento {retry_count}/{max_retries}): {e}")
             
             if retry_count < max_retries and not shutdown_requested:
-                logger.info(f"🔄 Reintentando en {retry_delay} segundos...")
-                time.sleep(retry_delay)
+                # Backoff con jitter: reintentos rápidos al principio, hasta retry_delay
+                delay = min(retry_delay, socket_mode_pool.backoff_delay(retry_count) + 1)
+                logger.info(f"🔄 Reintentando en {delay:.1f} segundos...")
+                time.sleep(delay)
             else:
                 logger.error("💀 Máximo número de reintentos alcanzado")
                 break
     
+    # Terminar los eventos ya encolados antes de cerrar los workers MCP
+    try:
+        from event_pipeline import event_pipeline
+        event_pipeline.shutdown(timeout=30)
+    except Exception as e:
+        logger.warning(f"⚠️ Error cerrando el pipeline de eventos: {e}")
+    
+    # Cerrar los workers Node persistentes (libera el navegador de Puppeteer)
+    try:
+        from mcp_bridge import mcp_bridge
+        mcp_bridge.shutdown()
+    except Exception as e:
+        logger.warning(f"⚠️ Error cerrando worker MCP: {e}")
+    
     logger.info("🏁 Bot detenido")
 
+def worker_health() -> dict:
+    """Estado del worker para su heartbeat (lo agrega el supervisor)"""
+    from socket_mode_pool import socket_mode_pool
+    from event_pipeline import event_pipeline
+    
+    socket_metrics = socket_mode_pool.get_metrics()
+    pipeline_metrics = event_pipeline.get_metrics()
+    # Listo cuando tiene al menos una conexión abierta (el handler clásico no expone su estado)
+    async_mode = os.getenv("SOCKET_MODE_ASYNC", "true").lower() == "true"
+    return {
+        "ready": socket_metrics["connected"] > 0 if async_mode else True,
+        "connections": socket_metrics["connected"],
+        "events_per_minute": socket_metrics["events_per_minute"],
+        "reconnects": socket_metrics["reconnects"],
+        "queue_depth": pipeline_metrics["queue_depth"],
+        "completed": pipeline_metrics["completed"],
+        "shed": pipeline_metrics["shed"]
+    }
+
+def run_worker(index: int, heartbeat_dir: str) -> None:
+    """Proceso worker: su propia App, pipeline y conexiones Socket Mode"""
+    global shutdown_requested
+    shutdown_requested = False
+    
+    os.environ["BOT_WORKER_INDEX"] = str(index)
+    # Con varios procesos el orden por conversación necesita el lock compartido en Redis
+    os.environ.setdefault("KEYED_LOCK_REDIS", "true")
+    
+    # SIGTERM del supervisor: shutdown graceful; Ctrl+C y SIGHUP los maneja el supervisor
+    signal.signal(signal.SIGTERM, signal_handler)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    
+    if not health_check():
+        logger.error(f"💥 Fallo en health check del worker {index}")
+        sys.exit(1)
+    
+    from worker_supervisor import WorkerHeartbeat
+    heartbeat = WorkerHeartbeat(index, heartbeat_dir, collect=worker_health)
+    heartbeat.start()
+    try:
+        run_bot_with_retry()
+    finally:
+        heartbeat.stop()
+
+def run_supervisor() -> None:
+    """Modo multi-proceso: el supervisor lanza y vigila BOT_WORKERS workers"""
+    from worker_supervisor import worker_supervisor
+    
+    def _stop(signum, frame):
+        logger.info(f"🛑 Señal recibida: {signum}. Deteniendo workers...")
+        worker_supervisor.request_stop()
+    
+    def _rolling_restart(signum, frame):
+        logger.info("🔁 SIGHUP recibido: rolling restart de workers")
+        worker_supervisor.request_rolling_restart()
+    
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    signal.signal(signal.SIGHUP, _rolling_restart)
+    worker_supervisor.run(run_worker)
+
 def health_check() -> bool:
     """Verifica que el bot esté configurado correctamente"""
     try:
@@ -153,12 +268,24 @@ def main():
         logger.error("💥 Fallo en validación de entorno")
         sys.exit(1)
     
-    # 2. Health check
+    # 2. Con varios workers el supervisor no carga la App: cada worker la importa
+    # (y hace su health check) después del fork
+    from worker_supervisor import worker_supervisor
+    if worker_supervisor.workers > 1:
+        try:
+            run_supervisor()
+        except Exception as e:
+            logger.error(f"💥 Error fatal en el supervisor: {e}")
+            sys.exit(1)
+        logger.info("👋 Shutdown completado")
+        return
+    
+    # 3. Health check
     if not health_check():
         logger.error("💥 Fallo en health check")
         sys.exit(1)
     
-    # 3. Ejecutar bot con reintentos
+    # 4. Ejecutar bot con reintentos
     try:
         run_bot_with_retry()
     except Exception as e:
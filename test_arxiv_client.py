@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test script para el cliente arXiv nativo (parseo en streaming y benchmark contra el puente Node)
+"""
+
+import os
+import json
+import time
+import logging
+import subprocess
+
+from arxiv_client import parse_feed, ARXIV_CATEGORIES
+from mcp_integration import mcp_integration
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "arxiv_search.xml")
+BENCH_ROUNDS = 20
+
+def _fixture_chunks(size: int = 512):
+    with open(FIXTURE, "rb") as f:
+        data = f.read()
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+def test_parse_fixture():
+    """El feed grabado produce los mismos dicts que consume format_papers_for_slack"""
+    papers = parse_feed(_fixture_chunks())
+    assert len(papers) == 3
+
+    first = papers[0]
+    assert first["id"] == "1706.03762v7"
+    assert first["title"] == "Attention Is All You Need"
+    assert first["authors"][:2] == ["Ashish Vaswani", "Noam Shazeer"]
+    assert first["categories"] == ["cs.CL", "cs.LG"]
+    assert first["pdfUrl"] == "http://arxiv.org/pdf/1706.03762v7"
+    assert first["arxivUrl"] == "http://arxiv.org/abs/1706.03762v7"
+    assert first["summary"].startswith("The dominant")
+    assert "comment" not in first
+
+    formatted = mcp_integration.format_papers_for_slack(papers)
+    assert "Attention Is All You Need" in formatted
+
+def test_parse_detailed():
+    """El modo detallado agrega comment, journalRef, doi y primaryCategory"""
+    papers = parse_feed(_fixture_chunks(64), detailed=True)
+    assert papers[1]["journalRef"] == "ICLR 2021"
+    assert papers[2]["doi"] == "10.18653/v1/N19-1423"
+    assert papers[0]["primaryCategory"] == "cs.CL"
+
+def test_categories_in_process():
+    """Las categorías salen de una constante, sin lanzar Node"""
+    result = mcp_integration.get_arxiv_categories()
+    assert result["success"]
+    assert result["categories"] == ARXIV_CATEGORIES
+    assert "cs.AI" in result["categories"]
+
+def _node_bridge_parse() -> dict:
+    """Parsea el fixture con ArxivMCP._parseArxivEntry vía Node (como hace el puente actual)"""
+    script = f"""
+    const fs = require('fs');
+    const xml2js = require('xml2js');
+    const ArxivMCP = require('./src/mcps/ArxivMCP');
+    (async () => {{
+        const arxiv = new ArxivMCP();
+        const data = fs.readFileSync({json.dumps(FIXTURE)}, 'utf8');
+        const parsed = await new xml2js.Parser().parseStringPromise(data);
+        const papers = (parsed.feed.entry || []).map(e => arxiv._parseArxivEntry(e));
+        console.log(JSON.stringify({{success: true, papers}}));
+    }})().catch(error => console.log(JSON.stringify({{success: false, error: error.message}})));
+    """
+    result = subprocess.run(
+        [mcp_integration.node_executable, "-e", script],
+        capture_output=True, text=True, timeout=30, cwd=mcp_integration.mcp_path
+    )
+    for line in reversed(result.stdout.strip().splitlines()):
+        try:
+            return json.loads(line)
+        except json.JSONDecodeError:
+            continue
+    return {"success": False, "error": result.stderr.strip()[-200:]}
+
+def test_benchmark_against_bridge():
+    """Benchmark sobre el fixture: parseo nativo vs subprocess Node + xml2js"""
+    chunks = _fixture_chunks()
+    start = time.perf_counter()
+    for _ in range(BENCH_ROUNDS):
+        native = parse_feed(chunks)
+    native_ms = (time.perf_counter() - start) * 1000 / BENCH_ROUNDS
+    logger.info(f"  ⚡ Nativo: {native_ms:.2f}ms por feed")
+
+    try:
+        start = time.perf_counter()
+        bridge = _node_bridge_parse()
+        bridge_ms = (time.perf_counter() - start) * 1000
+    except (FileNotFoundError, subprocess.TimeoutExpired) as e:
+        logger.info(f"  ⏭️ Puente Node no disponible, se omite la comparación: {e}")
+        return
+
+    if not bridge.get("success"):
+        logger.info(f"  ⏭️ Puente Node no disponible, se omite la comparación: {bridge.get('error')}")
+        return
+
+    logger.info(f"  🐢 Puente Node: {bridge_ms:.2f}ms por feed")
+    assert [p["id"] for p in bridge["papers"]] == [p["id"] for p in native]
+    assert bridge["papers"][0]["title"] == native[0]["title"]
+    assert native_ms < bridge_ms
+
+def main():
+    """Ejecutar todos los tests"""
+    tests = [
+        ("Parseo del fixture", test_parse_fixture),
+        ("Modo detallado", test_parse_detailed),
+        ("Categorías en proceso", test_categories_in_process),
+        ("Benchmark vs puente Node", test_benchmark_against_bridge)
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            logger.info(f"✅ {test_name}: PASSED")
+            passed += 1
+        except AssertionError as e:
+            logger.error(f"❌ {test_name}: FAILED - {e}")
+
+    logger.info(f"🎯 RESULTADO FINAL: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Test script para el mirror local de arXiv (snapshot JSON, OAI-PMH y búsqueda FTS5)
+"""
+
+import os
+import time
+import logging
+import tempfile
+import threading
+from types import SimpleNamespace
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import arxiv_mirror as mirror_module
+from arxiv_mirror import ArxivMirror
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+def _new_mirror() -> ArxivMirror:
+    mirror = ArxivMirror(db_path=os.path.join(tempfile.mkdtemp(), "mirror_test.db"),
+                         categories=["cs.AI", "cs.LG", "cs.CL", "cs.CV", "stat.ML"])
+    mirror.enabled = True
+    mirror.min_interval = 0
+    return mirror
+
+def test_load_snapshot():
+    """El snapshot carga solo las categorías configuradas"""
+    mirror = _new_mirror()
+    loaded = mirror.load_snapshot(os.path.join(FIXTURES, "arxiv_snapshot.jsonl"))
+    assert loaded == 3
+    assert mirror.is_ready()
+
+    paper = mirror.get_paper("1810.04805v2")
+    assert paper["title"] == "BERT: Pre-training of Deep Bidirectional Transformers for Language Understanding"
+    assert paper["authors"] == ["Jacob Devlin", "Ming-Wei Chang"]
+    assert paper["doi"] == "10.18653/v1/N19-1423"
+    assert paper["arxivUrl"] == "http://arxiv.org/abs/1810.04805"
+    assert mirror.get_paper("hep-th/9711200") is None
+
+def test_search():
+    """Búsqueda FTS5 por relevancia, con filtro de categoría y en menos de un milisegundo"""
+    mirror = _new_mirror()
+    mirror.load_snapshot(os.path.join(FIXTURES, "arxiv_snapshot.jsonl"))
+
+    papers = mirror.search("transformers attention", max_results=5)
+    assert papers[0]["id"] == "1706.03762"
+    assert mirror.search("graph convolutional", category="stat.ML")[0]["id"] == "1609.02907"
+    assert mirror.search("graph convolutional", category="cs.CV") == []
+    assert mirror.search("\"; DROP TABLE papers; --") == []
+
+    start = time.perf_counter()
+    for _ in range(100):
+        mirror.search("neural networks", max_results=5)
+    per_query_ms = (time.perf_counter() - start) * 1000 / 100
+    logger.info(f"  ⚡ Búsqueda local: {per_query_ms:.3f}ms")
+
+def test_oai_incremental_harvest():
+    """La cosecha OAI sigue el resumptionToken y guarda la fecha para la próxima"""
+    with open(os.path.join(FIXTURES, "arxiv_oai_page.xml"), "rb") as f:
+        first_page = f.read()
+    last_page = (b'<?xml version="1.0"?><OAI-PMH xmlns="http://www.openarchives.org/OAI/2.0/">'
+                 b'<ListRecords><resumptionToken cursor="1" completeListSize="2"/></ListRecords></OAI-PMH>')
+    requests_seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            params = parse_qs(urlparse(self.path).query)
+            requests_seen.append(params)
+            body = last_page if "resumptionToken" in params else first_page
+            self.send_response(200)
+            self.send_header("Content-Type", "text/xml")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    mirror = _new_mirror()
+    mirror.categories = ["cs.CV"]
+    mirror.oai_url = f"http://127.0.0.1:{server.server_port}/oai2"
+    try:
+        assert mirror.update() == 1
+    finally:
+        server.shutdown()
+
+    assert requests_seen[0]["set"] == ["cs"]
+    assert "from" not in requests_seen[0]
+    assert requests_seen[1]["resumptionToken"] == ["6960524|1001"]
+    assert mirror.get_stats()["last_harvest"] is not None
+
+    paper = mirror.get_paper("2010.11929")
+    assert paper["authors"] == ["Alexey Dosovitskiy", "Lucas Beyer"]
+    assert paper["journalRef"] == "ICLR 2021"
+    assert paper["published"] == "2020-10-22T00:00:00Z"
+
+class _StopLoop(Exception):
+    pass
+
+def test_failed_harvest_backs_off():
+    """Una cosecha fallida no avanza last_harvest y el reintento espera con backoff acotado"""
+    mirror = _new_mirror()
+    mirror.oai_url = "http://127.0.0.1:9/oai2"
+    assert mirror.update() is None
+    assert mirror.get_stats()["last_harvest"] is None
+
+    mirror.retry_base, mirror.retry_max = 60, 200
+    mirror.update = lambda: None
+    sleeps = []
+
+    def _sleep(seconds):
+        sleeps.append(seconds)
+        if len(sleeps) == 4:
+            raise _StopLoop()
+
+    original = mirror_module.time
+    mirror_module.time = SimpleNamespace(sleep=_sleep)
+    try:
+        mirror._update_loop()
+    except _StopLoop:
+        pass
+    finally:
+        mirror_module.time = original
+    assert sleeps == [60, 120, 200, 200], sleeps
+
+def main():
+    """Ejecutar todos los tests"""
+    tests = [
+        ("Carga de snapshot", test_load_snapshot),
+        ("Búsqueda local", test_search),
+        ("Cosecha OAI incremental", test_oai_incremental_harvest),
+        ("Backoff tras cosecha fallida", test_failed_harvest_backs_off)
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            logger.info(f"✅ {test_name}: PASSED")
+            passed += 1
+        except AssertionError as e:
+            logger.error(f"❌ {test_name}: FAILED - {e}")
+
+    logger.info(f"🎯 RESULTADO FINAL: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
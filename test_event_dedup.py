@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Test script para la deduplicación de eventos de Slack (LRU + Redis + índice único)
+"""
+
+import os
+import sqlite3
+import logging
+import tempfile
+
+import memory_manager as memory_module
+from event_dedup import EventDeduplicator
+from memory_manager import MemoryManager
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class _FakeRedis:
+    """SET NX EX en memoria, compartido entre 'workers'"""
+
+    def __init__(self, fail=False):
+        self.keys = {}
+        self.fail = fail
+        self.calls = 0
+
+    def set(self, key, value, nx=False, ex=None):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("redis caído")
+        if nx and key in self.keys:
+            return None
+        self.keys[key] = (value, ex)
+        return True
+
+def _event(event_id, ts="1700000000.000100", event_type="app_mention", client_msg_id="m-1"):
+    return {"type": "event_callback", "event_id": event_id,
+            "event": {"type": event_type, "channel": "C1", "ts": ts, "client_msg_id": client_msg_id}}
+
+def test_retry_dropped_in_process():
+    """El reintento (mismo event_id) y el mismo mensaje con otro event_id se descartan"""
+    dedup = EventDeduplicator(use_redis=False)
+    assert not dedup.is_duplicate(_event("Ev1"))
+    assert dedup.is_duplicate(_event("Ev1"))
+    assert dedup.is_duplicate(_event("Ev2"))
+    # El mismo mensaje como evento 'message' se procesa aparte (otro handler)
+    assert not dedup.is_duplicate(_event("Ev3", event_type="message"))
+    assert dedup.get_stats()["duplicates"] == 2
+
+def test_lru_is_bounded():
+    """El seen-set no crece más allá del máximo"""
+    dedup = EventDeduplicator(use_redis=False)
+    dedup.max_entries = 50
+    for i in range(200):
+        dedup.is_duplicate(_event(f"Ev{i}", ts=f"17000000{i:02d}.0001", client_msg_id=f"m-{i}"))
+    assert dedup.get_stats()["entries"] == 50
+
+def test_redis_shared_between_workers():
+    """Otro worker con el mismo Redis descarta el evento; si Redis falla se sigue con el LRU"""
+    redis = _FakeRedis()
+    worker_a = EventDeduplicator(redis_client=redis)
+    worker_b = EventDeduplicator(redis_client=redis)
+    assert not worker_a.is_duplicate(_event("Ev1"))
+    assert worker_b.is_duplicate(_event("Ev1"))
+    assert worker_b.stats["redis_duplicates"] == 1
+    assert all(ex == worker_a.ttl for _, ex in redis.keys.values())
+
+    broken = _FakeRedis(fail=True)
+    worker_c = EventDeduplicator(redis_client=broken)
+    assert not worker_c.is_duplicate(_event("Ev9", client_msg_id="m-9"))
+    assert not worker_c.is_duplicate(_event("Ev10", client_msg_id="m-10"))
+    assert worker_c.stats["redis_errors"] == 1 and broken.calls == 1
+
+def test_middleware_acks_duplicates():
+    """El middleware corta los duplicados con un 200 y deja pasar el resto"""
+    dedup = EventDeduplicator(use_redis=False)
+    passed = []
+    assert dedup.middleware(_event("Ev1"), lambda: passed.append(1)) is None
+    response = dedup.middleware(_event("Ev1"), lambda: passed.append(2))
+    assert response.status == 200 and passed == [1]
+    # Comandos y acciones no se tocan
+    dedup.middleware({"type": "block_actions"}, lambda: passed.append(3))
+    assert passed == [1, 3]
+
+def test_unique_message_ts():
+    """La DB limpia duplicados existentes y no guarda dos veces el mismo mensaje"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = os.path.join(tmpdir, "memory.db")
+        # Base previa sin índice único, con un duplicado
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("""CREATE TABLE conversations (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT,
+                channel_id TEXT, thread_ts TEXT, message_ts TEXT, role TEXT, content TEXT, metadata TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)""")
+            for _ in range(2):
+                conn.execute("INSERT INTO conversations (user_id, channel_id, message_ts, role, content) "
+                             "VALUES ('U1', 'C1', '1.1', 'user', 'hola')")
+
+        manager = MemoryManager(db_path=db_path)
+        assert manager.log_conversation("U1", "C1", "user", "hola", message_ts="1.1") is False
+        assert manager.log_conversation("U1", "C1", "user", "otra", message_ts="1.2") is True
+        assert manager.log_conversation("U1", "C2", "user", "mismo ts, otro canal", message_ts="1.2") is True
+        # Las respuestas del bot no tienen message_ts y no se ven afectadas
+        assert manager.log_conversation("U1", "C1", "assistant", "respuesta") is True
+        assert manager.log_conversation("U1", "C1", "assistant", "respuesta") is True
+
+        with sqlite3.connect(db_path) as conn:
+            rows = conn.execute("SELECT channel_id, message_ts FROM conversations ORDER BY id").fetchall()
+        assert rows == [("C1", "1.1"), ("C1", "1.2"), ("C2", "1.2"), ("C1", None), ("C1", None)]
+
+class _FakeRedisMemory:
+    """redis_memory en memoria: registra sesiones y contadores"""
+
+    def __init__(self):
+        self.calls = []
+
+    def is_available(self):
+        return True
+
+    def start_active_session(self, user_id, channel_id, metadata=None):
+        self.calls.append(("session", user_id, channel_id))
+
+    def update_session_activity(self, user_id, channel_id):
+        self.calls.append(("activity", user_id, channel_id))
+
+    def increment_message_counter(self, role):
+        self.calls.append(("counter", role))
+
+def test_duplicate_skips_redis_counters():
+    """Un reintento rechazado como duplicado no toca la sesión ni los contadores en Redis"""
+    fake = _FakeRedisMemory()
+    original = memory_module.redis_memory
+    memory_module.redis_memory = fake
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = MemoryManager(db_path=os.path.join(tmpdir, "memory.db"))
+            assert manager.log_conversation("U1", "C1", "user", "hola", message_ts="1.1") is True
+            assert manager.log_conversation("U1", "C1", "user", "hola", message_ts="1.1") is False
+            assert manager.log_conversation("U1", "C1", "assistant", "¡Hola!") is True
+    finally:
+        memory_module.redis_memory = original
+    assert fake.calls == [("session", "U1", "C1"), ("counter", "user"),
+                          ("activity", "U1", "C1"), ("counter", "bot")]
+
+def main():
+    """Ejecutar todos los tests"""
+    tests = [
+        ("Reintentos descartados en proceso", test_retry_dropped_in_process),
+        ("LRU acotado", test_lru_is_bounded),
+        ("Redis compartido entre workers", test_redis_shared_between_workers),
+        ("Middleware confirma duplicados", test_middleware_acks_duplicates),
+        ("message_ts único en la DB", test_unique_message_ts),
+        ("Duplicados sin contadores en Redis", test_duplicate_skips_redis_counters)
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            logger.info(f"✅ {test_name}: PASSED")
+            passed += 1
+        except AssertionError as e:
+            logger.error(f"❌ {test_name}: FAILED - {e}")
+
+    logger.info(f"🎯 RESULTADO FINAL: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Test script para el pipeline de eventos (ack inmediato, etapas y load shedding)
+"""
+
+import time
+import logging
+import threading
+
+from event_pipeline import EventPipeline
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def _wait_for(condition, timeout=3.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+def test_submit_returns_immediately():
+    """El listener encola sin esperar al LLM; las etapas completan el job en orden"""
+    done = []
+    pipeline = EventPipeline(name="test", max_queue=10)
+    pipeline.add_stage("context", lambda job: {**job, "context": ["hola"]})
+    pipeline.add_stage("llm", lambda job: (time.sleep(0.3), {**job, "response": "ok"})[1])
+    pipeline.add_stage("post", lambda job: done.append(job) or job)
+    try:
+        start = time.perf_counter()
+        assert pipeline.submit({"text": "pregunta"})
+        assert time.perf_counter() - start < 0.05
+        assert _wait_for(lambda: done)
+        assert done[0]["context"] == ["hola"] and done[0]["response"] == "ok"
+        metrics = pipeline.get_metrics()
+        assert metrics["completed"] == 1
+        assert metrics["stages"]["llm"]["duration_seconds"]["count"] == 1
+        assert metrics["end_to_end_seconds"]["p95"] >= 0.25
+    finally:
+        pipeline.shutdown()
+
+def test_load_shedding_when_full():
+    """Con la etapa lenta saturada la entrada se llena y los eventos se descartan al instante"""
+    release = threading.Event()
+    pipeline = EventPipeline(name="test", max_queue=2)
+    pipeline.add_stage("context", lambda job: job)
+    pipeline.add_stage("llm", lambda job: release.wait(5) and job)
+    try:
+        accepted = 0
+        while accepted < 50 and pipeline.submit({"n": accepted}):
+            accepted += 1
+            time.sleep(0.02)  # deja avanzar a los workers hasta que se bloqueen
+        # llm ocupado con 1 y 2 en su cola, context bloqueado con 1 y 2 en la entrada
+        assert accepted == 6, accepted
+        start = time.perf_counter()
+        assert not pipeline.submit({"n": 99})
+        assert time.perf_counter() - start < 0.05
+        assert pipeline.get_metrics()["shed"] == 2
+        release.set()
+        assert _wait_for(lambda: pipeline.get_metrics()["completed"] == accepted)
+    finally:
+        release.set()
+        pipeline.shutdown()
+
+def test_drop_and_error_paths():
+    """None termina el job sin error; una excepción notifica y no tumba al worker"""
+    errors, done = [], []
+
+    def _context(job):
+        if job["n"] == 1:
+            return None
+        if job["n"] == 2:
+            raise RuntimeError("DB caída")
+        return job
+
+    pipeline = EventPipeline(name="test", max_queue=10, on_error=lambda job, e: errors.append((job["n"], str(e))))
+    pipeline.add_stage("context", _context)
+    pipeline.add_stage("post", lambda job: done.append(job["n"]) or job)
+    try:
+        for n in (1, 2, 3):
+            pipeline.submit({"n": n})
+        assert _wait_for(lambda: done == [3])
+        metrics = pipeline.get_metrics()
+        assert errors == [(2, "DB caída")]
+        assert metrics["dropped"] == 1 and metrics["failed"] == 1 and metrics["completed"] == 1
+    finally:
+        pipeline.shutdown()
+
+def test_run_inline():
+    """Con el pipeline desactivado las etapas corren en el hilo del listener"""
+    pipeline = EventPipeline(name="test", max_queue=10)
+    threads = []
+    pipeline.add_stage("context", lambda job: threads.append(threading.current_thread()) or job)
+    pipeline.run_inline({"n": 1})
+    assert threads == [threading.current_thread()]
+    assert pipeline.get_metrics()["completed"] == 1
+
+def test_priority_stage_serves_urgent_first():
+    """Un job urgente encolado detrás de varios de baja urgencia se atiende primero; la espera envejece"""
+    levels = {"high": 0, "medium": 1, "low": 2}
+
+    def _run(jobs, aging_seconds, pause=0.0):
+        release, served = threading.Event(), []
+
+        def _generate(job):
+            if job["n"] == "busy":
+                # Ocupa al único worker mientras se llena la cola
+                release.wait(5)
+            served.append(job["n"])
+            return job
+
+        pipeline = EventPipeline(name="test", max_queue=10)
+        pipeline.add_stage("context", lambda job: job)
+        pipeline.add_stage("llm", _generate, priority=lambda job: levels[job["urgency"]], aging_seconds=aging_seconds)
+        try:
+            pipeline.submit({"n": "busy", "urgency": "low"})
+            assert _wait_for(lambda: pipeline.get_metrics()["stages"]["llm"]["busy"] == 1)
+            for n, urgency in jobs:
+                pipeline.submit({"n": n, "urgency": urgency})
+                time.sleep(pause)
+            assert _wait_for(lambda: pipeline.get_metrics()["stages"]["llm"]["queue_depth"] == len(jobs))
+            release.set()
+            assert _wait_for(lambda: len(served) == len(jobs) + 1)
+        finally:
+            release.set()
+            pipeline.shutdown()
+        return served
+
+    served = _run([("l1", "low"), ("l2", "low"), ("m1", "medium"), ("l3", "low"), ("h1", "high")], 10)
+    assert served == ["busy", "h1", "m1", "l1", "l2", "l3"], served
+
+    # Con envejecimiento corto, un job bajo que ya esperó pasa delante de uno urgente nuevo
+    served = _run([("l1", "low"), ("h1", "high")], 0.02, pause=0.2)
+    assert served == ["busy", "l1", "h1"], served
+
+def main():
+    """Ejecutar todos los tests"""
+    tests = [
+        ("Encolado inmediato y etapas en orden", test_submit_returns_immediately),
+        ("Load shedding con la cola llena", test_load_shedding_when_full),
+        ("Descartes y errores por etapa", test_drop_and_error_paths),
+        ("Ejecución en línea", test_run_inline),
+        ("Etapa con prioridad por urgencia", test_priority_stage_serves_urgent_first)
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            logger.info(f"✅ {test_name}: PASSED")
+            passed += 1
+        except AssertionError as e:
+            logger.error(f"❌ {test_name}: FAILED - {e}")
+
+    logger.info(f"🎯 RESULTADO FINAL: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
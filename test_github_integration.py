@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test script para consultas GitHub a través del worker MCP con cache persistente
+"""
+
+import uuid
+import asyncio
+import logging
+
+from mcp_integration import mcp_integration
+from llm_handler_production import ProductionLLMHandler
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class _FakeGitHub:
+    """Sustituye la llamada al worker y cuenta cuántas veces se usa la API"""
+
+    def __init__(self, error: str = None):
+        self.calls = []
+        self.error = error
+
+    def __call__(self, method, *params):
+        self.calls.append(method)
+        if self.error:
+            return {"success": False, "error": self.error}
+        if method == "getRepository":
+            owner, repo = params
+            return {"success": True, "result": {
+                "fullName": f"{owner}/{repo}", "description": "Demo repo", "stars": 42, "forks": 3,
+                "openIssues": 1, "language": "Python", "pushedAt": "2025-01-02T00:00:00Z",
+                "topics": ["bots"], "url": f"https://github.com/{owner}/{repo}", "license": None
+            }}
+        if method == "getIssues":
+            return {"success": True, "result": [{
+                "number": 7, "title": "Crash on start", "author": "octocat", "comments": 2,
+                "labels": [{"name": "bug", "color": "red"}], "url": "https://github.com/o/r/issues/7"
+            }]}
+        return {"success": True, "result": {"totalCount": 0, "repositories": []}}
+
+def _with_fake(fake, func):
+    original = mcp_integration._github_call
+    mcp_integration._github_call = fake
+    try:
+        return func()
+    finally:
+        mcp_integration._github_call = original
+
+def test_extract_repo_reference():
+    """Detecta owner/repo en URLs y en texto, sin confundir 'y/o'"""
+    handler = ProductionLLMHandler()
+    assert handler._extract_github_repo("mira https://github.com/pallets/flask.git") == ("pallets", "flask")
+    assert handler._extract_github_repo("issues de facebook/react.") == ("facebook", "react")
+    assert handler._extract_github_repo("busca repos de bots y/o agentes") is None
+
+def test_popular_lookups_served_locally():
+    """La segunda consulta del mismo repo no llega al worker"""
+    owner = f"octo-{uuid.uuid4().hex[:8]}"
+    fake = _FakeGitHub()
+
+    def _run():
+        first = mcp_integration.get_github_repository(owner, "demo")
+        second = mcp_integration.get_github_repository(owner, "DEMO")
+        return first, second
+
+    first, second = _with_fake(fake, _run)
+    assert first["success"] and second["success"]
+    assert second["repository"]["stars"] == 42
+    assert fake.calls == ["getRepository"]
+
+def test_handler_formats_issues():
+    """El handler enruta 'issues de owner/repo' a getIssues y formatea para Slack"""
+    owner = f"octo-{uuid.uuid4().hex[:8]}"
+    fake = _FakeGitHub()
+    handler = ProductionLLMHandler()
+    response = _with_fake(fake, lambda: asyncio.run(handler._handle_github_query(f"issues de {owner}/demo")))
+    assert fake.calls == ["getIssues"]
+    assert "#7 Crash on start" in response
+    assert f"{owner}/demo" in response
+
+def test_rate_limit_message():
+    """Sin presupuesto de API el usuario recibe un aviso claro, no un error crudo"""
+    owner = f"octo-{uuid.uuid4().hex[:8]}"
+    fake = _FakeGitHub(error="GitHub rate limit budget exhausted for core until 2025-01-01T00:00:00Z")
+    handler = ProductionLLMHandler()
+    response = _with_fake(fake, lambda: asyncio.run(handler._handle_github_query(f"repo {owner}/demo")))
+    assert "límite de consultas" in response
+    assert "MCP no disponible" not in response
+
+def main():
+    """Ejecutar todos los tests"""
+    tests = [
+        ("Referencias owner/repo", test_extract_repo_reference),
+        ("Consultas populares servidas localmente", test_popular_lookups_served_locally),
+        ("Issues formateados", test_handler_formats_issues),
+        ("Aviso de rate limit", test_rate_limit_message)
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            logger.info(f"✅ {test_name}: PASSED")
+            passed += 1
+        except AssertionError as e:
+            logger.error(f"❌ {test_name}: FAILED - {e}")
+
+    logger.info(f"🎯 RESULTADO FINAL: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
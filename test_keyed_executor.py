@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Test script para el orden por conversación (lanes por clave + lock en Redis)
+"""
+
+import time
+import logging
+import threading
+
+from event_pipeline import EventPipeline
+from keyed_executor import KeyedExecutor, RedisKeyLock, conversation_key
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class _FakeRedis:
+    """SET NX PX y el script de liberación con token, compartido entre 'procesos'"""
+
+    def __init__(self):
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def set(self, key, value, nx=False, px=None):
+        with self._lock:
+            if nx and key in self.values:
+                return None
+            self.values[key] = value
+            return True
+
+    def eval(self, script, numkeys, key, token):
+        with self._lock:
+            if self.values.get(key) == token:
+                del self.values[key]
+                return 1
+            return 0
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+def _pipeline(log, step_seconds=0.1, ordering=None, fail_on=None):
+    """Pipeline de 2 etapas con varios workers que registra inicio y fin de cada job"""
+    def _context(job):
+        if job["n"] == fail_on:
+            raise RuntimeError("falla simulada")
+        log.append(("start", job["key"], job["n"], time.perf_counter()))
+        time.sleep(step_seconds)
+        return job
+
+    def _post(job):
+        time.sleep(step_seconds)
+        log.append(("end", job["key"], job["n"], time.perf_counter()))
+        return job
+
+    pipeline = EventPipeline(name="test", max_queue=50, ordering=ordering or KeyedExecutor())
+    pipeline.add_stage("context", _context, workers=4)
+    pipeline.add_stage("post", _post, workers=4)
+    return pipeline
+
+def test_same_conversation_is_serial():
+    """Mensajes seguidos de un DM se procesan en orden y sin solaparse"""
+    log = []
+    pipeline = _pipeline(log)
+    key = conversation_key("U1", "D1")
+    try:
+        for n in range(4):
+            pipeline.submit({"key": key, "n": n})
+        assert _wait_for(lambda: len([e for e in log if e[0] == "end"]) == 4)
+    finally:
+        pipeline.shutdown()
+    assert [(kind, n) for kind, _, n, _ in log] == [
+        ("start", 0), ("end", 0), ("start", 1), ("end", 1), ("start", 2), ("end", 2), ("start", 3), ("end", 3)
+    ]
+    assert pipeline.get_metrics()["ordering"]["queued_behind"] == 3
+
+def test_conversations_run_in_parallel():
+    """Conversaciones distintas no se esperan entre sí"""
+    log = []
+    pipeline = _pipeline(log, step_seconds=0.2)
+    try:
+        start = time.perf_counter()
+        for user in ("U1", "U2", "U3", "U4"):
+            pipeline.submit({"key": conversation_key(user, "C1"), "n": 0})
+        assert _wait_for(lambda: len([e for e in log if e[0] == "end"]) == 4)
+        elapsed = time.perf_counter() - start
+    finally:
+        pipeline.shutdown()
+    logger.info(f"  ⚡ 4 conversaciones de 0.4s en {elapsed:.2f}s")
+    assert elapsed < 0.8
+    assert pipeline.get_metrics()["ordering"]["queued_behind"] == 0
+
+def test_failure_releases_lane():
+    """Un job que falla libera su conversación para el siguiente mensaje"""
+    log = []
+    pipeline = _pipeline(log, step_seconds=0.01, fail_on=0)
+    key = conversation_key("U1", "C1", "1700000000.0001")
+    try:
+        pipeline.submit({"key": key, "n": 0})
+        pipeline.submit({"key": key, "n": 1})
+        assert _wait_for(lambda: any(e[0] == "end" and e[2] == 1 for e in log))
+        assert _wait_for(lambda: pipeline.get_metrics()["ordering"]["active_conversations"] == 0)
+    finally:
+        pipeline.shutdown()
+    assert pipeline.get_metrics()["failed"] == 1
+
+def test_redis_lock_orders_processes():
+    """Dos 'procesos' con el mismo Redis no atienden la misma conversación a la vez"""
+    redis = _FakeRedis()
+    log = []
+    pipelines = [
+        _pipeline(log, step_seconds=0.1, ordering=KeyedExecutor(distributed_lock=RedisKeyLock(redis_client=redis)))
+        for _ in range(2)
+    ]
+    key = conversation_key("U1", "D1")
+    try:
+        pipelines[0].submit({"key": key, "n": 0})
+        time.sleep(0.02)
+        pipelines[1].submit({"key": key, "n": 1})
+        assert _wait_for(lambda: len([e for e in log if e[0] == "end"]) == 2)
+    finally:
+        for pipeline in pipelines:
+            pipeline.shutdown()
+    assert [(kind, n) for kind, _, n, _ in log] == [("start", 0), ("end", 0), ("start", 1), ("end", 1)]
+    assert pipelines[1].ordering.distributed_lock.stats["contended"] == 1
+    assert redis.values == {}
+
+def test_contended_lock_does_not_block_workers():
+    """Una conversación tomada por otro proceso se difiere; las demás siguen con el mismo worker"""
+    redis = _FakeRedis()
+    lock = RedisKeyLock(redis_client=redis)
+    busy_key = conversation_key("U1", "D1")
+    redis.set(lock.key_prefix + busy_key, "otro-proceso", nx=True)
+    log = []
+    pipeline = _pipeline(log, step_seconds=0.01, ordering=KeyedExecutor(distributed_lock=lock))
+    pipeline.stages[0].workers = 1
+    try:
+        pipeline.submit({"key": busy_key, "n": 0})
+        pipeline.submit({"key": conversation_key("U2", "D2"), "n": 1})
+        assert _wait_for(lambda: any(e[0] == "end" and e[2] == 1 for e in log), timeout=1.0)
+        assert not any(e[2] == 0 for e in log)
+        # El otro proceso termina: el mensaje diferido se procesa
+        del redis.values[lock.key_prefix + busy_key]
+        assert _wait_for(lambda: any(e[0] == "end" and e[2] == 0 for e in log))
+    finally:
+        pipeline.shutdown()
+    metrics = pipeline.get_metrics()
+    assert metrics["ordering"]["deferred"] >= 1 and metrics["ordering"]["redis_lock"]["contended"] == 1
+    assert metrics["queue_depth"] == 0 and redis.values == {}
+
+def main():
+    """Ejecutar todos los tests"""
+    tests = [
+        ("Misma conversación en serie", test_same_conversation_is_serial),
+        ("Conversaciones en paralelo", test_conversations_run_in_parallel),
+        ("Falla libera la conversación", test_failure_releases_lane),
+        ("Lock en Redis entre procesos", test_redis_lock_orders_processes),
+        ("Lock ocupado no bloquea workers", test_contended_lock_does_not_block_workers)
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            logger.info(f"✅ {test_name}: PASSED")
+            passed += 1
+        except AssertionError as e:
+            logger.error(f"❌ {test_name}: FAILED - {e}")
+
+    logger.info(f"🎯 RESULTADO FINAL: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Test script para la cascada de modelos (selección de tier, baja confianza y escalado)
+"""
+
+import asyncio
+import logging
+
+from llm_config_production import llm_config
+from llm_handler_production import ProductionLLMHandler
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def _run_cascade(results, analysis, tier_models=None):
+    """Ejecuta la cascada con respuestas simuladas por tier; devuelve (respuesta, tiers llamados)"""
+    calls = []
+    handler = ProductionLLMHandler()
+
+    async def _call(message, context=None, tier="standard", **kwargs):
+        calls.append(tier)
+        return results[tier]
+
+    handler._call_openrouter = _call
+    original_tiers = {name: dict(tier) for name, tier in llm_config.cascade["tiers"].items()}
+    try:
+        for name, model in (tier_models or {}).items():
+            llm_config.cascade["tiers"][name]["model"] = model
+        answer = asyncio.run(handler._call_with_cascade("pregunta", None, analysis))
+    finally:
+        llm_config.cascade["tiers"] = original_tiers
+    return answer, calls
+
+def _ok(content, finish_reason="stop"):
+    return {"success": True, "content": content, "finish_reason": finish_reason}
+
+def test_tier_mapping():
+    """Intención y complejidad eligen el tier; sin análisis o con la cascada apagada, standard"""
+    handler = ProductionLLMHandler()
+    cases = [
+        ({"intent": "greeting", "complexity": "low"}, "fast"),
+        ({"intent": "acknowledgment", "complexity": "low"}, "fast"),
+        ({"intent": "question", "complexity": "high"}, "strong"),
+        ({"intent": "question", "complexity": "medium", "topics": ["technical"]}, "strong"),
+        ({"intent": "issue_report", "complexity": "medium"}, "strong"),
+        ({"intent": "question", "complexity": "medium", "topics": ["general"]}, "standard"),
+        ({"intent": "greeting", "complexity": "medium"}, "standard"),
+        ({}, "standard")
+    ]
+    for analysis, expected in cases:
+        assert handler._select_tier(analysis) == expected, (analysis, expected)
+
+    llm_config.cascade["enabled"] = False
+    try:
+        assert handler._select_tier({"intent": "question", "complexity": "high"}) == "standard"
+    finally:
+        llm_config.cascade["enabled"] = True
+
+def test_low_confidence_markers():
+    """Dudas al inicio o en respuestas cortas cuentan; un 'no sé si…' dentro de una respuesta completa no"""
+    handler = ProductionLLMHandler()
+    long_tail = " Aquí va la explicación completa con todos los detalles del tema. " * 4
+    assert handler._is_low_confidence(_ok("No sé."))
+    assert handler._is_low_confidence(_ok("🤔 No estoy segura de eso." + long_tail))
+    assert handler._is_low_confidence(_ok("Lo siento, no tengo información sobre ese proyecto."))
+    assert handler._is_low_confidence(_ok("I'm not sure." + long_tail))
+    assert handler._is_low_confidence(_ok("", finish_reason="stop"))
+    assert handler._is_low_confidence(_ok("Respuesta cortada", finish_reason="length"))
+
+    assert not handler._is_low_confidence(_ok("No sé si te sirve, pero" + long_tail))
+    assert not handler._is_low_confidence(_ok("I don't know if this helps, but" + long_tail))
+    assert not handler._is_low_confidence(_ok(long_tail + "Si no sé algo, te lo digo."))
+    assert not handler._is_low_confidence(_ok("¡Hola! ¿En qué te ayudo hoy?"))
+
+def test_escalation_on_low_confidence():
+    """Una respuesta dudosa del tier rápido se reemplaza por la del siguiente"""
+    results = {"fast": _ok("No estoy seguro."), "standard": _ok("La respuesta correcta es 42.")}
+    answer, calls = _run_cascade(results, {"intent": "greeting", "complexity": "low"})
+    assert calls == ["fast", "standard"]
+    assert answer == "La respuesta correcta es 42."
+
+    # Si el escalado falla se mantiene la primera respuesta
+    results["standard"] = {"success": False, "error_message": "🔧 Error del servicio."}
+    answer, calls = _run_cascade(results, {"intent": "greeting", "complexity": "low"})
+    assert calls == ["fast", "standard"] and answer == "No estoy seguro."
+
+def test_escalation_on_error():
+    """Un error del tier se reintenta en el siguiente solo si es otro modelo y no es de autenticación"""
+    analysis = {"intent": "question", "complexity": "medium", "topics": ["general"]}
+    results = {"standard": {"success": False, "status": 503, "error_message": "🔧 Error del servicio."},
+               "strong": _ok("Respuesta del modelo fuerte.")}
+
+    answer, calls = _run_cascade(results, analysis, {"standard": "modelo-a", "strong": "modelo-b"})
+    assert calls == ["standard", "strong"] and answer == "Respuesta del modelo fuerte."
+
+    answer, calls = _run_cascade(results, analysis, {"standard": "modelo-a", "strong": "modelo-a"})
+    assert calls == ["standard"] and answer == "🔧 Error del servicio."
+
+    results["standard"] = {"success": False, "status": 401, "error_message": "🔐 Error de autenticación."}
+    answer, calls = _run_cascade(results, analysis, {"standard": "modelo-a", "strong": "modelo-b"})
+    assert calls == ["standard"] and answer == "🔐 Error de autenticación."
+
+def test_no_escalation_from_top_tier():
+    """El tier fuerte no tiene a dónde escalar"""
+    results = {"strong": _ok("No sé.")}
+    answer, calls = _run_cascade(results, {"intent": "question", "complexity": "high"})
+    assert calls == ["strong"] and answer == "No sé."
+
+    results["strong"] = {"success": False, "status": 503, "error_message": "🔧 Error del servicio."}
+    answer, calls = _run_cascade(results, {"intent": "question", "complexity": "high"})
+    assert calls == ["strong"] and answer == "🔧 Error del servicio."
+
+def main():
+    """Ejecutar todos los tests"""
+    tests = [
+        ("Mapeo de análisis a tier", test_tier_mapping),
+        ("Marcadores de baja confianza", test_low_confidence_markers),
+        ("Escalado por baja confianza", test_escalation_on_low_confidence),
+        ("Escalado por error", test_escalation_on_error),
+        ("Sin escalado desde el tier fuerte", test_no_escalation_from_top_tier)
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            logger.info(f"✅ {test_name}: PASSED")
+            passed += 1
+        except AssertionError as e:
+            logger.error(f"❌ {test_name}: FAILED - {e}")
+
+    logger.info(f"🎯 RESULTADO FINAL: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
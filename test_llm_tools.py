@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Test script para el router de tools del LLM (function calling sobre MCP)
+"""
+
+import json
+import time
+import asyncio
+import logging
+
+from llm_tools import ToolRouter, tool_router
+from llm_config_production import llm_config
+from llm_handler_production import ProductionLLMHandler
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def _tool_call(call_id, name, **arguments):
+    return {"id": call_id, "type": "function", "function": {"name": name, "arguments": json.dumps(arguments)}}
+
+def _slow_router(executed):
+    router = ToolRouter()
+
+    async def _weather(location="", forecast=False, **_):
+        executed.append(location)
+        await asyncio.sleep(0.2)
+        if location == "Atlantis":
+            return {"success": False, "not_found": True, "error": "Ubicación no encontrada"}
+        return {"success": True, "location": location, "temp": 21}
+
+    router._executors["get_weather"] = _weather
+    return router
+
+def test_parallel_calls_and_cache():
+    """Las tool calls de un turno corren en paralelo; los éxitos se cachean, los errores no"""
+    executed = []
+    router = _slow_router(executed)
+    calls = [_tool_call(f"c{i}", "get_weather", location=city)
+             for i, city in enumerate(["Madrid", "Lima", "Atlantis"])]
+
+    start = time.perf_counter()
+    messages = asyncio.run(router.execute(calls, budget=4))
+    elapsed = time.perf_counter() - start
+    logger.info(f"  ⚡ 3 tools de 0.2s en {elapsed:.2f}s")
+    assert elapsed < 0.4
+    assert [m["tool_call_id"] for m in messages] == ["c0", "c1", "c2"]
+    assert json.loads(messages[0]["content"])["location"] == "Madrid"
+
+    asyncio.run(router.execute(calls, budget=4))
+    assert executed == ["Madrid", "Lima", "Atlantis", "Atlantis"]
+    assert router.stats["cache_hits"] == 2 and router.stats["errors"] == 2
+
+def test_budget_and_bad_calls():
+    """Las llamadas fuera de presupuesto o inválidas responden sin ejecutarse"""
+    executed = []
+    router = _slow_router(executed)
+    calls = [
+        _tool_call("a", "get_weather", location="Madrid"),
+        {"id": "b", "type": "function", "function": {"name": "get_weather", "arguments": "{no json"}},
+        _tool_call("c", "delete_everything"),
+        _tool_call("d", "get_weather", location="Lima")
+    ]
+    messages = asyncio.run(router.execute(calls, budget=3))
+    contents = [json.loads(m["content"]) for m in messages]
+    assert executed == ["Madrid"]
+    assert "inválidos" in contents[1]["error"]
+    assert "desconocida" in contents[2]["error"]
+    assert "Presupuesto" in contents[3]["error"]
+    assert router.stats["over_budget"] == 1
+
+def _run_handler(replies, message):
+    """Corre get_response en modo tools con respuestas simuladas del modelo"""
+    handler = ProductionLLMHandler()
+    handler.config = {**handler.config, "api_key": "test"}
+    requests = []
+
+    async def _call(message, context=None, tier="standard", session=None, tools=None,
+                    extra_messages=None, tool_choice=None):
+        requests.append({"tools": tools, "extra": list(extra_messages or []), "tool_choice": tool_choice})
+        return replies[len(requests) - 1]
+
+    async def _cascade(message, context, analysis):
+        requests.append({"cascade": True})
+        return "respuesta de la cascada"
+
+    handler._call_openrouter = _call
+    handler._call_with_cascade = _cascade
+    previous = dict(llm_config.tool_calling)
+    llm_config.tool_calling.update(enabled=True, budget=4, max_rounds=2)
+    try:
+        return asyncio.run(handler.get_response(message)), requests
+    finally:
+        llm_config.tool_calling.clear()
+        llm_config.tool_calling.update(previous)
+
+def test_model_decides_without_detours():
+    """Una pregunta técnica con 'código' y 'proyecto' va directo al modelo, sin stub de GitHub"""
+    response, requests = _run_handler(
+        [{"success": True, "content": "Usa funciones pequeñas.", "tool_calls": []}],
+        "¿cómo organizo el código de mi proyecto en Python?"
+    )
+    assert response == "Usa funciones pequeñas."
+    assert len(requests) == 1 and requests[0]["tools"]
+
+def test_tool_round_trip():
+    """El modelo pide una tool, recibe el resultado y responde; 400 sin tools cae a la cascada"""
+    original = tool_router._executors["get_weather"]
+
+    async def _weather(location="", forecast=False, **_):
+        return {"success": True, "location": location, "temp": 18}
+
+    tool_router._executors["get_weather"] = _weather
+    try:
+        response, requests = _run_handler([
+            {"success": True, "content": "", "tool_calls": [_tool_call("w1", "get_weather", location="Santiago")]},
+            {"success": True, "content": "En Santiago hay 18°C.", "tool_calls": []}
+        ], "¿qué temperatura hace en Santiago?")
+    finally:
+        tool_router._executors["get_weather"] = original
+    assert response == "En Santiago hay 18°C."
+    assistant, tool_message = requests[1]["extra"]
+    assert assistant["tool_calls"][0]["id"] == "w1"
+    assert tool_message["tool_call_id"] == "w1" and '"temp": 18' in tool_message["content"]
+
+    response, requests = _run_handler(
+        [{"success": False, "status": 404, "error_message": "🔧 Error del servicio."}], "hola, ¿qué tal?"
+    )
+    assert response == "respuesta de la cascada" and requests[-1] == {"cascade": True}
+
+def main():
+    """Ejecutar todos los tests"""
+    tests = [
+        ("Tools en paralelo con cache", test_parallel_calls_and_cache),
+        ("Presupuesto y llamadas inválidas", test_budget_and_bad_calls),
+        ("El modelo decide sin desvíos", test_model_decides_without_detours),
+        ("Ronda completa con tool", test_tool_round_trip)
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            logger.info(f"✅ {test_name}: PASSED")
+            passed += 1
+        except AssertionError as e:
+            logger.error(f"❌ {test_name}: FAILED - {e}")
+
+    logger.info(f"🎯 RESULTADO FINAL: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
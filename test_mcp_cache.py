@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Test script para el cache persistente de resultados MCP
+"""
+
+import os
+import time
+import logging
+import tempfile
+
+from mcp_cache import MCPResultCache
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+PAPERS = {"success": True, "papers": [{"id": "1706.03762v7", "title": "Attention Is All You Need"}], "count": 1}
+
+def _new_cache(**kwargs) -> MCPResultCache:
+    db_path = os.path.join(tempfile.mkdtemp(), "mcp_cache_test.db")
+    return MCPResultCache(db_path=db_path, **kwargs)
+
+class _Fetcher:
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.result
+
+def test_hit_and_normalization():
+    """Misma consulta con distinta capitalización/espacios usa la misma entrada"""
+    cache = _new_cache()
+    fetch = _Fetcher(PAPERS)
+    cache.get_or_fetch("search_papers", {"query": "Machine  Learning", "max_results": 5}, fetch)
+    result = cache.get_or_fetch("search_papers", {"query": "machine learning ", "max_results": 5}, fetch)
+    assert fetch.calls == 1
+    assert result["papers"][0]["id"] == "1706.03762v7"
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        cache.get_or_fetch("search_papers", {"query": "machine learning", "max_results": 5}, fetch)
+    per_hit_us = (time.perf_counter() - start) * 1e6 / 1000
+    logger.info(f"  ⚡ Acierto en memoria: {per_hit_us:.1f}µs")
+
+    stats = cache.get_stats()
+    assert stats["misses"] == 1
+    assert stats["entries"] == 1
+
+def test_persistence_across_instances():
+    """Un segundo proceso (otra instancia) lee lo guardado en disco"""
+    cache = _new_cache()
+    cache.get_or_fetch("get_paper_details", {"arxiv_id": "1706.03762"}, _Fetcher(PAPERS))
+    other = MCPResultCache(db_path=cache.db_path)
+    fetch = _Fetcher(PAPERS)
+    other.get_or_fetch("get_paper_details", {"arxiv_id": "1706.03762"}, fetch)
+    assert fetch.calls == 0
+    assert other.get_stats()["disk_hits"] == 1
+
+def test_stale_while_revalidate():
+    """Un valor vencido se sirve al instante y se refresca en segundo plano"""
+    cache = _new_cache(ttls={"search_papers": 0})
+    cache.stale_seconds = 3600
+    cache.get_or_fetch("search_papers", {"query": "rl"}, _Fetcher(PAPERS))
+
+    refreshed = dict(PAPERS, count=2)
+    fetch = _Fetcher(refreshed)
+    result = cache.get_or_fetch("search_papers", {"query": "rl"}, fetch)
+    assert result["count"] == 1
+
+    cache._refresher.submit(lambda: None).result(timeout=5)
+    assert fetch.calls == 1
+    assert cache.get_stats()["refreshes"] == 1
+    assert cache.get_stats()["stale_served"] == 1
+
+def test_negative_caching():
+    """Búsquedas vacías no vuelven a consultar arXiv mientras dure el TTL negativo"""
+    cache = _new_cache()
+    fetch = _Fetcher({"success": True, "papers": [], "count": 0})
+    cache.get_or_fetch("search_papers", {"query": "xyzzy"}, fetch)
+    cache.get_or_fetch("search_papers", {"query": "xyzzy"}, fetch)
+    assert fetch.calls == 1
+    assert cache.get_stats()["negative_hits"] == 1
+
+def test_size_eviction():
+    """Al superar el tamaño máximo se desalojan las entradas menos usadas"""
+    cache = _new_cache(max_bytes=2000)
+    for i in range(30):
+        cache.get_or_fetch("search_papers", {"query": f"q{i}"}, _Fetcher(PAPERS))
+    stats = cache.get_stats()
+    logger.info(f"  🧹 Stats: {stats}")
+    assert stats["bytes"] <= 2000
+    assert stats["evictions"] > 0
+
+def main():
+    """Ejecutar todos los tests"""
+    tests = [
+        ("Aciertos y normalización", test_hit_and_normalization),
+        ("Persistencia en disco", test_persistence_across_instances),
+        ("Stale-while-revalidate", test_stale_while_revalidate),
+        ("Cache negativo", test_negative_caching),
+        ("Desalojo por tamaño", test_size_eviction)
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            logger.info(f"✅ {test_name}: PASSED")
+            passed += 1
+        except AssertionError as e:
+            logger.error(f"❌ {test_name}: FAILED - {e}")
+
+    logger.info(f"🎯 RESULTADO FINAL: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
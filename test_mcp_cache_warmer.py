@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Test script para el precalentador del cache MCP
+"""
+
+import os
+import time
+import logging
+import tempfile
+
+from mcp_cache import MCPResultCache
+from mcp_cache_warmer import CacheWarmer
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class _FakeIntegration:
+    """Fetchers simulados con la latencia de arXiv"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+
+    def _fetch_recent_papers(self, category, max_results=5):
+        self.calls.append(("recent", category))
+        time.sleep(self.delay)
+        return {"success": True, "papers": [{"id": f"{category}-1"}], "category": category}
+
+    def _fetch_search_papers(self, query, max_results=5, category=None):
+        self.calls.append(("search", query))
+        time.sleep(self.delay)
+        return {"success": True, "papers": [{"id": f"{query}-1"}], "count": 1}
+
+def _new_warmer(delay=0.0, **settings):
+    cache = MCPResultCache(db_path=os.path.join(tempfile.mkdtemp(), "warmer.db"))
+    integration = _FakeIntegration(delay)
+    warmer = CacheWarmer(integration=integration, cache=cache)
+    warmer.categories = ["cs.AI"]
+    warmer.pause_seconds = 0
+    for name, value in settings.items():
+        setattr(warmer, name, value)
+    return warmer, cache, integration
+
+def _ask(cache, integration, query, times=1):
+    args = {"query": query, "max_results": 5, "category": None}
+    for _ in range(times):
+        cache.get_or_fetch("search_papers", args, lambda: integration._fetch_search_papers(query))
+
+def test_targets_by_frequency():
+    """Categorías configuradas primero y luego las búsquedas por frecuencia"""
+    warmer, cache, integration = _new_warmer(top_n=2)
+    _ask(cache, integration, "rare", times=1)
+    _ask(cache, integration, "popular", times=5)
+    _ask(cache, integration, "medium", times=3)
+
+    targets = warmer.select_targets()
+    assert targets[0]["capability"] == "get_recent_papers"
+    assert targets[0]["args"]["category"] == "cs.AI"
+    assert [t["args"]["query"] for t in targets[1:]] == ["popular", "medium"]
+
+def test_refreshes_only_expiring_entries():
+    """Las entradas frescas se saltan; las que vencen dentro del horizonte se refrescan"""
+    warmer, cache, integration = _new_warmer(horizon_seconds=60)
+    _ask(cache, integration, "fresh", times=2)
+    cache.ttls["search_papers"] = 30
+    _ask(cache, integration, "expiring", times=2)
+    integration.calls.clear()
+
+    result = warmer.run_once()
+    assert ("search", "expiring") in integration.calls
+    assert ("search", "fresh") not in integration.calls
+    assert ("recent", "cs.AI") in integration.calls
+    assert result["refreshed"] == 2 and result["skipped_fresh"] == 1
+
+def test_request_budget():
+    """Nunca supera MCP_WARMER_MAX_REQUESTS por pasada"""
+    warmer, cache, integration = _new_warmer(max_requests=2, horizon_seconds=10 ** 9)
+    for query in ("a1", "a2", "a3", "a4"):
+        _ask(cache, integration, query)
+    integration.calls.clear()
+
+    result = warmer.run_once()
+    assert len(integration.calls) == 2
+    assert result["refreshed"] == 2
+
+def test_papers_p95_report():
+    """Reporte de p95 de /papers por hit/miss del cache: el warmer convierte misses en hits"""
+    warmer, cache, integration = _new_warmer(delay=0.05, top_n=10)
+    queries = [f"query {i}" for i in range(5)]
+    args = lambda query: {"query": query, "max_results": 5, "category": None}
+
+    def _papers(query):
+        cache_hit = cache.is_cached("search_papers", args(query))
+        start = time.perf_counter()
+        _ask(cache, integration, query)
+        warmer.observe_papers(time.perf_counter() - start, cache_hit)
+
+    # Sin warmer: la primera búsqueda espera a la "API"
+    for query in queries:
+        _papers(query)
+    assert warmer.report()["papers_hit_ratio"] == 0.0
+
+    # Vencidas y fuera de la ventana stale: sin warmer volverían a esperar
+    cache.stale_seconds = 0
+    cache.ttls["search_papers"] = 1
+    warmer.horizon_seconds = 3600
+    time.sleep(1.1)
+    warmer.run_once()
+    for query in queries:
+        _papers(query)
+    # Una consulta nueva sigue siendo un miss aunque el warmer ya haya corrido
+    _papers("query nueva")
+
+    report = warmer.report()
+    latency = report["papers_latency"]
+    logger.info(f"  📊 /papers p95: {latency['cache_miss']['p95']}s sin cache → "
+                f"{latency['cache_hit']['p95']}s desde cache")
+    assert latency["cache_miss"]["count"] == 6 and latency["cache_hit"]["count"] == 5
+    assert latency["cache_hit"]["p95"] < latency["cache_miss"]["p95"]
+    assert report["papers_hit_ratio"] == round(5 / 11, 3)
+
+def main():
+    """Ejecutar todos los tests"""
+    tests = [
+        ("Objetivos por frecuencia", test_targets_by_frequency),
+        ("Solo entradas por vencer", test_refreshes_only_expiring_entries),
+        ("Presupuesto de requests", test_request_budget),
+        ("Reporte p95 de /papers", test_papers_p95_report)
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            logger.info(f"✅ {test_name}: PASSED")
+            passed += 1
+        except AssertionError as e:
+            logger.error(f"❌ {test_name}: FAILED - {e}")
+
+    logger.info(f"🎯 RESULTADO FINAL: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
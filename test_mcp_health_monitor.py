@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Test script para el monitor de salud MCP con ping y snapshot cacheado
+"""
+
+import time
+import logging
+
+from mcp_integration import MCPIntegration
+from mcp_health_monitor import MCPHealthMonitor
+from circuit_breaker import CircuitBreakerRegistry
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class _FakeBridge:
+    """Worker simulado: cuenta pings y reinicios"""
+
+    def __init__(self, healthy=True):
+        self.healthy = healthy
+        self.pings = 0
+        self.restarts = 0
+
+    def ping_sync(self, timeout=5.0):
+        self.pings += 1
+        if not self.healthy:
+            return {"success": False, "error": "ping timeout"}
+        return {"success": True, "ready": True, "pid": 4242, "uptimeMs": 1000,
+                "status": {"uptime": "1s", "mcpCount": 4, "availableMCPs": ["arxiv", "github"]}}
+
+    def restart(self):
+        self.restarts += 1
+
+def _new_monitor(healthy=True):
+    integration = MCPIntegration()
+    bridge = _FakeBridge(healthy)
+    # Circuitos propios para no afectar a los demás tests
+    monitor = MCPHealthMonitor(integration, bridge=bridge, breakers=CircuitBreakerRegistry())
+    # El environment se verifica una sola vez; aquí se da por verificado
+    monitor.health_status["environment_verified"] = True
+    monitor.min_interval, monitor.max_interval, monitor.healthy_interval = 5, 40, 300
+    return monitor, integration, bridge
+
+def test_ping_updates_snapshot_and_readiness():
+    """Un ping exitoso deja el snapshot sano y el readiness de la integración al día"""
+    monitor, integration, bridge = _new_monitor()
+    assert monitor.perform_health_check()
+    snapshot = monitor.get_snapshot()
+    assert snapshot["healthy"] and snapshot["worker"]["pid"] == 4242
+    assert snapshot["latency_ms"] is not None
+    assert integration.is_ready() and integration._readiness_fresh()
+    assert monitor.next_interval() == 300
+
+def test_backoff_while_recovering():
+    """Intervalos cortos y crecientes mientras falla, con tope; lento al recuperarse"""
+    monitor, integration, bridge = _new_monitor(healthy=False)
+    intervals = []
+    for _ in range(6):
+        monitor.perform_health_check()
+        intervals.append(monitor.next_interval())
+    expected = [5, 10, 20, 40, 40, 40]
+    assert all(e * 0.9 <= i <= e * 1.1 for i, e in zip(intervals, expected)), intervals
+    assert not integration.is_ready()
+    # La falla conserva el último estado conocido y guarda el error
+    assert monitor.get_snapshot()["error"] == "ping timeout"
+
+    # La recuperación reinicia el worker y vuelve a verificar el environment
+    monitor.verify_environment = lambda: {
+        "node_available": True, "mcp_directory": True, "test_execution": True, "errors": []
+    }
+    bridge.healthy = True
+    assert monitor.attempt_recovery()
+    assert bridge.restarts == 1
+    monitor.perform_health_check()
+    assert monitor.next_interval() == 300 and integration.is_ready()
+
+def test_snapshot_reads_are_instant():
+    """Leer snapshot y reporte no toca el worker"""
+    monitor, integration, bridge = _new_monitor()
+    monitor.perform_health_check()
+    start = time.perf_counter()
+    for _ in range(1000):
+        monitor.get_snapshot()
+        monitor.get_health_report()
+    elapsed = time.perf_counter() - start
+    logger.info(f"  ⚡ 1000 lecturas de snapshot en {elapsed * 1000:.1f} ms")
+    assert bridge.pings == 1
+    assert elapsed < 0.5
+
+def test_debug_snapshot_collected_in_background():
+    """/debug devuelve el diagnóstico cacheado; la recolección corre fuera del handler"""
+    monitor, integration, bridge = _new_monitor()
+    collections = []
+
+    def _slow_collector():
+        collections.append(time.time())
+        time.sleep(0.2)
+        return {"errors": []}
+
+    monitor.debug_collector = _slow_collector
+    start = time.perf_counter()
+    assert monitor.get_debug_snapshot() is None
+    assert monitor.get_debug_snapshot() is None
+    assert time.perf_counter() - start < 0.05
+
+    deadline = time.time() + 2
+    while monitor._debug_snapshot is None and time.time() < deadline:
+        time.sleep(0.01)
+    snapshot = monitor.get_debug_snapshot()
+    assert snapshot["info"] == {"errors": []}
+    assert len(collections) == 1
+
+def test_request_check_wakes_monitor():
+    """request_check adelanta el próximo ping del loop"""
+    monitor, integration, bridge = _new_monitor()
+    monitor.start_monitoring()
+    try:
+        deadline = time.time() + 2
+        while bridge.pings < 1 and time.time() < deadline:
+            time.sleep(0.01)
+        monitor.request_check()
+        deadline = time.time() + 2
+        while bridge.pings < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        assert bridge.pings == 2
+    finally:
+        monitor.stop_monitoring()
+
+def main():
+    """Ejecutar todos los tests"""
+    tests = [
+        ("Ping actualiza snapshot y readiness", test_ping_updates_snapshot_and_readiness),
+        ("Backoff mientras se recupera", test_backoff_while_recovering),
+        ("Lecturas de snapshot instantáneas", test_snapshot_reads_are_instant),
+        ("Diagnóstico en segundo plano", test_debug_snapshot_collected_in_background),
+        ("request_check despierta al monitor", test_request_check_wakes_monitor)
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            logger.info(f"✅ {test_name}: PASSED")
+            passed += 1
+        except AssertionError as e:
+            logger.error(f"❌ {test_name}: FAILED - {e}")
+
+    logger.info(f"🎯 RESULTADO FINAL: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Test script para el pool de workers MCP (despacho al menos cargado, afinidad y reciclaje)
+"""
+
+import os
+import time
+import shutil
+import logging
+import tempfile
+import threading
+
+from mcp_bridge import MCPWorkerPool
+from circuit_breaker import CircuitBreakerRegistry
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+NODE = shutil.which("node")
+
+# Worker mínimo con el protocolo de src/worker.js: responde con su pid
+FAKE_WORKER = r"""
+const readline = require('readline');
+const send = (m) => process.stdout.write('@@DONA@@' + JSON.stringify(m) + '\n');
+let handled = 0;
+const methods = {
+    whoami: async () => process.pid,
+    slow: () => new Promise(resolve => setTimeout(() => resolve(process.pid), 300)),
+    crash: async () => process.exit(1)
+};
+const rl = readline.createInterface({ input: process.stdin });
+rl.on('line', async (line) => {
+    const req = JSON.parse(line);
+    if (req.op === 'ping') {
+        return send({ id: req.id, success: true, result: {
+            ready: true, pid: process.pid, handled, rssBytes: process.memoryUsage().rss, status: {} } });
+    }
+    const result = await methods[req.method]();
+    handled++;
+    send({ id: req.id, success: true, result });
+});
+rl.on('close', () => process.exit(0));
+send({ id: 0, event: 'ready', pid: process.pid });
+"""
+
+def _with_pool(size, func, **settings):
+    if not NODE:
+        logger.info("  ⏭️ Node no disponible, se omite")
+        return
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "fake_worker.js")
+        with open(path, "w") as f:
+            f.write(FAKE_WORKER)
+        pool = MCPWorkerPool(size=size, command=[NODE, path], cwd=tmpdir, breakers=CircuitBreakerRegistry())
+        pool.pinned = {"puppeteer": 1}
+        for name, value in settings.items():
+            setattr(pool, name, value)
+        try:
+            func(pool)
+        finally:
+            pool.shutdown()
+
+def _concurrent(pool, mcp, count):
+    pids = []
+    threads = [
+        threading.Thread(target=lambda: pids.append(pool.call_sync(mcp, "slow", timeout=10)["result"]))
+        for _ in range(count)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return pids
+
+def test_least_outstanding_dispatch():
+    """Requests simultáneas se reparten entre los workers"""
+    def _run(pool):
+        pool.ping_sync(timeout=10)  # arrancar todos los workers
+        pids = _concurrent(pool, "arxiv", 3)
+        assert len(set(pids)) == 3, pids
+        assert pool.get_stats()["pending"] == 0
+    _with_pool(3, _run)
+
+def test_affinity_pins_browser_sessions():
+    """Las capacidades con sesiones quedan en su worker aunque esté ocupado"""
+    def _run(pool):
+        pool.ping_sync(timeout=10)
+        pids = _concurrent(pool, "puppeteer", 4)
+        assert len(set(pids)) == 1
+        assert pids[0] == pool.get_stats()["workers"][1]["pid"]
+    _with_pool(3, _run)
+
+def test_crashed_worker_restarts():
+    """Un worker caído falla sus requests en curso y se relanza en la siguiente"""
+    def _run(pool):
+        first = pool.call_sync("arxiv", "whoami", timeout=10)["result"]
+        crashed = pool.call_sync("arxiv", "crash", timeout=10)
+        assert not crashed["success"] and crashed["unavailable"]
+        second = pool.call_sync("arxiv", "whoami", timeout=10)["result"]
+        assert second != first
+        assert pool.get_stats()["restarts"] == 1
+    _with_pool(1, _run)
+
+def test_rss_ceiling_recycles():
+    """Un worker sobre el techo de RSS se drena, se cierra y se relanza"""
+    def _run(pool):
+        before = pool.call_sync("arxiv", "whoami", timeout=10)["result"]
+        ping = pool.ping_sync(timeout=10)
+        assert ping["success"] and ping["alive"] == 2
+        deadline = time.time() + 5
+        while pool.get_stats()["recycled"] < 2 and time.time() < deadline:
+            time.sleep(0.05)
+        assert pool.get_stats()["recycled"] == 2
+        after = pool.call_sync("arxiv", "whoami", timeout=10)["result"]
+        assert after != before
+    _with_pool(2, _run, max_rss_bytes=1)
+
+def main():
+    """Ejecutar todos los tests"""
+    tests = [
+        ("Despacho al menos cargado", test_least_outstanding_dispatch),
+        ("Afinidad de sesiones de navegador", test_affinity_pins_browser_sessions),
+        ("Reinicio tras caída", test_crashed_worker_restarts),
+        ("Reciclaje por techo de RSS", test_rss_ceiling_recycles)
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            logger.info(f"✅ {test_name}: PASSED")
+            passed += 1
+        except AssertionError as e:
+            logger.error(f"❌ {test_name}: FAILED - {e}")
+
+    logger.info(f"🎯 RESULTADO FINAL: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
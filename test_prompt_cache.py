@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test script para los mensajes cacheables del prompt (prefijo estable y breakpoints),
+en el handler de producción y en el de Anthropic
+"""
+
+import json
+import logging
+
+from llm_handler import build_anthropic_messages
+from llm_handler_production import build_cacheable_messages, PromptCacheStats
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+SYSTEM = "Eres Dona, un asistente útil."
+SUMMARY = {"role": "system", "content": "Resumen: el usuario trabaja con transformers."}
+
+def _breakpoints(messages):
+    """Índices de los mensajes con cache_control"""
+    return [index for index, msg in enumerate(messages)
+            if isinstance(msg["content"], list) and msg["content"][0].get("cache_control")]
+
+def test_stable_prefix_across_window():
+    """Con la ventana deslizante el prefijo system + resumen no cambia byte a byte"""
+    first = build_cacheable_messages(SYSTEM, [SUMMARY, {"role": "user", "content": " hola  "},
+                                              {"role": "assistant", "content": "¡Hola!", "ts": "1.1"}],
+                                     "¿qué es atención?", cache_hints=True)
+    second = build_cacheable_messages(SYSTEM, [SUMMARY, {"role": "assistant", "content": "¡Hola!"},
+                                               {"role": "user", "content": "¿qué es atención?"},
+                                               {"role": "assistant", "content": "Un mecanismo…"}],
+                                      "¿y la dispersa?", cache_hints=True)
+    assert json.dumps(first[:2]) == json.dumps(second[:2])
+    # Turnos canónicos: sin espacios sobrantes ni claves extra
+    assert first[2:] == [{"role": "user", "content": "hola"}, {"role": "assistant", "content": "¡Hola!"},
+                         {"role": "user", "content": "¿qué es atención?"}]
+
+def test_current_message_not_repeated():
+    """El historial cargado tras registrar el mensaje no lo duplica"""
+    context = [{"role": "user", "content": "hola"}, {"role": "assistant", "content": "¡Hola!"},
+               {"role": "user", "content": "¿qué es atención?"}]
+    messages = build_cacheable_messages(SYSTEM, context, "¿qué es atención?")
+    assert [m["content"] for m in messages].count("¿qué es atención?") == 1
+    assert messages[-1] == {"role": "user", "content": "¿qué es atención?"}
+    assert len(messages) == 4
+
+    # Una pregunta repetida más atrás en el historial sí se mantiene
+    messages = build_cacheable_messages(SYSTEM, context[:2], "hola")
+    assert [m["content"] for m in messages] == [SYSTEM, "hola", "¡Hola!", "hola"]
+
+def test_breakpoints_only_on_stable_prefix():
+    """cache_control solo en el system prompt y el último resumen, nunca en los turnos"""
+    context = [SUMMARY, {"role": "system", "content": "Preferencias: respuestas cortas."},
+               {"role": "user", "content": "hola"}, {"role": "assistant", "content": "¡Hola!"}]
+    messages = build_cacheable_messages(SYSTEM, context, "gracias", cache_hints=True)
+    assert _breakpoints(messages) == [0, 2]
+
+    messages = build_cacheable_messages(SYSTEM, context[2:], "gracias", cache_hints=True)
+    assert _breakpoints(messages) == [0]
+    assert messages[1:] == [{"role": "user", "content": "hola"}, {"role": "assistant", "content": "¡Hola!"},
+                            {"role": "user", "content": "gracias"}]
+
+def test_without_hints_and_stats():
+    """Sin hints el contenido es texto plano; las estadísticas calculan el hit ratio"""
+    messages = build_cacheable_messages(SYSTEM, [SUMMARY], "hola")
+    assert _breakpoints(messages) == []
+    assert all(isinstance(m["content"], str) for m in messages)
+
+    stats = PromptCacheStats()
+    stats.record({"prompt_tokens": 1000, "prompt_tokens_details": {"cached_tokens": 800}})
+    stats.record({"prompt_tokens": 1000})
+    snapshot = stats.snapshot()
+    assert snapshot["requests"] == 2 and snapshot["cached_tokens"] == 800
+    assert snapshot["cache_hit_ratio"] == 0.4
+
+def test_anthropic_breakpoints_and_current_message():
+    """Handler de Anthropic: breakpoints solo en system y último resumen, mensaje actual sin duplicar"""
+    context = [SUMMARY, {"role": "system", "content": "Preferencias: respuestas cortas."},
+               {"role": "user", "content": "hola"}, {"role": "assistant", "content": "¡Hola!"},
+               {"role": "user", "content": "¿qué es atención? "}]
+    system_blocks, messages = build_anthropic_messages(SYSTEM, context, "¿qué es atención?")
+    assert [bool(block.get("cache_control")) for block in system_blocks] == [True, False, True]
+    assert messages == [{"role": "user", "content": "hola"}, {"role": "assistant", "content": "¡Hola!"},
+                        {"role": "user", "content": "¿qué es atención?"}]
+
+    # Sin resúmenes: un único breakpoint en el system prompt
+    system_blocks, messages = build_anthropic_messages(SYSTEM, context[2:4], "gracias")
+    assert system_blocks == [{"type": "text", "text": SYSTEM, "cache_control": {"type": "ephemeral"}}]
+    assert all(isinstance(msg["content"], str) for msg in messages)
+    assert messages[-1] == {"role": "user", "content": "gracias"} and len(messages) == 3
+
+def main():
+    """Ejecutar todos los tests"""
+    tests = [
+        ("Prefijo estable con ventana deslizante", test_stable_prefix_across_window),
+        ("Mensaje actual sin duplicar", test_current_message_not_repeated),
+        ("Breakpoints solo en el prefijo estable", test_breakpoints_only_on_stable_prefix),
+        ("Sin hints y estadísticas", test_without_hints_and_stats),
+        ("Mensajes del handler de Anthropic", test_anthropic_breakpoints_and_current_message)
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            logger.info(f"✅ {test_name}: PASSED")
+            passed += 1
+        except AssertionError as e:
+            logger.error(f"❌ {test_name}: FAILED - {e}")
+
+    logger.info(f"🎯 RESULTADO FINAL: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
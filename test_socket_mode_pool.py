@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Test script para el intake de Socket Mode con varias conexiones async
+"""
+
+import json
+import time
+import asyncio
+import logging
+import threading
+
+from slack_bolt.response import BoltResponse
+from slack_sdk.socket_mode.request import SocketModeRequest
+
+from socket_mode_pool import SocketModePool
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class _FakeClient:
+    """Cliente Socket Mode en memoria: connect, is_connected y respuestas enviadas"""
+
+    def __init__(self, fail_connect=False):
+        self.fail_connect = fail_connect
+        self.socket_mode_request_listeners = []
+        self.responses = []
+        self.connected = False
+        self.closed = False
+        self.loop = None
+
+    async def connect(self):
+        self.loop = asyncio.get_running_loop()
+        if self.fail_connect:
+            raise ConnectionError("wss no disponible")
+        self.connected = True
+
+    async def is_connected(self):
+        return self.connected
+
+    async def close(self):
+        self.closed = True
+        self.connected = False
+
+    async def send_socket_mode_response(self, response):
+        self.responses.append((time.perf_counter(), response))
+
+    def deliver(self, request):
+        """Entrega un request desde el hilo del test, como si llegara por el websocket"""
+        coros = [listener(self, request) for listener in self.socket_mode_request_listeners]
+        for coro in coros:
+            asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout=5)
+
+class _FakeApp:
+    """App de Bolt mínima: registra los bodies despachados"""
+
+    def __init__(self, delay=0.0, response=None):
+        self.delay = delay
+        self.response = response or BoltResponse(status=200, body="")
+        self.dispatched = []
+
+    def dispatch(self, bolt_request):
+        time.sleep(self.delay)
+        self.dispatched.append((time.perf_counter(), bolt_request.body))
+        return self.response
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+def _start(pool, app):
+    """Corre el pool en un hilo; devuelve la función que lo detiene"""
+    stop = threading.Event()
+    thread = threading.Thread(target=pool.run, args=(app, "xapp-test"), kwargs={"stop_requested": stop.is_set},
+                              daemon=True)
+    thread.start()
+
+    def _stop():
+        stop.set()
+        thread.join(timeout=5)
+    return _stop
+
+def _pool(clients, connections=2):
+    pool = SocketModePool(connections=connections, client_factory=lambda token: clients.pop(0))
+    pool.check_interval = 0.05
+    pool.reconnect_base = 0.05
+    pool.reconnect_max = 0.2
+    pool.reconnect_grace = 0.1
+    return pool
+
+def _event(envelope_id, event_id):
+    return SocketModeRequest(type="events_api", envelope_id=envelope_id,
+                             payload={"type": "event_callback", "event_id": event_id, "event": {"type": "app_mention"}})
+
+def test_events_acked_before_dispatch():
+    """Los eventos se confirman antes de que Bolt termine de procesarlos"""
+    clients = [_FakeClient(), _FakeClient()]
+    first = clients[0]
+    app = _FakeApp(delay=0.3)
+    pool = _pool(list(clients))
+    stop = _start(pool, app)
+    try:
+        assert _wait_for(lambda: pool.get_metrics()["connected"] == 2)
+        start = time.perf_counter()
+        first.deliver(_event("env-1", "Ev1"))
+        assert time.perf_counter() - start < 0.1
+        assert _wait_for(lambda: app.dispatched)
+        ack_at, response = first.responses[0]
+        assert response.envelope_id == "env-1"
+        assert ack_at < app.dispatched[0][0]
+        assert app.dispatched[0][1]["event_id"] == "Ev1"
+    finally:
+        stop()
+    assert all(client.closed for client in clients)
+
+def test_command_waits_for_bolt_response():
+    """Comandos esperan a Bolt y devuelven su contenido JSON en el ack"""
+    client = _FakeClient()
+    app = _FakeApp(response=BoltResponse(status=200, body=json.dumps({"text": "ok"}),
+                                         headers={"content-type": "application/json;charset=utf-8"}))
+    pool = _pool([client], connections=1)
+    stop = _start(pool, app)
+    try:
+        assert _wait_for(lambda: pool.get_metrics()["connected"] == 1)
+        client.deliver(SocketModeRequest(type="slash_commands", envelope_id="env-9",
+                                         payload={"command": "/health", "text": ""}))
+        assert len(client.responses) == 1 and app.dispatched
+        assert client.responses[0][1].payload == {"text": "ok"}
+    finally:
+        stop()
+
+def test_per_connection_metrics():
+    """Cada conexión cuenta sus eventos y su tasa por minuto"""
+    clients = [_FakeClient(), _FakeClient(), _FakeClient()]
+    pool = _pool(list(clients), connections=3)
+    app = _FakeApp()
+    stop = _start(pool, app)
+    try:
+        assert _wait_for(lambda: pool.get_metrics()["connected"] == 3)
+        for n in range(3):
+            clients[0].deliver(_event(f"a-{n}", f"EvA{n}"))
+        clients[2].deliver(_event("c-0", "EvC0"))
+        assert _wait_for(lambda: len(app.dispatched) == 4)
+        metrics = pool.get_metrics()
+    finally:
+        stop()
+    assert [c["events"] for c in metrics["connections"]] == [3, 0, 1]
+    assert metrics["events"] == 4 and metrics["events_per_minute"] == 4.0
+    assert metrics["connections"][0]["last_event_age"] is not None
+    assert metrics["connections"][1]["last_event_age"] is None
+
+def test_fast_jittered_reconnect():
+    """Una conexión caída se recrea en menos de un segundo; las demás siguen recibiendo"""
+    dropping, steady, failing, replacement = _FakeClient(), _FakeClient(), _FakeClient(fail_connect=True), _FakeClient()
+    pool = _pool([dropping, steady, failing, replacement])
+    app = _FakeApp()
+    stop = _start(pool, app)
+    try:
+        assert _wait_for(lambda: pool.get_metrics()["connected"] == 2)
+        dropping.connected = False
+        start = time.perf_counter()
+        # Mientras la #0 se reconecta, la #1 sigue recibiendo
+        steady.deliver(_event("s-0", "EvS0"))
+        assert _wait_for(lambda: replacement.connected)
+        elapsed = time.perf_counter() - start
+        metrics = pool.get_metrics()
+    finally:
+        stop()
+    logger.info(f"  🔄 Conexión recreada en {elapsed:.2f}s")
+    assert elapsed < 1.0
+    assert dropping.closed and failing.closed
+    assert metrics["connections"][0]["reconnects"] == 2
+    assert metrics["connections"][0]["errors"] == 2
+    assert metrics["connections"][1]["events"] == 1 and metrics["connections"][1]["reconnects"] == 0
+    delays = [pool.backoff_delay(attempt) for attempt in range(20) for _ in range(5)]
+    assert all(0 <= delay <= pool.reconnect_max for delay in delays)
+    assert len(set(delays)) > 1
+
+def main():
+    """Ejecutar todos los tests"""
+    tests = [
+        ("Ack antes del despacho", test_events_acked_before_dispatch),
+        ("Comandos esperan a Bolt", test_command_waits_for_bolt_response),
+        ("Métricas por conexión", test_per_connection_metrics),
+        ("Reconexión rápida con jitter", test_fast_jittered_reconnect)
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            logger.info(f"✅ {test_name}: PASSED")
+            passed += 1
+        except AssertionError as e:
+            logger.error(f"❌ {test_name}: FAILED - {e}")
+
+    logger.info(f"🎯 RESULTADO FINAL: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
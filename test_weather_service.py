@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Test script para el servicio de clima con cache por celda geográfica
+"""
+
+import time
+import random
+import asyncio
+import logging
+import threading
+
+from weather_service import weather_service
+from llm_handler_production import ProductionLLMHandler
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def _weather(lat, lon):
+    return {
+        "location": {"name": "Centro", "country": "CL", "coordinates": {"lat": lat, "lon": lon}},
+        "temperature": {"current": 21, "feelsLike": 20, "min": 15, "max": 25},
+        "condition": {"main": "Clear", "description": "cielo claro", "icon": "01d"},
+        "humidity": 40, "pressure": 1015, "wind": {"speed": 3.1, "direction": 180}
+    }
+
+def _forecast(lat, lon):
+    periods = []
+    for day, hour in [(1, "09"), (1, "15"), (2, "09")]:
+        periods.append({
+            "datetime": f"2025-01-0{day}T{hour}:00:00.000Z",
+            "temperature": {"current": 20, "feelsLike": 19, "min": 12 + day, "max": 24 + day},
+            "condition": {"main": "Rain" if day == 2 else "Clear", "description": "", "icon": ""},
+            "precipitation": 1.5 if day == 2 else 0
+        })
+    return {"location": {"name": "Centro", "country": "CL"}, "periods": periods}
+
+class _FakeWeather:
+    """Sustituye la llamada al worker y cuenta las requests a la API"""
+
+    def __init__(self, delay=0.0):
+        self.calls = []
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def __call__(self, method, *params):
+        with self._lock:
+            self.calls.append(method)
+        time.sleep(self.delay)
+        if method == "searchLocations":
+            return {"success": True, "result": [{"name": "Ciudad Test", "country": "CL", "lat": -33.45, "lon": -70.66}]}
+        if method == "getForecastByCoordinates":
+            return {"success": True, "result": _forecast(params[0], params[1])}
+        return {"success": True, "result": _weather(params[0], params[1])}
+
+def _with_fake(fake, func):
+    original = weather_service._call
+    weather_service._call = fake
+    try:
+        return func()
+    finally:
+        weather_service._call = original
+
+def _random_point():
+    """Punto al azar, lejos de los bordes de su celda (las corridas no comparten cache)"""
+    lat = round(random.uniform(-60, 60), 1) + 0.05
+    lon = round(random.uniform(-170, 170), 1) + 0.05
+    return lat, lon
+
+def test_normalization_and_cells():
+    """Nombres equivalentes se normalizan igual y puntos cercanos comparten celda"""
+    assert weather_service.normalize_location("  São Paulo hoy!! ") == "sao paulo"
+    assert weather_service.normalize_location("MADRID, España") == "madrid, espana"
+    assert weather_service.parse_coordinates("-33.45, -70.66") == (-33.45, -70.66)
+    assert weather_service.cell_key(40.4168, -3.7038) == weather_service.cell_key(40.44, -3.71)
+    assert weather_service.cell_key(40.4168, -3.7038) != weather_service.cell_key(40.55, -3.7038)
+
+def test_nearby_points_share_entry():
+    """Dos coordenadas de la misma celda hacen una sola request a la API"""
+    lat, lon = _random_point()
+    fake = _FakeWeather()
+
+    def _run():
+        first = weather_service.get_current(f"{lat}, {lon}")
+        second = weather_service.get_current(f"{lat + 0.02:.3f}, {lon - 0.02:.3f}")
+        return first, second
+
+    first, second = _with_fake(fake, _run)
+    assert first["success"] and second["success"]
+    assert fake.calls == ["getWeatherByCoordinates"]
+
+def test_concurrent_lookups_coalesced():
+    """Consultas simultáneas para una celda nueva comparten una sola request"""
+    lat, lon = _random_point()
+    fake = _FakeWeather(delay=0.2)
+    results = []
+
+    def _run():
+        threads = [
+            threading.Thread(target=lambda: results.append(weather_service.get_current(f"{lat}, {lon}")))
+            for _ in range(10)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    _with_fake(fake, _run)
+    assert len(results) == 10 and all(r["success"] for r in results)
+    assert fake.calls.count("getWeatherByCoordinates") == 1
+
+def test_prefetch_serves_from_process():
+    """Tras la precarga, la consulta del equipo no sale del proceso"""
+    lat, lon = _random_point()
+    fake = _FakeWeather()
+    saved = (weather_service.enabled, weather_service.prefetch_locations, weather_service.prefetch_top)
+    weather_service.enabled = True
+    weather_service.prefetch_locations = [f"{lat}, {lon}"]
+    weather_service.prefetch_top = 0
+    try:
+        refreshed = _with_fake(fake, weather_service.prefetch)
+        assert refreshed == 1
+        assert sorted(fake.calls) == ["getForecastByCoordinates", "getWeatherByCoordinates"]
+
+        fake.calls.clear()
+        current = _with_fake(fake, lambda: weather_service.get_current(f"{lat}, {lon}"))
+        forecast = _with_fake(fake, lambda: weather_service.get_forecast(f"{lat}, {lon}"))
+        assert current["success"] and forecast["success"]
+        assert fake.calls == []
+    finally:
+        weather_service.enabled, weather_service.prefetch_locations, weather_service.prefetch_top = saved
+
+def test_handler_formats_weather():
+    """El handler responde con clima real o pronóstico según la pregunta"""
+    lat, lon = _random_point()
+    fake = _FakeWeather()
+    handler = ProductionLLMHandler()
+
+    current = _with_fake(fake, lambda: asyncio.run(handler._handle_weather_query(f"clima {lat}, {lon}")))
+    assert "21°C" in current and "cielo claro" in current.lower()
+
+    forecast = _with_fake(
+        fake, lambda: asyncio.run(handler._handle_weather_query(f"pronóstico para {lat}, {lon}"))
+    )
+    assert "2025-01-01" in forecast and "2025-01-02" in forecast
+    assert "1.5 mm" in forecast
+
+def test_unit_labels_follow_units():
+    """Las etiquetas de temperatura y viento siguen WEATHER_UNITS"""
+    current = {"weather": _weather(0, 0)}
+    forecast = {"forecast": _forecast(0, 0)}
+    original = weather_service.units
+    try:
+        weather_service.units = "imperial"
+        text = weather_service.format_current_for_slack(current)
+        assert "21°F" in text and "3.1 mph" in text and "°C" not in text
+        assert "25°F" in weather_service.format_forecast_for_slack(forecast)
+
+        weather_service.units = "standard"
+        text = weather_service.format_current_for_slack(current)
+        assert "21K" in text and "3.1 m/s" in text and "°" not in text
+
+        weather_service.units = "metric"
+        assert "21°C" in weather_service.format_current_for_slack(current)
+        assert "°C" in weather_service.format_forecast_for_slack(forecast)
+    finally:
+        weather_service.units = original
+
+def main():
+    """Ejecutar todos los tests"""
+    tests = [
+        ("Normalización y celdas", test_normalization_and_cells),
+        ("Puntos cercanos comparten entrada", test_nearby_points_share_entry),
+        ("Consultas concurrentes coalescidas", test_concurrent_lookups_coalesced),
+        ("Precarga sirve desde el proceso", test_prefetch_serves_from_process),
+        ("Formato de respuesta", test_handler_formats_weather),
+        ("Unidades según WEATHER_UNITS", test_unit_labels_follow_units)
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            logger.info(f"✅ {test_name}: PASSED")
+            passed += 1
+        except AssertionError as e:
+            logger.error(f"❌ {test_name}: FAILED - {e}")
+
+    logger.info(f"🎯 RESULTADO FINAL: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
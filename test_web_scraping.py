@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Test script para web scraping con el worker MCP persistente y el pool de navegadores
+"""
+
+import os
+import time
+import shutil
+import logging
+import tempfile
+import threading
+import subprocess
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor
+
+from content_trimmer import trim_content
+from mcp_bridge import MCPBridge
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+SITE_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "site")
+TOOLBOX_DIR = os.path.join(os.path.dirname(__file__), "dona-mcp-toolbox")
+NODE = shutil.which("node")
+
+# Worker mínimo que habla el mismo protocolo que src/worker.js (sin DonaMCP)
+FAKE_WORKER = r"""
+const readline = require('readline');
+const send = (m) => process.stdout.write('@@DONA@@' + JSON.stringify(m) + '\n');
+console.log('info: logger noise that must be ignored');
+const rl = readline.createInterface({ input: process.stdin });
+rl.on('line', (line) => {
+    const req = JSON.parse(line);
+    if (req.op === 'ping') return send({ id: req.id, success: true, result: { pid: process.pid } });
+    if (req.method === 'crash') process.exit(3);
+    if (req.method === 'fail') return send({ id: req.id, success: false, error: 'boom' });
+    setTimeout(() => {
+        console.log('info: scraped ' + req.params[0]);
+        send({ id: req.id, success: true, result: { url: req.params[0], pid: process.pid } });
+    }, 200);
+});
+rl.on('close', () => process.exit(0));
+send({ id: 0, event: 'ready', pid: process.pid });
+"""
+
+def _fake_bridge(tmpdir):
+    path = os.path.join(tmpdir, "fake_worker.js")
+    with open(path, "w") as f:
+        f.write(FAKE_WORKER)
+    return MCPBridge(command=[NODE, path], cwd=tmpdir)
+
+def test_trim_drops_boilerplate():
+    """El recorte descarta menús, avisos de cookies y líneas duplicadas"""
+    text = "\n".join([
+        "Inicio",
+        "Aceptamos cookies para mejorar tu experiencia en este sitio web",
+        "Los agentes autónomos combinan un modelo de lenguaje con herramientas externas.",
+        "Los agentes autónomos combinan un modelo de lenguaje con herramientas externas.",
+        "© 2025 Autonomos Lab. Todos los derechos reservados para siempre."
+    ])
+    trimmed = trim_content(text)
+    assert trimmed == "Los agentes autónomos combinan un modelo de lenguaje con herramientas externas."
+
+def test_trim_respects_budget_and_query():
+    """Con presupuesto ajustado se priorizan las oraciones afines a la pregunta"""
+    filler = [f"Párrafo de relleno número {i} que habla de temas generales del sitio web." for i in range(60)]
+    key = "El pool de navegadores persistente reduce la latencia de extracción a cientos de milisegundos."
+    text = "\n".join(filler[:30] + [key] + filler[30:])
+    trimmed = trim_content(text, query="¿qué dice sobre el pool de navegadores?", max_chars=600)
+    assert len(trimmed) <= 600
+    assert key in trimmed
+
+def test_bridge_protocol():
+    """Un solo proceso atiende requests concurrentes e ignora el output del logger"""
+    if not NODE:
+        logger.info("  ⏭️ Node no disponible, se omite")
+        return
+    with tempfile.TemporaryDirectory() as tmpdir:
+        bridge = _fake_bridge(tmpdir)
+        try:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=10) as pool:
+                results = list(pool.map(
+                    lambda i: bridge.call_sync("puppeteer", "scrapePage", f"https://example.com/{i}", timeout=5),
+                    range(10)
+                ))
+            elapsed = time.perf_counter() - start
+
+            assert all(r["success"] for r in results), results
+            assert [r["result"]["url"] for r in results] == [f"https://example.com/{i}" for i in range(10)]
+            assert len({r["result"]["pid"] for r in results}) == 1
+            # 10 requests de 200ms en paralelo sobre el mismo worker
+            assert elapsed < 1.5, elapsed
+
+            failed = bridge.call_sync("puppeteer", "fail", timeout=5)
+            assert not failed["success"] and failed["error"] == "boom"
+            assert bridge.ping_sync()["success"]
+            assert bridge.get_stats()["restarts"] == 0
+        finally:
+            bridge.shutdown()
+
+def test_bridge_restarts_after_crash():
+    """Si el worker muere, las requests pendientes fallan y la siguiente lo relanza"""
+    if not NODE:
+        logger.info("  ⏭️ Node no disponible, se omite")
+        return
+    with tempfile.TemporaryDirectory() as tmpdir:
+        bridge = _fake_bridge(tmpdir)
+        try:
+            first_pid = bridge.call_sync("puppeteer", "scrapePage", "https://a.com", timeout=5)["result"]["pid"]
+            crashed = bridge.call_sync("puppeteer", "crash", timeout=5)
+            assert not crashed["success"] and crashed.get("unavailable")
+
+            again = bridge.call_sync("puppeteer", "scrapePage", "https://b.com", timeout=5)
+            assert again["success"]
+            assert again["result"]["pid"] != first_pid
+            assert bridge.get_stats()["restarts"] == 1
+        finally:
+            bridge.shutdown()
+
+def _puppeteer_available() -> bool:
+    if not NODE:
+        return False
+    result = subprocess.run(
+        [NODE, "-e", "require('puppeteer'); require('./src/DonaMCP')"],
+        cwd=TOOLBOX_DIR, capture_output=True, timeout=30
+    )
+    return result.returncode == 0
+
+def test_scrape_throughput():
+    """Throughput real del pool contra un sitio local (requiere puppeteer instalado)"""
+    if not _puppeteer_available():
+        logger.info("  ⏭️ Puppeteer/DonaMCP no disponible, se omite el benchmark")
+        return
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(SimpleHTTPRequestHandler, directory=SITE_DIR))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    bridge = MCPBridge(command=[NODE, "src/worker.js"], cwd=TOOLBOX_DIR)
+    try:
+        first = bridge.call_sync("puppeteer", "scrapePage", f"{base}/index.html", timeout=60)
+        assert first["success"], first
+        assert "pool de navegadores" in first["result"]["text"]
+        assert "document.body.dataset" not in first["result"]["text"]
+
+        urls = [f"{base}/articulo.html?n={i}" for i in range(20)]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            results = list(pool.map(lambda u: bridge.call_sync("puppeteer", "scrapePage", u, timeout=60), urls))
+        elapsed = time.perf_counter() - start
+        assert all(r["success"] for r in results)
+        logger.info(f"  🕷️ {len(urls)} páginas en {elapsed:.2f}s ({len(urls) / elapsed:.1f} páginas/s)")
+
+        cached = bridge.call_sync("puppeteer", "scrapePage", urls[0], timeout=60)
+        assert cached["result"]["cached"]
+
+        stats = bridge.call_sync("puppeteer", "getPoolStats", timeout=10)["result"]
+        assert stats["blockedRequests"] >= 1  # diagrama.png
+    finally:
+        bridge.shutdown()
+        server.shutdown()
+
+def main():
+    """Ejecutar todos los tests"""
+    tests = [
+        ("Recorte sin boilerplate", test_trim_drops_boilerplate),
+        ("Recorte con presupuesto y pregunta", test_trim_respects_budget_and_query),
+        ("Protocolo del worker persistente", test_bridge_protocol),
+        ("Reinicio tras caída del worker", test_bridge_restarts_after_crash),
+        ("Throughput del pool de navegadores", test_scrape_throughput)
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            logger.info(f"✅ {test_name}: PASSED")
+            passed += 1
+        except AssertionError as e:
+            logger.error(f"❌ {test_name}: FAILED - {e}")
+
+    logger.info(f"🎯 RESULTADO FINAL: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
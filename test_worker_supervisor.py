@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Test script para el supervisor de procesos worker (reinicios, rolling restart, salud y SQLite WAL)
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import logging
+import tempfile
+import threading
+import multiprocessing
+
+from worker_supervisor import WorkerSupervisor, WorkerHeartbeat, read_worker_health
+from memory_manager import MemoryManager
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Workers de prueba (nivel de módulo para poder lanzarlos en otro proceso)
+
+def _crashing_worker(index, heartbeat_dir):
+    sys.exit(1)
+
+def _hanging_worker(index, heartbeat_dir):
+    """Un heartbeat y después nada, como un worker bloqueado"""
+    WorkerHeartbeat(index, heartbeat_dir).beat()
+    time.sleep(30)
+
+def _healthy_worker(index, heartbeat_dir):
+    WorkerHeartbeat(index, heartbeat_dir, interval=0.05).start()
+    time.sleep(30)
+
+def _log_messages(db_path, channel):
+    manager = MemoryManager(db_path=db_path)
+    for n in range(40):
+        manager.log_conversation("U1", channel, "user", f"mensaje {n}", message_ts=f"{n}.0")
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+def _supervisor(heartbeat_dir, workers=1):
+    supervisor = WorkerSupervisor(workers=workers)
+    supervisor.heartbeat_dir = heartbeat_dir
+    supervisor.start_method = "fork"
+    supervisor.poll_interval = 0.02
+    supervisor.restart_base = 0.05
+    supervisor.restart_max = 0.2
+    supervisor.heartbeat_timeout = 0.3
+    supervisor.startup_timeout = 3
+    supervisor.shutdown_grace = 2
+    return supervisor
+
+def _start(supervisor, target):
+    thread = threading.Thread(target=supervisor.run, args=(target,), daemon=True)
+    thread.start()
+
+    def _stop():
+        supervisor.request_stop()
+        thread.join(timeout=10)
+    return _stop
+
+def test_crashed_worker_restarted_with_backoff():
+    """Un worker que se cae vuelve a levantarse, con esperas crecientes y acotadas"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        supervisor = _supervisor(tmpdir)
+        stop = _start(supervisor, _crashing_worker)
+        try:
+            assert _wait_for(lambda: supervisor.stats["restarts"] >= 3)
+        finally:
+            stop()
+        assert supervisor.slots[0]["crashes"] >= 3
+        assert supervisor.get_stats()["alive"] == 0
+    assert 0.025 <= supervisor.backoff_delay(1) <= 0.05
+    assert all(supervisor.backoff_delay(crashes) <= supervisor.restart_max for crashes in range(1, 30))
+
+def test_hung_worker_replaced():
+    """Un worker vivo que deja de enviar heartbeat se detiene y se reemplaza"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        supervisor = _supervisor(tmpdir)
+        stop = _start(supervisor, _hanging_worker)
+        try:
+            assert _wait_for(lambda: supervisor.slots and supervisor.slots[0]["process"] is not None)
+            first = supervisor.slots[0]["process"]
+            assert _wait_for(lambda: supervisor.stats["hung"] >= 1)
+            assert _wait_for(lambda: supervisor.stats["restarts"] >= 1)
+        finally:
+            stop()
+        assert not first.is_alive() and first.exitcode != 0
+
+def test_rolling_restart_keeps_capacity():
+    """SIGHUP reemplaza todos los workers sin bajar de N listos"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        supervisor = _supervisor(tmpdir, workers=2)
+        supervisor.heartbeat_timeout = 2
+        stop = _start(supervisor, _healthy_worker)
+        try:
+            assert _wait_for(lambda: read_worker_health(tmpdir, 2)["ready"] == 2)
+            old_pids = {slot["process"].pid for slot in supervisor.slots}
+            supervisor.request_rolling_restart()
+            min_ready = 2
+            deadline = time.time() + 10
+            while time.time() < deadline:
+                min_ready = min(min_ready, read_worker_health(tmpdir, 2)["ready"])
+                current = {slot["process"].pid for slot in supervisor.slots if slot["process"] is not None}
+                if len(current) == 2 and not current & old_pids and supervisor.stats["rolling_restarts"] == 1:
+                    break
+                time.sleep(0.01)
+            assert not current & old_pids, (current, old_pids)
+        finally:
+            stop()
+        assert min_ready == 2
+        assert supervisor.stats["restarts"] == 0 and supervisor.stats["spawned"] == 4
+        assert read_worker_health(tmpdir)["workers"] == 0
+
+def test_aggregate_health():
+    """La salud agregada suma los workers vivos e ignora heartbeats viejos o de procesos muertos"""
+    dead = multiprocessing.get_context("fork").Process(target=time.sleep, args=(0,))
+    dead.start()
+    dead.join()
+    now = time.time()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        beats = {
+            "worker-0-a.json": {"index": 0, "pid": os.getpid(), "updated_at": now, "ready": True,
+                                "events_per_minute": 12.5, "queue_depth": 3, "completed": 40, "shed": 1},
+            "worker-1-b.json": {"index": 1, "pid": os.getpid(), "updated_at": now, "ready": False,
+                                "events_per_minute": 0.5, "queue_depth": 0, "completed": 2, "shed": 0},
+            "worker-2-c.json": {"index": 2, "pid": os.getpid(), "updated_at": now - 600, "ready": True,
+                                "events_per_minute": 99, "completed": 99},
+            "worker-3-d.json": {"index": 3, "pid": dead.pid, "updated_at": now, "ready": True,
+                                "events_per_minute": 99, "completed": 99},
+            "supervisor.json": {"pid": os.getpid(), "size": 4, "restarts": 2}
+        }
+        for name, data in beats.items():
+            with open(os.path.join(tmpdir, name), "w") as f:
+                json.dump(data, f)
+        health = read_worker_health(tmpdir, stale_seconds=60)
+    assert health["workers"] == 2 and health["ready"] == 1 and health["size"] == 4
+    assert health["events_per_minute"] == 13.0 and health["queue_depth"] == 3
+    assert health["completed"] == 42 and health["shed"] == 1 and health["restarts"] == 2
+    assert [w["index"] for w in health["per_worker"]] == [0, 1]
+
+def test_sqlite_wal_shared_between_processes():
+    """La memoria usa WAL y dos procesos escriben a la vez sin perder mensajes"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = os.path.join(tmpdir, "memory.db")
+        MemoryManager(db_path=db_path)
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        context = multiprocessing.get_context("fork")
+        writers = [context.Process(target=_log_messages, args=(db_path, channel)) for channel in ("C1", "C2")]
+        for writer in writers:
+            writer.start()
+        for writer in writers:
+            writer.join(timeout=30)
+        assert all(writer.exitcode == 0 for writer in writers)
+        with sqlite3.connect(db_path) as conn:
+            count = conn.execute("SELECT COUNT(*) FROM conversations").fetchone()[0]
+        assert count == 80, count
+
+def main():
+    """Ejecutar todos los tests"""
+    tests = [
+        ("Reinicio con backoff tras crash", test_crashed_worker_restarted_with_backoff),
+        ("Worker colgado reemplazado", test_hung_worker_replaced),
+        ("Rolling restart sin perder capacidad", test_rolling_restart_keeps_capacity),
+        ("Salud agregada de workers", test_aggregate_health),
+        ("SQLite WAL entre procesos", test_sqlite_wal_shared_between_processes)
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            logger.info(f"✅ {test_name}: PASSED")
+            passed += 1
+        except AssertionError as e:
+            logger.error(f"❌ {test_name}: FAILED - {e}")
+
+    logger.info(f"🎯 RESULTADO FINAL: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
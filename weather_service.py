@@ -0,0 +1,288 @@
+"""
+Servicio de clima sobre Weather MCP
+Normaliza y geocodifica ubicaciones, ajusta coordenadas a celdas geográficas
+para que consultas cercanas compartan entrada en el cache persistente, y
+precarga el clima de las ubicaciones más consultadas por el equipo
+"""
+
+import os
+import re
+import math
+import time
+import logging
+import threading
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+from mcp_cache import mcp_cache
+from mcp_bridge import mcp_bridge
+
+logger = logging.getLogger(__name__)
+
+# "-33.45, -70.66" o "lat 40.4 lon -3.7"
+COORDINATES_PATTERN = re.compile(r'(-?\d{1,2}(?:\.\d+)?)\s*[,;\s]\s*(?:lon\w*\s*)?(-?\d{1,3}(?:\.\d+)?)')
+# Coletillas temporales que no forman parte del nombre del lugar
+LOCATION_NOISE = re.compile(r'\s+(hoy|ahora|manana|today|now|tomorrow|esta semana|this week)$')
+
+WEATHER_EMOJIS = {
+    "Clear": "☀️", "Clouds": "☁️", "Rain": "🌧️", "Drizzle": "🌦️", "Thunderstorm": "⛈️",
+    "Snow": "❄️", "Mist": "🌫️", "Fog": "🌫️", "Haze": "🌫️"
+}
+
+# Etiquetas (temperatura, viento) según WEATHER_UNITS de OpenWeatherMap
+UNIT_LABELS = {
+    "metric": ("°C", "m/s"),
+    "imperial": ("°F", "mph"),
+    "standard": ("K", "m/s")
+}
+
+
+class WeatherService:
+    """Clima actual y pronóstico con cache por celda geográfica"""
+
+    def __init__(self):
+        self.enabled = bool(os.getenv("WEATHER_API_KEY"))
+        self.units = os.getenv("WEATHER_UNITS", "metric")
+        # ~11 km en el ecuador con 0.1°
+        self.cell_degrees = float(os.getenv("WEATHER_CELL_DEGREES", "0.1"))
+        self.timeout = float(os.getenv("WEATHER_TIMEOUT", "15"))
+        self.forecast_days = int(os.getenv("WEATHER_FORECAST_DAYS", "3"))
+        # Precarga: ubicaciones fijas del equipo + las celdas más consultadas
+        self.prefetch_locations = [
+            loc.strip() for loc in os.getenv("WEATHER_PREFETCH_LOCATIONS", "").split(",") if loc.strip()
+        ]
+        self.prefetch_top = int(os.getenv("WEATHER_PREFETCH_TOP", "5"))
+        self.prefetch_minutes = int(os.getenv("WEATHER_PREFETCH_MINUTES", "8"))
+        self._prefetch_thread: Optional[threading.Thread] = None
+        self.stats = {"geocodes": 0, "api_calls": 0, "prefetched": 0}
+
+    # ------------------------------------------------------------------
+    # Normalización de ubicaciones
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def normalize_location(location: str) -> str:
+        """'  Ciudad de México hoy!! ' -> 'ciudad de mexico'; 'São Paulo' -> 'sao paulo'"""
+        text = unicodedata.normalize("NFKD", location or "")
+        text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+        text = re.sub(r"[^\w\s,.-]", " ", text)
+        text = " ".join(text.split()).strip(" ,.-")
+        previous = None
+        while previous != text:
+            previous = text
+            text = LOCATION_NOISE.sub("", text).strip()
+        return text
+
+    @staticmethod
+    def parse_coordinates(text: str) -> Optional[Tuple[float, float]]:
+        match = COORDINATES_PATTERN.search(text or "")
+        if not match:
+            return None
+        lat, lon = float(match.group(1)), float(match.group(2))
+        if -90 <= lat <= 90 and -180 <= lon <= 180:
+            return lat, lon
+        return None
+
+    def snap(self, lat: float, lon: float) -> Tuple[float, float]:
+        """Centro de la celda que contiene el punto (mismo cálculo que WeatherMCP)"""
+        def _center(value: float) -> float:
+            return round((math.floor(value / self.cell_degrees) + 0.5) * self.cell_degrees, 4)
+        return _center(lat), _center(lon)
+
+    def cell_key(self, lat: float, lon: float) -> str:
+        lat_c, lon_c = self.snap(lat, lon)
+        return f"{lat_c:.4f},{lon_c:.4f}"
+
+    # ------------------------------------------------------------------
+    # Llamadas al worker
+    # ------------------------------------------------------------------
+
+    def _call(self, method: str, *params) -> Dict:
+        self.stats["api_calls"] += 1
+        result = mcp_bridge.call_sync("weather", method, *params, timeout=self.timeout)
+        if not result.get("success"):
+            logger.error(f"Weather {method} failed: {result.get('error')}")
+        return result
+
+    def geocode(self, location: str) -> Dict:
+        """Nombre normalizado -> coordenadas (cacheado 30 días)"""
+        coordinates = self.parse_coordinates(location)
+        if coordinates:
+            return {"success": True, "lat": coordinates[0], "lon": coordinates[1], "name": None}
+        normalized = self.normalize_location(location)
+        if not normalized:
+            return {"success": False, "error": "Ubicación vacía"}
+        return mcp_cache.get_or_fetch(
+            "weather_geocode", {"location": normalized},
+            lambda: self._fetch_geocode(normalized)
+        )
+
+    def _fetch_geocode(self, normalized: str) -> Dict:
+        self.stats["geocodes"] += 1
+        result = self._call("searchLocations", normalized, 1)
+        if not result.get("success"):
+            return result
+        if not result["result"]:
+            return {"success": False, "error": f"No encontré la ubicación '{normalized}'", "not_found": True}
+        place = result["result"][0]
+        return {
+            "success": True, "lat": place["lat"], "lon": place["lon"],
+            "name": place["name"], "country": place.get("country"), "state": place.get("state")
+        }
+
+    def _cell_args(self, lat: float, lon: float, **extra) -> Dict:
+        return {"cell": self.cell_key(lat, lon), "units": self.units, **extra}
+
+    def _fetch_current(self, lat: float, lon: float) -> Dict:
+        lat_c, lon_c = self.snap(lat, lon)
+        result = self._call("getWeatherByCoordinates", lat_c, lon_c, self.units)
+        if not result.get("success"):
+            return result
+        return {"success": True, "weather": result["result"]}
+
+    def _fetch_forecast(self, lat: float, lon: float, days: int) -> Dict:
+        lat_c, lon_c = self.snap(lat, lon)
+        result = self._call("getForecastByCoordinates", lat_c, lon_c, days, self.units)
+        if not result.get("success"):
+            return result
+        return {"success": True, "forecast": result["result"]}
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+
+    def get_current(self, location: str) -> Dict:
+        """Clima actual; ubicaciones en la misma celda comparten entrada de cache"""
+        place = self.geocode(location)
+        if not place.get("success"):
+            return place
+        lat, lon = place["lat"], place["lon"]
+        result = mcp_cache.get_or_fetch(
+            "weather_current", self._cell_args(lat, lon),
+            lambda: self._fetch_current(lat, lon)
+        )
+        return {**result, "place": place} if result.get("success") else result
+
+    def get_forecast(self, location: str, days: int = None) -> Dict:
+        """Pronóstico por períodos de 3 horas para los próximos días"""
+        days = days or self.forecast_days
+        place = self.geocode(location)
+        if not place.get("success"):
+            return place
+        lat, lon = place["lat"], place["lon"]
+        result = mcp_cache.get_or_fetch(
+            "weather_forecast", self._cell_args(lat, lon, days=days),
+            lambda: self._fetch_forecast(lat, lon, days)
+        )
+        return {**result, "place": place} if result.get("success") else result
+
+    # ------------------------------------------------------------------
+    # Precarga
+    # ------------------------------------------------------------------
+
+    def _prefetch_targets(self) -> List[Dict]:
+        """Celdas a refrescar: ubicaciones configuradas + las más consultadas"""
+        targets = {}
+        for location in self.prefetch_locations:
+            place = self.geocode(location)
+            if place.get("success"):
+                args = self._cell_args(place["lat"], place["lon"])
+                targets[args["cell"]] = args
+        for entry in mcp_cache.top_entries("weather_current", self.prefetch_top):
+            args = entry["args"]
+            if args.get("units") == self.units:
+                targets.setdefault(args["cell"], args)
+        return list(targets.values())
+
+    def prefetch(self) -> int:
+        """Refresca clima actual y pronóstico de las celdas populares antes de que venzan"""
+        if not self.enabled:
+            return 0
+        refreshed = 0
+        for args in self._prefetch_targets():
+            lat, lon = (float(value) for value in args["cell"].split(","))
+            current = self._fetch_current(lat, lon)
+            if current.get("success"):
+                mcp_cache.store("weather_current", args, current)
+                refreshed += 1
+            forecast = self._fetch_forecast(lat, lon, self.forecast_days)
+            if forecast.get("success"):
+                mcp_cache.store("weather_forecast", {**args, "days": self.forecast_days}, forecast)
+        self.stats["prefetched"] += refreshed
+        if refreshed:
+            logger.info(f"🌤️ Clima precargado para {refreshed} celdas")
+        return refreshed
+
+    def start_prefetch(self):
+        """Hilo de precarga periódica (intervalo menor que el TTL del clima actual)"""
+        if not self.enabled or self.prefetch_minutes <= 0:
+            logger.info("🌤️ Precarga de clima deshabilitada")
+            return
+        if self._prefetch_thread and self._prefetch_thread.is_alive():
+            return
+
+        def _loop():
+            while True:
+                try:
+                    self.prefetch()
+                except Exception as e:
+                    logger.error(f"❌ Error en precarga de clima: {e}")
+                time.sleep(self.prefetch_minutes * 60)
+
+        self._prefetch_thread = threading.Thread(target=_loop, name="weather-prefetch", daemon=True)
+        self._prefetch_thread.start()
+        logger.info(f"🌤️ Precarga de clima cada {self.prefetch_minutes} minutos")
+
+    # ------------------------------------------------------------------
+    # Formato para Slack
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _place_name(result: Dict) -> str:
+        place = result.get("place") or {}
+        if place.get("name"):
+            return ", ".join(p for p in (place["name"], place.get("country")) if p)
+        location = (result.get("weather") or result.get("forecast") or {}).get("location", {})
+        return ", ".join(p for p in (location.get("name"), location.get("country")) if p) or "ubicación"
+
+    def _unit_labels(self) -> Tuple[str, str]:
+        return UNIT_LABELS.get(self.units, UNIT_LABELS["metric"])
+
+    def format_current_for_slack(self, result: Dict) -> str:
+        weather = result["weather"]
+        temperature = weather["temperature"]
+        condition = weather["condition"]
+        emoji = WEATHER_EMOJIS.get(condition.get("main"), "🌡️")
+        deg, speed = self._unit_labels()
+
+        formatted = f"{emoji} **Clima en {self._place_name(result)}**\n\n"
+        formatted += f"🌡️ **{temperature['current']}{deg}** (sensación {temperature['feelsLike']}{deg})\n"
+        formatted += f"📋 {condition.get('description', '').capitalize()}\n"
+        formatted += f"⬇️ Mín {temperature['min']}{deg} | ⬆️ Máx {temperature['max']}{deg}\n"
+        formatted += f"💧 Humedad {weather.get('humidity')}% | 💨 Viento {weather['wind'].get('speed')} {speed}\n"
+        return formatted
+
+    def format_forecast_for_slack(self, result: Dict) -> str:
+        days = {}
+        for period in result["forecast"].get("periods", []):
+            day = days.setdefault(period["datetime"][:10], {"min": [], "max": [], "conditions": [], "rain": 0})
+            day["min"].append(period["temperature"]["min"])
+            day["max"].append(period["temperature"]["max"])
+            day["conditions"].append(period["condition"]["main"])
+            day["rain"] += period.get("precipitation") or 0
+
+        deg, _ = self._unit_labels()
+        formatted = f"📅 **Pronóstico para {self._place_name(result)}**\n\n"
+        for date, day in list(days.items())[:self.forecast_days]:
+            main = max(set(day["conditions"]), key=day["conditions"].count)
+            formatted += f"{WEATHER_EMOJIS.get(main, '🌡️')} **{date}**: {min(day['min'])}{deg} – {max(day['max'])}{deg}"
+            if day["rain"]:
+                formatted += f" | 🌧️ {round(day['rain'], 1)} mm"
+            formatted += "\n"
+        return formatted
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, "enabled": self.enabled, "cell_degrees": self.cell_degrees}
+
+# Instancia global
+weather_service = WeatherService()
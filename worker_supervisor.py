@@ -0,0 +1,359 @@
+"""
+Supervisor de procesos worker para Dona Bot
+Con BOT_WORKERS > 1, start.py lanza N procesos, cada uno con su App, su
+pipeline y sus conexiones Socket Mode: el trabajo de CPU escala con los
+cores y un crash tumba un worker, no el bot. El estado compartido vive en
+Redis (dedup, lock por conversación) y en SQLite en modo WAL. El
+supervisor reinicia workers caídos o colgados con backoff, hace rolling
+restart con SIGHUP y agrega la salud a partir de archivos de heartbeat.
+"""
+
+import os
+import json
+import time
+import random
+import logging
+import tempfile
+import threading
+import multiprocessing
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def worker_index() -> Optional[int]:
+    """Índice del worker actual, o None si el bot corre en un solo proceso"""
+    value = os.getenv("BOT_WORKER_INDEX")
+    return int(value) if value is not None else None
+
+
+def is_primary_worker() -> bool:
+    """Las tareas de fondo (mirror, warmer, precargas) corren en un solo proceso"""
+    return worker_index() in (None, 0)
+
+
+def default_heartbeat_dir() -> str:
+    return os.getenv("WORKER_HEARTBEAT_DIR", os.path.join(tempfile.gettempdir(), "dona-workers"))
+
+
+def _write_json(path: str, data: Dict):
+    """Escritura atómica: quien lee nunca ve un archivo a medias"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+        return True
+    except OSError:
+        return False
+
+
+def read_worker_health(directory: str = None, stale_seconds: float = None) -> Dict:
+    """
+    Salud agregada de todos los workers (la puede leer cualquiera de ellos)
+
+    Ignora heartbeats de procesos muertos o que no se actualizan hace más de
+    stale_seconds.
+    """
+    directory = directory or default_heartbeat_dir()
+    stale_seconds = stale_seconds or float(os.getenv("WORKER_HEARTBEAT_TIMEOUT", "60"))
+    now = time.time()
+    workers = []
+    supervisor = None
+    try:
+        names = sorted(os.listdir(directory))
+    except OSError:
+        names = []
+    for name in names:
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if name == "supervisor.json":
+            supervisor = data
+        elif _pid_alive(data.get("pid", -1)) and now - data.get("updated_at", 0) <= stale_seconds:
+            workers.append(data)
+    return {
+        "workers": len(workers),
+        "ready": sum(1 for w in workers if w.get("ready")),
+        "events_per_minute": round(sum(w.get("events_per_minute", 0) for w in workers), 1),
+        "queue_depth": sum(w.get("queue_depth", 0) for w in workers),
+        "completed": sum(w.get("completed", 0) for w in workers),
+        "shed": sum(w.get("shed", 0) for w in workers),
+        "restarts": supervisor.get("restarts", 0) if supervisor else 0,
+        "size": supervisor.get("size", len(workers)) if supervisor else len(workers),
+        "per_worker": sorted(workers, key=lambda w: w.get("index", 0))
+    }
+
+
+class WorkerHeartbeat:
+    """Hilo del worker que publica su estado cada pocos segundos"""
+
+    def __init__(self, index: int, directory: str = None, collect: Callable[[], Dict] = None,
+                 interval: float = None):
+        self.index = index
+        self.directory = directory or default_heartbeat_dir()
+        self.collect = collect or (lambda: {"ready": True})
+        self.interval = interval or float(os.getenv("WORKER_HEARTBEAT_INTERVAL", "5"))
+        self.path = os.path.join(self.directory, f"worker-{index}-{os.getpid()}.json")
+        self.started_at = time.time()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def beat(self):
+        try:
+            state = self.collect()
+        except Exception as e:
+            logger.warning(f"⚠️ Error recolectando salud del worker {self.index}: {e}")
+            state = {"ready": False}
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            _write_json(self.path, {
+                "index": self.index, "pid": os.getpid(),
+                "started_at": self.started_at, "updated_at": time.time(), **state
+            })
+        except OSError as e:
+            logger.warning(f"⚠️ No se pudo escribir el heartbeat del worker {self.index}: {e}")
+
+    def start(self):
+        self.beat()
+        self._thread = threading.Thread(target=self._loop, name=f"worker-heartbeat-{self.index}", daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.beat()
+
+    def stop(self):
+        self._stop.set()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class WorkerSupervisor:
+    """
+    Mantiene N procesos worker vivos
+
+    Un worker que termina sin pedírselo (o que deja de enviar heartbeat) se
+    reinicia con backoff exponencial y jitter; el contador de crashes vuelve
+    a cero cuando un worker dura WORKER_STABLE_SECONDS. El rolling restart
+    levanta el reemplazo de cada worker y espera a que esté listo antes de
+    detener al anterior, así nunca baja la capacidad.
+    """
+
+    def __init__(self, workers: int = None):
+        configured = os.getenv("BOT_WORKERS", "1").lower()
+        self.workers = workers or ((os.cpu_count() or 1) if configured == "auto" else int(configured))
+        self.heartbeat_dir = default_heartbeat_dir()
+        self.restart_base = float(os.getenv("WORKER_RESTART_BASE", "1"))
+        self.restart_max = float(os.getenv("WORKER_RESTART_MAX", "60"))
+        self.stable_seconds = float(os.getenv("WORKER_STABLE_SECONDS", "60"))
+        self.heartbeat_timeout = float(os.getenv("WORKER_HEARTBEAT_TIMEOUT", "60"))
+        # Margen para importar la App y conectar antes del primer heartbeat listo
+        self.startup_timeout = float(os.getenv("WORKER_STARTUP_TIMEOUT", "120"))
+        # El pipeline de cada worker drena hasta 30s al recibir SIGTERM
+        self.shutdown_grace = float(os.getenv("WORKER_SHUTDOWN_GRACE", "40"))
+        self.health_log_seconds = float(os.getenv("WORKER_HEALTH_LOG_SECONDS", "300"))
+        self.poll_interval = 0.5
+        self.start_method = os.getenv("WORKER_START_METHOD", "fork")
+        self.slots: List[Dict] = []
+        self.stats = {"spawned": 0, "restarts": 0, "hung": 0, "rolling_restarts": 0}
+        self._target: Optional[Callable] = None
+        self._context = None
+        self._stop_requested = False
+        self._rolling_requested = False
+
+    def request_stop(self):
+        """Seguro desde un signal handler: el loop principal hace el trabajo"""
+        self._stop_requested = True
+
+    def request_rolling_restart(self):
+        self._rolling_requested = True
+
+    def backoff_delay(self, crashes: int) -> float:
+        """Backoff exponencial con jitter: base·2^(crashes-1), entre 50% y 100%, hasta el máximo"""
+        delay = min(self.restart_max, self.restart_base * (2 ** max(0, crashes - 1)))
+        return delay * random.uniform(0.5, 1.0)
+
+    def run(self, target: Callable[[int, str], None]):
+        """Lanza los workers y los supervisa hasta request_stop(); target(index, heartbeat_dir)"""
+        self._target = target
+        self._context = multiprocessing.get_context(self.start_method)
+        os.makedirs(self.heartbeat_dir, exist_ok=True)
+        self._stop_requested = False
+        logger.info(f"🧵 Supervisor: lanzando {self.workers} workers (pid {os.getpid()})")
+        self.slots = [{"index": index, "process": None, "crashes": 0, "restarts": 0, "restart_at": 0.0}
+                      for index in range(self.workers)]
+        for slot in self.slots:
+            slot["process"], slot["started_at"] = self._spawn(slot["index"]), time.monotonic()
+
+        last_health_log = time.monotonic()
+        while not self._stop_requested:
+            if self._rolling_requested:
+                self._rolling_requested = False
+                self._rolling_restart()
+                continue
+            self._check_slots()
+            self._write_state()
+            if time.monotonic() - last_health_log >= self.health_log_seconds:
+                last_health_log = time.monotonic()
+                self._log_health()
+            time.sleep(self.poll_interval)
+
+        logger.info("🛑 Supervisor: deteniendo workers...")
+        self._stop_all()
+        self._write_state()
+        logger.info("🏁 Supervisor detenido")
+
+    def _spawn(self, index: int):
+        process = self._context.Process(target=self._target, args=(index, self.heartbeat_dir),
+                                        name=f"dona-worker-{index}", daemon=False)
+        process.start()
+        self.stats["spawned"] += 1
+        logger.info(f"🚀 Worker {index} iniciado (pid {process.pid})")
+        return process
+
+    def _heartbeat(self, index: int, pid: int) -> Optional[Dict]:
+        try:
+            with open(os.path.join(self.heartbeat_dir, f"worker-{index}-{pid}.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _remove_heartbeat(self, index: int, pid: int):
+        try:
+            os.remove(os.path.join(self.heartbeat_dir, f"worker-{index}-{pid}.json"))
+        except OSError:
+            pass
+
+    def _is_hung(self, slot: Dict) -> bool:
+        """Sin heartbeat reciente (o sin el primero tras el arranque)"""
+        beat = self._heartbeat(slot["index"], slot["process"].pid)
+        if beat is None:
+            return time.monotonic() - slot["started_at"] > self.startup_timeout
+        return time.time() - beat.get("updated_at", 0) > self.heartbeat_timeout
+
+    def _check_slots(self, skip: Optional[int] = None):
+        now = time.monotonic()
+        for slot in self.slots:
+            if slot["index"] == skip:
+                continue
+            process = slot["process"]
+            if process is None:
+                if now >= slot["restart_at"]:
+                    slot["process"], slot["started_at"] = self._spawn(slot["index"]), now
+                    slot["restarts"] += 1
+                    self.stats["restarts"] += 1
+                continue
+            if process.is_alive():
+                if self._is_hung(slot):
+                    self.stats["hung"] += 1
+                    logger.warning(f"⏳ Worker {slot['index']} (pid {process.pid}) sin heartbeat, reiniciando")
+                    self._stop_process(process, grace=5)
+                else:
+                    continue
+            process.join(timeout=0)
+            self._remove_heartbeat(slot["index"], process.pid)
+            # Un worker que duró lo suficiente no arrastra los crashes anteriores
+            if now - slot["started_at"] >= self.stable_seconds:
+                slot["crashes"] = 0
+            slot["crashes"] += 1
+            delay = self.backoff_delay(slot["crashes"])
+            slot["process"], slot["restart_at"] = None, now + delay
+            logger.error(f"💥 Worker {slot['index']} terminó (código {process.exitcode}), "
+                         f"reinicio en {delay:.1f}s (crash #{slot['crashes']})")
+
+    def _wait_ready(self, index: int, process) -> bool:
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline and not self._stop_requested:
+            if not process.is_alive():
+                return False
+            beat = self._heartbeat(index, process.pid)
+            if beat and beat.get("ready"):
+                return True
+            self._check_slots(skip=index)
+            time.sleep(self.poll_interval)
+        return False
+
+    def _rolling_restart(self):
+        """Reemplaza los workers de a uno: el nuevo listo antes de detener el viejo"""
+        logger.info("🔁 Supervisor: rolling restart")
+        self.stats["rolling_restarts"] += 1
+        for slot in self.slots:
+            if self._stop_requested:
+                return
+            replacement = self._spawn(slot["index"])
+            if not self._wait_ready(slot["index"], replacement):
+                logger.error(f"❌ El reemplazo del worker {slot['index']} no quedó listo; se mantiene el actual")
+                self._stop_process(replacement, grace=5)
+                self._remove_heartbeat(slot["index"], replacement.pid)
+                return
+            old = slot["process"]
+            slot["process"], slot["started_at"], slot["crashes"] = replacement, time.monotonic(), 0
+            if old is not None:
+                self._stop_process(old, grace=self.shutdown_grace)
+                self._remove_heartbeat(slot["index"], old.pid)
+            logger.info(f"✅ Worker {slot['index']} reemplazado (pid {replacement.pid})")
+        logger.info("✅ Rolling restart completado")
+
+    def _stop_process(self, process, grace: float):
+        """SIGTERM (el worker drena su pipeline) y SIGKILL si no termina a tiempo"""
+        if process.is_alive():
+            process.terminate()
+            process.join(timeout=grace)
+        if process.is_alive():
+            logger.warning(f"⚠️ Worker pid {process.pid} no terminó en {grace:g}s, forzando")
+            process.kill()
+            process.join(timeout=5)
+
+    def _stop_all(self):
+        processes = [slot["process"] for slot in self.slots if slot["process"] is not None]
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + self.shutdown_grace
+        for process in processes:
+            process.join(timeout=max(0.0, deadline - time.monotonic()))
+        for slot in self.slots:
+            process = slot["process"]
+            if process is None:
+                continue
+            if process.is_alive():
+                self._stop_process(process, grace=0)
+            self._remove_heartbeat(slot["index"], process.pid)
+            slot["process"] = None
+
+    def _write_state(self):
+        try:
+            _write_json(os.path.join(self.heartbeat_dir, "supervisor.json"), {
+                "pid": os.getpid(), "size": self.workers, "updated_at": time.time(), **self.stats,
+                "slots": [{"index": slot["index"], "pid": slot["process"].pid if slot["process"] else None,
+                           "restarts": slot["restarts"], "crashes": slot["crashes"]} for slot in self.slots]
+            })
+        except OSError as e:
+            logger.debug(f"No se pudo escribir el estado del supervisor: {e}")
+
+    def _log_health(self):
+        health = read_worker_health(self.heartbeat_dir, self.heartbeat_timeout)
+        logger.info(f"🩺 Workers: {health['ready']}/{self.workers} listos, "
+                    f"{health['events_per_minute']} eventos/min, {health['queue_depth']} en cola, "
+                    f"{health['completed']} completados, {self.stats['restarts']} reinicios")
+
+    def get_stats(self) -> Dict:
+        return {
+            "size": self.workers,
+            "alive": sum(1 for slot in self.slots if slot["process"] is not None and slot["process"].is_alive()),
+            **self.stats
+        }
+
+# Instancia global; start.py la usa cuando BOT_WORKERS > 1
+worker_supervisor = WorkerSupervisor()